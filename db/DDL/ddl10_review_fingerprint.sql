@@ -0,0 +1,12 @@
+-- AI サマリー作成時のレビュー集合の指紋（変更検知用）
+-- 適用先: 通常 DB（DB_*）とメスガキ DB（MESUGAKI_DB_*）の両方
+--
+-- 例:
+--   .venv\Scripts\python.exe scripts/manual/run_sql.py db/DDL/ddl10_review_fingerprint.sql
+--   .venv\Scripts\python.exe scripts/manual/run_sql.py db/DDL/ddl10_review_fingerprint.sql --prefix MESUGAKI_DB
+
+alter table public.dmm_ai_review_summaries
+  add column if not exists review_fingerprint text null;
+
+comment on column public.dmm_ai_review_summaries.review_fingerprint is
+  'サマリー作成時のレビュー集合の sha256（generate_review_id をソートして改行連結）。NULL は未計算（旧データ）';
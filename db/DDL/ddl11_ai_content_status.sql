@@ -0,0 +1,21 @@
+-- 収集時の AI 生成文（auto_comment / auto_summary / auto_point）の状態
+-- 収集スクリプトは AI 生成を待たずに pending で INSERT し、process/generate_item_content.py が後から埋める
+-- 適用先（3 環境すべて）: DB_* / MESUGAKI_DB_* / DB2_*（BL/TL = SUPABASE_URL2）
+--
+-- 例:
+--   .venv\Scripts\python.exe scripts/manual/run_sql.py db/DDL/ddl11_ai_content_status.sql
+--   .venv\Scripts\python.exe scripts/manual/run_sql.py db/DDL/ddl11_ai_content_status.sql --prefix DB2
+--   .venv\Scripts\python.exe scripts/manual/run_sql.py db/DDL/ddl11_ai_content_status.sql --prefix MESUGAKI_DB
+
+alter table public.trn_dmm_items
+  add column if not exists ai_content_status text null,
+  add column if not exists ai_content_attempts integer null default 0;
+
+comment on column public.trn_dmm_items.ai_content_status is
+  'auto_* の生成状態。pending=未生成 / done=生成済 / failed=失敗上限到達。NULL は本カラム追加前の行';
+comment on column public.trn_dmm_items.ai_content_attempts is
+  'generate_item_content.py の生成失敗回数';
+
+create index if not exists trn_dmm_items_ai_content_pending_idx
+  on public.trn_dmm_items (content_id)
+  where ai_content_status = 'pending';
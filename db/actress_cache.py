@@ -0,0 +1,148 @@
+"""mst_actress の更新日時を actress_id ごとに覚えておくローカルキャッシュ（SQLite）。
+
+作品更新のたびに同じ女優へ ActressSearch API と mst_actress UPSERT を繰り返さないよう、
+TTL 内に更新済みの女優は呼び出し側でスキップできるようにする。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from utils.supabase_retry import execute_with_retry
+
+ACTRESS_CACHE_PATH = os.getenv("ACTRESS_CACHE_PATH", "cache/actress_cache.sqlite3")
+# mst_actress を再取得するまでの猶予（時間）
+ACTRESS_CACHE_TTL_HOURS = float(os.getenv("ACTRESS_CACHE_TTL_HOURS", "168"))
+
+
+def _parse_timestamp(value: Any) -> float | None:
+    """mst_actress.updated_at（ISO 文字列）を UNIX 秒にする。tz なしは UTC 扱い。"""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+class ActressCache:
+    """actress_id → 最終更新時刻（UNIX 秒）。
+
+    namespace は書き込み先の Supabase プロジェクト単位で分ける
+    （本体とメスガキでは mst_actress が別テーブルのため）。
+    path を省略すると ACTRESS_CACHE_PATH、":memory:" を渡すとファイルを作らない。
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        namespace: str = "default",
+        ttl_seconds: float = ACTRESS_CACHE_TTL_HOURS * 3600,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        path = ACTRESS_CACHE_PATH if path is None else path
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS actress_cache ("
+            " namespace TEXT NOT NULL,"
+            " actress_id TEXT NOT NULL,"
+            " refreshed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, actress_id))"
+        )
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT actress_id, refreshed_at FROM actress_cache WHERE namespace = ?",
+            (namespace,),
+        ).fetchall()
+        self._refreshed_at: dict[str, float] = {aid: float(ts) for aid, ts in rows}
+
+    def __enter__(self) -> "ActressCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._refreshed_at)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def is_fresh(self, actress_id: Any) -> bool:
+        if actress_id in (None, ""):
+            return False
+        refreshed_at = self._refreshed_at.get(str(actress_id))
+        return refreshed_at is not None and self._clock() - refreshed_at < self.ttl_seconds
+
+    def mark_refreshed(self, actress_ids: Iterable[Any], *, at: float | None = None) -> None:
+        """actress_ids を at（既定は現在時刻）に更新済みとして記録する。"""
+        ts = self._clock() if at is None else at
+        self._record((aid, ts) for aid in actress_ids)
+
+    def _record(self, pairs: Iterable[tuple[Any, float]]) -> None:
+        """(actress_id, 時刻) をまとめて 1 トランザクションで書く。古い時刻では上書きしない。"""
+        with self._lock:
+            updates = []
+            for aid, ts in pairs:
+                if aid in (None, ""):
+                    continue
+                key = str(aid)
+                if self._refreshed_at.get(key, float("-inf")) < ts:
+                    self._refreshed_at[key] = ts
+                    updates.append((self.namespace, key, ts))
+            if not updates:
+                return
+            self._conn.executemany(
+                "INSERT INTO actress_cache (namespace, actress_id, refreshed_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (namespace, actress_id) DO UPDATE SET refreshed_at = excluded.refreshed_at",
+                updates,
+            )
+            self._conn.commit()
+
+    def prewarm(self, supabase_client: Any, *, page_size: int = 1000) -> int:
+        """mst_actress の actress_id / updated_at を読み込み、キャッシュに反映する。
+
+        戻り値は読み込んだ行数。ローカルの方が新しい時刻ならそのまま残す。
+        """
+        table = supabase_client.table("mst_actress")
+        loaded = 0
+        start = 0
+        while True:
+            response = execute_with_retry(
+                lambda start=start: table.select("actress_id, updated_at")
+                .order("actress_id")
+                .range(start, start + page_size - 1)
+            )
+            data = response.data or []
+            pairs = [
+                (row.get("actress_id"), _parse_timestamp(row.get("updated_at"))) for row in data
+            ]
+            self._record((aid, ts) for aid, ts in pairs if ts is not None)
+            loaded += len(data)
+            if len(data) < page_size:
+                break
+            start += page_size
+        fresh = sum(1 for aid in list(self._refreshed_at) if self.is_fresh(aid))
+        logging.info(
+            "女優キャッシュ prewarm: mst_actress %d 件読み込み / TTL 内 %d 件", loaded, fresh
+        )
+        return loaded
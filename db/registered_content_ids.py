@@ -0,0 +1,81 @@
+"""trn_dmm_items の登録済み content_id をまとめて照会する。"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from utils.supabase_retry import execute_with_retry
+
+# PostgREST の in フィルタは URL に載るため、既存の in_ 照会と同じ件数で区切る
+CONTENT_ID_CHUNK_SIZE = 50
+
+
+def fetch_registered_content_ids(
+    table_client: Any,
+    content_ids: Iterable[str],
+    *,
+    chunk_size: int = CONTENT_ID_CHUNK_SIZE,
+) -> set[str]:
+    """content_ids のうち trn_dmm_items に登録済みのものを返す。
+
+    table_client は ``supabase.table("trn_dmm_items")``。
+    重複・空値は除いたうえで chunk_size 件ずつ ``in_`` で照会する。
+    """
+    unique_ids = list(dict.fromkeys(str(cid) for cid in content_ids if cid))
+    registered: set[str] = set()
+    for i in range(0, len(unique_ids), chunk_size):
+        chunk = unique_ids[i : i + chunk_size]
+        response = execute_with_retry(
+            lambda chunk=chunk: table_client.select("content_id").in_("content_id", chunk)
+        )
+        registered.update(
+            str(row["content_id"]) for row in response.data or [] if row.get("content_id")
+        )
+    return registered
+
+
+class RegisteredContentIdIndex:
+    """1 回の収集実行で共有する登録済み content_id の索引。
+
+    起動時に trn_dmm_items の content_id だけをページングで読み込み、
+    以降の存在確認はローカルの set で済ませる。登録成功時は add() で追記する。
+    """
+
+    def __init__(self, content_ids: Iterable[str] = ()):
+        self._ids: set[str] = {str(cid) for cid in content_ids if cid}
+
+    @classmethod
+    def load(cls, table_client: Any, *, page_size: int = 1000) -> "RegisteredContentIdIndex":
+        """table_client（``supabase.table("trn_dmm_items")``）から全件読み込む。"""
+        index = cls()
+        start = 0
+        while True:
+            response = execute_with_retry(
+                lambda start=start: table_client.select("content_id")
+                .order("content_id")
+                .range(start, start + page_size - 1)
+            )
+            data = response.data or []
+            for row in data:
+                index.add(row.get("content_id"))
+            if len(data) < page_size:
+                break
+            start += page_size
+        logging.info("登録済み content_id を読み込み: %d 件", len(index))
+        return index
+
+    def __contains__(self, content_id: object) -> bool:
+        return content_id is not None and str(content_id) in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, content_id: str | None) -> None:
+        if content_id:
+            self._ids.add(str(content_id))
+
+    def registered_among(self, content_ids: Iterable[str]) -> set[str]:
+        """content_ids のうち登録済みのもの（fetch_registered_content_ids と同じ形）。"""
+        return {str(cid) for cid in content_ids if cid in self}
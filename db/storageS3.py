@@ -1,7 +1,15 @@
+import atexit
+import json
 import os
 import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
 import boto3
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
@@ -17,13 +25,26 @@ S3_BUCKET_3 = os.environ.get("S3_BUCKET_3")
 S3_REGION = os.environ.get("S3_REGION", "ap-northeast-1")
 S3_ACCESS_KEY = os.environ.get("S3_ACCESS_KEY")
 S3_SECRET_KEY = os.environ.get("S3_SECRET_KEY")
+# 立ち読み画像の一括アップロードで同時に送る件数
+S3_UPLOAD_WORKERS = int(os.environ.get("S3_UPLOAD_WORKERS", "8"))
+# 立ち読みプレフィックスの一覧（list_objects_v2）の試行回数。尽きたらページごとの head_object に切り替える
+S3_LIST_ATTEMPTS = 2
+PRESIGNED_URL_EXPIRES = 3600
+# 署名付き URL を使い回すキャッシュ。期限まで PRESIGN_REFRESH_MARGIN 秒を切ったら署名し直す
+PRESIGN_REFRESH_MARGIN = int(os.environ.get("S3_PRESIGN_REFRESH_MARGIN", "300"))
+# 空でなければプロセスをまたいでディスクにも保存する（JSON 1 ファイル。URL は期限まで有効な資格情報なので共有しない場所に置く）
+PRESIGN_CACHE_PATH = os.environ.get("S3_PRESIGN_CACHE_PATH", "")
 
 s3_client = boto3.client(
     "s3",
     region_name=S3_REGION,
     aws_access_key_id=S3_ACCESS_KEY,
     aws_secret_access_key=S3_SECRET_KEY,
+    # 既定の 10 では S3_UPLOAD_WORKERS 本の並列アップロードが接続待ちになる
+    config=Config(max_pool_connections=max(10, S3_UPLOAD_WORKERS * 2)),
 )
+# 1 ページは数百 KB なので 1 オブジェクト内は分割せず、並列化はオブジェクト単位で行う
+S3_PAGE_TRANSFER_CONFIG = TransferConfig(use_threads=False)
 
 
 def _upload_local_image_to_s3(
@@ -55,17 +76,8 @@ def _upload_local_image_to_s3(
             )
         logging.info("[UPLOADED] %s", key)
 
-    # 署名付きURLを生成（1時間有効）
-    try:
-        url = s3_client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": bucket, "Key": key},
-            ExpiresIn=3600,
-        )
-        return url
-    except ClientError as e:
-        logging.error("署名付きURL生成失敗: %s", e)
-        return ""
+    # 署名付きURL（1時間有効。期限が近くなるまではキャッシュを返す）
+    return _presigned_get_url(key, bucket)
 
 
 def _upload_image_to_s3(
@@ -99,22 +111,261 @@ def _upload_image_to_s3(
         )
         logging.info("[UPLOADED] %s", key)
 
-    # 署名付きURLを生成（1時間有効）
+    # 署名付きURL（1時間有効。期限が近くなるまではキャッシュを返す）
+    return _presigned_get_url(key, bucket)
+
+
+def tachiyomi_s3_prefix(floor: str, content_id: str) -> str:
+    """立ち読み画像の S3 プレフィックス（末尾スラッシュ付き）。"""
+    return f"{floor}/{content_id}/"
+
+
+def tachiyomi_s3_key(filepath: str, content_id: str, index: int, floor: str) -> str:
+    """`{floor}/{content_id}/{content_id}_{index:02d}{拡張子}`（_upload_local_image_to_s3 と同じ形式）。"""
+    filename = f"{content_id}_{index:02d}{os.path.splitext(filepath)[1]}"
+    return f"{tachiyomi_s3_prefix(floor, content_id)}{filename}"
+
+
+def list_keys_under_prefix(
+    prefix: str, *, bucket: str, max_keys: int = 1000
+) -> set[str] | None:
+    """prefix 配下のキー一覧（最大 max_keys まで、1 回の list_objects_v2）。エラー時は None。"""
     try:
-        signed = s3_client.generate_presigned_url(
+        resp = s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix, MaxKeys=max_keys)
+    except ClientError as e:
+        logging.error("S3 list_objects_v2 エラー prefix=%s: %s", prefix, e)
+        return None
+    return {obj["Key"] for obj in resp.get("Contents") or []}
+
+
+class PresignedUrlCache:
+    """(bucket, key) → (署名付き URL, 失効時刻) のキャッシュ。
+
+    失効まで refresh_margin 秒を切ったエントリは無いものとして扱う。
+    path を渡すと起動時に読み込み、save() で書き出す（失効済みは捨てる）。
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        *,
+        refresh_margin: float = PRESIGN_REFRESH_MARGIN,
+        clock=time.time,
+    ):
+        self.path = path or None
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        self._entries: dict[tuple[str, str], tuple[str, float]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if self.path:
+            self._load()
+
+    def get(self, bucket: str, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get((bucket, key))
+        if entry is None or entry[1] - self.refresh_margin <= self._clock():
+            return None
+        return entry[0]
+
+    def put(self, bucket: str, key: str, url: str, expires_in: float) -> None:
+        with self._lock:
+            self._entries[(bucket, key)] = (url, self._clock() + expires_in)
+            self._dirty = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning("署名付きURLキャッシュ読み込み失敗 %s: %s", self.path, e)
+            return
+        now = self._clock()
+        for row in rows if isinstance(rows, list) else []:
+            try:
+                bucket, key, url, expires_at = row
+            except (TypeError, ValueError):
+                continue
+            if float(expires_at) > now:
+                self._entries[(bucket, key)] = (url, float(expires_at))
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        now = self._clock()
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [
+                [bucket, key, url, expires_at]
+                for (bucket, key), (url, expires_at) in self._entries.items()
+                if expires_at > now
+            ]
+            self._dirty = False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logging.warning("署名付きURLキャッシュ書き込み失敗 %s: %s", self.path, e)
+
+
+presigned_url_cache = PresignedUrlCache(PRESIGN_CACHE_PATH)
+atexit.register(presigned_url_cache.save)
+
+
+def _presigned_get_url(key: str, bucket: str) -> str:
+    """get_object の署名付き URL（presigned_url_cache にあれば署名しない）。"""
+    cached = presigned_url_cache.get(bucket, key)
+    if cached:
+        return cached
+    try:
+        url = s3_client.generate_presigned_url(
             "get_object",
             Params={"Bucket": bucket, "Key": key},
-            ExpiresIn=3600,
+            ExpiresIn=PRESIGNED_URL_EXPIRES,
         )
-        return signed
     except ClientError as e:
         logging.error("署名付きURL生成失敗: %s", e)
         return ""
+    presigned_url_cache.put(bucket, key, url, PRESIGNED_URL_EXPIRES)
+    return url
+
+
+class TachiyomiUploadStream:
+    """立ち読みページを撮れた順に S3 へ送るアップロードキュー（キャプチャと並行に動く）。
+
+    - 作成時に `{floor}/{content_id}/` を 1 回だけ一覧し、既存キーは送らない
+      （一覧が再試行しても失敗したときは、ページごとに head_object で存在確認する）
+    - put(index, filepath) で投入（index は 1 始まり）。送信はスレッドプールで行い、呼び出し元は待たない
+    - delete_after_upload なら送信済みのローカルファイルをすぐ消す（ディスクには未送信分しか残らない）
+    - results() は全件の完了を待ち、index 順の署名付き URL を返す（失敗したページは ""）
+    """
+
+    def __init__(
+        self,
+        content_id: str,
+        floor: str,
+        bucket: str | None,
+        *,
+        workers: int | None = None,
+        delete_after_upload: bool = True,
+    ):
+        self.content_id = content_id
+        self.floor = floor
+        self.bucket = bucket
+        self.delete_after_upload = delete_after_upload
+        self._futures: dict[int, Future] = {}
+        # None は一覧に失敗した状態（_upload_one がキーごとに存在確認する）
+        self._existing: set[str] | None = set()
+        if bucket:
+            prefix = tachiyomi_s3_prefix(floor, content_id)
+            for _ in range(S3_LIST_ATTEMPTS):
+                self._existing = list_keys_under_prefix(prefix, bucket=bucket)
+                if self._existing is not None:
+                    break
+            else:
+                logging.warning("S3 一覧に失敗したためページごとに存在確認します: %s", prefix)
+        else:
+            logging.error("S3 バケット名が未設定です")
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers or S3_UPLOAD_WORKERS), thread_name_prefix="s3-upload"
+        )
 
+    def __enter__(self) -> "TachiyomiUploadStream":
+        return self
 
-def tachiyomi_s3_prefix(floor: str, content_id: str) -> str:
-    """立ち読み画像の S3 プレフィックス（末尾スラッシュ付き）。"""
-    return f"{floor}/{content_id}/"
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def put(self, index: int, filepath: str) -> None:
+        self._futures[index] = self._executor.submit(self._upload_one, index, filepath)
+
+    def results(self) -> list[str]:
+        return [self._futures[index].result() for index in sorted(self._futures)]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _upload_one(self, index: int, filepath: str) -> str:
+        if not self.bucket:
+            return ""
+        if not os.path.exists(filepath):
+            logging.warning("ファイルが存在しません: %s", filepath)
+            return ""
+        key = tachiyomi_s3_key(filepath, self.content_id, index, self.floor)
+        try:
+            exists = self._exists(key)
+        except ClientError as e:
+            logging.error("S3 head_object エラー: %s", e)
+            return ""
+        if exists:
+            logging.info("[SKIP] 既に存在: %s", key)
+        else:
+            try:
+                s3_client.upload_file(
+                    filepath,
+                    self.bucket,
+                    key,
+                    ExtraArgs={"ContentType": "image/jpeg"},
+                    Config=S3_PAGE_TRANSFER_CONFIG,
+                )
+            except (ClientError, S3UploadFailedError, OSError) as e:
+                logging.error("S3 アップロード失敗 %s: %s", key, e)
+                return ""
+            logging.info("[UPLOADED] %s", key)
+        if self.delete_after_upload:
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+        return _presigned_get_url(key, self.bucket)
+
+    def _exists(self, key: str) -> bool:
+        if self._existing is not None:
+            return key in self._existing
+        try:
+            s3_client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "404":
+                raise
+            return False
+        return True
+
+
+def _upload_local_images_to_s3(
+    filepaths: list[str],
+    content_id: str,
+    floor: str,
+    bucket: str,
+    *,
+    workers: int | None = None,
+) -> list[str]:
+    """立ち読みページをまとめてアップロードし、index 順（1 始まり）に署名付き URL を返す。
+
+    `{floor}/{content_id}/` を 1 回だけ一覧して既存キーは送らず、未登録分だけ並列にアップロードする。
+    失敗したページは ""（_upload_local_image_to_s3 を 1 枚ずつ呼んだ場合と同じ結果）。
+    """
+    if not filepaths:
+        return []
+    workers = max(1, min(workers or S3_UPLOAD_WORKERS, len(filepaths)))
+    with TachiyomiUploadStream(
+        content_id, floor, bucket, workers=workers, delete_after_upload=False
+    ) as stream:
+        for index, filepath in enumerate(filepaths, start=1):
+            stream.put(index, filepath)
+        return stream.results()
 
 
 def count_objects_under_prefix(
@@ -158,6 +409,19 @@ def upload_local_image_to_s3_bucket3(
     return _upload_local_image_to_s3(filepath, content_id, index, floor, S3_BUCKET_3)
 
 
+# ---------------------------------------------------------------------
+# 立ち読みページをまとめて S3 にアップロード（既定バケット S3_BUCKET / S3_BUCKET_3）
+# ---------------------------------------------------------------------
+def upload_local_images_to_s3(filepaths: list[str], content_id: str, floor: str) -> list[str]:
+    return _upload_local_images_to_s3(filepaths, content_id, floor, S3_BUCKET)
+
+
+def upload_local_images_to_s3_bucket3(
+    filepaths: list[str], content_id: str, floor: str
+) -> list[str]:
+    return _upload_local_images_to_s3(filepaths, content_id, floor, S3_BUCKET_3)
+
+
 # ---------------------------------------------------------------------
 # URLから画像を S3 にアップロード（既定バケット S3_BUCKET）
 # ---------------------------------------------------------------------
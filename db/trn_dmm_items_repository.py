@@ -1,10 +1,18 @@
 from db.storageS3 import (
     upload_local_image_to_s3 as upload_local_image_to_s3_default,
     upload_local_image_to_s3_bucket3,
+    upload_local_images_to_s3 as upload_local_images_to_s3_default,
+    upload_local_images_to_s3_bucket3,
+)
+from db.registered_content_ids import (
+    RegisteredContentIdIndex,
+    fetch_registered_content_ids,
 )
 from db.supabase_client import supabase, supabase2, supabase3
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from openai_api.content_generator import generate_content
+import os
 import re
 import traceback
 from typing import Callable, Optional
@@ -18,6 +26,15 @@ from utils.supabase_retry import execute_with_retry
 setup_logger("trn_dmm_items_repository.log")
 
 UploadFn = Callable[..., Optional[str]]
+# (ファイルパス一覧, content_id, floor) → index 順の URL 一覧（失敗は ""）
+BulkUploadFn = Callable[[list, str, str], list]
+
+# auto_* の生成状態（ai_content_status）。pending の行は process/generate_item_content.py が埋める
+AI_CONTENT_PENDING = "pending"
+AI_CONTENT_DONE = "done"
+AI_CONTENT_FAILED = "failed"
+# 1 にすると従来どおり INSERT 前に generate_content（Chrome + OpenAI）を同期実行する
+AI_CONTENT_INLINE = os.getenv("AI_CONTENT_INLINE", "0") == "1"
 
 
 # ---------------------------------------------------------------------
@@ -39,6 +56,13 @@ def normalize_field(v):
     return None if v in (None, [], "") else v
 
 
+def has_ai_content(ai_content: dict) -> bool:
+    """generate_content の結果に使える本文（auto_summary / auto_point）があるか。"""
+    return any(
+        (ai_content.get(key) or "").strip() for key in ("auto_summary", "auto_point")
+    )
+
+
 def resolve_tachiyomi_page_count(
     tachiyomi_url: str | None,
     uploaded_count: int,
@@ -49,6 +73,128 @@ def resolve_tachiyomi_page_count(
     return int(uploaded_count)
 
 
+def _upload_tachiyomi_images(
+    tachiyomi_image_paths,
+    content_id: str,
+    floor,
+    *,
+    upload_local_image_to_s3_fn: UploadFn,
+    upload_local_images_to_s3_fn: BulkUploadFn | None = None,
+) -> list[str]:
+    """立ち読み画像をアップロードし、成功した URL だけを index 順に返す。"""
+    if not tachiyomi_image_paths:
+        return []
+    logging.info(f" 立ち読み画像を取得: {content_id}")
+    if upload_local_images_to_s3_fn is not None:
+        storage_paths = upload_local_images_to_s3_fn(
+            list(tachiyomi_image_paths), content_id, floor
+        )
+    else:
+        storage_paths = [
+            upload_local_image_to_s3_fn(
+                img_url, content_id=content_id, index=idx + 1, floor=floor
+            )
+            for idx, img_url in enumerate(tachiyomi_image_paths)
+        ]
+    uploaded_paths = []
+    for idx, (img_url, storage_path) in enumerate(zip(tachiyomi_image_paths, storage_paths)):
+        if storage_path:
+            uploaded_paths.append(storage_path)
+        else:
+            logging.error(f"  [IMG-FAIL] Tachiyomi {idx+1}: {img_url}")
+    return uploaded_paths
+
+
+def build_dmm_item_row(
+    item: dict,
+    site,
+    service,
+    floor,
+    *,
+    uploaded_count: int,
+    ai_content: dict,
+    coerce_empty_image_urls: bool,
+) -> dict:
+    """trn_dmm_items に INSERT する 1 行（DB ごとの違いは coerce_empty_image_urls だけ）。"""
+    content_id = item.get("content_id")
+    title = item.get("title")
+    url = item.get("URL")
+
+    sample_images = (
+        item.get("sampleImageURL", {}).get("sample_l", {}).get("image")
+    )
+    sample_images_s = (
+        item.get("sampleImageURL", {}).get("sample_s", {}).get("image")
+    )
+
+    # ジャンル情報を抽出
+    iteminfo = item.get("iteminfo", {})
+    genres_raw = iteminfo.get("genre", [])
+    genre_names = [g["name"] for g in genres_raw]
+    genre_ids = [g["id"] for g in genres_raw]
+
+    ai_content_status = (
+        AI_CONTENT_DONE if has_ai_content(ai_content) else AI_CONTENT_PENDING
+    )
+
+    price = parse_price(item.get("prices", {}).get("price"))
+    list_price = parse_price(item.get("prices", {}).get("list_price"))
+
+    # メーカー名
+    maker_list = iteminfo.get("maker") or iteminfo.get("manufacture") or [{}]
+    maker = maker_list[0].get("name")
+
+    if coerce_empty_image_urls:
+        image_large_url = item.get("imageURL", {}).get("large") or None
+        image_small_url = item.get("imageURL", {}).get("small") or None
+    else:
+        image_large_url = item.get("imageURL", {}).get("large")
+        image_small_url = item.get("imageURL", {}).get("small")
+
+    tachiyomi_url = item.get("tachiyomi", {}).get("URL")
+    data = {
+        "content_id": content_id,
+        "product_id": item.get("product_id"),
+        "site": site,
+        "service": service,
+        "floor": floor,
+        "title": title,
+        "volume": item.get("volume"),
+        "review_count": item.get("review", {}).get("count"),
+        "review_average": item.get("review", {}).get("average"),
+        "item_url": url,
+        "affiliate_url": item.get("affiliateURL"),
+        "image_large_url": image_large_url,
+        "image_small_url": image_small_url,
+        "sample_images": sample_images,
+        "sample_images_s": sample_images_s,
+        "sample_movie_url": item.get("sampleMovieURL_highest"),
+        "price": price,
+        "list_price": list_price,
+        "release_date": item.get("date"),
+        "genres": normalize_field(genre_names),
+        "genre_ids": normalize_field(genre_ids),
+        "series": iteminfo.get("series", [{}])[0].get("name"),
+        "maker": maker,
+        "campaign": item.get("campaign_data"),
+        "actress": normalize_field(iteminfo.get("actress")),
+        "director": normalize_field(iteminfo.get("director")),
+        "author": item.get("author"),
+        "category_name": item.get("category_name"),
+        "tachiyomi_url": tachiyomi_url,
+        "tachiyomi_affiliate_url": item.get("tachiyomi", {}).get("affiliateURL"),
+        "tachiyomi_page_count": resolve_tachiyomi_page_count(
+            tachiyomi_url, uploaded_count
+        ),
+        "auto_comment": ai_content.get("auto_comment", ""),
+        "auto_summary": ai_content.get("auto_summary", ""),
+        "auto_point": ai_content.get("auto_point", ""),
+        "ai_content_status": ai_content_status,
+        "raw_json": item,
+    }
+    return data
+
+
 def _insert_dmm_item(
     item: dict,
     tachiyomi_image_paths,
@@ -60,7 +206,20 @@ def _insert_dmm_item(
     supabase_client: Client,
     upload_local_image_to_s3_fn: UploadFn,
     coerce_empty_image_urls: bool,
+    registered_index: RegisteredContentIdIndex | None = None,
+    generate_ai: bool | None = None,
+    upload_local_images_to_s3_fn: BulkUploadFn | None = None,
 ):
+    """registered_index を渡すと重複チェックを索引で行い、登録成功時に追記する。
+
+    upload_local_images_to_s3_fn があれば立ち読み画像を 1 冊まとめて並列アップロードし、
+    無ければ upload_local_image_to_s3_fn で 1 枚ずつ送る。
+
+    generate_ai（省略時は AI_CONTENT_INLINE）が偽なら auto_* は空のまま
+    ai_content_status=pending で INSERT し、AI 生成は generate_item_content に任せる。
+    """
+    if generate_ai is None:
+        generate_ai = AI_CONTENT_INLINE
     try:
         content_id = item.get("content_id")
         title = item.get("title")
@@ -71,102 +230,42 @@ def _insert_dmm_item(
             return
 
         # 重複チェック
-        exists = execute_with_retry(
-            lambda: supabase_client.table("trn_dmm_items")
-            .select("id")
-            .eq("content_id", content_id)
-        )
-        if exists.data:
+        if registered_index is not None:
+            already_registered = content_id in registered_index
+        else:
+            already_registered = str(content_id) in fetch_registered_content_ids(
+                supabase_client.table("trn_dmm_items"), [content_id]
+            )
+        if already_registered:
             logging.info(f"[SKIP] 既に登録済: {title} ({content_id}) : {url}")
             return
 
         logging.info(f"[START] 登録処理開始: {title} ({content_id})")
 
-        uploaded_paths = []
         # 立ち読み画像を先にアップロード
-        if tachiyomi_image_paths:
-            logging.info(f" 立ち読み画像を取得: {title} : {url}")
-            for idx, img_url in enumerate(tachiyomi_image_paths):
-                storage_path = upload_local_image_to_s3_fn(
-                    img_url, content_id=content_id, index=idx + 1, floor=floor
-                )
-                if storage_path:
-                    uploaded_paths.append(storage_path)
-                else:
-                    logging.error(f"  [IMG-FAIL] Tachiyomi {idx+1}: {img_url}")
-
-        sample_images = (
-            item.get("sampleImageURL", {}).get("sample_l", {}).get("image")
-        )
-        sample_images_s = (
-            item.get("sampleImageURL", {}).get("sample_s", {}).get("image")
+        uploaded_paths = _upload_tachiyomi_images(
+            tachiyomi_image_paths,
+            content_id,
+            floor,
+            upload_local_image_to_s3_fn=upload_local_image_to_s3_fn,
+            upload_local_images_to_s3_fn=upload_local_images_to_s3_fn,
         )
 
-        # ジャンル情報を抽出
-        iteminfo = item.get("iteminfo", {})
-        genres_raw = iteminfo.get("genre", [])
-        genre_names = [g["name"] for g in genres_raw]
-        genre_ids = [g["id"] for g in genres_raw]
-
-        # --- OpenAIで文章生成 ---
-        ai_content = generate_content(item) or {}
-
-        price = parse_price(item.get("prices", {}).get("price"))
-        list_price = parse_price(item.get("prices", {}).get("list_price"))
-
-        # メーカー名
-        maker_list = iteminfo.get("maker") or iteminfo.get("manufacture") or [{}]
-        maker = maker_list[0].get("name")
-
-        if coerce_empty_image_urls:
-            image_large_url = item.get("imageURL", {}).get("large") or None
-            image_small_url = item.get("imageURL", {}).get("small") or None
-        else:
-            image_large_url = item.get("imageURL", {}).get("large")
-            image_small_url = item.get("imageURL", {}).get("small")
-
-        tachiyomi_url = item.get("tachiyomi", {}).get("URL")
-        data = {
-            "content_id": content_id,
-            "product_id": item.get("product_id"),
-            "site": site,
-            "service": service,
-            "floor": floor,
-            "title": title,
-            "volume": item.get("volume"),
-            "review_count": item.get("review", {}).get("count"),
-            "review_average": item.get("review", {}).get("average"),
-            "item_url": url,
-            "affiliate_url": item.get("affiliateURL"),
-            "image_large_url": image_large_url,
-            "image_small_url": image_small_url,
-            "sample_images": sample_images,
-            "sample_images_s": sample_images_s,
-            "sample_movie_url": item.get("sampleMovieURL_highest"),
-            "price": price,
-            "list_price": list_price,
-            "release_date": item.get("date"),
-            "genres": normalize_field(genre_names),
-            "genre_ids": normalize_field(genre_ids),
-            "series": iteminfo.get("series", [{}])[0].get("name"),
-            "maker": maker,
-            "campaign": item.get("campaign_data"),
-            "actress": normalize_field(iteminfo.get("actress")),
-            "director": normalize_field(iteminfo.get("director")),
-            "author": item.get("author"),
-            "category_name": item.get("category_name"),
-            "tachiyomi_url": tachiyomi_url,
-            "tachiyomi_affiliate_url": item.get("tachiyomi", {}).get("affiliateURL"),
-            "tachiyomi_page_count": resolve_tachiyomi_page_count(
-                tachiyomi_url, len(uploaded_paths)
-            ),
-            "auto_comment": ai_content.get("auto_comment", ""),
-            "auto_summary": ai_content.get("auto_summary", ""),
-            "auto_point": ai_content.get("auto_point", ""),
-            "raw_json": item,
-        }
+        # --- OpenAIで文章生成（既定では後段の generate_item_content で行う） ---
+        ai_content = (generate_content(item) or {}) if generate_ai else {}
+        data = build_dmm_item_row(
+            item,
+            site,
+            service,
+            floor,
+            uploaded_count=len(uploaded_paths),
+            ai_content=ai_content,
+            coerce_empty_image_urls=coerce_empty_image_urls,
+        )
 
         execute_with_retry(lambda: supabase_client.table("trn_dmm_items").insert(data))
+        if registered_index is not None:
+            registered_index.add(content_id)
         logging.info(f"[INSERT] 成功: {title} ({content_id}) : {url}")
 
     except Exception as e:
@@ -177,7 +276,16 @@ def _insert_dmm_item(
 # ---------------------------------------------------------------------
 # DMMアイテムをSupabaseのtrn_dmm_itemsテーブルに挿入（既定DB / 既定S3）
 # ---------------------------------------------------------------------
-def insert_dmm_item(item: dict, tachiyomi_image_paths, sample_movie_path, site, service, floor):
+def insert_dmm_item(
+    item: dict,
+    tachiyomi_image_paths,
+    sample_movie_path,
+    site,
+    service,
+    floor,
+    *,
+    registered_index: RegisteredContentIdIndex | None = None,
+):
     _insert_dmm_item(
         item,
         tachiyomi_image_paths,
@@ -187,11 +295,22 @@ def insert_dmm_item(item: dict, tachiyomi_image_paths, sample_movie_path, site,
         floor,
         supabase_client=supabase,
         upload_local_image_to_s3_fn=upload_local_image_to_s3_default,
+        upload_local_images_to_s3_fn=upload_local_images_to_s3_default,
         coerce_empty_image_urls=True,
+        registered_index=registered_index,
     )
 
 
-def insert_dmm_item_supabase2(item: dict, tachiyomi_image_paths, sample_movie_path, site, service, floor):
+def insert_dmm_item_supabase2(
+    item: dict,
+    tachiyomi_image_paths,
+    sample_movie_path,
+    site,
+    service,
+    floor,
+    *,
+    registered_index: RegisteredContentIdIndex | None = None,
+):
     """SUPABASE_URL2 向け（立ち読み画像は storageS3 と同じバケット設定）。"""
     _insert_dmm_item(
         item,
@@ -202,11 +321,22 @@ def insert_dmm_item_supabase2(item: dict, tachiyomi_image_paths, sample_movie_pa
         floor,
         supabase_client=supabase2,
         upload_local_image_to_s3_fn=upload_local_image_to_s3_default,
+        upload_local_images_to_s3_fn=upload_local_images_to_s3_default,
         coerce_empty_image_urls=False,
+        registered_index=registered_index,
     )
 
 
-def insert_dmm_item_supabase3(item: dict, tachiyomi_image_paths, sample_movie_path, site, service, floor):
+def insert_dmm_item_supabase3(
+    item: dict,
+    tachiyomi_image_paths,
+    sample_movie_path,
+    site,
+    service,
+    floor,
+    *,
+    registered_index: RegisteredContentIdIndex | None = None,
+):
     """SUPABASE_URL3 向け（立ち読み画像は S3_BUCKET_3）。"""
     _insert_dmm_item(
         item,
@@ -217,5 +347,167 @@ def insert_dmm_item_supabase3(item: dict, tachiyomi_image_paths, sample_movie_pa
         floor,
         supabase_client=supabase3,
         upload_local_image_to_s3_fn=upload_local_image_to_s3_bucket3,
+        upload_local_images_to_s3_fn=upload_local_images_to_s3_bucket3,
         coerce_empty_image_urls=False,
+        registered_index=registered_index,
     )
+
+
+# ---------------------------------------------------------------------
+# 複数 DB へ同時に登録（生成・アップロードは 1 回だけ）
+# ---------------------------------------------------------------------
+class DmmItemTarget:
+    """insert_dmm_item_fanout の書き込み先（Supabase クライアントと立ち読み画像の保存先）。"""
+
+    def __init__(
+        self,
+        name: str,
+        client: Client,
+        *,
+        upload_local_image_to_s3_fn: UploadFn,
+        upload_local_images_to_s3_fn: BulkUploadFn | None = None,
+        coerce_empty_image_urls: bool = False,
+        registered_index: RegisteredContentIdIndex | None = None,
+    ):
+        self.name = name
+        self.client = client
+        self.upload_local_image_to_s3_fn = upload_local_image_to_s3_fn
+        self.upload_local_images_to_s3_fn = upload_local_images_to_s3_fn
+        self.coerce_empty_image_urls = coerce_empty_image_urls
+        self.registered_index = registered_index
+
+    @property
+    def upload_key(self):
+        """同じ値のターゲットは同じバケットに書く（アップロードは 1 回で共有する）。"""
+        return self.upload_local_images_to_s3_fn or self.upload_local_image_to_s3_fn
+
+    def is_registered(self, content_id: str) -> bool:
+        if self.registered_index is not None:
+            return content_id in self.registered_index
+        return str(content_id) in fetch_registered_content_ids(
+            self.client.table("trn_dmm_items"), [content_id]
+        )
+
+
+def dmm_item_target(
+    name: str,
+    *,
+    registered_index: RegisteredContentIdIndex | None = None,
+) -> DmmItemTarget:
+    """default / supabase2 / supabase3 の書き込み先（insert_dmm_item* と同じ組み合わせ）。"""
+    if name == "default":
+        return DmmItemTarget(
+            name,
+            supabase,
+            upload_local_image_to_s3_fn=upload_local_image_to_s3_default,
+            upload_local_images_to_s3_fn=upload_local_images_to_s3_default,
+            coerce_empty_image_urls=True,
+            registered_index=registered_index,
+        )
+    if name == "supabase2":
+        if supabase2 is None:
+            raise RuntimeError("SUPABASE_URL2 / SUPABASE_KEY2 が未設定です")
+        return DmmItemTarget(
+            name,
+            supabase2,
+            upload_local_image_to_s3_fn=upload_local_image_to_s3_default,
+            upload_local_images_to_s3_fn=upload_local_images_to_s3_default,
+            registered_index=registered_index,
+        )
+    if name == "supabase3":
+        if supabase3 is None:
+            raise RuntimeError("SUPABASE_URL3 / SUPABASE_KEY3 が未設定です")
+        return DmmItemTarget(
+            name,
+            supabase3,
+            upload_local_image_to_s3_fn=upload_local_image_to_s3_bucket3,
+            upload_local_images_to_s3_fn=upload_local_images_to_s3_bucket3,
+            registered_index=registered_index,
+        )
+    raise ValueError(f"unknown db target: {name}")
+
+
+def insert_dmm_item_fanout(
+    item: dict,
+    tachiyomi_image_paths,
+    sample_movie_path,
+    site,
+    service,
+    floor,
+    *,
+    targets: list[DmmItemTarget],
+    generate_ai: bool | None = None,
+) -> dict[str, str]:
+    """1 作品を複数 DB に登録する。戻り値はターゲット名 → inserted | skipped | failed。
+
+    重複チェックはターゲットごと、AI 生成は 1 回、立ち読み画像はバケットごとに 1 回だけ行い、
+    INSERT は未登録のターゲットへ並列に送る（1 つ失敗しても他は続行）。
+    """
+    if generate_ai is None:
+        generate_ai = AI_CONTENT_INLINE
+    content_id = item.get("content_id")
+    title = item.get("title")
+    url = item.get("URL")
+    results = {target.name: "skipped" for target in targets}
+    if not content_id:
+        logging.warning(f"[SKIP] content_id が存在しない: {title} : {url}")
+        return results
+
+    pending = []
+    for target in targets:
+        try:
+            if target.is_registered(content_id):
+                logging.info(f"[SKIP] 既に登録済 ({target.name}): {title} ({content_id})")
+            else:
+                pending.append(target)
+        except Exception as e:
+            logging.error(f" 重複チェック失敗 ({target.name}) {content_id}: {e}")
+            results[target.name] = "failed"
+    if not pending:
+        return results
+
+    logging.info(
+        f"[START] 登録処理開始: {title} ({content_id}) → {', '.join(t.name for t in pending)}"
+    )
+    try:
+        uploaded_by_bucket: dict = {}
+        for target in pending:
+            if target.upload_key not in uploaded_by_bucket:
+                uploaded_by_bucket[target.upload_key] = _upload_tachiyomi_images(
+                    tachiyomi_image_paths,
+                    content_id,
+                    floor,
+                    upload_local_image_to_s3_fn=target.upload_local_image_to_s3_fn,
+                    upload_local_images_to_s3_fn=target.upload_local_images_to_s3_fn,
+                )
+        ai_content = (generate_content(item) or {}) if generate_ai else {}
+    except Exception as e:
+        logging.error(f" insert_dmm_item_fanout 準備失敗: {e}")
+        logging.error(traceback.format_exc())
+        results.update({target.name: "failed" for target in pending})
+        return results
+
+    def _insert(target: DmmItemTarget) -> str:
+        data = build_dmm_item_row(
+            item,
+            site,
+            service,
+            floor,
+            uploaded_count=len(uploaded_by_bucket[target.upload_key]),
+            ai_content=ai_content,
+            coerce_empty_image_urls=target.coerce_empty_image_urls,
+        )
+        try:
+            execute_with_retry(lambda: target.client.table("trn_dmm_items").insert(data))
+        except Exception as e:
+            logging.error(f" INSERT 失敗 ({target.name}) {content_id}: {e}")
+            return "failed"
+        if target.registered_index is not None:
+            target.registered_index.add(content_id)
+        logging.info(f"[INSERT] 成功 ({target.name}): {title} ({content_id})")
+        return "inserted"
+
+    with ThreadPoolExecutor(max_workers=len(pending), thread_name_prefix="db-fanout") as pool:
+        for target, status in zip(pending, pool.map(_insert, pending)):
+            results[target.name] = status
+    return results
@@ -0,0 +1,147 @@
+"""行単位の書き込みを溜めて複数行 UPSERT でまとめて流す（write-behind）。"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from utils.supabase_retry import execute_with_retry
+
+DEFAULT_MAX_ROWS = 100
+DEFAULT_MAX_SECONDS = 10.0
+# update_only の存在確認で in_ に載せるキー数（URL 長の制限があるため区切る）
+EXISTS_CHUNK_SIZE = 50
+
+
+class UpsertBuffer:
+    """supabase_client.table(table).upsert(rows, on_conflict=...) をまとめて実行する。
+
+    - add() した行が max_rows 件に達するか、前回 flush から max_seconds 経つと flush する
+    - 同じ on_conflict キーの行は 1 行にマージする（後勝ち。同一文で 2 回更新するとエラーのため）
+    - PostgREST の一括 UPSERT は全行同じ列が必要なので、列の組み合わせごとに分けて送る
+    - with 文で使うと、例外で抜けた場合も残りを flush する
+    - update_only=True なら flush 前に既存行を確認し、無いキーの行は捨てる（UPSERT の INSERT 側で空行を作らない）
+    - 書き込めなかった行数は failed_count に残る（呼び出し側は has_failures で失敗終了を判断する）
+    """
+
+    def __init__(
+        self,
+        supabase_client: Any,
+        table: str,
+        *,
+        on_conflict: str,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_seconds: float = DEFAULT_MAX_SECONDS,
+        update_only: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.supabase_client = supabase_client
+        self.table = table
+        self.on_conflict = on_conflict
+        self.max_rows = max(int(max_rows), 1)
+        self.max_seconds = max_seconds
+        self._clock = clock
+        self._conflict_keys = tuple(k.strip() for k in on_conflict.split(","))
+        if update_only and len(self._conflict_keys) != 1:
+            raise ValueError("update_only は on_conflict が 1 列のときだけ使えます")
+        self.update_only = update_only
+        self._rows: dict[tuple, dict] = {}
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+        self.flushed_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+
+    def __enter__(self) -> "UpsertBuffer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def has_failures(self) -> bool:
+        return self.failed_count > 0
+
+    def add(self, row: dict) -> None:
+        key = tuple(row.get(k) for k in self._conflict_keys)
+        with self._lock:
+            merged = self._rows.pop(key, {})
+            merged.update(row)
+            self._rows[key] = merged
+            due = (
+                len(self._rows) >= self.max_rows
+                or self._clock() - self._last_flush >= self.max_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """溜まった行を書き込み、書き込めた行数を返す。失敗分はログに残して破棄する。"""
+        with self._lock:
+            rows = list(self._rows.values())
+            self._rows.clear()
+            self._last_flush = self._clock()
+        if not rows:
+            return 0
+        if self.update_only:
+            rows = self._existing_rows_only(rows)
+            if not rows:
+                return 0
+
+        groups: dict[tuple, list[dict]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        written = 0
+        for group in groups.values():
+            try:
+                execute_with_retry(
+                    lambda group=group: self.supabase_client.table(self.table).upsert(
+                        group, on_conflict=self.on_conflict
+                    )
+                )
+                written += len(group)
+            except Exception as e:
+                self.failed_count += len(group)
+                logging.error(
+                    "%s 一括UPSERT失敗 (%d 件): %s keys=%s",
+                    self.table,
+                    len(group),
+                    e,
+                    [tuple(r.get(k) for k in self._conflict_keys) for r in group],
+                )
+        self.flushed_count += written
+        logging.info("%s 一括UPSERT: %d / %d 件", self.table, written, len(rows))
+        return written
+
+    def _existing_rows_only(self, rows: list[dict]) -> list[dict]:
+        """テーブルに既にあるキーの行だけを返す。確認できなかった分は失敗として数える。"""
+        key = self._conflict_keys[0]
+        values = [row.get(key) for row in rows]
+        existing: set = set()
+        for i in range(0, len(values), EXISTS_CHUNK_SIZE):
+            chunk = values[i : i + EXISTS_CHUNK_SIZE]
+            try:
+                response = execute_with_retry(
+                    lambda chunk=chunk: self.supabase_client.table(self.table)
+                    .select(key)
+                    .in_(key, chunk)
+                )
+            except Exception as e:
+                self.failed_count += len(rows)
+                logging.error("%s 既存行の確認に失敗 (%d 件): %s", self.table, len(rows), e)
+                return []
+            existing.update(r.get(key) for r in response.data or [])
+
+        kept = [row for row in rows if row.get(key) in existing]
+        missing = [row.get(key) for row in rows if row.get(key) not in existing]
+        if missing:
+            self.skipped_count += len(missing)
+            logging.warning("%s に存在しないため更新しない (%d 件): %s", self.table, len(missing), missing)
+        return kept
@@ -13,9 +13,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from db.storageS3 import S3_PUBLIC_BASE_URL, upload_actress_image_to_s3
+from dmm.dmm_http import dmm_api_get
 from dmm.minnano_actress_api import enrich_with_minnano
 from dmm.wikipedia_actress_api import enrich_with_wikipedia
 from dmm.wikidata_actress_api import enrich_with_wikidata
+from utils.html_parser import make_soup
 from utils.logger import setup_logger
 
 os.makedirs("logs", exist_ok=True)
@@ -202,7 +204,7 @@ def _extract_embedded_field(html: str, field_name: str) -> Optional[str]:
 
 
 def _dmm_get(url: str, params: dict) -> dict:
-    response = requests.get(url, params=params, timeout=20)
+    response = dmm_api_get(url, params)
     response.raise_for_status()
     payload = response.json()
     result = payload.get("result", {})
@@ -318,7 +320,7 @@ def scrape_osusume_profile(actress_id: int | str, *, session: Optional[requests.
             return {}
 
         html = response.text
-        soup = BeautifulSoup(html, "html.parser")
+        soup = make_soup(html)
 
         profile = _normalize_text(_extract_embedded_field(html, "profile")) or _extract_section_text(
             soup, "profile-detail"
@@ -2,8 +2,11 @@ import os
 import requests
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from db.registered_content_ids import fetch_registered_content_ids
 from db.supabase_client import supabase as default_supabase_client
+from dmm.dmm_http import DMM_API_MAX_IN_FLIGHT, dmm_api_get
 
 # .envファイル読み込み
 load_dotenv()
@@ -62,10 +65,12 @@ def fetch_items(
     min_sample_count=10,
     supabase_client=None,
     keyword=None,
+    registered_index=None,
 ):
     """
     supabase_client: None のとき db.supabase_client の既定クライアント。
     keyword: 指定時は ItemList に keyword パラメータを付与（メスガキ用検索など）。
+    registered_index: RegisteredContentIdIndex を渡すと存在確認を DB ではなく索引で行う。
     """
     client = default_supabase_client if supabase_client is None else supabase_client
 
@@ -88,7 +93,7 @@ def fetch_items(
     logging.info("送信パラメータ: %s", params)
 
     try:
-        response = requests.get(API_URL, params=params)
+        response = dmm_api_get(API_URL, params)
         response.raise_for_status()
     except requests.HTTPError as e:
         logging.error("HTTPエラー: %s", e)
@@ -104,6 +109,22 @@ def fetch_items(
 
     # logging.info(items)
 
+    # ---------------------------
+    # Supabase で存在確認（ページ単位でまとめて照会）
+    # ---------------------------
+    page_ids = [item.get("content_id") for item in items]
+    try:
+        if registered_index is not None:
+            registered_ids = registered_index.registered_among(page_ids)
+        else:
+            registered_ids = fetch_registered_content_ids(
+                client.table("trn_dmm_items"), page_ids
+            )
+    except Exception as e:
+        # ページごと捨てず未登録扱いで続行する（登録時の重複チェックで弾かれる）
+        logging.warning("[ERROR] Supabase 照会失敗（未登録として続行）: %s", e)
+        registered_ids = set()
+
     filtered_items = []
     for item in items:
 
@@ -111,17 +132,9 @@ def fetch_items(
         if not content_id:
             continue
 
-        # ---------------------------
-        # Supabase で存在確認
-        # ---------------------------
-        try:
-            existing = client.table("trn_dmm_items").select("id").eq("content_id", content_id).execute()
-            if existing.data and len(existing.data) > 0:
-                logging.info("[SKIP] 既に登録済み: %s", content_id)
-                continue  # 既に登録済みなのでスキップ
-        except Exception as e:
-            logging.warning("[ERROR] Supabase 照会失敗: %s", e)
-            continue
+        if str(content_id) in registered_ids:
+            logging.info("[SKIP] 既に登録済み: %s", content_id)
+            continue  # 既に登録済みなのでスキップ
 
         sample_images = item.get("sampleImageURL", {}).get("sample_l", {}).get("image", [])
         if isinstance(sample_images, list) :
@@ -137,8 +150,79 @@ def fetch_items(
 
 
 # ---------------------------------------------------------------------
-# 複数 sort を順に叩いて結果を統合（同一 content_id は先勝ち）
+# 複数 target × 複数 sort を並列に叩いて結果を統合（同一 content_id は先勝ち）
 # ---------------------------------------------------------------------
+def merge_sorted_batches(batches):
+    """sort 順に並んだ取得結果を content_id で重複除去して 1 本にまとめる（先勝ち）。"""
+    merged = []
+    seen = set()
+    for batch in batches:
+        for item in batch:
+            cid = item.get("content_id")
+            if not cid or cid in seen:
+                continue
+            seen.add(cid)
+            merged.append(item)
+    return merged
+
+
+def fetch_targets_merged_sorts(
+    targets,
+    hits=1,
+    offset=1,
+    sorts=("rank", "date", "review"),
+    min_sample_count=10,
+    supabase_client=None,
+    keyword=None,
+    registered_index=None,
+    max_in_flight=None,
+):
+    """
+    targets（site/service/floor の dict）× sorts の ItemList をまとめて並列取得する。
+    同時リクエスト数は max_in_flight（None のとき DMM_API_MAX_IN_FLIGHT）まで。
+
+    戻り値は targets と同じ並びのリストで、各要素は fetch_items_merged_sorts と同じ
+    統合済みリスト。いずれかの sort の取得に失敗した target は例外オブジェクトになる。
+    """
+    workers = max(int(max_in_flight or DMM_API_MAX_IN_FLIGHT), 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            (t_index, sort_key): executor.submit(
+                fetch_items,
+                site=target["site"],
+                service=target["service"],
+                floor=target.get("floor"),
+                hits=hits,
+                offset=offset,
+                sort=sort_key,
+                min_sample_count=min_sample_count,
+                supabase_client=supabase_client,
+                keyword=keyword,
+                registered_index=registered_index,
+            )
+            for t_index, target in enumerate(targets)
+            for sort_key in sorts
+        }
+
+        results = []
+        for t_index, target in enumerate(targets):
+            try:
+                # 完了順ではなく sorts の並びで統合するので、逐次取得時と同じ結果になる
+                batches = [futures[(t_index, sort_key)].result() for sort_key in sorts]
+            except Exception as e:
+                results.append(e)
+                continue
+            merged = merge_sorted_batches(batches)
+            logging.info(
+                "統合取得完了 floor=%s sorts=%s → %d 件（重複除去後）",
+                target.get("floor"),
+                sorts,
+                len(merged),
+            )
+            results.append(merged)
+    return results
+
+
 def fetch_items_merged_sorts(
     site,
     service,
@@ -149,37 +233,25 @@ def fetch_items_merged_sorts(
     min_sample_count=10,
     supabase_client=None,
     keyword=None,
+    registered_index=None,
 ):
     """
-    sorts の順で ItemList を取得し、content_id で重複を除いた 1 本のリストにまとめる。
+    sorts の ItemList を並列取得し、content_id で重複を除いた 1 本のリストにまとめる。
     並びは rank 結果が先頭、その後に date のみに現れたもの、最後に review のみに現れたもの。
     """
-    merged = []
-    seen = set()
-    for sort_key in sorts:
-        batch = fetch_items(
-            site=site,
-            service=service,
-            floor=floor,
-            hits=hits,
-            offset=offset,
-            sort=sort_key,
-            min_sample_count=min_sample_count,
-            supabase_client=supabase_client,
-            keyword=keyword,
-        )
-        for item in batch:
-            cid = item.get("content_id")
-            if not cid or cid in seen:
-                continue
-            seen.add(cid)
-            merged.append(item)
-    logging.info(
-        "統合取得完了 sorts=%s → %d 件（重複除去後）",
-        sorts,
-        len(merged),
-    )
-    return merged
+    result = fetch_targets_merged_sorts(
+        [{"site": site, "service": service, "floor": floor}],
+        hits=hits,
+        offset=offset,
+        sorts=sorts,
+        min_sample_count=min_sample_count,
+        supabase_client=supabase_client,
+        keyword=keyword,
+        registered_index=registered_index,
+    )[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
 
 
 # ---------------------------------------------------------------------
@@ -203,7 +275,7 @@ def fetch_items_search_keyword(site, service, floor, keyword, hits=10, offset=1,
     logging.info("送信パラメータ: %s", params)
 
     try:
-        response = requests.get(API_URL, params=params)
+        response = dmm_api_get(API_URL, params)
         response.raise_for_status()
     except requests.HTTPError as e:
         logging.error("HTTPエラー: %s", e)
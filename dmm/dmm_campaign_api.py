@@ -10,6 +10,7 @@ import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
+from utils.html_parser import ANCHOR_STRAINER, HEAD_META_STRAINER, make_soup
 from utils.logger import setup_logger
 
 load_dotenv()
@@ -176,7 +177,7 @@ def _fetch_html_with_selenium(url: str) -> Optional[str]:
         from selenium.webdriver.chrome.service import Service
         from selenium.webdriver.common.by import By
 
-        from utils.chromedriver import chromedriver_path
+        from utils.chromedriver import apply_resource_blocking, chromedriver_path, log_page_load_metrics
     except ImportError as exc:
         logging.warning("[WARN] Selenium 未インストールのため video TOP 取得をスキップ: %s", exc)
         return None
@@ -186,9 +187,11 @@ def _fetch_html_with_selenium(url: str) -> Optional[str]:
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
     driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+    apply_resource_blocking(driver, "campaign")
 
     try:
         driver.get(url)
+        log_page_load_metrics(driver, "campaign")
         driver.implicitly_wait(8)
         try:
             driver.find_element(By.LINK_TEXT, "はい").click()
@@ -214,7 +217,7 @@ def _normalize_video_list_url(url: str) -> str:
 
 def _parse_video_top_sale_links(html: str, priority_offset: int) -> list[dict]:
     """video.dmm.co.jp TOP の「お得な商品」セールリンクを抽出する。"""
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, parse_only=ANCHOR_STRAINER)
     campaigns = []
     seen_urls: set[str] = set()
 
@@ -352,7 +355,7 @@ def _parse_feature_page(
 ) -> Optional[dict]:
     """特集ページ自身を1件のキャンペーンとして取得する。"""
     source = source or {}
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, parse_only=HEAD_META_STRAINER)
 
     page_title = soup.title.string.strip() if soup.title and soup.title.string else None
     og_title = _meta_content(soup, "og:title")
@@ -395,7 +398,7 @@ def _parse_html_banners(
     default_floor: str,
     priority_offset: int,
 ) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, parse_only=ANCHOR_STRAINER)
     campaigns = []
     seen_urls: set[str] = set()
 
@@ -0,0 +1,102 @@
+"""DMM Affiliate API 用 requests セッション（接続プール共有・流量制御・リトライ）"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from utils.rate_limit import TokenBucketRateLimiter, parse_retry_after
+
+load_dotenv()
+
+# 素の requests.get はタイムアウト無しで固まり得るため、全呼び出しに既定値を付ける
+DMM_API_TIMEOUT = 20.0
+# 並列取得時の同時リクエスト上限（= 接続プールの大きさ）
+DMM_API_MAX_IN_FLIGHT = int(os.getenv("DMM_API_MAX_IN_FLIGHT", "4"))
+# プロセス全体での DMM API 呼び出しレート（秒間リクエスト数）とバースト許容数
+DMM_API_RATE_PER_SEC = float(os.getenv("DMM_API_RATE_PER_SEC", "5"))
+DMM_API_BURST = int(os.getenv("DMM_API_BURST", "5"))
+
+DMM_API_RETRIES = 5
+DMM_API_BACKOFF_BASE = 1.0
+DMM_API_BACKOFF_MAX = 60.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+rate_limiter = TokenBucketRateLimiter(DMM_API_RATE_PER_SEC, DMM_API_BURST)
+
+
+def create_dmm_session(pool_size: int = DMM_API_MAX_IN_FLIGHT) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(int(pool_size), 1))
+    session.mount("https://", adapter)
+    return session
+
+
+def get_dmm_session() -> requests.Session:
+    """プロセス内で共有するセッション（初回呼び出し時に作成）。"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_dmm_session()
+        return _session
+
+
+def backoff_delay(attempt: int, *, base: float = DMM_API_BACKOFF_BASE) -> float:
+    """attempt 回目（0 始まり）の指数バックオフ秒数（ジッター付き）。"""
+    delay = base * (2**attempt) + random.uniform(0, base)
+    return min(delay, DMM_API_BACKOFF_MAX)
+
+
+def dmm_api_get(
+    url: str,
+    params: dict,
+    *,
+    timeout: float = DMM_API_TIMEOUT,
+    retries: int = DMM_API_RETRIES,
+) -> requests.Response:
+    """流量制御付きで GET する。429/5xx と接続エラーは指数バックオフでリトライする。
+
+    429/5xx のままリトライを使い切った場合はそのレスポンスを返す
+    （raise_for_status の扱いは呼び出し側に任せる）。
+    """
+    for attempt in range(retries):
+        rate_limiter.acquire()
+        try:
+            response = get_dmm_session().get(url, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            if attempt >= retries - 1:
+                raise
+            delay = backoff_delay(attempt)
+            logging.warning(
+                "DMM API 接続失敗 (%s)。%.1f 秒後にリトライ (%d/%d)",
+                exc,
+                delay,
+                attempt + 1,
+                retries,
+            )
+            rate_limiter.pause(delay)
+            continue
+
+        if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= retries - 1:
+            return response
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        delay = retry_after if retry_after is not None else backoff_delay(attempt)
+        logging.warning(
+            "DMM API が %s を返しました。%.1f 秒後にリトライ (%d/%d)",
+            response.status_code,
+            delay,
+            attempt + 1,
+            retries,
+        )
+        rate_limiter.pause(delay)
+    raise RuntimeError("dmm_api_get: unreachable")  # pragma: no cover - ループ内で必ず return/raise
@@ -1,5 +1,6 @@
 import os
-import requests
+
+from dmm.dmm_http import dmm_api_get
 
 def fetch_item_by_content_id(content_id: str):
     """content_idを使ってDMM APIから作品情報を取得"""
@@ -15,7 +16,7 @@ def fetch_item_by_content_id(content_id: str):
         "output": "json"
     }
 
-    res = requests.get(url, params=params)
+    res = dmm_api_get(url, params)
     if res.status_code != 200:
         raise Exception(f"APIエラー: {res.status_code}")
 
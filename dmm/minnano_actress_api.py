@@ -12,6 +12,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from dmm.actress_merge import merge_supplement_record
+from utils.html_parser import ANCHOR_STRAINER, make_soup, tags_named
 from utils.logger import setup_logger
 
 setup_logger("minnano_actress_api.log")
@@ -31,6 +32,8 @@ SIZE_PATTERN = re.compile(
 BIRTHDAY_PATTERN = re.compile(r"(\d{4})年(\d{1,2})月(\d{1,2})日")
 DEBUT_DATE_PATTERN = re.compile(r"(\d{4})年(\d{1,2})月\s*(\d{1,2})日")
 ACTRESS_PAGE_PATTERN = re.compile(r"actress\d+\.html", re.IGNORECASE)
+# プロフィールページは見出しとプロフィール表の行だけ木にする
+PROFILE_STRAINER = tags_named(["h1", "tr"])
 
 
 def _normalize_text(value: Any) -> Optional[str]:
@@ -158,7 +161,7 @@ def _find_profile_url(name: str, *, session: requests.Session) -> Optional[str]:
     if ACTRESS_PAGE_PATTERN.search(response.url):
         return response.url
 
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(response.text, parse_only=ANCHOR_STRAINER)
     candidates: list[tuple[str, str]] = []
     for anchor in soup.select("a[href]"):
         href = anchor.get("href", "")
@@ -183,7 +186,7 @@ def _find_profile_url(name: str, *, session: requests.Session) -> Optional[str]:
 def scrape_minnano_profile(profile_url: str, *, session: requests.Session) -> Optional[dict]:
     response = session.get(profile_url, timeout=20)
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = make_soup(response.text, parse_only=PROFILE_STRAINER)
 
     h1 = soup.find("h1")
     title_text = h1.get_text(" ", strip=True) if h1 else None
@@ -6,12 +6,12 @@ from typing import Any, Optional
 from urllib.parse import quote
 
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from dmm.actress_merge import merge_supplement_record
+from utils.html_parser import make_soup
 from utils.logger import setup_logger
 
 setup_logger("wikipedia_actress_api.log")
@@ -114,7 +114,7 @@ def _fetch_wikipedia_section_text(title: str, section_index: str) -> Optional[st
     html = payload.get("parse", {}).get("text", {}).get("*")
     if not html:
         return None
-    text = BeautifulSoup(html, "html.parser").get_text("\n", strip=True)
+    text = make_soup(html).get_text("\n", strip=True)
     return _normalize_text(text)
 
 
@@ -1,14 +1,19 @@
+import atexit
 import os
 import logging
 import json
+import threading
 from openai import OpenAI
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 import requests
+from requests.adapters import HTTPAdapter
 from selenium.webdriver.common.by import By
 
+from openai_api import llm_gateway
 from openai_api.config import OPENAI_MODEL
-from utils.chromedriver import create_chrome_driver, quit_chrome_driver
+from utils.chromedriver import DriverPool, create_chrome_driver, log_page_load_metrics
+from utils.html_parser import SYNOPSIS_STRAINER, make_soup
 from utils.logger import setup_logger
 
 setup_logger("scraper.log")
@@ -18,11 +23,120 @@ load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
-def get_page_source_with_age_verification(url: str) -> str:
-    driver = create_chrome_driver(page_load_timeout=60)
+# 同時に起動しておく Chrome の台数（generate_item_content --workers と合わせる）
+PAGE_DRIVER_POOL_SIZE = int(os.getenv("PAGE_DRIVER_POOL_SIZE", "1"))
+# 収集処理では作品ごとに Chrome を起動し直さず使い回す（プロセス終了時に閉じる）
+page_driver_pool = DriverPool(
+    lambda: create_chrome_driver(page_load_timeout=60, block_resources="synopsis"), size=PAGE_DRIVER_POOL_SIZE
+)
+atexit.register(page_driver_pool.close)
+
+# あらすじはまず requests で取得し、取れなかったときだけ Chrome で開き直す
+SYNOPSIS_HTTP_TIMEOUT = float(os.getenv("SYNOPSIS_HTTP_TIMEOUT", "15"))
+# HTTP 取得の接続プールの大きさ（generate_item_content --workers 以上にする）
+SYNOPSIS_HTTP_POOL_SIZE = int(os.getenv("SYNOPSIS_HTTP_POOL_SIZE", "8"))
+AGE_CHECK_COOKIE = {"age_check_done": "1"}
+AGE_CHECK_COOKIE_DOMAINS = (".dmm.co.jp", ".dmm.com")
+SYNOPSIS_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+_synopsis_session: requests.Session | None = None
+_synopsis_session_lock = threading.Lock()
+
+
+class SynopsisFetchStats:
+    """あらすじ取得の経路別件数（HTTP で取れた / ブラウザにフォールバックした）。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.http_hits = 0
+        self.browser_fallbacks = 0
+        self.browser_hits = 0
+
+    def record(self, *, fallback: bool, found: bool) -> None:
+        with self._lock:
+            if not fallback:
+                self.http_hits += 1
+                return
+            self.browser_fallbacks += 1
+            if found:
+                self.browser_hits += 1
+
+    @property
+    def total(self) -> int:
+        return self.http_hits + self.browser_fallbacks
+
+    @property
+    def fallback_rate(self) -> float:
+        """ブラウザにフォールバックした割合（0.0〜1.0。取得 0 件なら 0.0）。"""
+        total = self.total
+        return self.browser_fallbacks / total if total else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "total": self.total,
+                "http_hits": self.http_hits,
+                "browser_fallbacks": self.browser_fallbacks,
+                "browser_hits": self.browser_hits,
+                "fallback_rate": self.fallback_rate,
+            }
+
+    def log_summary(self) -> None:
+        stats = self.snapshot()
+        if not stats["total"]:
+            return
+        logging.info(
+            "あらすじ取得: %d 件（HTTP %d / ブラウザへフォールバック %d うち取得 %d）fallback率 %.1f%%",
+            stats["total"],
+            stats["http_hits"],
+            stats["browser_fallbacks"],
+            stats["browser_hits"],
+            stats["fallback_rate"] * 100,
+        )
 
-    try:
+
+synopsis_stats = SynopsisFetchStats()
+atexit.register(synopsis_stats.log_summary)
+
+
+def create_synopsis_session(pool_size: int = SYNOPSIS_HTTP_POOL_SIZE) -> requests.Session:
+    """年齢確認済み Cookie を持たせた requests セッション（「はい」のクリックを省く）。"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(int(pool_size), 1))
+    session.mount("https://", adapter)
+    for domain in AGE_CHECK_COOKIE_DOMAINS:
+        for key, value in AGE_CHECK_COOKIE.items():
+            session.cookies.set(key, value, domain=domain)
+    session.headers.update({"User-Agent": SYNOPSIS_USER_AGENT})
+    return session
+
+
+def get_synopsis_session() -> requests.Session:
+    """プロセス内で共有するセッション（初回呼び出し時に作成）。"""
+    global _synopsis_session
+    with _synopsis_session_lock:
+        if _synopsis_session is None:
+            _synopsis_session = create_synopsis_session()
+        return _synopsis_session
+
+
+def fetch_synopsis_http(url: str) -> str:
+    """requests だけであらすじを取る。年齢確認ページに飛ばされた・見つからない場合は空文字。"""
+    res = get_synopsis_session().get(url, timeout=SYNOPSIS_HTTP_TIMEOUT)
+    res.raise_for_status()
+    if "age_check" in (res.url or ""):
+        logging.info("[Synopsis] 年齢確認ページに転送されました: %s", url)
+        return ""
+    return parse_synopsis_html(res.text, url)
+
+
+def get_page_source_with_age_verification(url: str) -> str:
+    with page_driver_pool.driver() as driver:
         driver.get(url)
+        log_page_load_metrics(driver, "synopsis")
         driver.implicitly_wait(5)
 
         # 年齢確認「はい」ボタンが存在する場合はクリック
@@ -34,24 +148,6 @@ def get_page_source_with_age_verification(url: str) -> str:
             pass
 
         return driver.page_source
-    finally:
-        quit_chrome_driver(driver)
-
-def get_dmm_comment_text(url: str) -> str:
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-    }
-    res = requests.get(url, headers=headers, timeout=10)
-    res.raise_for_status()
-
-    soup = BeautifulSoup(res.text, "html.parser")
-    comment_div = soup.select_one("div.mg-b20.lh4")
-
-    if comment_div:
-        text = comment_div.get_text(separator="\n").strip()
-        return text
-    else:
-        return ""
 
 
 def _parse_json_ld_description(soup: BeautifulSoup) -> str:
@@ -119,29 +215,56 @@ def extract_synopsis_from_soup(soup: BeautifulSoup, url: str = "") -> str:
     return ""
 
 
-def scrape_product_details(url: str) -> str:
-    try:
-        html = get_page_source_with_age_verification(url)
-        soup = BeautifulSoup(html, "html.parser")
+def parse_synopsis_html(html: str, url: str = "") -> str:
+    """extract_synopsis_from_soup が見る要素だけを木にして抽出する。
 
-        summary = extract_synopsis_from_soup(soup, url)
-        if summary:
-            return summary
+    book.dmm は折りたたみボタンの親要素から本文を探すため全体を木にする。
+    """
+    parse_only = None if "book.dmm.co.jp" in url else SYNOPSIS_STRAINER
+    return extract_synopsis_from_soup(make_soup(html, parse_only=parse_only), url)
+
+
+def fetch_synopsis_browser(url: str) -> str:
+    return parse_synopsis_html(get_page_source_with_age_verification(url), url)
 
-        if "book.dmm.co.jp" not in url:
-            comment_div = get_dmm_comment_text(url)
-            if comment_div:
-                return comment_div
 
+def scrape_product_details(url: str) -> str:
+    """あらすじを取得する。HTTP で取れなければ Chrome（page_driver_pool）で開き直す。"""
+    if not url:
         return ""
+    try:
+        summary = fetch_synopsis_http(url)
+    except Exception as e:
+        logging.info("[Synopsis] HTTP 取得失敗 → ブラウザで再取得: %s (%s)", url, e)
+        summary = ""
+    if summary:
+        synopsis_stats.record(fallback=False, found=True)
+        return summary
 
+    try:
+        summary = fetch_synopsis_browser(url)
     except Exception as e:
         logging.warning(f"[Scrape Error] URL: {url} → {e}")
-        return ""
+        summary = ""
+    synopsis_stats.record(fallback=True, found=bool(summary))
+    return summary
+
+
+def parse_content_json(content: str) -> dict:
+    """AI 出力（```json フェンス付きでも可）を dict にする。"""
+    content = content.strip()
+    if "```" in content:
+        json_str = content.split("```")[1]
+        if json_str.startswith("json"):
+            json_str = json_str[4:].strip()
+    else:
+        json_str = content
+    return json.loads(json_str)
 
 
 # --- generate_content関数 ---
-def generate_content(item: dict) -> dict:
+def generate_content(item: dict, *, use_cache: bool = True) -> dict:
+    """作品の auto_comment / auto_summary / auto_point を生成する（use_cache=False で必ず作り直す）。"""
     title = item.get("title", "")
     genres_raw = item.get("iteminfo", {}).get("genre", [])
     genres = [g.get("name") for g in genres_raw if "name" in g]
@@ -226,20 +349,14 @@ def generate_content(item: dict) -> dict:
 """
     
     try:
-        response = client.chat.completions.create(
+        content = llm_gateway.complete(
+            [{"role": "user", "content": prompt}],
             model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
+            client=client,
+            use_cache=use_cache,
+            validate=parse_content_json,
         )
-
-        content = response.choices[0].message.content.strip()
-        if "```" in content:
-            json_str = content.split("```")[1]
-            if json_str.startswith("json"):
-                json_str = json_str[4:].strip()
-        else:
-            json_str = content
-
-        data = json.loads(json_str)
+        data = parse_content_json(content)
 
         # 各項目で \\n → 実際の改行 に変換
         for key in ["auto_comment", "auto_summary", "auto_point"]:
@@ -0,0 +1,307 @@
+"""OpenAI Batch API で Chat Completions をまとめて実行する（夜間の大量生成向け）。
+
+- batch_request() で 1 件分の JSONL 行を作り、custom_id で結果を突き合わせる
+- run_batch() が JSONL を書き出して投入し、完了までポーリングして custom_id → 応答本文 を返す
+- (model, プロンプト, パラメータ) が同じ応答は llm_gateway のディスクキャッシュを共有し、キャッシュ済みの行は投入しない
+  （保存条件も llm_gateway.complete と同じ: finish_reason が stop で validate を通るもの）
+- LocalBatchClient は同じ JSONL 形式を読み書きするローカル実装（テスト・リハーサル用）
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from dotenv import load_dotenv
+
+from openai_api import llm_gateway
+from openai_api.config import OPENAI_MODEL
+
+load_dotenv()
+
+LLM_BATCH_DIR = os.getenv("LLM_BATCH_DIR", "cache/llm_batch")
+LLM_BATCH_POLL_SECONDS = float(os.getenv("LLM_BATCH_POLL_SECONDS", "60"))
+# 完了を待つ上限。completion_window（24h）を過ぎると OpenAI 側で expired になる
+LLM_BATCH_TIMEOUT_HOURS = float(os.getenv("LLM_BATCH_TIMEOUT_HOURS", "25"))
+# 1 バッチあたりのリクエスト数（OpenAI の上限は 50,000 件 / 200MB）
+LLM_BATCH_MAX_REQUESTS = int(os.getenv("LLM_BATCH_MAX_REQUESTS", "50000"))
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+def batch_request(
+    custom_id: Any, messages: list[dict], *, model: str = OPENAI_MODEL, **params: Any
+) -> dict:
+    """Batch 入力ファイルの 1 行（params は llm_gateway.complete と同じく create の引数）。"""
+    return {
+        "custom_id": str(custom_id),
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {"model": model, "messages": messages, **params},
+    }
+
+
+def write_batch_file(requests: Iterable[dict], path: str | Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        f.write(_to_jsonl(requests))
+    return path
+
+
+def parse_batch_output(text: str) -> dict[str, str | None]:
+    """出力 / エラーファイルの JSONL を custom_id → 応答本文（失敗は None）にする。"""
+    return {custom_id: content for custom_id, (content, _) in _parse_batch_records(text).items()}
+
+
+def _parse_batch_records(text: str) -> dict[str, tuple[str | None, str | None]]:
+    """custom_id → (応答本文, finish_reason)。"""
+    results: dict[str, tuple[str | None, str | None]] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        custom_id = record.get("custom_id")
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        content = finish_reason = None
+        if not record.get("error") and response.get("status_code") == 200:
+            try:
+                choice = body["choices"][0]
+                content = choice["message"]["content"]
+                finish_reason = choice.get("finish_reason")
+            except (KeyError, IndexError, TypeError, AttributeError):
+                content = None
+        if content is None:
+            logging.warning(
+                "バッチ応答エラー %s: %s", custom_id, record.get("error") or body.get("error")
+            )
+        results[custom_id] = (content, finish_reason)
+    return results
+
+
+def _to_jsonl(rows: Iterable[dict]) -> str:
+    return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+def _file_text(client: Any, file_id: str) -> str:
+    content = client.files.content(file_id)
+    text = getattr(content, "text", content)
+    return text.decode("utf-8") if isinstance(text, bytes) else text
+
+
+def submit_batch(client: Any, path: str | Path, *, metadata: dict | None = None) -> str:
+    """入力ファイルをアップロードしてバッチを作成し、batch id を返す。"""
+    with open(path, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=COMPLETION_WINDOW,
+        metadata=metadata or {},
+    )
+    logging.info("バッチ投入: %s (%s)", batch.id, path)
+    return batch.id
+
+
+def wait_for_batch(
+    client: Any,
+    batch_id: str,
+    *,
+    poll_seconds: float = LLM_BATCH_POLL_SECONDS,
+    timeout_seconds: float = LLM_BATCH_TIMEOUT_HOURS * 3600,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Any:
+    """終了状態（completed / failed / expired / cancelled）になるまでポーリングする。"""
+    deadline = clock() + timeout_seconds
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            logging.info("バッチ終了: %s status=%s", batch_id, batch.status)
+            return batch
+        if clock() >= deadline:
+            raise TimeoutError(f"バッチが時間内に終わりませんでした: {batch_id} ({batch.status})")
+        logging.info(
+            "バッチ待機中: %s status=%s %s",
+            batch_id,
+            batch.status,
+            getattr(batch, "request_counts", None) or "",
+        )
+        sleep(poll_seconds)
+
+
+def collect_results(client: Any, batch: Any) -> dict[str, str | None]:
+    """エラーファイル・出力ファイルを読む（expired でも処理済みの分は出力ファイルに入る）。"""
+    return {custom_id: content for custom_id, (content, _) in _collect_records(client, batch).items()}
+
+
+def _collect_records(client: Any, batch: Any) -> dict[str, tuple[str | None, str | None]]:
+    results: dict[str, tuple[str | None, str | None]] = {}
+    for file_id in (getattr(batch, "error_file_id", None), getattr(batch, "output_file_id", None)):
+        if file_id:
+            results.update(_parse_batch_records(_file_text(client, file_id)))
+    return results
+
+
+def run_batch(
+    requests: Iterable[dict],
+    *,
+    client: Any = None,
+    name: str = "batch",
+    workdir: str | Path | None = None,
+    use_cache: bool = True,
+    validate: Callable[[str], Any] | None = None,
+    poll_seconds: float = LLM_BATCH_POLL_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> dict[str, str | None]:
+    """requests（batch_request の戻り値）を実行し、custom_id → 応答本文 を返す。
+
+    失敗・未処理のリクエストは None。LLM_BATCH_MAX_REQUESTS 件ごとに分けて全て投入してから待つ。
+    validate は llm_gateway.complete と同じ（不正なキャッシュは捨てて投入し直す）。
+    """
+    results: dict[str, str | None] = {}
+    cache_keys: dict[str, tuple[str, str]] = {}
+    pending: list[dict] = []
+    for request in requests:
+        custom_id = request["custom_id"]
+        if custom_id in results or custom_id in cache_keys:
+            raise ValueError(f"custom_id が重複しています: {custom_id}")
+        params = dict(request["body"])
+        model = params.pop("model")
+        messages = params.pop("messages")
+        key = llm_gateway.cache_key(model, messages, params)
+        cached = llm_gateway.read_cache(key) if use_cache else None
+        if cached is not None:
+            if llm_gateway.is_valid_content(cached, validate):
+                results[custom_id] = cached
+                continue
+            llm_gateway.evict_cache(key)
+        cache_keys[custom_id] = (key, model)
+        pending.append(request)
+
+    logging.info(
+        "%s: バッチ対象 %d 件（キャッシュ使用 %d 件）", name, len(pending), len(results)
+    )
+    if not pending:
+        return results
+
+    api = client or llm_gateway.get_client()
+    directory = Path(workdir or LLM_BATCH_DIR)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    submitted = []
+    for part, start in enumerate(range(0, len(pending), LLM_BATCH_MAX_REQUESTS), start=1):
+        chunk = pending[start : start + LLM_BATCH_MAX_REQUESTS]
+        path = write_batch_file(chunk, directory / f"{name}_{stamp}_{part}.jsonl")
+        submitted.append((submit_batch(api, path, metadata={"job": name}), chunk))
+
+    for batch_id, chunk in submitted:
+        batch = wait_for_batch(api, batch_id, poll_seconds=poll_seconds, sleep=sleep)
+        chunk_records = _collect_records(api, batch)
+        for request in chunk:
+            custom_id = request["custom_id"]
+            content, finish_reason = chunk_records.get(custom_id, (None, None))
+            results[custom_id] = content
+            if use_cache and llm_gateway.is_cacheable(content, finish_reason, validate):
+                key, model = cache_keys[custom_id]
+                llm_gateway.write_cache(key, model, content)
+
+    ok = sum(1 for content in results.values() if content is not None)
+    logging.info("%s: バッチ完了 成功 %d / %d 件", name, ok, len(results))
+    return results
+
+
+class LocalBatchClient:
+    """OpenAI クライアントの files / batches だけを真似るローカル実装。
+
+    handler(body) が応答本文を返す（例外はそのリクエストのエラー行になる）。
+    作成直後は validating、retrieve 1 回目で in_progress、2 回目で入力を処理して completed になる。
+    """
+
+    def __init__(self, handler: Callable[[dict], str]):
+        self.handler = handler
+        self.stored: dict[str, str] = {}
+        self._batches: dict[str, SimpleNamespace] = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _store(self, text: str) -> str:
+        file_id = f"file-local-{len(self.stored) + 1}"
+        self.stored[file_id] = text
+        return file_id
+
+    def _create_file(self, *, file: Any, purpose: str) -> SimpleNamespace:
+        data = file.read() if hasattr(file, "read") else file
+        text = data.decode("utf-8") if isinstance(data, bytes) else data
+        return SimpleNamespace(id=self._store(text), purpose=purpose)
+
+    def _file_content(self, file_id: str) -> SimpleNamespace:
+        return SimpleNamespace(text=self.stored[file_id])
+
+    def _create_batch(
+        self,
+        *,
+        input_file_id: str,
+        endpoint: str,
+        completion_window: str,
+        metadata: dict | None = None,
+    ) -> SimpleNamespace:
+        batch_id = f"batch-local-{len(self._batches) + 1}"
+        batch = SimpleNamespace(
+            id=batch_id,
+            status="validating",
+            endpoint=endpoint,
+            input_file_id=input_file_id,
+            output_file_id=None,
+            error_file_id=None,
+            metadata=metadata or {},
+        )
+        self._batches[batch_id] = batch
+        return batch
+
+    def _retrieve_batch(self, batch_id: str) -> SimpleNamespace:
+        batch = self._batches[batch_id]
+        if batch.status == "validating":
+            batch.status = "in_progress"
+        elif batch.status == "in_progress":
+            self._run(batch)
+        return batch
+
+    def _run(self, batch: SimpleNamespace) -> None:
+        outputs, errors = [], []
+        for n, line in enumerate(self.stored[batch.input_file_id].splitlines(), start=1):
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            record = {"id": f"batch_req_{n}", "custom_id": request["custom_id"]}
+            try:
+                content = self.handler(request["body"])
+            except Exception as e:
+                errors.append(
+                    {**record, "response": None, "error": {"code": "local_error", "message": str(e)}}
+                )
+                continue
+            body = {
+                "object": "chat.completion",
+                "model": request["body"].get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+            }
+            outputs.append(
+                {**record, "response": {"status_code": 200, "body": body}, "error": None}
+            )
+        batch.output_file_id = self._store(_to_jsonl(outputs)) if outputs else None
+        batch.error_file_id = self._store(_to_jsonl(errors)) if errors else None
+        batch.status = "completed"
@@ -0,0 +1,240 @@
+"""OpenAI Chat Completions 呼び出しの共通窓口。
+
+- プロセス全体の同時実行数（LLM_MAX_CONCURRENCY）と tokens/分（LLM_TOKENS_PER_MINUTE）を制限
+- 429 / 5xx / 接続エラーは Retry-After またはジッター付き指数バックオフでリトライ
+- (model, プロンプト) のハッシュをキーにした応答のディスクキャッシュ（LLM_CACHE_DIR 指定時のみ。同じプロンプトは再実行で課金しない）
+  再生成・上書きやサンプリング目的の呼び出しは use_cache=False で必ず API を呼ぶ
+  finish_reason が stop で、呼び出し側の validate を通った応答だけを保存する
+- submit() でスレッドプールに積み、Future で受け取ることもできる
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from openai_api.config import OPENAI_MODEL
+from utils.rate_limit import TokenBucketRateLimiter, parse_retry_after
+
+load_dotenv()
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+# 0 以下なら tokens/分 の制限なし
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+# 応答キャッシュの置き場所。既定は空（キャッシュしない）。リハーサル・再実行の課金を抑えたいときだけ指定する
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "120"))
+LLM_RETRIES = 5
+LLM_BACKOFF_BASE = 2.0
+LLM_BACKOFF_MAX = 60.0
+# max_completion_tokens 未指定時に見込む出力トークン数
+DEFAULT_COMPLETION_TOKENS = 1000
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRYABLE_ERROR_NAMES = frozenset({"APIConnectionError", "APITimeoutError"})
+# length（出力上限で途中切れ）や content_filter の応答はキャッシュしない
+CACHEABLE_FINISH_REASONS = frozenset({"stop"})
+
+_semaphore = threading.BoundedSemaphore(max(LLM_MAX_CONCURRENCY, 1))
+token_limiter = (
+    TokenBucketRateLimiter(LLM_TOKENS_PER_MINUTE / 60.0, LLM_TOKENS_PER_MINUTE)
+    if LLM_TOKENS_PER_MINUTE > 0
+    else None
+)
+_client = None
+_client_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_client():
+    """共通の OpenAI クライアント（SDK 側のリトライは切り、ここでリトライする）。"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
+
+            _client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"), timeout=LLM_TIMEOUT, max_retries=0
+            )
+        return _client
+
+
+def cache_key(model: str, messages: list[dict], params: dict) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "params": params},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> Path | None:
+    if not LLM_CACHE_DIR:
+        return None
+    return Path(LLM_CACHE_DIR) / key[:2] / f"{key}.json"
+
+
+def read_cache(key: str) -> str | None:
+    path = _cache_path(key)
+    if path is None or not path.is_file():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["content"]
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning("LLM キャッシュ読み込み失敗 %s: %s", path, e)
+        return None
+
+
+def write_cache(key: str, model: str, content: str) -> None:
+    path = _cache_path(key)
+    if path is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(
+            json.dumps({"model": model, "content": content}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+    except OSError as e:
+        logging.warning("LLM キャッシュ書き込み失敗 %s: %s", path, e)
+
+
+def evict_cache(key: str) -> None:
+    path = _cache_path(key)
+    if path is None:
+        return
+    try:
+        path.unlink(missing_ok=True)
+    except OSError as e:
+        logging.warning("LLM キャッシュ削除失敗 %s: %s", path, e)
+
+
+def is_valid_content(content: str, validate: Callable[[str], Any] | None) -> bool:
+    """validate（json.loads など）が例外を出さなければ真。validate 省略時は常に真。"""
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception as e:
+        logging.warning("LLM 応答の検証失敗（キャッシュしない）: %s", e)
+        return False
+    return True
+
+
+def is_cacheable(
+    content: str, finish_reason: Any, validate: Callable[[str], Any] | None = None
+) -> bool:
+    """最後まで生成され（finish_reason == stop）、validate を通る応答だけキャッシュする。"""
+    if not content:
+        return False
+    if finish_reason not in CACHEABLE_FINISH_REASONS:
+        logging.warning("LLM 応答が完了していないためキャッシュしない: finish_reason=%s", finish_reason)
+        return False
+    return is_valid_content(content, validate)
+
+
+def estimate_tokens(messages: list[dict], params: dict) -> int:
+    """入力は 1 文字 ≒ 1 トークン（日本語前提の上振れ見積もり）＋出力上限で概算する。"""
+    prompt_chars = sum(len(str(m.get("content") or "")) for m in messages)
+    completion = params.get("max_completion_tokens") or params.get("max_tokens")
+    return prompt_chars + int(completion or DEFAULT_COMPLETION_TOKENS)
+
+
+def _retry_delay(exc: BaseException, attempt: int) -> float | None:
+    """リトライすべき例外なら待機秒数、そうでなければ None。"""
+    status = getattr(exc, "status_code", None)
+    if status not in RETRYABLE_STATUS_CODES and type(exc).__name__ not in RETRYABLE_ERROR_NAMES:
+        return None
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after = parse_retry_after(headers.get("retry-after") or headers.get("Retry-After"))
+    if retry_after is not None:
+        return min(retry_after, LLM_BACKOFF_MAX)
+    delay = LLM_BACKOFF_BASE * (2**attempt) + random.uniform(0, LLM_BACKOFF_BASE)
+    return min(delay, LLM_BACKOFF_MAX)
+
+
+def complete(
+    messages: list[dict],
+    *,
+    model: str = OPENAI_MODEL,
+    client: Any = None,
+    use_cache: bool = True,
+    retries: int = LLM_RETRIES,
+    validate: Callable[[str], Any] | None = None,
+    **params: Any,
+) -> str:
+    """chat.completions.create を呼び、choices[0].message.content を返す。
+
+    params は create にそのまま渡す（response_format, max_completion_tokens など）。
+    client を省略すると get_client() を使う（各スクリプトの既存クライアントも渡せる。
+    その場合もリクエスト単位で LLM_TIMEOUT を付ける）。リトライを使い切った例外はそのまま送出する。
+    validate は応答を解析する関数（例外で不正とみなす）。不正な応答もそのまま返すがキャッシュはせず、
+    キャッシュ済みの応答が不正なら削除して API を呼び直す。
+    """
+    key = cache_key(model, messages, params)
+    if use_cache:
+        cached = read_cache(key)
+        if cached is not None:
+            if is_valid_content(cached, validate):
+                logging.info("LLM キャッシュ使用: %s", key[:12])
+                return cached
+            evict_cache(key)
+
+    api = client or get_client()
+    for attempt in range(retries):
+        if token_limiter is not None:
+            token_limiter.acquire(estimate_tokens(messages, params))
+        try:
+            with _semaphore:
+                response = api.chat.completions.create(
+                    model=model, messages=messages, timeout=LLM_TIMEOUT, **params
+                )
+        except Exception as exc:
+            delay = _retry_delay(exc, attempt)
+            if delay is None or attempt >= retries - 1:
+                raise
+            logging.warning(
+                "OpenAI API エラー (%s)。%.1f 秒後にリトライ (%d/%d)",
+                exc,
+                delay,
+                attempt + 1,
+                retries,
+            )
+            if token_limiter is not None:
+                token_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+            continue
+
+        choice = response.choices[0]
+        content = choice.message.content or ""
+        if use_cache and is_cacheable(content, choice.finish_reason, validate):
+            write_cache(key, model, content)
+        return content
+    raise RuntimeError("llm_gateway.complete: unreachable")  # pragma: no cover
+
+
+def submit(messages: list[dict], **kwargs: Any) -> Future:
+    """complete() を共有スレッドプールで実行する（同時実行数は complete 側で制限）。"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(LLM_MAX_CONCURRENCY, 1), thread_name_prefix="llm"
+            )
+        executor = _executor
+    return executor.submit(complete, messages, **kwargs)
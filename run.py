@@ -25,6 +25,8 @@ RUN_LOCK_PATH = ROOT / "logs" / "run.lock"
 
 # 加工フェーズを系統分割して並列実行するためのフェーズ名
 PROCESS_PIPELINE_PHASES = ("process_main", "process_actress", "process_mesugaki")
+# 系統ロックの一覧（process_bltl はフェーズを持たず、BL/TL DB を触るスクリプトだけが取る）
+PIPELINE_LOCKS = ("process_main", "process_bltl", "process_actress", "process_mesugaki")
 
 PHASE_CHOICES = [
     "collect",
@@ -49,6 +51,7 @@ PHASE_LOCK = {
 
 # --script 実行時にどの系統ロックを取るか
 SCRIPT_PIPELINE: dict[str, str] = {
+    "scripts/process/generate_item_content.py": "process_main",
     "scripts/process/update_items.py": "process_main",
     "scripts/process/create_ai_review.py": "process_main",
     "scripts/process/create_weekly_rankings.py": "process_main",
@@ -59,6 +62,14 @@ SCRIPT_PIPELINE: dict[str, str] = {
     "scripts/process/create_weekly_rankings_mesugaki.py": "process_mesugaki",
 }
 
+# --db で対象 DB を切り替えるスクリプトは、DB ごとの系統ロックを取る
+DB_SCRIPT_PATHS = frozenset({"scripts/process/generate_item_content.py"})
+DB_PIPELINE: dict[str, str] = {
+    "default": "process_main",
+    "supabase2": "process_bltl",
+    "supabase3": "process_mesugaki",
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,18 +77,34 @@ def pipeline_lock_path(phase: str) -> Path:
     return ROOT / "logs" / f"run_{phase}.lock"
 
 
-def resolve_lock_paths(phase: str | None, script_path: str | None) -> list[Path]:
-    """実行対象に応じたロックファイルパスを返す（複数可）。"""
+def entry_pipeline(path: str, args: list[str] | None = None) -> str | None:
+    """スクリプト（と tasks.yaml の args）が触る系統。--db 付きスクリプトは DB から決める。"""
+    normalized = path.replace("\\", "/")
+    if normalized in DB_SCRIPT_PATHS:
+        args = args or []
+        db = args[args.index("--db") + 1] if "--db" in args[:-1] else "default"
+        return DB_PIPELINE.get(db, "process_main")
+    return SCRIPT_PIPELINE.get(normalized)
+
+
+def resolve_lock_paths(
+    phase: str | None, script_path: str | None, entries: list[dict] | None = None
+) -> list[Path]:
+    """実行対象に応じたロックファイルパスを返す（複数可）。
+
+    entries（resolve_scripts の戻り値）を渡すと、フェーズ内で別 DB を触るスクリプトの系統ロックも加える。
+    """
+    extra = [entry_pipeline(e["path"], script_cli_args(e)) for e in entries or []]
     if phase in PHASE_LOCK:
-        return [pipeline_lock_path(PHASE_LOCK[phase])]
+        pipelines = dict.fromkeys(p for p in [PHASE_LOCK[phase], *extra] if p)
+        return [pipeline_lock_path(p) for p in pipelines]
     if phase == "process":
         # 全系統直列実行時は各系統ロックをすべて取得し、分割 bat と衝突させない
-        return [pipeline_lock_path(p) for p in PROCESS_PIPELINE_PHASES]
+        return [pipeline_lock_path(p) for p in PIPELINE_LOCKS]
     if phase == "all":
-        return [RUN_LOCK_PATH, *[pipeline_lock_path(p) for p in PROCESS_PIPELINE_PHASES]]
+        return [RUN_LOCK_PATH, *[pipeline_lock_path(p) for p in PIPELINE_LOCKS]]
     if script_path:
-        normalized = script_path.replace("\\", "/")
-        pipeline = SCRIPT_PIPELINE.get(normalized)
+        pipeline = extra[0] if extra else entry_pipeline(script_path)
         if pipeline:
             return [pipeline_lock_path(pipeline)]
         return [RUN_LOCK_PATH]
@@ -319,7 +346,7 @@ def main() -> None:
 
     lock_set: LockSet | None = None
     if not args.no_lock:
-        lock_set = LockSet(resolve_lock_paths(args.phase, args.script))
+        lock_set = LockSet(resolve_lock_paths(args.phase, args.script, entries))
         try:
             lock_set.acquire()
         except RunLockError as exc:
@@ -6,18 +6,29 @@ import logging
 from collections.abc import Callable
 from typing import Any
 
-from utils.supabase_retry import execute_with_retry
+from db.registered_content_ids import RegisteredContentIdIndex, fetch_registered_content_ids
 
 
 def filter_unregistered_items(
     top_items: list[dict],
     *,
-    exists_by_content_id: Callable[[str], bool],
+    exists_by_content_id: Callable[[str], bool] | None = None,
+    registered_content_ids: Callable[[list[str]], set[str]] | None = None,
 ) -> list[dict]:
     """取得済み一覧から content_id 未登録のアイテムだけを返す。
 
+    registered_content_ids を渡すと一覧の content_id をまとめて 1 回で照会し、
+    exists_by_content_id は 1 件ずつ照会する（どちらか一方を指定）。
     既存作品や content_id 欠落はスキップし、処理全体は止めない。
     """
+    if registered_content_ids is not None:
+        registered = registered_content_ids(
+            [str(item["content_id"]) for item in top_items if item.get("content_id")]
+        )
+        exists_by_content_id = registered.__contains__
+    elif exists_by_content_id is None:
+        raise TypeError("exists_by_content_id か registered_content_ids が必要です")
+
     items: list[dict] = []
     for item in top_items:
         content_id = item.get("content_id")
@@ -53,13 +64,31 @@ def run_items_isolated(
     return has_error
 
 
-def supabase_exists_checker(table_client: Any) -> Callable[[str], bool]:
-    """Supabase table client から exists 判定関数を作る。"""
+def supabase_registered_ids_checker(table_client: Any) -> Callable[[list[str]], set[str]]:
+    """Supabase table client から登録済み content_id の一括照会関数を作る。"""
+
+    def _registered(content_ids: list[str]) -> set[str]:
+        return fetch_registered_content_ids(table_client, content_ids)
+
+    return _registered
+
+
+def load_registered_index(table_client: Any) -> RegisteredContentIdIndex | None:
+    """登録済み content_id の索引を読み込む。
+
+    失敗しても収集全体は止めず None を返す（以降は registered_ids_checker が DB へ都度照会する）。
+    """
+    try:
+        return RegisteredContentIdIndex.load(table_client)
+    except Exception as e:
+        logging.error("登録済み content_id の読み込みに失敗（都度照会に切り替え）: %s", e)
+        return None
 
-    def _exists(content_id: str) -> bool:
-        exists = execute_with_retry(
-            lambda: table_client.select("id").eq("content_id", content_id)
-        )
-        return bool(exists.data)
 
-    return _exists
+def registered_ids_checker(
+    table_client: Any, registered_index: RegisteredContentIdIndex | None
+) -> Callable[[list[str]], set[str]]:
+    """索引があれば索引で、なければ table_client への一括照会で登録済みを判定する。"""
+    if registered_index is not None:
+        return registered_index.registered_among
+    return supabase_registered_ids_checker(table_client)
@@ -6,17 +6,18 @@ import sys
 
 from db.supabase_client import supabase
 # from db.storageMega import mega_login, mega_logout
-from dmm.dmm_api import fetch_items_merged_sorts
+from dmm.dmm_api import fetch_targets_merged_sorts
 from db.trn_dmm_items_repository import insert_dmm_item
 import os
 import logging
 from utils.get_sample_movie import get_sample_movie
-from utils.get_tachiyomi import capture_all_tachiyomi_pages
+from utils.get_tachiyomi import TachiyomiCaptureService
 from utils.logger import setup_logger
 from scripts.collect._filter import (
     filter_unregistered_items,
+    load_registered_index,
+    registered_ids_checker,
     run_items_isolated,
-    supabase_exists_checker,
 )
 
 # ログ用ディレクトリを作成（存在しなければ）
@@ -58,64 +59,88 @@ def main():
 
     has_error = False
 
+    # 登録済み content_id は実行開始時に 1 回だけ読み込み、以降はローカルで判定する（読めなければ DB へ都度照会）
+    registered_index = load_registered_index(supabase.table("trn_dmm_items"))
+
     # mega_login()  # 先にログイン
 
-    for target in targets:
-        site = target["site"]
-        service = target["service"]
-        floor = target.get("floor")
-        logging.info("[FETCH] site=%s service=%s floor=%s", site, service, floor)
-
-        try:
-            top_items = fetch_items_merged_sorts(
-                site=site,
-                service=service,
-                floor=floor,
-                offset=1,
-                hits=hits_per_request,
-                sorts=("rank", "date", "review"),
-                min_sample_count=10,
+    # 全 target × sort の ItemList を先にまとめて並列取得する
+    fetched = fetch_targets_merged_sorts(
+        targets,
+        offset=1,
+        hits=hits_per_request,
+        sorts=("rank", "date", "review"),
+        min_sample_count=10,
+        registered_index=registered_index,
+    )
+
+    # 年齢認証済みのモバイル Chrome を使い回し、複数の本の立ち読みを並列に取り込む
+    with TachiyomiCaptureService() as tachiyomi_service:
+        for target, top_items in zip(targets, fetched):
+            site = target["site"]
+            service = target["service"]
+            floor = target.get("floor")
+            logging.info("[FETCH] site=%s service=%s floor=%s", site, service, floor)
+
+            try:
+                if isinstance(top_items, Exception):
+                    raise top_items
+                logging.info("データ取得完了")
+
+                items = filter_unregistered_items(
+                    top_items,
+                    registered_content_ids=registered_ids_checker(
+                        supabase.table("trn_dmm_items"), registered_index
+                    ),
+                )
+                logging.info("未登録 %d 件 / 取得 %d 件", len(items), len(top_items))
+            except Exception as e:
+                logging.error("登録処理に失敗: %s", str(e))
+                has_error = True
+                continue
+
+            # 立ち読みは数冊先まで先読みし、登録は従来どおり 1 件ずつ（取り込み済みの本から順に使う）
+            tachiyomi_jobs = tachiyomi_service.prefetch(
+                item.get("tachiyomi", {}).get("URL") for item in items
             )
-            logging.info("データ取得完了")
 
-            items = filter_unregistered_items(
-                top_items,
-                exists_by_content_id=supabase_exists_checker(supabase.table("trn_dmm_items")),
-            )
-            logging.info("未登録 %d 件 / 取得 %d 件", len(items), len(top_items))
-        except Exception as e:
-            logging.error("登録処理に失敗: %s", str(e))
-            has_error = True
-            continue
-
-        def process_one(item: dict) -> None:
-            # 立ち読みデータの取得
-            # 立ち読みURLが存在する場合のみ処理
-            tachiyomi_url = item.get("tachiyomi", {}).get("URL")  # ← .get を安全化
-            # logging.info("立ち読みデータ取得開始")
-            tachiyomi_image_paths = []
-            if tachiyomi_url:
-                logging.info("立ち読みデータ取得 URL=%s", tachiyomi_url)
-                tachiyomi_image_paths = capture_all_tachiyomi_pages(tachiyomi_url=tachiyomi_url)
-            # logging.info("立ち読みデータ取得完了")
-
-            sample_movie_url = item.get("sampleMovieURL_highest")
-            # sample_movie_path = ""
-            # if sample_movie_url:
-            #     logging.info("サンプル動画URL: %s", sample_movie_url)
-            #     sample_movie_path = get_sample_movie(sample_movie_url)
-
-            insert_dmm_item(item, tachiyomi_image_paths, sample_movie_url,site=site, service=service, floor=floor)
-            logging.info("データ登録完了")
-
-            for image_path in tachiyomi_image_paths:
-                cleanup_file(image_path)
-
-            # cleanup_file(sample_movie_path)
-            logging.info("不要ファイル削除完了")
-
-        if run_items_isolated(items, process_one):
-            has_error = True
+            def process_one(item: dict) -> None:
+                # 立ち読みデータの取得
+                # 立ち読みURLが存在する場合のみ処理
+                tachiyomi_url = item.get("tachiyomi", {}).get("URL")  # ← .get を安全化
+                # logging.info("立ち読みデータ取得開始")
+                tachiyomi_image_paths = []
+                if tachiyomi_url:
+                    logging.info("立ち読みデータ取得 URL=%s", tachiyomi_url)
+                    tachiyomi_image_paths = tachiyomi_jobs.take(tachiyomi_url)
+                # logging.info("立ち読みデータ取得完了")
+
+                sample_movie_url = item.get("sampleMovieURL_highest")
+                # sample_movie_path = ""
+                # if sample_movie_url:
+                #     logging.info("サンプル動画URL: %s", sample_movie_url)
+                #     sample_movie_path = get_sample_movie(sample_movie_url)
+
+                insert_dmm_item(
+                    item,
+                    tachiyomi_image_paths,
+                    sample_movie_url,
+                    site=site,
+                    service=service,
+                    floor=floor,
+                    registered_index=registered_index,
+                )
+                logging.info("データ登録完了")
+
+                for image_path in tachiyomi_image_paths:
+                    cleanup_file(image_path)
+
+                # cleanup_file(sample_movie_path)
+                logging.info("不要ファイル削除完了")
+
+            if run_items_isolated(items, process_one):
+                has_error = True
+            tachiyomi_jobs.close()
 
     if has_error:
         logging.error("処理中にエラーが発生しました")
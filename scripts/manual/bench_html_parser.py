@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""HTML パーサ（html.parser / lxml）と部分パース（utils/html_parser のストレーナ）の速度を比べる。
+
+tests/fixtures/html の保存済みページで、あらすじ・レビュー・キャンペーンリンクの抽出を
+「全体を木にする」「必要な部分木だけ木にする」の両方で実行し、結果が同じであることも確かめる。
+
+例:
+  .venv\\Scripts\\python.exe scripts/manual/bench_html_parser.py
+  .venv\\Scripts\\python.exe scripts/manual/bench_html_parser.py --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from dmm.dmm_campaign_api import _parse_video_top_sale_links
+from openai_api.content_generator import parse_synopsis_html
+from utils import html_parser
+from utils.dmm_review_scraper import parse_comic_reviews_html, parse_e2e_video_reviews_html
+
+ROOT = Path(__file__).resolve().parents[2]
+FIXTURE_DIR = ROOT / "tests" / "fixtures" / "html"
+VIDEO_URL = "https://video.dmm.co.jp/av/content/?id=sample001"
+
+
+def load_cases() -> list[tuple[str, Callable[[], object]]]:
+    video = (FIXTURE_DIR / "video_product.html").read_text(encoding="utf-8")
+    comic = (FIXTURE_DIR / "comic_product.html").read_text(encoding="utf-8")
+    top = (FIXTURE_DIR / "campaign_top.html").read_text(encoding="utf-8")
+    return [
+        ("synopsis(video)", lambda: parse_synopsis_html(video, VIDEO_URL)),
+        ("e2e reviews(video)", lambda: parse_e2e_video_reviews_html(video)),
+        ("comic reviews", lambda: parse_comic_reviews_html(comic)),
+        ("campaign links", lambda: _parse_video_top_sale_links(top, 0)),
+    ]
+
+
+def available_parsers() -> list[str]:
+    parsers = ["html.parser"]
+    if html_parser.lxml_available():
+        parsers.append("lxml")
+    return parsers
+
+
+def measure(func: Callable[[], object], *, parser: str, targeted: bool, repeat: int):
+    """(1 回あたりの秒数の中央値, 抽出結果) を返す。"""
+    html_parser.HTML_PARSER = parser
+    html_parser.HTML_TARGETED_PARSE = targeted
+    result = func()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return samples[len(samples) // 2], result
+
+
+def run_benchmark(repeat: int) -> int:
+    original = (html_parser.HTML_PARSER, html_parser.HTML_TARGETED_PARSE)
+    mismatches = 0
+    print(f"{'case':<22}{'parser':<13}{'full ms':>10}{'targeted ms':>13}{'speedup':>10}")
+    try:
+        for name, func in load_cases():
+            baseline, expected = measure(func, parser="html.parser", targeted=False, repeat=repeat)
+            for parser in available_parsers():
+                full, full_result = measure(func, parser=parser, targeted=False, repeat=repeat)
+                targeted, targeted_result = measure(func, parser=parser, targeted=True, repeat=repeat)
+                same = full_result == expected and targeted_result == expected
+                mismatches += 0 if same else 1
+                print(
+                    f"{name:<22}{parser:<13}{full * 1000:>10.2f}{targeted * 1000:>13.2f}"
+                    f"{baseline / targeted:>9.1f}x{'' if same else '  結果不一致'}"
+                )
+    finally:
+        html_parser.HTML_PARSER, html_parser.HTML_TARGETED_PARSE = original
+    print("speedup は html.parser で全体を木にした場合との比較")
+    return 1 if mismatches else 0
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="HTML パーサと部分パースの速度比較")
+    parser.add_argument("--repeat", type=int, default=20, help="1 ケースあたりの計測回数（既定 20）")
+    args = parser.parse_args(argv)
+    sys.exit(run_benchmark(max(args.repeat, 1)))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,11 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 import os
 import sys
 import re
-import time
 import logging
 from datetime import datetime
-import requests
 from openai import OpenAI  # ← ★追加
 
+from dmm.dmm_http import dmm_api_get
 from db.supabase_client import supabase
 from openai_api.config import OPENAI_MODEL
 from pykakasi import kakasi
@@ -28,7 +27,6 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # ★追加
 client = OpenAI(api_key=OPENAI_API_KEY)       # ★追加
 
 BATCH_SIZE = 100
-SLEEP_BETWEEN_BATCH = 5
 
 
 # ----------------------------------------------------
@@ -188,7 +186,7 @@ def fetch_actress_detail(actress_id: str):
     }
 
     try:
-        res = requests.get(url, params=params, timeout=10)
+        res = dmm_api_get(url, params)
         res.raise_for_status()
         data = res.json()
         actresses = data.get("result", {}).get("actress", [])
@@ -237,7 +235,6 @@ def upsert_actresses(actresses: list[dict]):
             ).execute()
         except Exception as e:
             logging.error(f"❌ 女優UPSERT失敗: {a} ({e})")
-        time.sleep(0.5)
 
 def upsert_genres(genres: list[dict], service_code: str, floor_code: str):
     if not genres:
@@ -302,7 +299,7 @@ def fetch_item_by_content_id(content_id: str):
         "output": "json",
     }
     try:
-        res = requests.get(url, params=params, timeout=10)
+        res = dmm_api_get(url, params)
         res.raise_for_status()
         data = res.json()
         items = data.get("result", {}).get("items", [])
@@ -410,7 +407,6 @@ def process_batch(batch_items, batch_index, total, range_start=0):
             update_dmm_item(content_id, item, row["auto_summary"], row["auto_point"])
         else:
             logging.warning(f"⚠️ データ取得失敗: {content_id}")
-        time.sleep(0.5)
     logging.info(f"=== ✅ バッチ {batch_index} 完了 ===")
 
 # ----------------------------------------------------
@@ -465,10 +461,6 @@ def main():
         process_batch(batch_items, batch_index, total, range_start=i)
         update_count += len(batch_items)
 
-        if i + BATCH_SIZE < total:
-            logging.info(f"⏸ {SLEEP_BETWEEN_BATCH}秒待機中（次のバッチまで）...")
-            time.sleep(SLEEP_BETWEEN_BATCH)
-
     logging.info(f"🎉 全ての作品データ更新が完了しました。{update_count} 件処理しました。")
 
 
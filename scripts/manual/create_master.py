@@ -8,6 +8,8 @@ import requests
 from supabase import create_client
 from dotenv import load_dotenv
 
+from dmm.dmm_http import dmm_api_get
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -23,14 +25,13 @@ def sync_site_and_service_master():
     logging.info("[SITE] サイト/サービス一覧の取得開始")
 
     try:
-        res = requests.get(
+        res = dmm_api_get(
             "https://api.dmm.com/affiliate/v3/floorList",
-            params={
+            {
                 "api_id": DMM_API_ID,
                 "affiliate_id": DMM_AFFILIATE_ID,
                 "output": "json"
             },
-            timeout=10
         )
         res.raise_for_status()
         result = res.json()
@@ -75,14 +76,13 @@ def sync_floor_master():
     logging.info("[FLOOR] フロア一覧の取得開始")
 
     try:
-        res = requests.get(
+        res = dmm_api_get(
             "https://api.dmm.com/affiliate/v3/FloorList",
-            params={
+            {
                 "api_id": DMM_API_ID,
                 "affiliate_id": DMM_AFFILIATE_ID,
                 "output": "json"
             },
-            timeout=10
         )
         res.raise_for_status()
         result = res.json()
@@ -136,7 +136,7 @@ def sync_genre_master(floor_id):
             "offset": offset
         }
 
-        response = requests.get(url, params=params)
+        response = dmm_api_get(url, params)
         response.raise_for_status()
 
         data = response.json()
@@ -110,7 +110,8 @@ def regenerate_row(row: dict[str, Any]) -> dict[str, Any] | None:
         logging.warning("raw_json が不正: %s", row.get("content_id"))
         return None
 
-    ai_content = generate_content(raw) or {}
+    # 空を埋め直すための再生成なので、前回の応答キャッシュは使わない
+    ai_content = generate_content(raw, use_cache=False) or {}
     summary_in = ai_content.get("auto_summary") or ""
     point_in = ai_content.get("auto_point") or ""
     if is_blank(summary_in) and is_blank(point_in):
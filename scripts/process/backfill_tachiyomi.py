@@ -10,12 +10,14 @@
 - 空なら capture → upload → tachiyomi_page_count を UPDATE
 - キャプチャ失敗時は fail_count を +1。3 回で後埋め対象外
 - --sync-only なら S3 同期のみ（キャプチャしない）
+- --stream なら撮れたページから順に S3 へ送り、送ったファイルはすぐ消す（キャプチャと並行）
 
 例:
   .venv\\Scripts\\python.exe scripts/process/backfill_tachiyomi.py --dry-run
   .venv\\Scripts\\python.exe scripts/process/backfill_tachiyomi.py --limit 20
   .venv\\Scripts\\python.exe scripts/process/backfill_tachiyomi.py --sync-only --limit 200
   .venv\\Scripts\\python.exe scripts/process/backfill_tachiyomi.py --db supabase3 --limit 10
+  .venv\\Scripts\\python.exe scripts/process/backfill_tachiyomi.py --stream --limit 20
 """
 
 from __future__ import annotations
@@ -34,6 +36,7 @@ from dotenv import load_dotenv
 from db.storageS3 import (
     S3_BUCKET,
     S3_BUCKET_3,
+    TachiyomiUploadStream,
     count_objects_under_prefix,
     upload_local_image_to_s3,
     upload_local_image_to_s3_bucket3,
@@ -50,6 +53,8 @@ UploadFn = Callable[..., str | None]
 
 DB_CHOICES = ("default", "supabase2", "supabase3")
 CAPTURE_FAIL_THRESHOLD = 3
+# 1 にすると --stream を付けなくてもストリーミングアップロードにする
+STREAM_UPLOAD_DEFAULT = os.getenv("TACHIYOMI_STREAM_UPLOAD", "0") == "1"
 
 
 def resolve_db_target(name: str) -> tuple[Any, UploadFn, str | None]:
@@ -157,6 +162,23 @@ def upload_tachiyomi_paths(
     return uploaded
 
 
+def capture_and_stream_upload(
+    tachiyomi_url: str,
+    *,
+    content_id: str,
+    floor: str,
+    bucket: str | None,
+) -> tuple[list[str], int]:
+    """撮ったページをその場でアップロードキューに渡す。戻り値は (ページパス一覧, アップロード成功数)。"""
+    with TachiyomiUploadStream(content_id, floor, bucket) as stream:
+        paths = capture_all_tachiyomi_pages(tachiyomi_url, on_page=stream.put)
+        urls = stream.results()
+    for idx, url in enumerate(urls, start=1):
+        if not url:
+            logging.error("[IMG-FAIL] %s idx=%d", content_id, idx)
+    return paths, sum(1 for url in urls if url)
+
+
 def cleanup_local_files(paths: list[str]) -> None:
     for path in paths:
         try:
@@ -175,8 +197,12 @@ def process_one_row(
     bucket: str | None,
     dry_run: bool,
     sync_only: bool = False,
+    stream_upload: bool = False,
 ) -> str:
-    """1件処理。戻り値: synced | captured | skipped | failed"""
+    """1件処理。戻り値: synced | captured | skipped | failed
+
+    stream_upload なら TachiyomiUploadStream でページごとにアップロードする（upload_fn は使わない）。
+    """
     content_id = row.get("content_id")
     floor = row.get("floor") or ""
     tachiyomi_url = row.get("tachiyomi_url")
@@ -220,19 +246,27 @@ def process_one_row(
     if dry_run:
         return "captured"
 
-    paths = capture_all_tachiyomi_pages(tachiyomi_url)
+    paths: list[str] = []
     try:
+        if stream_upload:
+            paths, uploaded = capture_and_stream_upload(
+                tachiyomi_url, content_id=content_id, floor=floor, bucket=bucket
+            )
+        else:
+            paths = capture_all_tachiyomi_pages(tachiyomi_url)
+            uploaded = None
         if not paths:
             logging.warning("[EMPTY] キャプチャ 0 件: %s", content_id)
             record_capture_failure(client, content_id, fail_count)
             return "failed"
 
-        uploaded = upload_tachiyomi_paths(
-            paths,
-            content_id=content_id,
-            floor=floor,
-            upload_fn=upload_fn,
-        )
+        if uploaded is None:
+            uploaded = upload_tachiyomi_paths(
+                paths,
+                content_id=content_id,
+                floor=floor,
+                upload_fn=upload_fn,
+            )
         if uploaded <= 0:
             logging.error("[FAIL] アップロード 0 件: %s", content_id)
             record_capture_failure(client, content_id, fail_count)
@@ -261,6 +295,7 @@ def run_backfill(
     content_id: str | None = None,
     sync_only: bool = False,
     offset: int = 0,
+    stream_upload: bool = False,
 ) -> int:
     client, upload_fn, bucket = resolve_db_target(db_name)
     rows = fetch_pending_tachiyomi_rows(
@@ -287,6 +322,7 @@ def run_backfill(
                 bucket=bucket,
                 dry_run=dry_run,
                 sync_only=sync_only,
+                stream_upload=stream_upload,
             )
             counts[status] = counts.get(status, 0) + 1
             if status == "failed":
@@ -336,6 +372,12 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         help="S3 既存分の件数同期のみ（キャプチャしない）",
     )
     parser.add_argument("--content-id", default=None, help="特定 content_id のみ")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=STREAM_UPLOAD_DEFAULT,
+        help="撮れたページから順にアップロードする（既定は TACHIYOMI_STREAM_UPLOAD）",
+    )
     return parser.parse_args(argv)
 
 
@@ -354,6 +396,7 @@ def main(argv: list[str] | None = None) -> None:
         content_id=args.content_id,
         sync_only=args.sync_only,
         offset=args.offset,
+        stream_upload=args.stream,
     )
     sys.exit(code)
 
@@ -14,6 +14,8 @@ from datetime import datetime
 import httpx
 from openai import OpenAI
 from db.supabase_client import supabase
+from db.upsert_buffer import UpsertBuffer
+from openai_api import llm_batch, llm_gateway
 from openai_api.config import OPENAI_MODEL
 from utils.logger import setup_logger
 from utils.supabase_retry import execute_with_retry
@@ -92,7 +94,7 @@ def _format_actress_info(actress: dict) -> str:
 # AI解説生成
 # =================================
 
-def generate_actress_ai_profile(actress):
+def build_actress_messages(actress):
 
     actress_info = _format_actress_info(actress)
 
@@ -115,19 +117,25 @@ def generate_actress_ai_profile(actress):
 }}
 """
 
+    return [
+        {"role": "system", "content": ACTRESS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def generate_actress_ai_profile(actress, *, use_cache=True):
+
     try:
 
-        response = client.chat.completions.create(
+        content = llm_gateway.complete(
+            build_actress_messages(actress),
             model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": ACTRESS_SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"}
+            client=client,
+            use_cache=use_cache,
+            response_format={"type": "json_object"},
+            validate=json.loads,
         )
 
-        content = response.choices[0].message.content
-
         return json.loads(content)
 
     except Exception as e:
@@ -139,15 +147,20 @@ def generate_actress_ai_profile(actress):
 # DB保存
 # =================================
 
-def save_actress_ai(actress_id, ai):
+def _ai_columns(ai):
 
-    data = {
+    return {
         "ai_summary": ai.get("ai_summary"),
         "ai_career": ai.get("ai_career"),
         "ai_appeal": ai.get("ai_appeal"),
         "ai_generated_at": datetime.utcnow().isoformat()
     }
 
+
+def save_actress_ai(actress_id, ai):
+
+    data = _ai_columns(ai)
+
     execute_with_retry(
         lambda: supabase.table("mst_actress")
         .update(data)
@@ -227,7 +240,8 @@ def process_actresses(actresses, *, regenerate=False):
 
         logging.info(f"[{i}/{total}] AI{mode}: {name} (actress_id={actress_id})")
 
-        ai = generate_actress_ai_profile(actress)
+        # 再生成（既存レビューの上書き）は前回の応答キャッシュを使わない
+        ai = generate_actress_ai_profile(actress, use_cache=not regenerate)
 
         if not ai:
             logging.warning("AI生成失敗: actress_id=%s", actress_id)
@@ -238,6 +252,60 @@ def process_actresses(actresses, *, regenerate=False):
         time.sleep(SLEEP_TIME)
 
 
+def process_actresses_batch(actresses, *, regenerate=False):
+    """OpenAI Batch API でまとめて生成し、mst_actress へ複数行 UPSERT で書き戻す。
+
+    regenerate（既存レビューの上書き）なら応答キャッシュを使わず必ず投入する。
+    """
+
+    if not actresses:
+        logging.info("対象女優なし")
+        return 0
+
+    by_id = {str(a["actress_id"]): a for a in actresses}
+    requests = [
+        llm_batch.batch_request(
+            actress_id,
+            build_actress_messages(actress),
+            model=OPENAI_MODEL,
+            response_format={"type": "json_object"},
+        )
+        for actress_id, actress in by_id.items()
+    ]
+    results = llm_batch.run_batch(
+        requests,
+        client=client,
+        name="actress_profile",
+        use_cache=not regenerate,
+        validate=json.loads,
+    )
+
+    with UpsertBuffer(supabase, "mst_actress", on_conflict="actress_id") as writes:
+        for actress_id, content in results.items():
+            actress = by_id[actress_id]
+            try:
+                ai = json.loads(content) if content else None
+            except ValueError as e:
+                logging.error(f"AI生成失敗: {e}")
+                ai = None
+            if not ai:
+                logging.warning("AI生成失敗: actress_id=%s", actress_id)
+                continue
+            # UPSERT の INSERT 側でも NOT NULL を満たすよう name を含める
+            writes.add(
+                {
+                    "actress_id": actress["actress_id"],
+                    "name": actress["name"],
+                    **_ai_columns(ai),
+                }
+            )
+
+    logging.info(
+        "AI解説保存（バッチ）: %d / %d 件", writes.flushed_count, len(requests)
+    )
+    return writes.flushed_count
+
+
 def parse_args(argv=None):
 
     parser = argparse.ArgumentParser(
@@ -256,6 +324,11 @@ def parse_args(argv=None):
         type=str,
         help="指定した名前の女優を再生成（既存レビューを上書き）",
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="OpenAI Batch API でまとめて生成する（完了まで待つ。夜間バッチ向け）",
+    )
     return parser.parse_args(argv)
 
 
@@ -294,7 +367,10 @@ def main(argv=None):
     if regenerate and args.name and not actresses:
         logging.warning("名前に一致する女優が見つかりません: %s", args.name)
 
-    process_actresses(actresses, regenerate=regenerate)
+    if args.batch:
+        process_actresses_batch(actresses, regenerate=regenerate)
+    else:
+        process_actresses(actresses, regenerate=regenerate)
 
     logging.info("🎉 女優AI解説生成完了")
 
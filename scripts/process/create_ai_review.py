@@ -9,22 +9,30 @@ import os
 import sys
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
 from openai import OpenAI  # ← ★追加
 
+from db.registered_content_ids import CONTENT_ID_CHUNK_SIZE
 from db.supabase_client import supabase
+from db.upsert_buffer import UpsertBuffer
+from openai_api import llm_batch
 from openai_api.config import OPENAI_MODEL
 from openai_api.content_generator import scrape_product_details
 from utils.content_generator_review import (
     AGE_GATE_SYNOPSIS_MARKERS,
-    create_driver,
+    create_driver_pool,
     scrape_review_comments,
     scrape_product_summary,
     generate_review_insights,
+    build_review_insights_messages,
+    parse_review_insights,
     usable_saved_summary,
     build_fallback_synopsis,
+    REVIEW_INSIGHTS_MAX_TOKENS,
 )
 from utils.logger import setup_logger
+from utils.supabase_retry import execute_with_retry
 import hashlib
 
 from utils.screenshot import save_debug_files
@@ -55,6 +63,13 @@ client = OpenAI(api_key=OPENAI_API_KEY)       # ★追加
 BATCH_SIZE = 100
 SLEEP_BETWEEN_BATCH = 5
 
+# --workers 指定時に generate_review_insights を同時に呼ぶ上限（スクレイプ並列数とは別）
+DEFAULT_AI_WORKERS = int(os.getenv("AI_REVIEW_AI_WORKERS", "2"))
+
+# 作品ごとに Chrome を起動し直さず、プールの driver を使い回す。
+# main() は実行ごとに作り直して最後に閉じる（ここは main() を通さない呼び出し用）
+driver_pool = create_driver_pool()
+
 # =========================
 # ユーティリティ関数
 # =========================
@@ -82,8 +97,91 @@ def should_skip_selenium_precheck(
     return normalize_review_count(db_review_count) == 0 and bool(has_saved_summary)
 
 
+# main() の事前一括取得結果（content_id → あらすじ / レビュー指紋 / 既存 review_id 集合）。
+# 取得済みの content_id は 1 件ずつの DB 照会を省く。
+_prefetched_summaries: dict[str, str | None] = {}
+_prefetched_fingerprints: dict[str, str | None] = {}
+_prefetched_review_ids: dict[str, set[str]] = {}
+
+
+def _fetch_rows_in_chunks(table: str, columns: str, content_ids: list[str], *, order_by: tuple[str, ...]):
+    """content_id を CONTENT_ID_CHUNK_SIZE 件ずつ in_ で照会する（1 チャンク内も 1000 行ごとにページング）。"""
+    rows: list[dict] = []
+    page = 1000
+    for i in range(0, len(content_ids), CONTENT_ID_CHUNK_SIZE):
+        chunk = content_ids[i : i + CONTENT_ID_CHUNK_SIZE]
+        start = 0
+        while True:
+            def build(chunk=chunk, start=start):
+                query = supabase.table(table).select(columns).in_("content_id", chunk)
+                for column in order_by:
+                    query = query.order(column)
+                return query.range(start, start + page - 1)
+
+            data = execute_with_retry(build).data or []
+            rows.extend(data)
+            if len(data) < page:
+                break
+            start += page
+    return rows
+
+
+def prefetch_precheck_state(content_ids) -> None:
+    """対象作品の保存済みあらすじと既存 review_id をまとめて読み込む。"""
+    ids = list(dict.fromkeys(str(cid) for cid in content_ids if cid))
+    if not ids:
+        return
+    summaries = {cid: None for cid in ids}
+    fingerprints = {cid: None for cid in ids}
+    for row in _fetch_rows_in_chunks(
+        "dmm_ai_review_summaries",
+        "content_id, summary_text, review_fingerprint",
+        ids,
+        order_by=("content_id",),
+    ):
+        summaries[row["content_id"]] = row.get("summary_text")
+        fingerprints[row["content_id"]] = row.get("review_fingerprint")
+    # 指紋が未保存（ddl10 以前に保存したサマリー）の作品だけ review_id を読む
+    legacy_ids = [cid for cid in ids if summaries[cid] and not fingerprints[cid]]
+    review_ids: dict[str, set[str]] = {cid: set() for cid in legacy_ids}
+    for row in _fetch_rows_in_chunks(
+        "dmm_raw_reviews", "content_id, review_id", legacy_ids, order_by=("content_id", "review_id")
+    ):
+        review_ids.setdefault(row["content_id"], set()).add(row["review_id"])
+    _prefetched_summaries.update(summaries)
+    _prefetched_fingerprints.update(fingerprints)
+    _prefetched_review_ids.update(review_ids)
+    logging.info(
+        "事前取得: あらすじ保存済 %s 件 / レビュー保存済 %s 件（対象 %s 件）",
+        sum(1 for v in summaries.values() if v),
+        sum(1 for v in review_ids.values() if v),
+        len(ids),
+    )
+
+
+def drop_precheck_skips(items: list[dict]) -> list[dict]:
+    """事前取得した状態で should_skip_selenium_precheck に当たる作品を除く。"""
+    remaining = [
+        row
+        for row in items
+        if not should_skip_selenium_precheck(
+            row.get("review_count"),
+            has_saved_summary=bool(usable_saved_summary(get_saved_summary(row["content_id"]))),
+        )
+    ]
+    logging.info(
+        "事前スキップ %s 件 → ブラウザが必要な作品 %s / %s 件",
+        len(items) - len(remaining),
+        len(remaining),
+        len(items),
+    )
+    return remaining
+
+
 # 既存のあらすじ取得
 def get_saved_summary(content_id):
+    if content_id in _prefetched_summaries:
+        return _prefetched_summaries[content_id]
     result = supabase.table("dmm_ai_review_summaries")\
         .select("summary_text")\
         .eq("content_id", content_id)\
@@ -95,30 +193,62 @@ def get_saved_summary(content_id):
 
     return None
 
+def get_saved_fingerprint(content_id):
+    if content_id in _prefetched_fingerprints:
+        return _prefetched_fingerprints[content_id]
+    result = supabase.table("dmm_ai_review_summaries")\
+        .select("review_fingerprint")\
+        .eq("content_id", content_id)\
+        .limit(1)\
+        .execute()
+
+    if result.data:
+        return result.data[0].get("review_fingerprint")
+
+    return None
+
+
 # レビュー変更チェック
 def has_no_review_changed(content_id: str, new_reviews: list):
+    """前回 AI サマリーを作ったときとレビュー集合が同じなら True。
 
-    response = supabase.table("dmm_raw_reviews") \
-        .select("review_id") \
-        .eq("content_id", content_id) \
-        .execute()
+    dmm_ai_review_summaries.review_fingerprint と比較する。指紋が未保存の旧データは
+    dmm_raw_reviews の review_id 集合と突き合わせる。
+    """
+    new_fingerprint = review_set_fingerprint(content_id, new_reviews)
+    saved_fingerprint = get_saved_fingerprint(content_id)
+    if saved_fingerprint:
+        unchanged = saved_fingerprint == new_fingerprint
+        logging.info(f"レビュー指紋チェック 変更なし: {unchanged}")
+        return unchanged
+
+    if content_id in _prefetched_review_ids:
+        existing_ids = _prefetched_review_ids[content_id]
+    else:
+        response = supabase.table("dmm_raw_reviews") \
+            .select("review_id") \
+            .eq("content_id", content_id) \
+            .execute()
 
-    existing_ids = {r["review_id"] for r in response.data}
+        existing_ids = {r["review_id"] for r in response.data}
 
-    new_ids = {
-        hashlib.md5(r["text"].encode()).hexdigest()
-        for r in new_reviews
-    }
+    new_ids = {generate_review_id(content_id, r["text"]) for r in new_reviews}
 
     logging.info(f"既存レビューID数: {len(existing_ids)}, 新規レビューID数: {len(new_ids)}")
-    logging.info(f"レビュー変更チェック trueは変更なし、falseは変更あり: {len(existing_ids) == len(new_ids)}")
-    return len(new_ids) == len(existing_ids)
+    logging.info(f"レビュー変更チェック trueは変更なし、falseは変更あり: {existing_ids == new_ids}")
+    return new_ids == existing_ids
 
 
 def generate_review_id(content_id: str, text: str) -> str:
     base = content_id + text.strip()
     return hashlib.md5(base.encode("utf-8")).hexdigest()
 
+
+def review_set_fingerprint(content_id: str, reviews) -> str:
+    """レビュー集合の指紋（generate_review_id を重複除去・ソートして連結した sha256）。"""
+    review_ids = sorted({generate_review_id(content_id, r["text"]) for r in reviews})
+    return hashlib.sha256("\n".join(review_ids).encode("utf-8")).hexdigest()
+
 # ==============================
 # ③ 生レビュー保存
 # ==============================
@@ -165,7 +295,12 @@ def save_raw_reviews(content_id: str, reviews):
 # ⑦ AI結果保存
 # ==============================
 
-def save_ai_summary(summary: dict):
+def save_ai_summary(summary: dict, *, buffer: UpsertBuffer | None = None):
+    """buffer を渡すと content_id をキーにした一括 UPSERT 用に積む。"""
+    if buffer is not None:
+        buffer.add(summary)
+        return
+
     response = supabase.table("dmm_ai_review_summaries") \
         .upsert(summary, on_conflict="content_id") \
         .execute()
@@ -180,7 +315,7 @@ def save_ai_summary(summary: dict):
 # 🎯 メイン処理
 # =========================
 
-def process_content(
+def prepare_content(
     content_id: str,
     product_url: str,
     service_code: str,
@@ -189,7 +324,12 @@ def process_content(
     fallback_summary=None,
     title=None,
     genres=None,
-):
+) -> dict | None:
+    """①〜④: Chrome でレビュー・あらすじを集めて raw レビューを保存する。
+
+    AI 分析へ進む作品だけ入力（reviews / html_summary など）を dict で返し、
+    スキップする作品は None を返す。driver は AI 分析の前にプールへ返す。
+    """
     # ①' DB事前判定（Chrome 起動前）
     saved_summary = usable_saved_summary(get_saved_summary(content_id))
     if should_skip_selenium_precheck(
@@ -201,9 +341,9 @@ def process_content(
             content_id,
             db_review_count,
         )
-        return
+        return None
 
-    driver = create_driver()
+    driver = driver_pool.lease()
 
     try:
         logging.info("🔍 処理開始: %s (URL: %s)", content_id, product_url)
@@ -218,7 +358,7 @@ def process_content(
         # ② 変更チェック（誤あらすじは未保存扱いなので再生成する）
         if len(reviews) > 0 and saved_summary and has_no_review_changed(content_id, reviews):
             logging.info("レビュー変更なし → スキップ")
-            return
+            return None
 
         # ③ raw保存
         logging.info("🤖 rawレビュー保存中...")
@@ -231,7 +371,7 @@ def process_content(
             html_summary = saved_summary
             if len(reviews) == 0:
                 logging.info("レビュー０件、かつあらすじ保存済なのでスキップ")
-                return
+                return None
         else:
             logging.info("初回あらすじ取得")
             if service_code == "doujin" and floor_code == "digital_doujin":
@@ -254,64 +394,249 @@ def process_content(
             logging.info(f"初回あらすじ取得: {html_summary}")
             if not html_summary:
                 logging.warning("⚠ あらすじなし → AI生成をスキップ: %s", content_id)
-                return
+                return None
 
-        # ⑤ AI分析
-        logging.info("🤖 AIレビュー生成中...")
+        return {
+            "content_id": content_id,
+            "service_code": service_code,
+            "floor_code": floor_code,
+            "reviews": reviews,
+            "html_summary": html_summary,
+        }
+    finally:
+        driver_pool.release(driver)
 
-        avg_rating = round(
-            sum(r["rating"] for r in reviews if r["rating"]) / (len(reviews) if reviews else 1),
-            2
-        )
 
-        insight = generate_review_insights(
-            reviews=reviews,
-            html_summary=html_summary,
-            review_avg=avg_rating,
-            review_count=len(reviews),
-            genre_type=f"{service_code}_{floor_code}"
-        )
+def finish_content(job: dict) -> None:
+    """⑤〜⑧: prepare_content の結果から AI 分析し、サマリーと週次スコアを保存する。"""
+    reviews = job["reviews"]
 
-        if not insight:
-            logging.info("⚠ AI分析失敗 → あらすじとレビュー数のみ保存")
-            return
+    # ⑤ AI分析
+    logging.info("🤖 AIレビュー生成中...")
 
-        logging.info(f"AI分析: {insight}")
+    insight = generate_review_insights(
+        reviews=reviews,
+        html_summary=job["html_summary"],
+        review_avg=_average_rating(reviews),
+        review_count=len(reviews),
+        genre_type=_genre_type(job),
+    )
+    store_insight(job, insight)
 
-        # ⑥ 保存整形
-        logging.info("💾 AIレビュー保存中...")
-        summary = {
-            "content_id": content_id,
-            "review_digest": insight.get("review_digest"),
-            "content_score": int(insight.get("content_score", 0)),
-            "emotion_score": int(insight.get("emotion_score", 0)),
-            "attraction_score": int(insight.get("attraction_score", 0)),
-            "genre_axis1_score": int(insight.get("genre_axis1_score", 0)),
-            "genre_axis2_score": int(insight.get("genre_axis2_score", 0)),
-
-            "reader_types": insight.get("reader_types"),
-            "warning_points": insight.get("warning_points"),
-
-            "review_count": len(reviews),
-            "avg_rating": avg_rating,
-            "summary_text": html_summary,
-            "ai_model": OPENAI_MODEL,
-            "prompt_version": "v3_structured",
-            "updated_at": datetime.utcnow().isoformat()
-        }
-        # ⑦ AI保存
-        save_ai_summary(summary)
 
-        # ⑧ 週次保存
-        logging.info("💾 週次スコア保存中...")
-        save_weekly_score(summary)
+def _average_rating(reviews: list) -> float:
+    return round(
+        sum(r["rating"] for r in reviews if r["rating"]) / (len(reviews) if reviews else 1),
+        2
+    )
+
+
+def _genre_type(job: dict) -> str:
+    return f"{job['service_code']}_{job['floor_code']}"
+
+
+def store_insight(
+    job: dict,
+    insight: dict | None,
+    *,
+    summary_writes: UpsertBuffer | None = None,
+    score_writes: UpsertBuffer | None = None,
+) -> None:
+    """⑥〜⑧: AI 分析結果を整形してサマリーと週次スコアを保存する。"""
+    content_id = job["content_id"]
+    reviews = job["reviews"]
+    html_summary = job["html_summary"]
+    avg_rating = _average_rating(reviews)
+
+    if not insight:
+        logging.info("⚠ AI分析失敗 → あらすじとレビュー数のみ保存")
+        return
+
+    logging.info(f"AI分析: {insight}")
+
+    # ⑥ 保存整形
+    logging.info("💾 AIレビュー保存中...")
+    summary = {
+        "content_id": content_id,
+        "review_digest": insight.get("review_digest"),
+        "content_score": int(insight.get("content_score", 0)),
+        "emotion_score": int(insight.get("emotion_score", 0)),
+        "attraction_score": int(insight.get("attraction_score", 0)),
+        "genre_axis1_score": int(insight.get("genre_axis1_score", 0)),
+        "genre_axis2_score": int(insight.get("genre_axis2_score", 0)),
+
+        "reader_types": insight.get("reader_types"),
+        "warning_points": insight.get("warning_points"),
+
+        "review_count": len(reviews),
+        "avg_rating": avg_rating,
+        "summary_text": html_summary,
+        "ai_model": OPENAI_MODEL,
+        "prompt_version": "v3_structured",
+        "review_fingerprint": review_set_fingerprint(content_id, reviews),
+        "updated_at": datetime.utcnow().isoformat()
+    }
+    # ⑦ AI保存
+    save_ai_summary(summary, buffer=summary_writes)
+
+    # ⑧ 週次保存
+    logging.info("💾 週次スコア保存中...")
+    save_weekly_score(summary, buffer=score_writes)
 
-        logging.info("🎉 完了: %s", content_id)
+    logging.info("🎉 完了: %s", content_id)
 
+
+def process_content(
+    content_id: str,
+    product_url: str,
+    service_code: str,
+    floor_code: str,
+    db_review_count=None,
+    fallback_summary=None,
+    title=None,
+    genres=None,
+):
+    """1 作品を順に処理する（失敗はログに残して次の作品へ進む）。"""
+    try:
+        job = prepare_content(
+            content_id,
+            product_url,
+            service_code,
+            floor_code,
+            db_review_count=db_review_count,
+            fallback_summary=fallback_summary,
+            title=title,
+            genres=genres,
+        )
+        if job:
+            finish_content(job)
     except Exception as e:
         logging.info("❌ エラー: %s", e)
-    finally:
-        driver.quit()
+
+
+def _row_kwargs(row: dict) -> dict:
+    return {
+        "content_id": row["content_id"],
+        "product_url": row["item_url"],
+        "service_code": row["service"],
+        "floor_code": row["floor"],
+        "db_review_count": row.get("review_count"),
+        "fallback_summary": row.get("auto_summary"),
+        "title": row.get("title"),
+        "genres": row.get("genres"),
+    }
+
+
+def process_items_parallel(items: list[dict], *, workers: int, ai_workers: int) -> None:
+    """スクレイプ（workers 並列・driver プール）と AI 分析（ai_workers 並列）をパイプラインで回す。
+
+    スクレイプが済んだ作品から AI 分析キューに積むので、Chrome は LLM 応答を待たずに次の作品へ進む。
+    1 作品の失敗は他の作品に影響させない。
+    """
+    total = len(items)
+
+    def finish_safely(job: dict) -> None:
+        try:
+            finish_content(job)
+        except Exception as e:
+            logging.info("❌ エラー: %s (%s)", e, job["content_id"])
+
+    with ThreadPoolExecutor(max_workers=ai_workers, thread_name_prefix="ai") as ai_pool:
+
+        def scrape(index: int, row: dict):
+            logging.info(f"[{index}/{total}] {row['content_id']} 処理中...")
+            try:
+                job = prepare_content(**_row_kwargs(row))
+            except Exception as e:
+                logging.info("❌ エラー: %s (%s)", e, row["content_id"])
+                return None
+            return ai_pool.submit(finish_safely, job) if job else None
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape") as scrape_pool:
+            scrape_futures = [
+                scrape_pool.submit(scrape, index, row)
+                for index, row in enumerate(items, start=1)
+            ]
+        ai_futures = [f.result() for f in scrape_futures]
+        for future in ai_futures:
+            if future is not None:
+                future.result()
+
+
+def scrape_jobs(items: list[dict], *, workers: int) -> list[dict]:
+    """prepare_content を workers 並列で回し、AI 分析へ進む作品の入力だけを入力順に返す。"""
+    total = len(items)
+
+    def scrape(index: int, row: dict):
+        logging.info(f"[{index}/{total}] {row['content_id']} 処理中...")
+        try:
+            return prepare_content(**_row_kwargs(row))
+        except Exception as e:
+            logging.info("❌ エラー: %s (%s)", e, row["content_id"])
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape") as scrape_pool:
+        jobs = list(scrape_pool.map(scrape, range(1, total + 1), items))
+    return [job for job in jobs if job]
+
+
+def process_items_batch(items: list[dict], *, workers: int = 1) -> int:
+    """スクレイプを先に全件済ませ、AI 分析は OpenAI Batch API でまとめて行う。
+
+    結果は dmm_ai_review_summaries / trn_dmm_score_history へ複数行 UPSERT で書き戻す。
+    戻り値は AI 分析を保存した件数。
+    """
+    jobs = {job["content_id"]: job for job in scrape_jobs(items, workers=workers)}
+    if not jobs:
+        logging.info("AI 分析対象なし")
+        return 0
+
+    requests = []
+    for content_id, job in jobs.items():
+        reviews = job["reviews"]
+        messages = build_review_insights_messages(
+            reviews,
+            job["html_summary"],
+            _average_rating(reviews),
+            len(reviews),
+            _genre_type(job),
+        )
+        requests.append(
+            llm_batch.batch_request(
+                content_id,
+                messages,
+                model=OPENAI_MODEL,
+                response_format={"type": "json_object"},
+                max_completion_tokens=REVIEW_INSIGHTS_MAX_TOKENS,
+            )
+        )
+    results = llm_batch.run_batch(
+        requests, client=client, name="review_insights", validate=json.loads
+    )
+
+    saved = 0
+    with UpsertBuffer(
+        supabase, "dmm_ai_review_summaries", on_conflict="content_id"
+    ) as summary_writes, UpsertBuffer(
+        supabase, "trn_dmm_score_history", on_conflict="content_id,snapshot_date"
+    ) as score_writes:
+        for content_id, content in results.items():
+            job = jobs[content_id]
+            reviews = job["reviews"]
+            insight = None
+            if content:
+                try:
+                    insight = parse_review_insights(
+                        content, _average_rating(reviews), len(reviews), _genre_type(job)
+                    )
+                except Exception as e:
+                    logging.warning(f"[AI Error] {e}")
+            store_insight(
+                job, insight, summary_writes=summary_writes, score_writes=score_writes
+            )
+            saved += bool(insight)
+    logging.info("AI 分析（バッチ）保存: %d / %d 件", saved, len(jobs))
+    return saved
 
 
 # =========================
@@ -362,7 +687,7 @@ def calculate_final_score(summary: dict):
     return round(min(final_score, 100), 2)
 
 # ⑧ 週次スコア保存
-def save_weekly_score(summary: dict):
+def save_weekly_score(summary: dict, *, buffer: UpsertBuffer | None = None):
 
     today = datetime.utcnow()
     snapshot_date = today.date().isoformat()
@@ -377,6 +702,10 @@ def save_weekly_score(summary: dict):
         "snapshot_date": snapshot_date,
     }
 
+    if buffer is not None:
+        buffer.add(row)
+        return
+
     supabase.table("trn_dmm_score_history") \
         .upsert(row, on_conflict="content_id,snapshot_date") \
         .execute()
@@ -558,10 +887,28 @@ def parse_args(argv=None):
     )
     parser.add_argument("--dry-run", action="store_true", help="対象 content_id を表示して終了")
     parser.add_argument("--limit", type=int, default=None, help="処理件数の上限")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="スクレイプの並列数（= 起動する Chrome の台数）。1 なら従来どおり 1 件ずつ処理",
+    )
+    parser.add_argument(
+        "--ai-workers",
+        type=int,
+        default=DEFAULT_AI_WORKERS,
+        help=f"--workers 2 以上のときの AI 分析の同時実行数（既定 {DEFAULT_AI_WORKERS}）",
+    )
+    parser.add_argument(
+        "--ai-batch",
+        action="store_true",
+        help="スクレイプを先に全件行い、AI 分析は OpenAI Batch API でまとめて実行する（夜間バッチ向け）",
+    )
     return parser.parse_args(argv)
 
 
 def main(argv=None):
+    global driver_pool
     args = parse_args(argv)
     logging.info("=== trn_dmm_items のAPI更新を開始 ===")
 
@@ -586,21 +933,52 @@ def main(argv=None):
         print("\n".join(preview))
         return
 
+    prefetch_precheck_state(row["content_id"] for row in all_items)
+    all_items = drop_precheck_skips(all_items)
+    if not all_items:
+        logging.info("ブラウザが必要な作品はありません。処理を終了します。")
+        return
+
     total = len(all_items)
     logging.info(f"全 {total} 件の作品を更新対象として処理します。")
 
+    # 前回の main() で閉じたプールを使わないよう、実行ごとに作る
+    driver_pool = create_driver_pool(args.workers) if args.workers > 1 else create_driver_pool()
+
+    if args.ai_batch:
+        logging.info("バッチモード: スクレイプ %s 並列 / AI 分析は Batch API", max(args.workers, 1))
+        try:
+            saved = process_items_batch(all_items, workers=max(args.workers, 1))
+        finally:
+            driver_pool.close()
+        logging.info(f"🎉 全ての作品データ更新が完了しました。{total} 件中 {saved} 件を保存しました。")
+        return
+
+    if args.workers > 1:
+        ai_workers = max(args.ai_workers, 1)
+        logging.info("並列モード: スクレイプ %s 並列 / AI 分析 %s 並列", args.workers, ai_workers)
+        try:
+            process_items_parallel(all_items, workers=args.workers, ai_workers=ai_workers)
+        finally:
+            driver_pool.close()
+        logging.info(f"🎉 全ての作品データ更新が完了しました。{total} 件処理しました。")
+        return
+
     update_count = 0
 
-    for i in range(0, total, BATCH_SIZE):
-        batch_items = all_items[i : i + BATCH_SIZE]
-        batch_index = (i // BATCH_SIZE) + 1
+    try:
+        for i in range(0, total, BATCH_SIZE):
+            batch_items = all_items[i : i + BATCH_SIZE]
+            batch_index = (i // BATCH_SIZE) + 1
 
-        process_batch(batch_items, batch_index, total)
-        update_count += len(batch_items)
+            process_batch(batch_items, batch_index, total)
+            update_count += len(batch_items)
 
-        if i + BATCH_SIZE < total:
-            logging.info(f"⏸ {SLEEP_BETWEEN_BATCH}秒待機中（次のバッチまで）...")
-            time.sleep(SLEEP_BETWEEN_BATCH)
+            if i + BATCH_SIZE < total:
+                logging.info(f"⏸ {SLEEP_BETWEEN_BATCH}秒待機中（次のバッチまで）...")
+                time.sleep(SLEEP_BETWEEN_BATCH)
+    finally:
+        driver_pool.close()
 
     logging.info(f"🎉 全ての作品データ更新が完了しました。{update_count} 件処理しました。")
 
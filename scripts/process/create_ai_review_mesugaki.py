@@ -33,9 +33,7 @@ from db.supabase_client_mesugaki import supabase
 from openai_api.config import OPENAI_MODEL
 from utils.content_generator_review import (
     AGE_GATE_SYNOPSIS_MARKERS,
-    create_driver,
-    ensure_driver_alive,
-    quit_driver_safe,
+    create_driver_pool,
     scrape_doujin_synopsis,
     scrape_product_summary,
     scrape_review_comments,
@@ -67,6 +65,10 @@ client = OpenAI(api_key=OPENAI_API_KEY)
 BATCH_SIZE = 100
 SLEEP_BETWEEN_BATCH = 5
 
+# バッチをまたいで Chrome を使い回す。
+# main() は実行ごとに作り直して最後に閉じる（ここは main() を通さない呼び出し用）
+driver_pool = create_driver_pool()
+
 # =========================
 # ユーティリティ関数
 # =========================
@@ -86,7 +88,32 @@ def get_saved_summary(content_id):
     return None
 
 
+def get_saved_fingerprint(content_id):
+    result = execute_with_retry(
+        lambda: supabase.table("dmm_ai_review_summaries")
+        .select("review_fingerprint")
+        .eq("content_id", content_id)
+        .limit(1)
+    )
+
+    if result.data:
+        return result.data[0].get("review_fingerprint")
+
+    return None
+
+
 def has_no_review_changed(content_id: str, new_reviews: list):
+    """前回 AI サマリーを作ったときとレビュー集合が同じなら True。
+
+    review_fingerprint が保存済みならその比較だけで判定し、未保存の旧データは
+    dmm_raw_reviews の review_id 集合と突き合わせる。
+    """
+    saved_fingerprint = get_saved_fingerprint(content_id)
+    if saved_fingerprint:
+        unchanged = saved_fingerprint == review_set_fingerprint(content_id, new_reviews)
+        logging.info("レビュー指紋チェック 変更なし: %s", unchanged)
+        return unchanged
+
     response = execute_with_retry(
         lambda: supabase.table("dmm_raw_reviews")
         .select("review_id")
@@ -114,6 +141,12 @@ def generate_review_id(content_id: str, text: str) -> str:
     return hashlib.md5(base.encode("utf-8")).hexdigest()
 
 
+def review_set_fingerprint(content_id: str, reviews) -> str:
+    """レビュー集合の指紋（generate_review_id を重複除去・ソートして連結した sha256）。"""
+    review_ids = sorted({generate_review_id(content_id, r["text"]) for r in reviews})
+    return hashlib.sha256("\n".join(review_ids).encode("utf-8")).hexdigest()
+
+
 def save_raw_reviews(content_id: str, reviews):
     clean_reviews = []
     seen = set()
@@ -322,6 +355,7 @@ def process_content(
             "summary_text": html_summary,
             "ai_model": OPENAI_MODEL,
             "prompt_version": "v3_structured",
+            "review_fingerprint": review_set_fingerprint(content_id, reviews),
             "updated_at": datetime.utcnow().isoformat(),
         }
         save_ai_summary(summary)
@@ -369,7 +403,6 @@ def process_content_raw_only(
 
 
 def _process_item_with_retry(
-    driver,
     raw_only: bool,
     content_id: str,
     product_url: str,
@@ -379,9 +412,10 @@ def _process_item_with_retry(
     title=None,
     genres=None,
 ):
-    """セッション切れ時は driver を再作成して1回リトライする。"""
+    """プールから driver を借りて処理する。セッション切れなら driver を作り直して1回リトライする。"""
     for attempt in range(2):
-        driver = ensure_driver_alive(driver)
+        driver = driver_pool.lease()
+        broken = False
         try:
             if raw_only:
                 process_content_raw_only(
@@ -398,18 +432,18 @@ def _process_item_with_retry(
                     title=title,
                     genres=genres,
                 )
-            return driver
+            return
         except InvalidSessionIdException:
+            broken = True
             if attempt == 0:
                 logging.warning(
                     "セッション切れ (%s) → driver 再作成してリトライ",
                     content_id,
                 )
-                quit_driver_safe(driver)
-                driver = create_driver()
                 continue
             raise
-    return driver
+        finally:
+            driver_pool.release(driver, broken=broken)
 
 
 def process_batch(batch_items, batch_index, total, raw_only: bool = False):
@@ -418,40 +452,35 @@ def process_batch(batch_items, batch_index, total, raw_only: bool = False):
         batch_index,
         len(batch_items),
     )
-    driver = create_driver()
-    try:
-        for i, row in enumerate(batch_items, start=1):
-            content_id = row["content_id"]
-            service_code = row["service"]
-            floor_code = row["floor"]
-            product_url = row["item_url"]
-            logging.info(
-                "%s週目 [%s/%s] %s 処理中...",
-                batch_index,
-                i + (batch_index - 1) * BATCH_SIZE,
-                total,
-                content_id,
-            )
-            t0 = time.perf_counter()
-            driver = _process_item_with_retry(
-                driver,
-                raw_only,
-                content_id,
-                product_url,
-                service_code,
-                floor_code,
-                fallback_summary=row.get("auto_summary"),
-                title=row.get("title"),
-                genres=row.get("genres"),
-            )
-            logging.info(
-                "⏱ %s 処理時間: %.1f秒",
-                content_id,
-                time.perf_counter() - t0,
-            )
-            time.sleep(0.3)
-    finally:
-        quit_driver_safe(driver)
+    for i, row in enumerate(batch_items, start=1):
+        content_id = row["content_id"]
+        service_code = row["service"]
+        floor_code = row["floor"]
+        product_url = row["item_url"]
+        logging.info(
+            "%s週目 [%s/%s] %s 処理中...",
+            batch_index,
+            i + (batch_index - 1) * BATCH_SIZE,
+            total,
+            content_id,
+        )
+        t0 = time.perf_counter()
+        _process_item_with_retry(
+            raw_only,
+            content_id,
+            product_url,
+            service_code,
+            floor_code,
+            fallback_summary=row.get("auto_summary"),
+            title=row.get("title"),
+            genres=row.get("genres"),
+        )
+        logging.info(
+            "⏱ %s 処理時間: %.1f秒",
+            content_id,
+            time.perf_counter() - t0,
+        )
+        time.sleep(0.3)
     logging.info("=== ✅ バッチ %s 完了 ===", batch_index)
 
 
@@ -534,6 +563,7 @@ def fetch_age_gate_items(limit: int | None = None):
 
 
 def main():
+    global driver_pool
     parser = argparse.ArgumentParser(
         description="メスガキ向け AI レビュー / 生レビュー保存バッチ",
     )
@@ -593,20 +623,25 @@ def main():
     mode_label = "生レビュー保存" if raw_only else "AIレビュー更新"
     logging.info("全 %s 件の作品を%s対象として処理します。", total, mode_label)
 
+    # 前回の main() で閉じたプールを使わないよう、実行ごとに作る
+    driver_pool = create_driver_pool()
     update_count = 0
 
-    for i in range(0, total, BATCH_SIZE):
-        batch_items = all_items[i : i + BATCH_SIZE]
-        batch_index = (i // BATCH_SIZE) + 1
+    try:
+        for i in range(0, total, BATCH_SIZE):
+            batch_items = all_items[i : i + BATCH_SIZE]
+            batch_index = (i // BATCH_SIZE) + 1
 
-        process_batch(batch_items, batch_index, total, raw_only=raw_only)
-        update_count += len(batch_items)
+            process_batch(batch_items, batch_index, total, raw_only=raw_only)
+            update_count += len(batch_items)
 
-        if i + BATCH_SIZE < total:
-            logging.info(
-                "⏸ %s秒待機中（次のバッチまで）...", SLEEP_BETWEEN_BATCH
-            )
-            time.sleep(SLEEP_BETWEEN_BATCH)
+            if i + BATCH_SIZE < total:
+                logging.info(
+                    "⏸ %s秒待機中（次のバッチまで）...", SLEEP_BETWEEN_BATCH
+                )
+                time.sleep(SLEEP_BETWEEN_BATCH)
+    finally:
+        driver_pool.close()
 
     logging.info(
         "🎉 [メスガキ] %sが完了しました。%s 件処理しました。",
@@ -8,6 +8,7 @@ from psycopg2.extras import RealDictCursor
 from dotenv import load_dotenv
 import logging
 from db.postgres_connect import connect_from_env
+from openai_api import llm_gateway
 from openai_api.config import OPENAI_MODEL
 from utils.logger import setup_logger
 from openai import OpenAI  # ← ★追加
@@ -88,15 +89,16 @@ def generate_ai_summary(service, floor, year, week, rows):
 ・SEOを意識
 """
 
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
+        content = llm_gateway.complete(
+            [
                 {"role": "system", "content": "あなたはプロのランキング分析ライターです。"},
                 {"role": "user", "content": prompt}
             ],
+            model=OPENAI_MODEL,
+            client=client,
         )
 
-        return response.choices[0].message.content.strip()
+        return content.strip()
 
     except Exception:
         logging.exception("AI summary generation failed")
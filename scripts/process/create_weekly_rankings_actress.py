@@ -12,6 +12,7 @@ from openai import OpenAI
 from psycopg2.extras import RealDictCursor
 
 from db.postgres_connect import connect_from_env
+from openai_api import llm_gateway
 from openai_api.config import OPENAI_MODEL
 from utils.logger import setup_logger
 
@@ -93,14 +94,15 @@ def generate_ai_summary(year: int, week: int, rows: list[dict]) -> str | None:
 ・誹謗中傷や過激な表現は避ける
 """
 
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
+        content = llm_gateway.complete(
+            [
                 {"role": "system", "content": "あなたはプロのランキング分析ライターです。"},
                 {"role": "user", "content": prompt},
             ],
+            model=OPENAI_MODEL,
+            client=client,
         )
-        return response.choices[0].message.content.strip()
+        return content.strip()
     except Exception:
         logging.exception("AI summary generation failed")
         return None
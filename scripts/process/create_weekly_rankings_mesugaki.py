@@ -20,6 +20,7 @@ import logging
 from openai import OpenAI
 
 from db.postgres_connect import connect_from_env
+from openai_api import llm_gateway
 from openai_api.config import OPENAI_MODEL
 from utils.logger import setup_logger
 
@@ -119,15 +120,16 @@ def generate_ai_summary(service, floor, year, week, rows):
 ・過激な表現は避け、一般向けに読みやすい表現にする
 """
 
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
+        content = llm_gateway.complete(
+            [
                 {"role": "system", "content": "あなたはプロのランキング分析ライターです。"},
                 {"role": "user", "content": prompt},
             ],
+            model=OPENAI_MODEL,
+            client=client,
         )
 
-        return response.choices[0].message.content.strip()
+        return content.strip()
 
     except Exception:
         logging.exception("AI summary generation failed")
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""ai_content_status=pending の作品に AI 生成文（auto_comment / auto_summary / auto_point）を埋める。
+
+collect/* は AI 生成を待たずに pending で INSERT する（db/trn_dmm_items_repository）。
+本スクリプトが raw_json から generate_content を並列に実行して UPDATE する。
+
+- 成功: auto_* を更新して ai_content_status=done
+- 失敗: ai_content_attempts を +1。MAX_ATTEMPTS 回で failed（以降は対象外）
+- 候補を content_id 順に page_size 件ずつ取り出し、無くなるまで（または --limit 件まで）処理する
+
+例:
+  .venv\\Scripts\\python.exe scripts/process/generate_item_content.py --dry-run
+  .venv\\Scripts\\python.exe scripts/process/generate_item_content.py --workers 4
+  .venv\\Scripts\\python.exe scripts/process/generate_item_content.py --db supabase3 --limit 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from dotenv import load_dotenv
+
+from db.supabase_client import supabase, supabase2, supabase3
+from db.trn_dmm_items_repository import (
+    AI_CONTENT_DONE,
+    AI_CONTENT_FAILED,
+    AI_CONTENT_PENDING,
+    has_ai_content,
+)
+from openai_api.content_generator import generate_content
+from utils.logger import setup_logger
+from utils.supabase_retry import execute_with_retry
+
+load_dotenv()
+setup_logger("generate_item_content.log")
+
+DB_CHOICES = ("default", "supabase2", "supabase3")
+MAX_ATTEMPTS = 3
+PAGE_SIZE = 50
+# Chrome（あらすじ取得）は PAGE_DRIVER_POOL_SIZE 台、OpenAI は LLM_MAX_CONCURRENCY で別途制限される
+DEFAULT_WORKERS = int(os.getenv("ITEM_CONTENT_WORKERS", "4"))
+PENDING_SELECT = "content_id,title,raw_json,ai_content_attempts"
+
+
+def resolve_db_client(name: str) -> Any:
+    if name == "default":
+        return supabase
+    if name == "supabase2":
+        if supabase2 is None:
+            raise RuntimeError("SUPABASE_URL2 / SUPABASE_KEY2 が未設定です")
+        return supabase2
+    if name == "supabase3":
+        if supabase3 is None:
+            raise RuntimeError("SUPABASE_URL3 / SUPABASE_KEY3 が未設定です")
+        return supabase3
+    raise ValueError(f"unknown db target: {name}")
+
+
+def fetch_pending_rows(
+    client: Any,
+    *,
+    limit: int,
+    after: str | None = None,
+    content_id: str | None = None,
+) -> list[dict[str, Any]]:
+    """pending の行を content_id 順に取得する（after より後ろだけ。同じ実行で同じ行を二度処理しない）。"""
+    query = (
+        client.table("trn_dmm_items")
+        .select(PENDING_SELECT)
+        .eq("ai_content_status", AI_CONTENT_PENDING)
+    )
+    if content_id:
+        query = query.eq("content_id", content_id)
+    if after is not None:
+        query = query.gt("content_id", after)
+    query = query.order("content_id").limit(limit)
+    result = execute_with_retry(lambda: query)
+    return list(result.data or [])
+
+
+def update_pending_row(client: Any, content_id: str, fields: dict[str, Any]) -> bool:
+    """pending のままの行だけ更新する（並行実行で他プロセスが埋めた行は上書きしない）。"""
+    result = execute_with_retry(
+        lambda: client.table("trn_dmm_items")
+        .update(fields)
+        .eq("content_id", content_id)
+        .eq("ai_content_status", AI_CONTENT_PENDING)
+    )
+    return bool(result.data)
+
+
+def record_generation_failure(client: Any, content_id: str, attempts: Any) -> int:
+    """失敗回数を +1。MAX_ATTEMPTS 到達で failed にして対象外にする。"""
+    new_attempts = int(attempts or 0) + 1
+    fields: dict[str, Any] = {"ai_content_attempts": new_attempts}
+    if new_attempts >= MAX_ATTEMPTS:
+        fields["ai_content_status"] = AI_CONTENT_FAILED
+        logging.warning("[ABANDON] AI 生成失敗 %d 回到達 → 対象外: %s", new_attempts, content_id)
+    else:
+        logging.warning("[FAIL-COUNT] %s attempts=%d/%d", content_id, new_attempts, MAX_ATTEMPTS)
+    update_pending_row(client, content_id, fields)
+    return new_attempts
+
+
+def process_one_row(row: dict[str, Any], *, client: Any, dry_run: bool) -> str:
+    """1件処理。戻り値: done | failed | skipped"""
+    content_id = row.get("content_id")
+    raw = row.get("raw_json")
+    if not content_id or not isinstance(raw, dict):
+        logging.warning("[SKIP] content_id / raw_json 不足: %s", content_id)
+        return "skipped"
+
+    logging.info("[GENERATE] 開始: %s (%s)", row.get("title") or "", content_id)
+    if dry_run:
+        return "done"
+
+    ai_content = generate_content(raw) or {}
+    if not has_ai_content(ai_content):
+        record_generation_failure(client, content_id, row.get("ai_content_attempts"))
+        return "failed"
+
+    fields = {
+        "auto_comment": ai_content.get("auto_comment", ""),
+        "auto_summary": ai_content.get("auto_summary", ""),
+        "auto_point": ai_content.get("auto_point", ""),
+        "ai_content_status": AI_CONTENT_DONE,
+    }
+    if not update_pending_row(client, content_id, fields):
+        logging.info("[SKIP] 既に他の処理で更新済: %s", content_id)
+        return "skipped"
+    logging.info("[OK] %s", content_id)
+    return "done"
+
+
+def run_generation(
+    *,
+    db_name: str,
+    workers: int,
+    limit: int | None,
+    dry_run: bool,
+    content_id: str | None = None,
+    page_size: int = PAGE_SIZE,
+) -> int:
+    client = resolve_db_client(db_name)
+    counts = {"done": 0, "failed": 0, "skipped": 0}
+    has_error = False
+    processed = 0
+    after: str | None = None
+
+    def handle(row: dict[str, Any]) -> str:
+        try:
+            return process_one_row(row, client=client, dry_run=dry_run)
+        except Exception as exc:
+            cid = row.get("content_id")
+            logging.exception("AI 生成処理に失敗: %s (%s)", cid, exc)
+            if cid and not dry_run:
+                try:
+                    record_generation_failure(client, cid, row.get("ai_content_attempts"))
+                except Exception:
+                    logging.exception("attempts 更新にも失敗: %s", cid)
+            return "failed"
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="content") as pool:
+        while limit is None or processed < limit:
+            size = page_size if limit is None else min(page_size, limit - processed)
+            rows = fetch_pending_rows(client, limit=size, after=after, content_id=content_id)
+            if not rows:
+                break
+            after = rows[-1]["content_id"]
+            logging.info("候補 %d 件 (db=%s 処理済 %d 件)", len(rows), db_name, processed)
+            for status in pool.map(handle, rows):
+                counts[status] += 1
+                has_error = has_error or status == "failed"
+            processed += len(rows)
+            if len(rows) < size:
+                break
+
+    logging.info(
+        "完了 done=%d failed=%d skipped=%d", counts["done"], counts["failed"], counts["skipped"]
+    )
+    return 1 if has_error else 0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="未生成（pending）作品の AI 生成文を埋める")
+    parser.add_argument(
+        "--db",
+        choices=DB_CHOICES,
+        default="default",
+        help="対象 DB（default / supabase2 / supabase3）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"同時に生成する件数（既定 {DEFAULT_WORKERS}）",
+    )
+    parser.add_argument("--limit", type=int, default=None, help="処理上限件数（既定は候補がなくなるまで）")
+    parser.add_argument("--dry-run", action="store_true", help="生成・更新しない")
+    parser.add_argument("--content-id", default=None, help="特定 content_id のみ")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.limit is not None and args.limit < 1:
+        logging.error("--limit は 1 以上である必要があります")
+        sys.exit(2)
+    code = run_generation(
+        db_name=args.db,
+        workers=args.workers,
+        limit=args.limit,
+        dry_run=args.dry_run,
+        content_id=args.content_id,
+    )
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
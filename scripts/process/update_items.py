@@ -5,13 +5,16 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 import os
 import sys
 import re
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timezone
-import requests
 from openai import OpenAI  # ← ★追加
 
+from db.actress_cache import ActressCache
+from dmm.dmm_http import dmm_api_get
 from db.supabase_client import supabase
+from db.upsert_buffer import UpsertBuffer
+from openai_api import llm_batch, llm_gateway
 from openai_api.config import OPENAI_MODEL
 from pykakasi import kakasi
 from utils.update_items_selection import (
@@ -19,7 +22,7 @@ from utils.update_items_selection import (
     merge_api_state,
     next_api_state_on_miss,
     next_api_state_on_success,
-    parse_update_mode_args,
+    build_update_mode_parser,
 )
 
 # ----------------------------------------------------
@@ -35,19 +38,29 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # ★追加
 client = OpenAI(api_key=OPENAI_API_KEY)       # ★追加
 
 BATCH_SIZE = 100
-SLEEP_BETWEEN_BATCH = 5
+WRITE_FLUSH_ROWS = 50
+WRITE_FLUSH_SECONDS = 30.0
 ITEM_SELECT = (
-    "content_id, auto_summary, auto_point, safe_generated_at, "
+    "content_id, title, auto_summary, auto_point, safe_generated_at, "
     "service, floor, release_date, campaign"
 )
 API_STATE_SELECT = "content_id, miss_count, last_ok_at, skip_until"
 API_STATE_TABLE = "trn_dmm_item_api_state"
+# mst_actress の鮮度キャッシュ。main() で開いて prewarm する（未設定なら毎回 API を叩く）
+ACTRESS_CACHE_NAMESPACE = "main"
+actress_cache: ActressCache | None = None
+# --ai-batch 時は作品ごとの Safe AI を行わず、最後に Batch API でまとめて生成する
+safe_ai_batch = False
 
 
 def parse_args(argv=None):
-    return parse_update_mode_args(
-        argv, description="trn_dmm_items の DMM API 更新"
+    parser = build_update_mode_parser("trn_dmm_items の DMM API 更新")
+    parser.add_argument(
+        "--ai-batch",
+        action="store_true",
+        help="Safe化 AI を OpenAI Batch API でまとめて実行する（完了まで待つ。夜間バッチ向け）",
     )
+    return parser.parse_args(argv)
 
 
 def fetch_paginated_rows(table: str, columns: str) -> list[dict]:
@@ -77,20 +90,26 @@ def record_api_result(
     ok: bool,
     current_state: dict | None = None,
     now: datetime | None = None,
+    buffer: UpsertBuffer | None = None,
 ):
+    """buffer を渡すと即時 UPSERT せず、まとめ書き用のバッファに積む。"""
     clock = now or datetime.now(timezone.utc)
     payload = (
         next_api_state_on_success(now=clock)
         if ok
         else next_api_state_on_miss(current_state, now=clock)
     )
+    row = {
+        "content_id": content_id,
+        **payload,
+        "updated_at": clock.isoformat(),
+    }
+    if buffer is not None:
+        buffer.add(row)
+        return
     try:
         supabase.table(API_STATE_TABLE).upsert(
-            {
-                "content_id": content_id,
-                **payload,
-                "updated_at": clock.isoformat(),
-            },
+            row,
             on_conflict="content_id",
         ).execute()
     except Exception as e:
@@ -153,20 +172,14 @@ def safe_text_by_word_mapping(auto_summary: str, auto_point: str) -> tuple[str,
     return safe_auto_summary, safe_auto_point
 
 
-def generate_safe_summary_point(
+def build_safe_summary_point_messages(
     title: str, auto_summary: str, auto_point
-) -> tuple[str, str, bool]:
-    """
-    ワード置換済み文章で要約・ポイント生成。
-    戻り値: (summary, point, ai_ok)
-    - 入力が空: ("", "", False)
-    - OpenAI 成功: (生成文, 生成文, True)
-    - OpenAI 失敗: ("", "", False)
-    """
+) -> list[dict] | None:
+    """Safe化プロンプト（ワード置換済み）。置換後の本文が空なら None。"""
     safe_auto_summary, safe_auto_point = safe_text_by_word_mapping(auto_summary, auto_point)
 
     if not safe_auto_summary.strip() and not safe_auto_point.strip():
-        return "", "", False
+        return None
 
     prompt = f"""
 次の成人向け作品紹介文を、性的表現を避けつつ内容を維持したSafeSearch対応テキストに変換してください。
@@ -186,25 +199,86 @@ def generate_safe_summary_point(
 作品ポイント:
 {safe_auto_point}
 """
+    return [{"role": "user", "content": prompt}]
+
+
+def split_safe_text(text: str) -> tuple[str, str]:
+    """AI 出力を【あらすじ・概要】/【おすすめポイント】で (summary, point) に分ける。"""
+    text = text.strip()
+    match = re.split(r"【おすすめポイント】", text)
+    out_summary = match[0].replace("【あらすじ・概要】", "").strip() if len(match) > 0 else text
+    out_point = match[1].strip() if len(match) > 1 else ""
+    return out_summary, out_point
+
+
+def generate_safe_summary_point(
+    title: str, auto_summary: str, auto_point
+) -> tuple[str, str, bool]:
+    """
+    ワード置換済み文章で要約・ポイント生成。
+    戻り値: (summary, point, ai_ok)
+    - 入力が空: ("", "", False)
+    - OpenAI 成功: (生成文, 生成文, True)
+    - OpenAI 失敗: ("", "", False)
+    """
+    messages = build_safe_summary_point_messages(title, auto_summary, auto_point)
+    if messages is None:
+        return "", "", False
 
     try:
-        res = client.chat.completions.create(
+        text = llm_gateway.complete(
+            messages,
             model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
+            client=client,
             # temperature=0.7,
         )
-        text = res.choices[0].message.content.strip()
-
-        match = re.split(r"【おすすめポイント】", text)
-        out_summary = match[0].replace("【あらすじ・概要】", "").strip() if len(match) > 0 else text
-        out_point = match[1].strip() if len(match) > 1 else ""
-
+        out_summary, out_point = split_safe_text(text)
         return out_summary, out_point, True
 
     except Exception as e:
         logging.error(f"❌ Safe化AI生成失敗: {e}")
         return "", "", False
 
+
+def run_safe_rewrite_batch(rows: list[dict], *, writes: UpsertBuffer) -> int:
+    """safe_generated_at 未設定の作品を Batch API でまとめて Safe 化し、writes に積む。
+
+    戻り値は書き込みに積んだ件数。失敗した作品は据え置き（次回の実行で再度対象になる）。
+    """
+    batch_requests = []
+    for row in rows:
+        if row.get("safe_generated_at"):
+            continue
+        messages = build_safe_summary_point_messages(
+            row.get("title") or "", row.get("auto_summary"), row.get("auto_point")
+        )
+        if messages is not None:
+            batch_requests.append(
+                llm_batch.batch_request(row["content_id"], messages, model=OPENAI_MODEL)
+            )
+    if not batch_requests:
+        logging.info("Safe化バッチ: 対象なし")
+        return 0
+
+    results = llm_batch.run_batch(batch_requests, client=client, name="safe_rewrite")
+    queued = 0
+    for content_id, text in results.items():
+        if not text:
+            logging.warning("Safe AI 未完了のため auto_summary/auto_point は据え置き: %s", content_id)
+            continue
+        out_summary, out_point = split_safe_text(text)
+        writes.add(
+            {
+                "content_id": content_id,
+                "auto_summary": out_summary,
+                "auto_point": out_point,
+                "safe_generated_at": datetime.utcnow().isoformat(),
+            }
+        )
+        queued += 1
+    logging.info("Safe化バッチ: %d / %d 件を書き込み", queued, len(batch_requests))
+    return queued
+
 # ----------------------------------------------------
 # 🧠 Safe化AI生成関数
 # ----------------------------------------------------
@@ -230,12 +304,14 @@ def generate_safe_text(title: str, summary: str = "") -> tuple[str, str]:
 概要文:
 {summary}
 """
-        res = client.chat.completions.create(
+        text = llm_gateway.complete(
+            [{"role": "user", "content": prompt}],
             model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
+            client=client,
             temperature=0.7,
-        )
-        text = res.choices[0].message.content.strip()
+            # サンプリングで言い回しを変える呼び出しなので、同じ応答を使い回さない
+            use_cache=False,
+        ).strip()
         # 分割
         match = re.split(r"【おすすめポイント】", text)
         auto_summary = match[0].replace("【あらすじ・概要】", "").strip() if len(match) > 0 else text
@@ -259,7 +335,7 @@ def fetch_actress_detail(actress_id: str):
     }
 
     try:
-        res = requests.get(url, params=params, timeout=10)
+        res = dmm_api_get(url, params)
         res.raise_for_status()
         data = res.json()
         actresses = data.get("result", {}).get("actress", [])
@@ -286,12 +362,22 @@ def to_romanized(text: str) -> str | None:
 # ----------------------------------------------------
 # 女優・監督・ジャンルUPSERT
 # ----------------------------------------------------
-def upsert_actresses(actresses: list[dict]):
+def upsert_actresses(actresses: list[dict], *, cache: ActressCache | None = None):
+    """出演女優を mst_actress に反映する。
+
+    cache が TTL 内と判定した女優は ActressSearch API も UPSERT も行わない。
+    残りは 1 回の複数行 UPSERT でまとめて書き込み、成功したらキャッシュを更新する。
+    """
     if not actresses:
         return
+    rows: dict[str, dict] = {}
+    seen: set[str] = set()
     for a in actresses:
         actress_id = a.get("id")
-        if not actress_id:
+        if not actress_id or str(actress_id) in seen:
+            continue
+        seen.add(str(actress_id))
+        if cache is not None and cache.is_fresh(actress_id):
             continue
         detail = fetch_actress_detail(actress_id) or {}
         name = detail.get("name") or a.get("name")
@@ -300,21 +386,27 @@ def upsert_actresses(actresses: list[dict]):
             continue
         ruby = detail.get("ruby") or a.get("ruby")
         image = detail.get("imageURL") if isinstance(detail.get("imageURL"), dict) else {}
-        try:
-            supabase.table("mst_actress").upsert(
-                {
-                    "actress_id": detail.get("id") or actress_id,
-                    "name": name,
-                    "name_kana": ruby,
-                    "name_en": to_romanized(ruby),
-                    "image_url": image.get("large"),
-                    "updated_at": datetime.utcnow().isoformat(),
-                },
-                on_conflict="actress_id",
-            ).execute()
-        except Exception as e:
-            logging.error(f"❌ 女優UPSERT失敗: {a} ({e})")
-        time.sleep(0.5)
+        row_id = detail.get("id") or actress_id
+        rows[str(row_id)] = {
+            "actress_id": row_id,
+            "name": name,
+            "name_kana": ruby,
+            "name_en": to_romanized(ruby),
+            "image_url": image.get("large"),
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+    if not rows:
+        return
+    try:
+        supabase.table("mst_actress").upsert(
+            list(rows.values()),
+            on_conflict="actress_id",
+        ).execute()
+    except Exception as e:
+        logging.error(f"❌ 女優UPSERT失敗: {list(rows)} ({e})")
+        return
+    if cache is not None:
+        cache.mark_refreshed(rows)
 
 def upsert_genres(genres: list[dict], service_code: str, floor_code: str):
     if not genres:
@@ -392,7 +484,7 @@ def fetch_item_by_content_id(
 
     try:
         for params in param_sets:
-            res = requests.get(url, params=params, timeout=10)
+            res = dmm_api_get(url, params)
             res.raise_for_status()
             items = res.json().get("result", {}).get("items", [])
             if items:
@@ -402,6 +494,23 @@ def fetch_item_by_content_id(
         logging.error(f"❌ DMM API呼び出し失敗: {content_id} ({e})")
         return None
 
+def prefetch_items(rows: list[dict], *, workers: int) -> list[dict | None]:
+    """rows の作品情報を並列にまとめて取得する（並びは rows と同じ）。
+
+    ItemList の cid は 1 件指定のみのため、1 行 1 リクエストを workers 本で並列化する。
+    流量は dmm.dmm_http の共有レート制限で抑える。
+    """
+
+    def fetch(row: dict) -> dict | None:
+        return fetch_item_by_content_id(
+            row["content_id"],
+            service=row.get("service"),
+            floor=row.get("floor"),
+        )
+
+    with ThreadPoolExecutor(max_workers=max(int(workers), 1)) as executor:
+        return list(executor.map(fetch, rows))
+
 # ----------------------------------------------------
 # trn_dmm_items 更新
 # ----------------------------------------------------
@@ -411,7 +520,10 @@ def update_dmm_item(
     auto_summary: str,
     auto_point: str,
     safe_generated_at=None,
+    *,
+    buffer: UpsertBuffer | None = None,
 ):
+    """buffer を渡すと UPDATE せず、content_id をキーにした一括 UPSERT 用に積む。"""
     try:
         review_count = item.get("review", {}).get("count")
         review_average = item.get("review", {}).get("average")
@@ -435,7 +547,7 @@ def update_dmm_item(
         )
 
         # マスタ更新（女優は週間ランキングの JOIN 対象のため必須）
-        upsert_actresses(actresses)
+        upsert_actresses(actresses, cache=actress_cache)
         # upsert_genres(genres,item.get("service_code"),item.get("floor_code"))
         # upsert_directors(directors)
 
@@ -466,6 +578,8 @@ def update_dmm_item(
 
         if safe_generated_at:
             logging.info("safe_generated_at 済みのため Safe AI をスキップ: %s", content_id)
+        elif safe_ai_batch:
+            logging.info("Safe AI はバッチで後からまとめて生成: %s", content_id)
         else:
             new_summary, new_point, ai_ok = generate_safe_summary_point(
                 title, auto_summary, auto_point
@@ -480,6 +594,11 @@ def update_dmm_item(
                     content_id,
                 )
 
+        if buffer is not None:
+            buffer.add({"content_id": content_id, **update_data})
+            logging.info(f"📝 更新を一括書き込み待ちに追加: {content_id}")
+            return
+
         res = (
             supabase.table("trn_dmm_items")
             .update(update_data)
@@ -498,18 +617,36 @@ def update_dmm_item(
 # ----------------------------------------------------
 # バッチ処理・メイン
 # ----------------------------------------------------
-def process_batch(batch_items, batch_index, total, range_start=0):
-    """range_start: 全体リスト上のこのバッチ先頭の0-basedインデックス"""
+def process_batch(
+    batch_items,
+    batch_index,
+    total,
+    range_start=0,
+    *,
+    fetch_workers=1,
+    item_writes: UpsertBuffer | None = None,
+    state_writes: UpsertBuffer | None = None,
+):
+    """range_start: 全体リスト上のこのバッチ先頭の0-basedインデックス
+    fetch_workers: 2 以上ならバッチ分の DMM API 取得を先に並列で済ませる
+    item_writes / state_writes: 渡すと trn_dmm_items / API 状態をまとめ書きする
+    """
     logging.info(f"=== 🧩 バッチ {batch_index} 開始 ({len(batch_items)}件) ===")
+    prefetched = (
+        prefetch_items(batch_items, workers=fetch_workers) if fetch_workers > 1 else None
+    )
     for i, row in enumerate(batch_items, start=1):
         content_id = row["content_id"]
         global_num = range_start + i
         logging.info(f"[{global_num}/{total}] {content_id} 処理中...")
-        item = fetch_item_by_content_id(
-            content_id,
-            service=row.get("service"),
-            floor=row.get("floor"),
-        )
+        if prefetched is not None:
+            item = prefetched[i - 1]
+        else:
+            item = fetch_item_by_content_id(
+                content_id,
+                service=row.get("service"),
+                floor=row.get("floor"),
+            )
         if item:
             update_dmm_item(
                 content_id,
@@ -517,19 +654,33 @@ def process_batch(batch_items, batch_index, total, range_start=0):
                 row.get("auto_summary"),
                 row.get("auto_point"),
                 row.get("safe_generated_at"),
+                buffer=item_writes,
             )
-            record_api_result(content_id, ok=True, current_state=row)
+            record_api_result(content_id, ok=True, current_state=row, buffer=state_writes)
         else:
             logging.warning(f"⚠️ データ取得失敗: {content_id}")
-            record_api_result(content_id, ok=False, current_state=row)
-        time.sleep(0.5)
+            record_api_result(content_id, ok=False, current_state=row, buffer=state_writes)
     logging.info(f"=== ✅ バッチ {batch_index} 完了 ===")
 
 # ----------------------------------------------------
 # メイン
 # ----------------------------------------------------
+def open_actress_cache() -> ActressCache:
+    """女優キャッシュを開き、mst_actress.updated_at で prewarm する。"""
+    global actress_cache
+    if actress_cache is None:
+        actress_cache = ActressCache(namespace=ACTRESS_CACHE_NAMESPACE)
+    try:
+        actress_cache.prewarm(supabase)
+    except Exception as e:
+        logging.warning("女優キャッシュの prewarm に失敗しました（ローカル分のみで続行）: %s", e)
+    return actress_cache
+
+
 def main(argv=None, *, today: date | None = None, now: datetime | None = None):
+    global safe_ai_batch
     args = parse_args(argv)
+    safe_ai_batch = args.ai_batch
     day = today or date.today()
     clock = now or datetime.now(timezone.utc)
     logging.info(
@@ -576,21 +727,55 @@ def main(argv=None, *, today: date | None = None, now: datetime | None = None):
     total = len(items)
     logging.info(f"全 {total} 件の作品を更新対象として処理します。")
 
+    open_actress_cache()
+
     # -----------------------------
     # バッチ処理
     # -----------------------------
     update_count = 0
 
-    for i in range(0, total, BATCH_SIZE):
-        batch_items = items[i : i + BATCH_SIZE]
-        batch_index = (i // BATCH_SIZE) + 1
-
-        process_batch(batch_items, batch_index, total, range_start=i)
-        update_count += len(batch_items)
-
-        if i + BATCH_SIZE < total:
-            logging.info(f"⏸ {SLEEP_BETWEEN_BATCH}秒待機中（次のバッチまで）...")
-            time.sleep(SLEEP_BETWEEN_BATCH)
+    # 作品更新・API 状態は WRITE_FLUSH_ROWS 件 / WRITE_FLUSH_SECONDS 秒ごとに一括 UPSERT する。
+    # with を抜けるとき（例外終了を含む）に残りを書き出す。
+    # 作品は UPDATE の置き換えなので、削除済みの content_id で空の行を作らないよう既存行だけに書く。
+    with UpsertBuffer(
+        supabase,
+        "trn_dmm_items",
+        on_conflict="content_id",
+        max_rows=WRITE_FLUSH_ROWS,
+        max_seconds=WRITE_FLUSH_SECONDS,
+        update_only=True,
+    ) as item_writes, UpsertBuffer(
+        supabase,
+        API_STATE_TABLE,
+        on_conflict="content_id",
+        max_rows=WRITE_FLUSH_ROWS,
+        max_seconds=WRITE_FLUSH_SECONDS,
+    ) as state_writes:
+        for i in range(0, total, BATCH_SIZE):
+            batch_items = items[i : i + BATCH_SIZE]
+            batch_index = (i // BATCH_SIZE) + 1
+
+            process_batch(
+                batch_items,
+                batch_index,
+                total,
+                range_start=i,
+                fetch_workers=args.fetch_workers,
+                item_writes=item_writes,
+                state_writes=state_writes,
+            )
+            update_count += len(batch_items)
+
+        if safe_ai_batch:
+            # バッチ完了待ちの間に API 更新分を書き込み待ちのまま抱えない
+            item_writes.flush()
+            state_writes.flush()
+            run_safe_rewrite_batch(items, writes=item_writes)
+
+    if item_writes.has_failures or state_writes.has_failures:
+        write_failures = item_writes.failed_count + state_writes.failed_count
+        logging.error(f"❌ 書き込みに失敗した行があります: {write_failures} 件（{update_count} 件処理）")
+        sys.exit(1)
 
     logging.info(f"🎉 全ての作品データ更新が完了しました。{update_count} 件処理しました。")
 
@@ -15,12 +15,15 @@ import sys
 import re
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from datetime import date, datetime, timezone
-import requests
 from openai import OpenAI  # ← ★追加
 
+from db.actress_cache import ActressCache
 from db.supabase_client_mesugaki import supabase
+from dmm.dmm_http import dmm_api_get
+from openai_api import llm_gateway
 from openai_api.config import OPENAI_MODEL
 from pykakasi import kakasi
 from utils.update_items_selection import (
@@ -44,10 +47,12 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # ★追加
 client = OpenAI(api_key=OPENAI_API_KEY)       # ★追加
 
 BATCH_SIZE = 100
-SLEEP_BETWEEN_BATCH = 5
 ITEM_SELECT = "content_id, auto_summary, auto_point, release_date, campaign"
 API_STATE_SELECT = "content_id, miss_count, last_ok_at, skip_until"
 API_STATE_TABLE = "trn_dmm_item_api_state"
+# mst_actress の鮮度キャッシュ。main() で開いて prewarm する（未設定なら毎回 API を叩く）
+ACTRESS_CACHE_NAMESPACE = "mesugaki"
+actress_cache: ActressCache | None = None
 
 
 def parse_args(argv=None):
@@ -216,12 +221,12 @@ def generate_safe_summary_point(
 """
 
     try:
-        res = client.chat.completions.create(
+        raw_content = llm_gateway.complete(
+            [{"role": "user", "content": prompt}],
             model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
+            client=client,
             # temperature=0.7,
         )
-        raw_content = res.choices[0].message.content
         text = (raw_content or "").strip()
 
         match = re.split(r"【おすすめポイント】", text)
@@ -259,12 +264,14 @@ def generate_safe_text(title: str, summary: str = "") -> tuple[str, str]:
 概要文:
 {summary}
 """
-        res = client.chat.completions.create(
+        raw_content = llm_gateway.complete(
+            [{"role": "user", "content": prompt}],
             model=OPENAI_MODEL,
-            messages=[{"role": "user", "content": prompt}],
+            client=client,
             temperature=0.7,
+            # サンプリングで言い回しを変える呼び出しなので、同じ応答を使い回さない
+            use_cache=False,
         )
-        raw_content = res.choices[0].message.content
         text = (raw_content or "").strip()
         # 分割
         match = re.split(r"【おすすめポイント】", text)
@@ -289,7 +296,7 @@ def fetch_actress_detail(actress_id: str):
     }
 
     try:
-        res = requests.get(url, params=params, timeout=10)
+        res = dmm_api_get(url, params)
         res.raise_for_status()
         data = res.json()
         result = data.get("result") or {}
@@ -317,12 +324,22 @@ def to_romanized(text: str) -> str | None:
 # ----------------------------------------------------
 # 女優・監督・ジャンルUPSERT
 # ----------------------------------------------------
-def upsert_actresses(actresses: list[dict]):
+def upsert_actresses(actresses: list[dict], *, cache: ActressCache | None = None):
+    """出演女優を mst_actress に反映する。
+
+    cache が TTL 内と判定した女優は ActressSearch API も UPSERT も行わない。
+    残りは 1 回の複数行 UPSERT でまとめて書き込み、成功したらキャッシュを更新する。
+    """
     if not actresses:
         return
+    rows: dict[str, dict] = {}
+    seen: set[str] = set()
     for a in actresses:
         actress_id = a.get("id")
-        if not actress_id:
+        if not actress_id or str(actress_id) in seen:
+            continue
+        seen.add(str(actress_id))
+        if cache is not None and cache.is_fresh(actress_id):
             continue
         detail = fetch_actress_detail(actress_id) or {}
         name = detail.get("name") or a.get("name")
@@ -331,21 +348,27 @@ def upsert_actresses(actresses: list[dict]):
             continue
         ruby = detail.get("ruby") or a.get("ruby")
         image = detail.get("imageURL") if isinstance(detail.get("imageURL"), dict) else {}
-        try:
-            supabase.table("mst_actress").upsert(
-                {
-                    "actress_id": detail.get("id") or actress_id,
-                    "name": name,
-                    "name_kana": ruby,
-                    "name_en": to_romanized(ruby),
-                    "image_url": image.get("large"),
-                    "updated_at": datetime.utcnow().isoformat(),
-                },
-                on_conflict="actress_id",
-            ).execute()
-        except Exception as e:
-            logging.error(f"❌ 女優UPSERT失敗: {a} ({e})")
-        time.sleep(0.5)
+        row_id = detail.get("id") or actress_id
+        rows[str(row_id)] = {
+            "actress_id": row_id,
+            "name": name,
+            "name_kana": ruby,
+            "name_en": to_romanized(ruby),
+            "image_url": image.get("large"),
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+    if not rows:
+        return
+    try:
+        supabase.table("mst_actress").upsert(
+            list(rows.values()),
+            on_conflict="actress_id",
+        ).execute()
+    except Exception as e:
+        logging.error(f"❌ 女優UPSERT失敗: {list(rows)} ({e})")
+        return
+    if cache is not None:
+        cache.mark_refreshed(rows)
 
 def upsert_genres(genres: list[dict], service_code: str, floor_code: str):
     if not genres:
@@ -410,7 +433,7 @@ def fetch_item_by_content_id(content_id: str):
         "output": "json",
     }
     try:
-        res = requests.get(url, params=params, timeout=10)
+        res = dmm_api_get(url, params)
         res.raise_for_status()
         data = res.json()
         result = data.get("result") or {}
@@ -422,6 +445,19 @@ def fetch_item_by_content_id(content_id: str):
         logging.error(f"❌ DMM API呼び出し失敗: {content_id} ({e})")
         return None
 
+def prefetch_items(rows: list[dict], *, workers: int) -> list[dict | None]:
+    """rows の作品情報を並列にまとめて取得する（並びは rows と同じ、content_id 無しは None）。
+
+    ItemList の cid は 1 件指定のみのため、1 行 1 リクエストを workers 本で並列化する。
+    """
+
+    def fetch(row: dict) -> dict | None:
+        content_id = row.get("content_id")
+        return fetch_item_by_content_id(content_id) if content_id else None
+
+    with ThreadPoolExecutor(max_workers=max(int(workers), 1)) as executor:
+        return list(executor.map(fetch, rows))
+
 # ----------------------------------------------------
 # trn_dmm_items 更新
 # ----------------------------------------------------
@@ -463,7 +499,7 @@ def update_dmm_item(
             sample_images = []
 
         # マスタ更新（女優は週間ランキングの JOIN 対象のため必須）
-        upsert_actresses(actresses)
+        upsert_actresses(actresses, cache=actress_cache)
         # upsert_genres(genres,item.get("service_code"),item.get("floor_code"))
         # upsert_directors(directors)
 
@@ -530,8 +566,12 @@ def process_batch(
     total_batches: int,
     range_start: int,
     total: int,
+    *,
+    fetch_workers: int = 1,
 ):
-    """range_start: 全体リスト上のこのバッチ先頭の0-basedインデックス"""
+    """range_start: 全体リスト上のこのバッチ先頭の0-basedインデックス
+    fetch_workers: 2 以上ならバッチ分の DMM API 取得を先に並列で済ませる
+    """
     batch_t0 = time.perf_counter()
     batch_end = min(range_start + len(batch_items), total)
     logging.info(
@@ -543,6 +583,9 @@ def process_batch(
         batch_end,
         total,
     )
+    prefetched = (
+        prefetch_items(batch_items, workers=fetch_workers) if fetch_workers > 1 else None
+    )
     for idx_in_batch, row in enumerate(batch_items, start=1):
         content_id = row.get("content_id")
         if not content_id:
@@ -557,7 +600,10 @@ def process_batch(
             pct,
             content_id,
         )
-        item = fetch_item_by_content_id(content_id)
+        if prefetched is not None:
+            item = prefetched[idx_in_batch - 1]
+        else:
+            item = fetch_item_by_content_id(content_id)
         if item:
             update_dmm_item(
                 content_id,
@@ -569,7 +615,6 @@ def process_batch(
         else:
             logging.warning("⚠️ データ取得失敗: %s", content_id)
             record_api_result(content_id, ok=False, current_state=row)
-        time.sleep(0.5)
     elapsed = time.perf_counter() - batch_t0
     logging.info(
         "=== バッチ %s/%s 完了（%.1f 秒、1件あたり平均 %.2f 秒）===",
@@ -582,6 +627,18 @@ def process_batch(
 # ----------------------------------------------------
 # メイン
 # ----------------------------------------------------
+def open_actress_cache() -> ActressCache:
+    """女優キャッシュを開き、mst_actress.updated_at で prewarm する。"""
+    global actress_cache
+    if actress_cache is None:
+        actress_cache = ActressCache(namespace=ACTRESS_CACHE_NAMESPACE)
+    try:
+        actress_cache.prewarm(supabase)
+    except Exception as e:
+        logging.warning("女優キャッシュの prewarm に失敗しました（ローカル分のみで続行）: %s", e)
+    return actress_cache
+
+
 def main(argv=None, *, today: date | None = None, now: datetime | None = None):
     args = parse_args(argv)
     day = today or date.today()
@@ -647,6 +704,8 @@ def main(argv=None, *, today: date | None = None, now: datetime | None = None):
         total_batches,
     )
 
+    open_actress_cache()
+
     # -----------------------------
     # バッチ処理
     # -----------------------------
@@ -657,17 +716,16 @@ def main(argv=None, *, today: date | None = None, now: datetime | None = None):
         batch_items = items[i : i + BATCH_SIZE]
         batch_index = (i // BATCH_SIZE) + 1
 
-        process_batch(batch_items, batch_index, total_batches, i, total)
+        process_batch(
+            batch_items,
+            batch_index,
+            total_batches,
+            i,
+            total,
+            fetch_workers=args.fetch_workers,
+        )
         update_count += len(batch_items)
 
-        if i + BATCH_SIZE < total:
-            logging.info(
-                "⏸ 次バッチまで %s 秒待機（残りバッチ: %s）…",
-                SLEEP_BETWEEN_BATCH,
-                total_batches - batch_index,
-            )
-            time.sleep(SLEEP_BETWEEN_BATCH)
-
     run_elapsed = time.perf_counter() - run_t0
     logging.info(
         "🎉 全作品の更新が完了しました。処理 %s 件 / 合計 %.1f 分（%.1f 秒）",
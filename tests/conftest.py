@@ -1,6 +1,10 @@
+import os
 import sys
 from pathlib import Path
 
+# LLM 応答のディスクキャッシュはテストでは使わない（テスト間で応答が共有されないように）
+os.environ["LLM_CACHE_DIR"] = ""
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
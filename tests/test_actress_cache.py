@@ -0,0 +1,72 @@
+"""db.actress_cache の TTL 判定・永続化・prewarm を検証する。"""
+
+from unittest.mock import MagicMock
+
+from db.actress_cache import ActressCache
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_within_ttl():
+    clock = FakeClock(1000.0)
+    cache = ActressCache(":memory:", ttl_seconds=100, clock=clock)
+
+    assert not cache.is_fresh("1")
+    cache.mark_refreshed([1])
+    assert cache.is_fresh("1")
+    assert cache.is_fresh(1)
+    clock.now = 1100.0
+    assert not cache.is_fresh("1")
+    assert not cache.is_fresh(None)
+
+
+def test_older_timestamp_does_not_overwrite():
+    cache = ActressCache(":memory:", ttl_seconds=100, clock=FakeClock(1000.0))
+    cache.mark_refreshed(["1"])
+    cache.mark_refreshed(["1"], at=0.0)
+    assert cache.is_fresh("1")
+
+
+def test_persists_per_namespace(tmp_path):
+    path = tmp_path / "sub" / "cache.sqlite3"
+    clock = FakeClock(1000.0)
+    with ActressCache(path, namespace="main", clock=clock) as cache:
+        cache.mark_refreshed(["1", "2"])
+
+    with ActressCache(path, namespace="main", clock=clock) as reopened:
+        assert len(reopened) == 2
+        assert reopened.is_fresh("2")
+    with ActressCache(path, namespace="mesugaki", clock=clock) as other:
+        assert len(other) == 0
+
+
+def test_prewarm_reads_updated_at_pages():
+    page1 = MagicMock(
+        data=[
+            {"actress_id": 1, "updated_at": "2026-08-19T00:00:00+00:00"},
+            {"actress_id": 2, "updated_at": None},
+        ]
+    )
+    page2 = MagicMock(data=[{"actress_id": 3, "updated_at": "2026-01-01T00:00:00"}])
+    client = MagicMock()
+    table = client.table.return_value
+    table.select.return_value.order.return_value.range.return_value.execute.side_effect = [
+        page1,
+        page2,
+    ]
+    # 2026-08-19T12:00:00Z
+    cache = ActressCache(":memory:", ttl_seconds=86400, clock=FakeClock(1787140800.0))
+
+    assert cache.prewarm(client, page_size=2) == 3
+
+    client.table.assert_called_once_with("mst_actress")
+    assert cache.is_fresh("1")
+    assert not cache.is_fresh("2")
+    assert not cache.is_fresh("3")
+    assert len(cache) == 2
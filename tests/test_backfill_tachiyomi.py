@@ -2,15 +2,30 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from db import storageS3
 from db.storageS3 import count_objects_under_prefix, tachiyomi_s3_prefix
 from db.trn_dmm_items_repository import resolve_tachiyomi_page_count
 from scripts.process import backfill_tachiyomi as bf
 
 
+@pytest.fixture(autouse=True)
+def _clear_presign_cache():
+    storageS3.presigned_url_cache.clear()
+    yield
+    storageS3.presigned_url_cache.clear()
+
+
+def _client_error():
+    from botocore.exceptions import ClientError
+
+    return ClientError({"Error": {"Code": "500", "Message": "boom"}}, "PutObject")
+
+
 class TestResolveTachiyomiPageCount:
     def test_no_url_returns_none(self):
         assert resolve_tachiyomi_page_count(None, 3) is None
@@ -59,10 +74,98 @@ class TestCountObjectsUnderPrefix:
             assert count_objects_under_prefix("comic", "abc", bucket="b") == 0
 
 
+class TestUploadLocalImagesToS3:
+    def _files(self, tmp_path, n):
+        paths = []
+        for i in range(n):
+            path = tmp_path / f"page_{i + 1:03}.webp"
+            path.write_bytes(b"x")
+            paths.append(str(path))
+        return paths
+
+    def test_lists_once_and_uploads_only_missing_in_index_order(self, tmp_path):
+        paths = self._files(tmp_path, 3)
+        with patch("db.storageS3.s3_client") as client:
+            client.list_objects_v2.return_value = {"Contents": [{"Key": "comic/abc/abc_02.webp"}]}
+            client.generate_presigned_url.side_effect = lambda op, Params, ExpiresIn: (
+                "signed:" + Params["Key"]
+            )
+            urls = storageS3._upload_local_images_to_s3(paths, "abc", "comic", "b", workers=3)
+
+        assert urls == [
+            "signed:comic/abc/abc_01.webp",
+            "signed:comic/abc/abc_02.webp",
+            "signed:comic/abc/abc_03.webp",
+        ]
+        client.list_objects_v2.assert_called_once_with(
+            Bucket="b", Prefix="comic/abc/", MaxKeys=1000
+        )
+        client.head_object.assert_not_called()
+        uploaded = sorted(call.args[2] for call in client.upload_file.call_args_list)
+        assert uploaded == ["comic/abc/abc_01.webp", "comic/abc/abc_03.webp"]
+
+    def test_failed_and_missing_pages_are_empty_strings(self, tmp_path):
+        paths = self._files(tmp_path, 2) + [str(tmp_path / "missing.webp")]
+        with patch("db.storageS3.s3_client") as client:
+            client.list_objects_v2.return_value = {}
+            client.generate_presigned_url.return_value = "signed"
+            client.upload_file.side_effect = [None, OSError("reset")]
+            urls = storageS3._upload_local_images_to_s3(paths, "abc", "comic", "b", workers=1)
+
+        assert urls == ["signed", "", ""]
+
+    def test_missing_bucket(self, tmp_path):
+        assert storageS3._upload_local_images_to_s3(["a.webp"], "abc", "comic", None) == [""]
+        assert storageS3._upload_local_images_to_s3([], "abc", "comic", "b") == []
+
+
+    def test_stream_uploads_as_pages_arrive_and_deletes_sent_files(self, tmp_path):
+        paths = self._files(tmp_path, 3)
+        with patch("db.storageS3.s3_client") as client:
+            client.list_objects_v2.return_value = {}
+            client.generate_presigned_url.side_effect = lambda op, Params, ExpiresIn: Params["Key"]
+            client.upload_file.side_effect = [None, _client_error(), None]
+            with storageS3.TachiyomiUploadStream("abc", "comic", "b", workers=1) as stream:
+                for index, path in enumerate(paths, start=1):
+                    stream.put(index, path)
+                urls = stream.results()
+
+        assert urls == ["comic/abc/abc_01.webp", "", "comic/abc/abc_03.webp"]
+        client.list_objects_v2.assert_called_once()
+        # 送れたファイルだけ消える（失敗分は呼び出し元の後始末に任せる）
+        assert [Path(p).exists() for p in paths] == [False, True, False]
+
+    def test_listing_retried_then_falls_back_to_head_object(self, tmp_path):
+        from botocore.exceptions import ClientError
+
+        paths = self._files(tmp_path, 3)
+
+        def head_object(Bucket, Key):
+            if Key.endswith("_01.webp"):
+                raise ClientError({"Error": {"Code": "404", "Message": "nf"}}, "HeadObject")
+            if Key.endswith("_03.webp"):
+                raise _client_error()
+            return {}
+
+        with patch("db.storageS3.s3_client") as client:
+            client.list_objects_v2.side_effect = ClientError(
+                {"Error": {"Code": "503", "Message": "slow down"}}, "ListObjectsV2"
+            )
+            client.head_object.side_effect = head_object
+            client.generate_presigned_url.side_effect = lambda op, Params, ExpiresIn: Params["Key"]
+            urls = storageS3._upload_local_images_to_s3(paths, "abc", "comic", "b", workers=1)
+
+        assert client.list_objects_v2.call_count == storageS3.S3_LIST_ATTEMPTS
+        # 存在するページは送らず、存在確認に失敗したページは空（再アップロードしない）
+        assert urls == ["comic/abc/abc_01.webp", "comic/abc/abc_02.webp", ""]
+        uploaded = [call.args[2] for call in client.upload_file.call_args_list]
+        assert uploaded == ["comic/abc/abc_01.webp"]
+
+
 class TestInsertSetsPageCount:
     def test_insert_payload_includes_page_count(self):
         client = MagicMock()
-        client.table.return_value.select.return_value.eq.return_value.execute.return_value = (
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value = (
             MagicMock(data=[])
         )
         client.table.return_value.insert.return_value.execute.return_value = MagicMock(
@@ -110,7 +213,7 @@ class TestInsertSetsPageCount:
 
     def test_insert_page_count_zero_on_empty_paths(self):
         client = MagicMock()
-        client.table.return_value.select.return_value.eq.return_value.execute.return_value = (
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value = (
             MagicMock(data=[])
         )
         client.table.return_value.insert.return_value.execute.return_value = MagicMock(
@@ -155,7 +258,7 @@ class TestInsertSetsPageCount:
 
     def test_insert_page_count_null_without_url(self):
         client = MagicMock()
-        client.table.return_value.select.return_value.eq.return_value.execute.return_value = (
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value = (
             MagicMock(data=[])
         )
         client.table.return_value.insert.return_value.execute.return_value = MagicMock(
@@ -199,6 +302,50 @@ class TestInsertSetsPageCount:
         assert payload["tachiyomi_page_count"] is None
 
 
+    def test_insert_uses_bulk_upload_when_given(self):
+        client = MagicMock()
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value = (
+            MagicMock(data=[])
+        )
+        single = MagicMock()
+        bulk = MagicMock(return_value=["u1", "", "u3"])
+        item = {
+            "content_id": "cid4",
+            "title": "t",
+            "URL": "https://example.com/i",
+            "tachiyomi": {"URL": "https://example.com/t"},
+            "iteminfo": {},
+            "prices": {},
+            "imageURL": {},
+            "sampleImageURL": {},
+        }
+
+        with patch(
+            "db.trn_dmm_items_repository.execute_with_retry",
+            side_effect=lambda builder: builder().execute(),
+        ):
+            from db.trn_dmm_items_repository import _insert_dmm_item
+
+            _insert_dmm_item(
+                item,
+                ["a.webp", "b.webp", "c.webp"],
+                None,
+                "FANZA",
+                "ebook",
+                "comic",
+                supabase_client=client,
+                upload_local_image_to_s3_fn=single,
+                upload_local_images_to_s3_fn=bulk,
+                coerce_empty_image_urls=True,
+                generate_ai=False,
+            )
+
+        single.assert_not_called()
+        bulk.assert_called_once_with(["a.webp", "b.webp", "c.webp"], "cid4", "comic")
+        payload = client.table.return_value.insert.call_args[0][0]
+        assert payload["tachiyomi_page_count"] == 2
+
+
 class TestBackfillProcessOneRow:
     def test_sync_when_s3_has_objects(self):
         client = MagicMock()
@@ -317,6 +464,47 @@ class TestBackfillProcessOneRow:
         capture.assert_not_called()
 
 
+    def test_stream_upload_passes_pages_to_upload_queue(self):
+        row = {
+            "content_id": "c6",
+            "floor": "comic",
+            "tachiyomi_url": "https://example.com/t",
+            "title": "t6",
+        }
+        stream = MagicMock()
+        stream.__enter__.return_value = stream
+        stream.results.return_value = ["u1", "u2"]
+
+        def fake_capture(url, *, on_page):
+            on_page(1, "p1.webp")
+            on_page(2, "p2.webp")
+            return ["p1.webp", "p2.webp"]
+
+        upload = MagicMock()
+        with patch.object(bf, "count_objects_under_prefix", return_value=0), patch.object(
+            bf, "TachiyomiUploadStream", return_value=stream
+        ) as stream_cls, patch.object(
+            bf, "capture_all_tachiyomi_pages", side_effect=fake_capture
+        ), patch.object(bf, "update_tachiyomi_fields", return_value=True) as upd, patch.object(
+            bf, "cleanup_local_files"
+        ) as cleanup:
+            status = bf.process_one_row(
+                row,
+                client=MagicMock(),
+                upload_fn=upload,
+                bucket="b",
+                dry_run=False,
+                stream_upload=True,
+            )
+
+        assert status == "captured"
+        stream_cls.assert_called_once_with("c6", "comic", "b")
+        assert [c.args for c in stream.put.call_args_list] == [(1, "p1.webp"), (2, "p2.webp")]
+        upload.assert_not_called()
+        assert upd.call_args.args[2]["tachiyomi_page_count"] == 2
+        cleanup.assert_called_once_with(["p1.webp", "p2.webp"])
+
+
 class TestRecordCaptureFailure:
     def test_increments_and_keeps_retryable(self):
         client = MagicMock()
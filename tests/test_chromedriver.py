@@ -7,10 +7,13 @@ import pytest
 
 from utils import chromedriver as chromedriver_mod
 from utils.chromedriver import (
+    apply_resource_blocking,
+    blocked_url_patterns,
     build_chrome_options,
     chromedriver_path,
     clear_chromedriver_cache,
     create_chrome_driver,
+    page_load_metrics,
     quit_chrome_driver,
     resolve_chromedriver_path,
 )
@@ -184,3 +187,181 @@ class TestCreateChromeDriver:
         quit_chrome_driver(driver)
 
         assert not user_dir.exists()
+
+
+class TestResourceBlocking:
+    def test_synopsis_blocks_every_category(self):
+        patterns = blocked_url_patterns("synopsis")
+        assert "*.jpg" in patterns
+        assert "*.webp?*" in patterns
+        assert "*.svg" in patterns
+        assert "*.woff2" in patterns
+        assert "*.mp4" in patterns
+        assert "*googletagmanager.com/*" in patterns
+
+    def test_review_allows_svg(self):
+        patterns = blocked_url_patterns("review")
+        assert "*.svg" not in patterns
+        assert "*.png" in patterns
+
+    def test_tachiyomi_is_exempt(self):
+        assert blocked_url_patterns("tachiyomi") == []
+
+    def test_unknown_page_type_raises(self):
+        with pytest.raises(ValueError):
+            blocked_url_patterns("nope")
+
+    def test_disabled_and_extra_urls(self, monkeypatch):
+        monkeypatch.setattr(chromedriver_mod, "SCRAPER_BLOCK_EXTRA_URLS", ("*ads.example/*",))
+        assert blocked_url_patterns("campaign")[-1] == "*ads.example/*"
+        monkeypatch.setattr(chromedriver_mod, "SCRAPER_BLOCK_RESOURCES", False)
+        assert blocked_url_patterns("campaign") == []
+
+    def test_apply_sends_cdp_commands(self):
+        driver = MagicMock()
+        assert apply_resource_blocking(driver, "review") is True
+        calls = driver.execute_cdp_cmd.call_args_list
+        assert calls[0].args == ("Network.enable", {})
+        assert calls[1].args == ("Network.setBlockedURLs", {"urls": blocked_url_patterns("review")})
+
+    def test_apply_without_cdp_returns_false(self):
+        driver = MagicMock()
+        driver.execute_cdp_cmd.side_effect = AttributeError("no cdp")
+        assert apply_resource_blocking(driver, "synopsis") is False
+
+    def test_create_chrome_driver_applies_profile(self):
+        driver = MagicMock()
+        with patch.object(chromedriver_mod, "chromedriver_path", return_value="fake"):
+            with patch.object(chromedriver_mod.webdriver, "Chrome", return_value=driver):
+                create_chrome_driver(block_resources="synopsis", max_retries=1)
+        driver.execute_cdp_cmd.assert_any_call(
+            "Network.setBlockedURLs", {"urls": blocked_url_patterns("synopsis")}
+        )
+
+    def test_create_chrome_driver_without_profile_does_not_block(self):
+        driver = MagicMock()
+        with patch.object(chromedriver_mod, "chromedriver_path", return_value="fake"):
+            with patch.object(chromedriver_mod.webdriver, "Chrome", return_value=driver):
+                create_chrome_driver(max_retries=1)
+        driver.execute_cdp_cmd.assert_not_called()
+
+    def test_page_load_metrics(self):
+        driver = MagicMock()
+        driver.execute_script.return_value = {"load_ms": 812.5, "transfer_bytes": 2048, "resources": 3}
+        assert page_load_metrics(driver)["transfer_bytes"] == 2048
+        driver.execute_script.side_effect = RuntimeError("gone")
+        assert page_load_metrics(driver) is None
+
+
+def _pool(size=1, **kwargs):
+    drivers = []
+
+    def factory():
+        driver = MagicMock(name=f"driver{len(drivers)}")
+        driver.execute_script.return_value = None
+        drivers.append(driver)
+        return driver
+
+    quit_driver = MagicMock()
+    pool = chromedriver_mod.DriverPool(factory, size=size, quit_driver=quit_driver, **kwargs)
+    return pool, drivers, quit_driver
+
+
+class TestDriverPool:
+    def test_reuses_returned_driver(self):
+        pool, drivers, quit_driver = _pool()
+        first = pool.lease()
+        pool.release(first)
+        assert pool.lease() is first
+        assert len(drivers) == 1
+        quit_driver.assert_not_called()
+
+    def test_creates_up_to_size_then_times_out(self):
+        pool, drivers, _ = _pool(size=2)
+        a = pool.lease()
+        b = pool.lease()
+        assert a is not b
+        with pytest.raises(TimeoutError):
+            pool.lease(timeout=0.01)
+
+    def test_dead_driver_is_replaced_on_lease(self):
+        pool, drivers, quit_driver = _pool()
+        first = pool.lease()
+        pool.release(first)
+        with patch.object(chromedriver_mod, "is_driver_alive", return_value=False):
+            second = pool.lease()
+        assert second is not first
+        quit_driver.assert_called_once_with(first)
+
+    def test_recycles_after_max_pages(self):
+        pool, drivers, quit_driver = _pool(max_pages=2)
+        first = pool.lease()
+        pool.release(first)
+        assert pool.lease() is first
+        pool.release(first)
+        quit_driver.assert_called_once_with(first)
+        assert pool.lease() is not first
+
+    def test_recycles_on_heap_growth(self):
+        pool, drivers, quit_driver = _pool(max_heap_mb=100)
+        driver = pool.lease()
+        driver.execute_script.return_value = 200 * 1024 * 1024
+        pool.release(driver)
+        quit_driver.assert_called_once_with(driver)
+
+    def test_context_manager_discards_broken_driver(self):
+        pool, drivers, quit_driver = _pool()
+        with patch.object(chromedriver_mod, "is_driver_alive", return_value=False):
+            with pytest.raises(RuntimeError):
+                with pool.driver() as driver:
+                    raise RuntimeError("boom")
+        quit_driver.assert_called_once_with(driver)
+        assert pool.lease() is not driver
+
+    def test_factory_failure_frees_slot(self):
+        factory = MagicMock(side_effect=[RuntimeError("launch"), MagicMock()])
+        pool = chromedriver_mod.DriverPool(factory, quit_driver=MagicMock())
+        with pytest.raises(RuntimeError):
+            pool.lease()
+        assert pool.lease() is not None
+
+    def test_close_quits_idle_and_returned(self):
+        pool, drivers, quit_driver = _pool(size=2)
+        a = pool.lease()
+        b = pool.lease()
+        pool.release(a)
+        pool.close()
+        quit_driver.assert_called_once_with(a)
+        pool.release(b)
+        assert quit_driver.call_count == 2
+        with pytest.raises(RuntimeError):
+            pool.lease()
+
+    def test_concurrent_releases_count_every_use(self):
+        import threading
+
+        pool, drivers, quit_driver = _pool(size=4, max_pages=0)
+        leased = [pool.lease() for _ in range(4)]
+
+        def worker(driver):
+            for _ in range(200):
+                pool.release(driver)
+                driver = pool.lease()
+
+        threads = [threading.Thread(target=worker, args=(d,)) for d in leased]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(pool._uses.values()) == 800
+        assert len(drivers) == 4
+        quit_driver.assert_not_called()
+
+    def test_release_after_close_quits_instead_of_idling(self):
+        pool, drivers, quit_driver = _pool(max_heap_mb=0)
+        driver = pool.lease()
+        pool.close()
+        pool.release(driver)
+        quit_driver.assert_called_once_with(driver)
+        assert pool._idle == []
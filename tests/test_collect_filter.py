@@ -3,11 +3,16 @@
 from unittest.mock import MagicMock, patch
 
 import httpx
+import pytest
+
+from db.registered_content_ids import RegisteredContentIdIndex
 
 from scripts.collect._filter import (
     filter_unregistered_items,
+    load_registered_index,
+    registered_ids_checker,
     run_items_isolated,
-    supabase_exists_checker,
+    supabase_registered_ids_checker,
 )
 
 
@@ -30,24 +35,51 @@ def test_filter_empty_input():
     assert filter_unregistered_items([], exists_by_content_id=lambda _: False) == []
 
 
-def test_supabase_exists_checker():
+def test_filter_with_registered_content_ids_queries_once():
+    top = [
+        {"title": "no-id", "URL": "u0"},
+        {"content_id": "a", "title": "存在", "URL": "u1"},
+        {"content_id": "b", "title": "新規", "URL": "u2"},
+    ]
+    registered = MagicMock(return_value={"a"})
+
+    items = filter_unregistered_items(top, registered_content_ids=registered)
+
+    assert [i["content_id"] for i in items] == ["b"]
+    registered.assert_called_once_with(["a", "b"])
+
+
+def test_filter_requires_checker():
+    with pytest.raises(TypeError):
+        filter_unregistered_items([{"content_id": "a"}])
+
+
+def test_supabase_registered_ids_checker():
     table = MagicMock()
-    table.select.return_value.eq.return_value.execute.return_value = MagicMock(data=[{"id": 1}])
-    assert supabase_exists_checker(table)("x") is True
+    table.select.return_value.in_.return_value.execute.return_value = MagicMock(
+        data=[{"content_id": "x"}]
+    )
+    assert supabase_registered_ids_checker(table)(["x", "y"]) == {"x"}
+    table.select.return_value.in_.assert_called_once_with("content_id", ["x", "y"])
 
-    table.select.return_value.eq.return_value.execute.return_value = MagicMock(data=[])
-    assert supabase_exists_checker(table)("y") is False
 
+def test_load_registered_index_failure_falls_back_to_table_queries():
+    table = MagicMock()
+    table.select.return_value.in_.return_value.execute.return_value = MagicMock(
+        data=[{"content_id": "x"}]
+    )
+    with patch.object(RegisteredContentIdIndex, "load", side_effect=httpx.ConnectError("down")):
+        index = load_registered_index(table)
+
+    assert index is None
+    assert registered_ids_checker(table, index)(["x", "y"]) == {"x"}
 
-def test_supabase_exists_checker_retries_remote_protocol_error():
+
+def test_registered_ids_checker_prefers_index():
     table = MagicMock()
-    table.select.return_value.eq.return_value.execute.side_effect = [
-        httpx.RemoteProtocolError("disconnect"),
-        MagicMock(data=[{"id": 1}]),
-    ]
-    with patch("utils.supabase_retry.time.sleep"):
-        assert supabase_exists_checker(table)("x") is True
-    assert table.select.return_value.eq.return_value.execute.call_count == 2
+    checker = registered_ids_checker(table, RegisteredContentIdIndex(["a"]))
+    assert checker(["a", "b"]) == {"a"}
+    table.select.assert_not_called()
 
 
 def test_run_items_isolated_continues_after_failure():
@@ -0,0 +1,98 @@
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+if "openai" not in sys.modules:
+    openai_mock = MagicMock()
+    openai_mock.OpenAI = MagicMock()
+    sys.modules["openai"] = openai_mock
+
+from openai_api import content_generator as cg
+
+SUMMARY_HTML = '<html><body><div class="summary__txt">あらすじ本文</div></body></html>'
+EMPTY_HTML = "<html><body><p>no synopsis</p></body></html>"
+URL = "https://video.dmm.co.jp/av/content/?id=abc001"
+
+
+def _response(text, url=URL):
+    res = MagicMock()
+    res.text = text
+    res.url = url
+    return res
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    fresh = cg.SynopsisFetchStats()
+    monkeypatch.setattr(cg, "synopsis_stats", fresh)
+    return fresh
+
+
+def test_create_synopsis_session_sets_age_cookie_and_pool():
+    session = cg.create_synopsis_session(pool_size=3)
+    try:
+        assert session.cookies.get("age_check_done", domain=".dmm.co.jp") == "1"
+        assert session.cookies.get("age_check_done", domain=".dmm.com") == "1"
+        assert session.get_adapter("https://book.dmm.co.jp")._pool_maxsize == 3
+    finally:
+        session.close()
+
+
+def test_fetch_synopsis_http_treats_age_check_redirect_as_empty():
+    session = MagicMock()
+    session.get.return_value = _response(
+        SUMMARY_HTML, url="https://www.dmm.co.jp/age_check/=/declared=yes/"
+    )
+    with patch.object(cg, "get_synopsis_session", return_value=session):
+        assert cg.fetch_synopsis_http(URL) == ""
+
+
+def test_scrape_product_details_uses_http_without_browser(stats):
+    session = MagicMock()
+    session.get.return_value = _response(SUMMARY_HTML)
+    with patch.object(cg, "get_synopsis_session", return_value=session), patch.object(
+        cg, "get_page_source_with_age_verification"
+    ) as browser:
+        assert cg.scrape_product_details(URL) == "あらすじ本文"
+
+    browser.assert_not_called()
+    assert stats.snapshot()["http_hits"] == 1
+    assert stats.fallback_rate == 0.0
+
+
+def test_scrape_product_details_falls_back_to_browser_when_empty(stats):
+    session = MagicMock()
+    session.get.return_value = _response(EMPTY_HTML)
+    with patch.object(cg, "get_synopsis_session", return_value=session), patch.object(
+        cg, "get_page_source_with_age_verification", return_value=SUMMARY_HTML
+    ) as browser:
+        assert cg.scrape_product_details(URL) == "あらすじ本文"
+
+    browser.assert_called_once_with(URL)
+    snapshot = stats.snapshot()
+    assert snapshot["browser_fallbacks"] == 1
+    assert snapshot["browser_hits"] == 1
+    assert stats.fallback_rate == 1.0
+
+
+def test_scrape_product_details_falls_back_on_http_error(stats):
+    session = MagicMock()
+    session.get.side_effect = cg.requests.ConnectionError("down")
+    with patch.object(cg, "get_synopsis_session", return_value=session), patch.object(
+        cg, "get_page_source_with_age_verification", side_effect=RuntimeError("chrome")
+    ):
+        assert cg.scrape_product_details(URL) == ""
+
+    snapshot = stats.snapshot()
+    assert snapshot["browser_fallbacks"] == 1
+    assert snapshot["browser_hits"] == 0
+
+
+def test_fallback_rate_counts_both_paths():
+    stats = cg.SynopsisFetchStats()
+    for _ in range(3):
+        stats.record(fallback=False, found=True)
+    stats.record(fallback=True, found=False)
+    assert stats.total == 4
+    assert stats.fallback_rate == pytest.approx(0.25)
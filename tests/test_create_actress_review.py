@@ -168,6 +168,34 @@ def test_process_actresses_success(review_module):
                 sleep_mock.assert_called_once()
 
 
+def test_regenerate_ignores_cached_profile(review_module, monkeypatch, tmp_path):
+    from openai_api import llm_gateway
+
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(llm_gateway, "token_limiter", None)
+    actress = {"actress_id": 1, "name": "A"}
+    key = llm_gateway.cache_key(
+        review_module.OPENAI_MODEL,
+        review_module.build_actress_messages(actress),
+        {"response_format": {"type": "json_object"}},
+    )
+    llm_gateway.write_cache(key, review_module.OPENAI_MODEL, json.dumps({"ai_summary": "old"}))
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps({"ai_summary": "new"})
+    response.choices[0].finish_reason = "stop"
+    review_module.client = MagicMock()
+    review_module.client.chat.completions.create.return_value = response
+
+    with patch.object(review_module, "save_actress_ai") as save_mock, patch.object(
+        review_module.time, "sleep"
+    ):
+        review_module.process_actresses([actress])
+        assert save_mock.call_args.args[1] == {"ai_summary": "old"}
+        review_module.process_actresses([actress], regenerate=True)
+        assert save_mock.call_args.args[1] == {"ai_summary": "new"}
+    review_module.client.chat.completions.create.assert_called_once()
+
+
 def test_process_actresses_ai_failure(review_module):
     actresses = [{"actress_id": 2, "name": "B"}]
 
@@ -221,3 +249,89 @@ def test_main_conflicting_args(review_module):
         with pytest.raises(SystemExit) as exc:
             review_module.main(["--actress-id", "1", "--name", "A"])
         assert exc.value.code == 1
+
+
+def test_process_actresses_batch(review_module, monkeypatch, tmp_path):
+    from functools import partial
+
+    from openai_api import llm_batch
+
+    monkeypatch.setattr("openai_api.llm_gateway.LLM_CACHE_DIR", "")
+    monkeypatch.setattr(
+        llm_batch,
+        "run_batch",
+        partial(llm_batch.run_batch, workdir=tmp_path, sleep=lambda s: None),
+    )
+
+    def handler(body):
+        assert body["response_format"] == {"type": "json_object"}
+        if "名前: B" in body["messages"][1]["content"]:
+            return "not json"
+        return json.dumps({"ai_summary": "s", "ai_career": "c", "ai_appeal": "a"})
+
+    review_module.client = llm_batch.LocalBatchClient(handler)
+    mock_supabase = _mock_supabase(review_module)
+
+    saved = review_module.process_actresses_batch(
+        [{"actress_id": 1, "name": "A"}, {"actress_id": 2, "name": "B"}]
+    )
+
+    assert saved == 1
+    rows = mock_supabase.table.return_value.upsert.call_args.args[0]
+    assert rows == [
+        {
+            "actress_id": 1,
+            "name": "A",
+            "ai_summary": "s",
+            "ai_career": "c",
+            "ai_appeal": "a",
+            "ai_generated_at": rows[0]["ai_generated_at"],
+        }
+    ]
+    mock_supabase.table.assert_called_with("mst_actress")
+
+
+def test_main_batch_flag(review_module):
+    actresses = [{"actress_id": 1, "name": "A"}]
+
+    with patch.object(review_module, "get_target_actresses", return_value=actresses):
+        with patch.object(review_module, "process_actresses_batch") as batch_mock:
+            with patch.object(review_module, "process_actresses") as process_mock:
+                review_module.main(["--batch"])
+    batch_mock.assert_called_once_with(actresses, regenerate=False)
+    process_mock.assert_not_called()
+
+
+def test_main_batch_regenerate_sends_request_despite_cache(review_module, monkeypatch, tmp_path):
+    from functools import partial
+
+    from openai_api import llm_batch, llm_gateway
+
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path / "llm"))
+    monkeypatch.setattr(
+        llm_batch,
+        "run_batch",
+        partial(llm_batch.run_batch, workdir=tmp_path, sleep=lambda s: None),
+    )
+    actress = {"actress_id": 1, "name": "A"}
+    key = llm_gateway.cache_key(
+        review_module.OPENAI_MODEL,
+        review_module.build_actress_messages(actress),
+        {"response_format": {"type": "json_object"}},
+    )
+    llm_gateway.write_cache(key, review_module.OPENAI_MODEL, json.dumps({"ai_summary": "old"}))
+    sent = []
+
+    def handler(body):
+        sent.append(body)
+        return json.dumps({"ai_summary": "new", "ai_career": "c", "ai_appeal": "a"})
+
+    review_module.client = llm_batch.LocalBatchClient(handler)
+    mock_supabase = _mock_supabase(review_module)
+
+    with patch.object(review_module, "get_target_actresses", return_value=[actress]):
+        review_module.main(["--batch", "--actress-id", "1"])
+
+    assert len(sent) == 1
+    rows = mock_supabase.table.return_value.upsert.call_args.args[0]
+    assert rows[0]["ai_summary"] == "new"
@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import importlib
 import sys
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from utils.chromedriver import DriverPool
+
 
 def load_create_ai_review_module():
     module_name = "scripts.process.create_ai_review"
@@ -26,6 +30,13 @@ def create_ai_review():
     return load_create_ai_review_module()
 
 
+def install_driver(module, driver):
+    """module.driver_pool を driver を 1 台だけ作るプールに差し替え、factory を返す。"""
+    factory = MagicMock(return_value=driver)
+    module.driver_pool = DriverPool(factory, quit_driver=lambda d: d.quit())
+    return factory
+
+
 class TestNormalizeReviewCount:
     def test_none_and_empty(self, create_ai_review):
         assert create_ai_review.normalize_review_count(None) == 0
@@ -88,8 +99,7 @@ class TestShouldSkipSeleniumPrecheck:
 class TestProcessContentPrecheck:
     def test_skips_chrome_when_db_zero_and_summary_exists(self, create_ai_review):
         create_ai_review.get_saved_summary = MagicMock(return_value="あらすじ本文")
-        create_driver = MagicMock()
-        create_ai_review.create_driver = create_driver
+        create_driver = install_driver(create_ai_review, MagicMock())
         scrape = MagicMock()
         create_ai_review.scrape_review_comments = scrape
 
@@ -107,7 +117,7 @@ class TestProcessContentPrecheck:
     def test_opens_chrome_when_review_count_positive(self, create_ai_review):
         create_ai_review.get_saved_summary = MagicMock(return_value="あらすじ本文")
         driver = MagicMock()
-        create_ai_review.create_driver = MagicMock(return_value=driver)
+        create_driver = install_driver(create_ai_review, driver)
         create_ai_review.scrape_review_comments = MagicMock(return_value=[])
         create_ai_review.save_raw_reviews = MagicMock()
         create_ai_review.generate_review_insights = MagicMock(return_value=None)
@@ -121,14 +131,15 @@ class TestProcessContentPrecheck:
             db_review_count=2,
         )
 
-        create_ai_review.create_driver.assert_called_once()
+        create_driver.assert_called_once()
         create_ai_review.scrape_review_comments.assert_called_once()
-        driver.quit.assert_called_once()
+        # 作品ごとに quit せずプールへ返す
+        driver.quit.assert_not_called()
 
     def test_opens_chrome_when_zero_but_no_summary(self, create_ai_review):
         create_ai_review.get_saved_summary = MagicMock(return_value=None)
         driver = MagicMock()
-        create_ai_review.create_driver = MagicMock(return_value=driver)
+        create_driver = install_driver(create_ai_review, driver)
         create_ai_review.scrape_review_comments = MagicMock(return_value=[])
         create_ai_review.save_raw_reviews = MagicMock()
         create_ai_review.scrape_product_summary = MagicMock(return_value="初回あらすじ")
@@ -142,7 +153,25 @@ class TestProcessContentPrecheck:
             db_review_count=0,
         )
 
-        create_ai_review.create_driver.assert_called_once()
+        create_driver.assert_called_once()
+        # 作品ごとに quit せずプールへ返す
+        driver.quit.assert_not_called()
+
+
+    def test_reuses_pooled_driver_across_items(self, create_ai_review):
+        create_ai_review.get_saved_summary = MagicMock(return_value=None)
+        driver = MagicMock()
+        create_driver = install_driver(create_ai_review, driver)
+        create_ai_review.scrape_review_comments = MagicMock(side_effect=RuntimeError("x"))
+
+        for cid in ("a", "b", "c"):
+            create_ai_review.process_content(
+                cid, "https://example.com", "digital", "videoa", db_review_count=1
+            )
+
+        create_driver.assert_called_once()
+        assert create_ai_review.scrape_review_comments.call_count == 3
+        create_ai_review.driver_pool.close()
         driver.quit.assert_called_once()
 
 
@@ -156,7 +185,7 @@ class TestProcessContentAgeGate:
     def test_opens_chrome_when_age_gate_summary_and_review_zero(self, create_ai_review):
         create_ai_review.get_saved_summary = MagicMock(return_value=AGE_GATE_SUMMARY)
         driver = MagicMock()
-        create_ai_review.create_driver = MagicMock(return_value=driver)
+        create_driver = install_driver(create_ai_review, driver)
         create_ai_review.scrape_review_comments = MagicMock(return_value=[])
         create_ai_review.save_raw_reviews = MagicMock()
         create_ai_review.scrape_product_summary = MagicMock(
@@ -172,14 +201,15 @@ class TestProcessContentAgeGate:
             db_review_count=0,
         )
 
-        create_ai_review.create_driver.assert_called_once()
+        create_driver.assert_called_once()
         create_ai_review.scrape_product_summary.assert_called_once()
-        driver.quit.assert_called_once()
+        # 作品ごとに quit せずプールへ返す
+        driver.quit.assert_not_called()
 
     def test_uses_auto_summary_when_scrape_empty(self, create_ai_review):
         create_ai_review.get_saved_summary = MagicMock(return_value=AGE_GATE_SUMMARY)
         driver = MagicMock()
-        create_ai_review.create_driver = MagicMock(return_value=driver)
+        create_driver = install_driver(create_ai_review, driver)
         create_ai_review.scrape_review_comments = MagicMock(return_value=[])
         create_ai_review.save_raw_reviews = MagicMock()
         create_ai_review.scrape_product_summary = MagicMock(return_value="")
@@ -195,13 +225,14 @@ class TestProcessContentAgeGate:
             fallback_summary=fallback,
         )
 
+        create_driver.assert_called_once()
         kwargs = create_ai_review.generate_review_insights.call_args.kwargs
         assert kwargs["html_summary"] == fallback
 
     def test_uses_title_and_genres_when_auto_summary_empty(self, create_ai_review):
         create_ai_review.get_saved_summary = MagicMock(return_value=None)
         driver = MagicMock()
-        create_ai_review.create_driver = MagicMock(return_value=driver)
+        create_driver = install_driver(create_ai_review, driver)
         create_ai_review.scrape_review_comments = MagicMock(return_value=[])
         create_ai_review.save_raw_reviews = MagicMock()
         create_ai_review.scrape_product_summary = MagicMock(return_value="")
@@ -217,6 +248,7 @@ class TestProcessContentAgeGate:
             genres=["素人配信", "ハメ撮り"],
         )
 
+        create_driver.assert_called_once()
         kwargs = create_ai_review.generate_review_insights.call_args.kwargs
         assert "タイトル: みな" in kwargs["html_summary"]
         assert "ジャンル: 素人配信 / ハメ撮り" in kwargs["html_summary"]
@@ -224,7 +256,7 @@ class TestProcessContentAgeGate:
     def test_skips_ai_when_no_synopsis(self, create_ai_review):
         create_ai_review.get_saved_summary = MagicMock(return_value=None)
         driver = MagicMock()
-        create_ai_review.create_driver = MagicMock(return_value=driver)
+        create_driver = install_driver(create_ai_review, driver)
         create_ai_review.scrape_review_comments = MagicMock(return_value=[])
         create_ai_review.save_raw_reviews = MagicMock()
         create_ai_review.scrape_product_summary = MagicMock(return_value="")
@@ -238,6 +270,8 @@ class TestProcessContentAgeGate:
             db_review_count=1,
         )
 
+        # レビューは Chrome で読むが、あらすじが無いので AI は呼ばない
+        create_driver.assert_called_once()
         create_ai_review.generate_review_insights.assert_not_called()
 
     def test_regenerates_when_reviews_unchanged_but_summary_is_age_gate(
@@ -245,7 +279,7 @@ class TestProcessContentAgeGate:
     ):
         create_ai_review.get_saved_summary = MagicMock(return_value=AGE_GATE_SUMMARY)
         driver = MagicMock()
-        create_ai_review.create_driver = MagicMock(return_value=driver)
+        create_driver = install_driver(create_ai_review, driver)
         create_ai_review.scrape_review_comments = MagicMock(
             return_value=[{"rating": 5, "text": "良い"}]
         )
@@ -264,10 +298,261 @@ class TestProcessContentAgeGate:
             db_review_count=1,
         )
 
+        create_driver.assert_called_once()
         create_ai_review.scrape_product_summary.assert_called_once()
         create_ai_review.has_no_review_changed.assert_not_called()
 
 
+def _row(cid: str) -> dict:
+    return {
+        "content_id": cid,
+        "item_url": f"https://example.com/{cid}",
+        "service": "digital",
+        "floor": "videoa",
+        "review_count": 1,
+    }
+
+
+class TestProcessItemsParallel:
+    def test_isolates_failures_and_skips(self, create_ai_review):
+        def prepare(content_id, **kwargs):
+            if content_id == "boom":
+                raise RuntimeError("scrape failed")
+            if content_id == "skip":
+                return None
+            return {"content_id": content_id}
+
+        finished = []
+
+        def finish(job):
+            if job["content_id"] == "ai_fail":
+                raise RuntimeError("llm failed")
+            finished.append(job["content_id"])
+
+        create_ai_review.prepare_content = MagicMock(side_effect=prepare)
+        create_ai_review.finish_content = MagicMock(side_effect=finish)
+        rows = [_row(c) for c in ("a", "boom", "skip", "ai_fail", "b")]
+
+        create_ai_review.process_items_parallel(rows, workers=3, ai_workers=2)
+
+        assert create_ai_review.prepare_content.call_count == 5
+        assert create_ai_review.finish_content.call_count == 3
+        assert sorted(finished) == ["a", "b"]
+
+    def test_ai_concurrency_is_capped_separately(self, create_ai_review):
+        lock = threading.Lock()
+        active = {"now": 0, "max": 0}
+
+        def finish(job):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.01)
+            with lock:
+                active["now"] -= 1
+
+        create_ai_review.prepare_content = MagicMock(
+            side_effect=lambda content_id, **kw: {"content_id": content_id}
+        )
+        create_ai_review.finish_content = MagicMock(side_effect=finish)
+
+        create_ai_review.process_items_parallel(
+            [_row(str(i)) for i in range(8)], workers=4, ai_workers=1
+        )
+
+        assert create_ai_review.finish_content.call_count == 8
+        assert active["max"] == 1
+
+    def test_prepare_returns_driver_before_ai(self, create_ai_review):
+        create_ai_review.get_saved_summary = MagicMock(return_value=None)
+        driver = MagicMock()
+        install_driver(create_ai_review, driver)
+        create_ai_review.scrape_review_comments = MagicMock(return_value=[{"rating": 4, "text": "t"}])
+        create_ai_review.save_raw_reviews = MagicMock()
+        create_ai_review.scrape_product_summary = MagicMock(
+            return_value="作品固有のあらすじを40文字以上で書いた本文です。"
+        )
+
+        job = create_ai_review.prepare_content(
+            "cid", "https://example.com", "digital", "videoa", db_review_count=1
+        )
+
+        assert job["reviews"] == [{"rating": 4, "text": "t"}]
+        # AI 分析前に driver はプールへ戻っている
+        assert create_ai_review.driver_pool.lease(timeout=0) is driver
+
+
+class TestPrefetchPrecheckState:
+    def _table(self, pages):
+        table = MagicMock()
+        for name in ("select", "in_", "order", "range"):
+            getattr(table, name).return_value = table
+        table.execute.side_effect = pages
+        return table
+
+    def test_prefetch_replaces_per_item_queries(self, create_ai_review):
+        reviews = [{"text": "x"}, {"text": "y"}]
+        fingerprint = create_ai_review.review_set_fingerprint("a", reviews)
+        summaries = self._table(
+            [
+                MagicMock(
+                    data=[
+                        {"content_id": "a", "summary_text": "あらすじ", "review_fingerprint": fingerprint},
+                        {"content_id": "c", "summary_text": "あらすじ", "review_fingerprint": None},
+                    ]
+                )
+            ]
+        )
+        legacy_ids = [create_ai_review.generate_review_id("c", r["text"]) for r in reviews]
+        raw = self._table([MagicMock(data=[{"content_id": "c", "review_id": i} for i in legacy_ids])])
+        client = MagicMock()
+        client.table.side_effect = lambda name: {
+            "dmm_ai_review_summaries": summaries,
+            "dmm_raw_reviews": raw,
+        }[name]
+        create_ai_review.supabase = client
+
+        create_ai_review.prefetch_precheck_state(["a", "b", "c", "a"])
+        calls_after_prefetch = client.table.call_count
+
+        assert summaries.in_.call_args.args == ("content_id", ["a", "b", "c"])
+        # 指紋のある a・サマリーの無い b は review_id を読まない
+        assert raw.in_.call_args.args == ("content_id", ["c"])
+        assert create_ai_review.get_saved_summary("a") == "あらすじ"
+        assert create_ai_review.get_saved_summary("b") is None
+        assert create_ai_review.has_no_review_changed("a", reviews)
+        assert not create_ai_review.has_no_review_changed("a", reviews + [{"text": "z"}])
+        assert create_ai_review.has_no_review_changed("c", reviews)
+        assert not create_ai_review.has_no_review_changed("c", reviews[:1])
+        assert client.table.call_count == calls_after_prefetch
+
+    def test_pages_within_chunk(self, create_ai_review):
+        create_ai_review.CONTENT_ID_CHUNK_SIZE = 2
+        full = MagicMock(data=[{"content_id": "a", "review_id": str(i)} for i in range(1000)])
+        table = self._table([full, MagicMock(data=[]), MagicMock(data=[{"content_id": "c", "review_id": "z"}])])
+        create_ai_review.supabase = MagicMock()
+        create_ai_review.supabase.table.return_value = table
+
+        rows = create_ai_review._fetch_rows_in_chunks(
+            "dmm_raw_reviews", "content_id, review_id", ["a", "b", "c"], order_by=("content_id",)
+        )
+
+        assert len(rows) == 1001
+        assert [c.args for c in table.range.call_args_list] == [(0, 999), (1000, 1999), (0, 999)]
+
+    def test_drop_precheck_skips(self, create_ai_review):
+        create_ai_review._prefetched_summaries.update({"zero_saved": "あらすじ", "zero_new": None})
+        rows = [
+            dict(_row("zero_saved"), review_count=0),
+            dict(_row("zero_new"), review_count=0),
+            dict(_row("positive"), review_count=3),
+        ]
+        create_ai_review._prefetched_summaries["positive"] = "あらすじ"
+
+        kept = create_ai_review.drop_precheck_skips(rows)
+
+        assert [r["content_id"] for r in kept] == ["zero_new", "positive"]
+
+
+class TestReviewFingerprint:
+    def test_order_and_duplicates_do_not_matter(self, create_ai_review):
+        fp = create_ai_review.review_set_fingerprint
+        a = [{"text": "良い"}, {"text": "悪い"}]
+        assert fp("c1", a) == fp("c1", list(reversed(a)) + [{"text": " 良い "}])
+        assert fp("c1", a) != fp("c1", a[:1])
+        assert fp("c1", a) != fp("c2", a)
+
+    def test_same_count_different_reviews_is_change(self, create_ai_review):
+        old = [{"text": "a"}, {"text": "b"}]
+        create_ai_review._prefetched_fingerprints["cid"] = create_ai_review.review_set_fingerprint(
+            "cid", old
+        )
+        assert create_ai_review.has_no_review_changed("cid", old)
+        assert not create_ai_review.has_no_review_changed("cid", [{"text": "a"}, {"text": "c"}])
+
+    def test_summary_saves_fingerprint(self, create_ai_review):
+        create_ai_review.generate_review_insights = MagicMock(return_value={"review_digest": "d"})
+        create_ai_review.save_ai_summary = MagicMock()
+        create_ai_review.save_weekly_score = MagicMock()
+        reviews = [{"rating": 5, "text": "良い"}]
+
+        create_ai_review.finish_content(
+            {
+                "content_id": "cid",
+                "service_code": "digital",
+                "floor_code": "videoa",
+                "reviews": reviews,
+                "html_summary": "あらすじ",
+            }
+        )
+
+        summary = create_ai_review.save_ai_summary.call_args.args[0]
+        assert summary["review_fingerprint"] == create_ai_review.review_set_fingerprint(
+            "cid", reviews
+        )
+
+
+class TestProcessItemsBatch:
+    def test_scrapes_then_writes_batch_results(self, create_ai_review, monkeypatch, tmp_path):
+        import json
+        from functools import partial
+
+        from openai_api import llm_batch
+
+        monkeypatch.setattr("openai_api.llm_gateway.LLM_CACHE_DIR", "")
+        monkeypatch.setattr(
+            llm_batch,
+            "run_batch",
+            partial(llm_batch.run_batch, workdir=tmp_path, sleep=lambda s: None),
+        )
+
+        def prepare(content_id, product_url, service_code, floor_code, **kwargs):
+            if content_id == "skip":
+                return None
+            return {
+                "content_id": content_id,
+                "service_code": service_code,
+                "floor_code": floor_code,
+                "reviews": [{"rating": 4, "text": "良い"}],
+                "html_summary": f"あらすじ cid={content_id}",
+            }
+
+        def handler(body):
+            if "cid=b" in body["messages"][1]["content"]:
+                raise RuntimeError("boom")
+            return json.dumps({"review_digest": "d", "content_score": 80})
+
+        create_ai_review.prepare_content = MagicMock(side_effect=prepare)
+        create_ai_review.client = llm_batch.LocalBatchClient(handler)
+        tables = {"dmm_ai_review_summaries": MagicMock(), "trn_dmm_score_history": MagicMock()}
+        create_ai_review.supabase = MagicMock()
+        create_ai_review.supabase.table.side_effect = tables.__getitem__
+        rows = [_row("a"), _row("skip"), _row("c"), _row("b")]
+
+        saved = create_ai_review.process_items_batch(rows, workers=2)
+
+        assert saved == 2
+        summary_call = tables["dmm_ai_review_summaries"].upsert.call_args
+        assert [s["content_id"] for s in summary_call.args[0]] == ["a", "c"]
+        assert summary_call.args[0][0]["review_digest"] == "d"
+        assert summary_call.kwargs["on_conflict"] == "content_id"
+        score_call = tables["trn_dmm_score_history"].upsert.call_args
+        assert [s["content_id"] for s in score_call.args[0]] == ["a", "c"]
+        assert score_call.kwargs["on_conflict"] == "content_id,snapshot_date"
+
+    def test_main_ai_batch(self, create_ai_review):
+        create_ai_review.fetch_recent_items = MagicMock(return_value=[_row("a")])
+        create_ai_review.prefetch_precheck_state = MagicMock()
+        create_ai_review.drop_precheck_skips = MagicMock(side_effect=lambda items: items)
+        create_ai_review.process_items_batch = MagicMock(return_value=1)
+        create_ai_review.process_batch = MagicMock()
+
+        create_ai_review.main(["--ai-batch"])
+
+        create_ai_review.process_batch.assert_not_called()
+        create_ai_review.process_items_batch.assert_called_once_with([_row("a")], workers=1)
+
+
 class TestCreateAiReviewCli:
     def test_parse_args(self, create_ai_review):
         args = create_ai_review.parse_args(
@@ -277,6 +562,22 @@ class TestCreateAiReviewCli:
         assert args.dry_run is True
         assert args.limit == 3
         assert args.content_id == "pai436"
+        assert args.workers == 1
+
+    def test_main_workers_uses_parallel_pool(self, create_ai_review):
+        create_ai_review.fetch_recent_items = MagicMock(return_value=[_row("a")])
+        create_ai_review.prefetch_precheck_state = MagicMock()
+        create_ai_review.drop_precheck_skips = MagicMock(side_effect=lambda items: items)
+        create_ai_review.process_items_parallel = MagicMock()
+        create_ai_review.process_batch = MagicMock()
+
+        create_ai_review.main(["--workers", "3", "--ai-workers", "2"])
+
+        create_ai_review.process_batch.assert_not_called()
+        create_ai_review.process_items_parallel.assert_called_once_with(
+            [_row("a")], workers=3, ai_workers=2
+        )
+        assert create_ai_review.driver_pool.size == 3
 
     def test_main_dry_run_empty_summary(self, create_ai_review, capsys):
         create_ai_review.fetch_empty_summary_items = MagicMock(
@@ -375,6 +676,45 @@ class TestCreateAiReviewCli:
         with patch.object(create_ai_review.supabase, "table", return_value=table):
             assert create_ai_review.fetch_recent_items() == []
 
+    def test_main_stops_when_all_items_skippable(self, create_ai_review):
+        create_ai_review.fetch_recent_items = MagicMock(
+            return_value=[dict(_row("a"), review_count=0)]
+        )
+        create_ai_review.prefetch_precheck_state = MagicMock()
+        create_ai_review._prefetched_summaries["a"] = "あらすじ"
+        create_ai_review.process_batch = MagicMock()
+
+        create_ai_review.main([])
+
+        create_ai_review.prefetch_precheck_state.assert_called_once()
+        create_ai_review.process_batch.assert_not_called()
+
+    def test_main_can_run_twice_with_a_fresh_pool(self, create_ai_review):
+        create_ai_review.fetch_recent_items = MagicMock(return_value=[_row("a")])
+        create_ai_review.prefetch_precheck_state = MagicMock()
+        create_ai_review.drop_precheck_skips = MagicMock(side_effect=lambda items: items)
+        pools = []
+
+        def new_pool(*args):
+            pools.append(DriverPool(MagicMock, quit_driver=MagicMock()))
+            return pools[-1]
+
+        def process_batch(batch_items, batch_index, total):
+            with create_ai_review.driver_pool.driver():
+                pass
+
+        create_ai_review.create_driver_pool = new_pool
+        create_ai_review.process_batch = process_batch
+
+        with patch("utils.chromedriver.is_driver_alive", return_value=True), patch(
+            "utils.chromedriver.driver_heap_mb", return_value=None
+        ):
+            create_ai_review.main([])
+            create_ai_review.main([])
+
+        assert len(pools) == 2
+        assert all(pool._closed for pool in pools)
+
     def test_main_content_id_missing_exits(self, create_ai_review):
         create_ai_review.fetch_item_by_content_id = MagicMock(return_value=[])
         with pytest.raises(SystemExit) as exc:
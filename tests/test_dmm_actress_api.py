@@ -175,14 +175,14 @@ def test_extract_embedded_field():
 
 def test_dmm_get_success():
     payload = {"result": {"status": "200", "actress": []}}
-    with patch("dmm.dmm_actress_api.requests.get", return_value=FakeResponse(payload)):
+    with patch("dmm.dmm_actress_api.dmm_api_get", return_value=FakeResponse(payload)):
         result = api._dmm_get("https://example.com", {"a": 1})
         assert result["status"] == "200"
 
 
 def test_dmm_get_api_error():
     payload = {"result": {"status": "400", "message": "bad request"}}
-    with patch("dmm.dmm_actress_api.requests.get", return_value=FakeResponse(payload)):
+    with patch("dmm.dmm_actress_api.dmm_api_get", return_value=FakeResponse(payload)):
         with pytest.raises(Exception, match="API error"):
             api._dmm_get("https://example.com", {})
 
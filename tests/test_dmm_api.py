@@ -0,0 +1,124 @@
+"""dmm.dmm_api の ItemList 取得・並列統合を検証する。"""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db.registered_content_ids import RegisteredContentIdIndex
+from dmm import dmm_api
+
+
+def _response(items):
+    res = MagicMock()
+    res.json.return_value = {"result": {"status": 200, "items": items}}
+    return res
+
+
+def _item(cid):
+    return {"content_id": cid, "sampleImageURL": {"sample_l": {"image": []}}}
+
+
+class TestFetchItems:
+    def test_skips_registered_using_index(self):
+        with patch.object(
+            dmm_api, "dmm_api_get", return_value=_response([_item("a"), _item("b"), {}])
+        ):
+            items = dmm_api.fetch_items(
+                "FANZA",
+                "digital",
+                "videoa",
+                supabase_client=MagicMock(),
+                registered_index=RegisteredContentIdIndex(["a"]),
+            )
+        assert [i["content_id"] for i in items] == ["b"]
+
+    def test_single_batch_lookup_per_page(self):
+        client = MagicMock()
+        table = client.table.return_value
+        table.select.return_value.in_.return_value.execute.return_value = MagicMock(
+            data=[{"content_id": "b"}]
+        )
+        with patch.object(
+            dmm_api, "dmm_api_get", return_value=_response([_item("a"), _item("b")])
+        ):
+            items = dmm_api.fetch_items("FANZA", "digital", "videoa", supabase_client=client)
+        assert [i["content_id"] for i in items] == ["a"]
+        table.select.return_value.in_.assert_called_once_with("content_id", ["a", "b"])
+
+    def test_lookup_failure_keeps_page_as_unregistered(self):
+        client = MagicMock()
+        client.table.side_effect = RuntimeError("db down")
+        with patch.object(
+            dmm_api, "dmm_api_get", return_value=_response([_item("a"), _item("b")])
+        ):
+            items = dmm_api.fetch_items("FANZA", "digital", "videoa", supabase_client=client)
+        assert [i["content_id"] for i in items] == ["a", "b"]
+
+
+class TestFetchTargetsMergedSorts:
+    def test_merge_order_independent_of_completion(self):
+        pages = {
+            ("comic", "rank"): ["r1", "r2"],
+            ("comic", "date"): ["d1", "r1"],
+            ("comic", "review"): ["v1", "d1"],
+            ("novel", "rank"): ["n1"],
+            ("novel", "date"): [],
+            ("novel", "review"): ["n2"],
+        }
+        # rank を最後に完了させても並びは rank → date → review の先勝ち
+        delays = {"rank": 0.05, "date": 0.0, "review": 0.02}
+
+        def fake_fetch(**kwargs):
+            time.sleep(delays[kwargs["sort"]])
+            return [{"content_id": cid} for cid in pages[(kwargs["floor"], kwargs["sort"])]]
+
+        targets = [
+            {"site": "DMM.R18", "service": "ebook", "floor": "comic"},
+            {"site": "FANZA", "service": "ebook", "floor": "novel"},
+        ]
+        with patch.object(dmm_api, "fetch_items", side_effect=fake_fetch):
+            results = dmm_api.fetch_targets_merged_sorts(targets, max_in_flight=6)
+
+        assert [i["content_id"] for i in results[0]] == ["r1", "r2", "d1", "v1"]
+        assert [i["content_id"] for i in results[1]] == ["n1", "n2"]
+
+    def test_respects_max_in_flight(self):
+        lock = threading.Lock()
+        state = {"now": 0, "peak": 0}
+
+        def fake_fetch(**_kwargs):
+            with lock:
+                state["now"] += 1
+                state["peak"] = max(state["peak"], state["now"])
+            time.sleep(0.01)
+            with lock:
+                state["now"] -= 1
+            return []
+
+        targets = [{"site": "s", "service": "v", "floor": str(i)} for i in range(4)]
+        with patch.object(dmm_api, "fetch_items", side_effect=fake_fetch):
+            dmm_api.fetch_targets_merged_sorts(targets, max_in_flight=2)
+        assert state["peak"] <= 2
+
+    def test_failed_target_is_isolated(self):
+        def fake_fetch(**kwargs):
+            if kwargs["floor"] == "bad" and kwargs["sort"] == "date":
+                raise RuntimeError("http 500")
+            return [{"content_id": f"{kwargs['floor']}-{kwargs['sort']}"}]
+
+        targets = [
+            {"site": "s", "service": "v", "floor": "bad"},
+            {"site": "s", "service": "v", "floor": "ok"},
+        ]
+        with patch.object(dmm_api, "fetch_items", side_effect=fake_fetch):
+            results = dmm_api.fetch_targets_merged_sorts(targets, sorts=("rank", "date"))
+
+        assert isinstance(results[0], RuntimeError)
+        assert [i["content_id"] for i in results[1]] == ["ok-rank", "ok-date"]
+
+    def test_fetch_items_merged_sorts_raises_target_error(self):
+        with patch.object(dmm_api, "fetch_items", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                dmm_api.fetch_items_merged_sorts("s", "v", "f")
@@ -0,0 +1,151 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from dmm import dmm_http
+from dmm.dmm_http import (
+    DMM_API_TIMEOUT,
+    TokenBucketRateLimiter,
+    backoff_delay,
+    create_dmm_session,
+    dmm_api_get,
+    get_dmm_session,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _response(status, headers=None):
+    res = MagicMock()
+    res.status_code = status
+    res.headers = headers or {}
+    return res
+
+
+def test_create_dmm_session_pool_size():
+    session = create_dmm_session(pool_size=3)
+    try:
+        assert isinstance(session, requests.Session)
+        assert session.get_adapter("https://api.dmm.com")._pool_maxsize == 3
+    finally:
+        session.close()
+
+
+def test_get_dmm_session_is_shared():
+    assert get_dmm_session() is get_dmm_session()
+
+
+class TestTokenBucketRateLimiter:
+    def test_burst_then_waits_for_refill(self):
+        clock = FakeClock()
+        limiter = TokenBucketRateLimiter(2.0, burst=2, clock=clock, sleep=clock.sleep)
+
+        assert limiter.acquire() == 0
+        assert limiter.acquire() == 0
+        assert limiter.acquire() == pytest.approx(0.5)
+        assert clock.sleeps == [pytest.approx(0.5)]
+
+    def test_refill_capped_at_burst(self):
+        clock = FakeClock()
+        limiter = TokenBucketRateLimiter(1.0, burst=1, clock=clock, sleep=clock.sleep)
+        limiter.acquire()
+        clock.now += 100
+        assert limiter.acquire() == 0
+        assert limiter.acquire() == pytest.approx(1.0)
+
+    def test_pause_blocks_until_deadline(self):
+        clock = FakeClock()
+        limiter = TokenBucketRateLimiter(10.0, burst=5, clock=clock, sleep=clock.sleep)
+        limiter.pause(3.0)
+        limiter.pause(1.0)  # 短い pause で期限は縮まない
+        assert limiter.acquire() == pytest.approx(3.0)
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucketRateLimiter(0)
+
+
+class TestParseRetryAfter:
+    def test_seconds_and_invalid(self):
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after("-1") == 0.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("") is None
+        assert parse_retry_after("soon") is None
+
+    def test_http_date(self):
+        now = datetime(2026, 8, 19, 8, 0, 0, tzinfo=timezone.utc)
+        assert parse_retry_after("Wed, 19 Aug 2026 08:00:30 GMT", now=now) == 30.0
+        assert parse_retry_after("Wed, 19 Aug 2026 07:59:00 GMT", now=now) == 0.0
+
+
+def test_backoff_delay_grows_and_caps():
+    with patch("dmm.dmm_http.random.uniform", return_value=0.0):
+        assert backoff_delay(0) == 1.0
+        assert backoff_delay(3) == 8.0
+        assert backoff_delay(20) == dmm_http.DMM_API_BACKOFF_MAX
+
+
+class TestDmmApiGet:
+    @pytest.fixture(autouse=True)
+    def limiter(self):
+        limiter = MagicMock()
+        with patch.object(dmm_http, "rate_limiter", limiter):
+            yield limiter
+
+    def test_sets_default_timeout(self, limiter):
+        with patch.object(dmm_http, "get_dmm_session") as get_session:
+            get_session.return_value.get.return_value = _response(200)
+            dmm_api_get("https://example.com", {"a": 1})
+        get_session.return_value.get.assert_called_once_with(
+            "https://example.com", params={"a": 1}, timeout=DMM_API_TIMEOUT
+        )
+        limiter.acquire.assert_called_once()
+
+    def test_retries_429_with_retry_after(self, limiter):
+        ok = _response(200)
+        with patch.object(dmm_http, "get_dmm_session") as get_session:
+            get_session.return_value.get.side_effect = [
+                _response(429, {"Retry-After": "4"}),
+                ok,
+            ]
+            assert dmm_api_get("https://example.com", {}) is ok
+        limiter.pause.assert_called_once_with(4.0)
+        assert limiter.acquire.call_count == 2
+
+    def test_retries_5xx_with_backoff_then_returns_last(self, limiter):
+        with patch.object(dmm_http, "get_dmm_session") as get_session, patch.object(
+            dmm_http, "backoff_delay", return_value=0.25
+        ):
+            get_session.return_value.get.return_value = _response(503)
+            res = dmm_api_get("https://example.com", {}, retries=3)
+        assert res.status_code == 503
+        assert limiter.pause.call_args_list == [((0.25,),), ((0.25,),)]
+
+    def test_does_not_retry_4xx(self, limiter):
+        with patch.object(dmm_http, "get_dmm_session") as get_session:
+            get_session.return_value.get.return_value = _response(404)
+            assert dmm_api_get("https://example.com", {}).status_code == 404
+        limiter.pause.assert_not_called()
+
+    def test_retries_connection_error_then_raises(self, limiter):
+        with patch.object(dmm_http, "get_dmm_session") as get_session:
+            get_session.return_value.get.side_effect = requests.ConnectionError("dns")
+            with pytest.raises(requests.ConnectionError):
+                dmm_api_get("https://example.com", {}, retries=2)
+        assert get_session.return_value.get.call_count == 2
+        limiter.pause.assert_called_once()
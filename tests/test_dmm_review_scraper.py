@@ -35,6 +35,56 @@ EMPTY_REVIEW_HTML = """
 """
 
 
+DIGITAL_REVIEW_HTML = """
+<html><body>
+<div id="review">
+  <div class="border rounded-lg border-gray-300">
+    <span>総評価</span>
+    <img src="https://assets.video.dmm.co.jp/icon/star/yellow.svg" width="50" height="50">
+    <span>(2件のコメント)</span>
+  </div>
+  <div class="review-list">
+    <div class="card">
+      <div class="head">
+        <img src="https://assets.video.dmm.co.jp/icon/star/yellow.svg" width="24" height="24">
+        <img src="https://assets.video.dmm.co.jp/icon/star/yellow.svg" width="24" height="24">
+        <img src="https://assets.video.dmm.co.jp/icon/star/yellow.svg" width="24" height="24">
+        <img src="https://assets.video.dmm.co.jp/icon/star/yellow.svg" width="24" height="24">
+        <span class="font-bold">最高の一本</span>
+      </div>
+      <p>演技も構成も素晴らしく、何度も見返しています。</p>
+      <a href="https://review.dmm.co.jp/review-front/reviewer/list/1">花子</a>
+      <time datetime="2026-08-10">2026/08/10</time>
+      <p>このレビューは参考になりましたか？</p>
+    </div>
+    <div class="card">
+      <div class="head">
+        <img src="https://assets.video.dmm.co.jp/icon/star/yellow.svg" width="24" height="24">
+        <img src="https://assets.video.dmm.co.jp/icon/star/yellow.svg" width="24" height="24">
+        <img src="https://assets.video.dmm.co.jp/icon/star/half-yellow.svg" width="24" height="24">
+      </div>
+      <p>前半は良かったが後半が少し冗長に感じました。女優さんの魅力は十分に伝わってくるので、次回作にも期待しています。</p>
+      <a href="https://review.dmm.co.jp/review-front/reviewer/list/2">次郎</a>
+      <span>2026.07.01</span>
+    </div>
+  </div>
+</div>
+</body></html>
+"""
+
+
+def _probe_driver(*probes):
+    """execute_script がレビュー欄の probe を順に返す（最後の値を返し続ける）driver。"""
+    driver = MagicMock()
+    queue = [dict(p) for p in probes]
+
+    def execute_script(script, *args):
+        return queue.pop(0) if len(queue) > 1 else queue[0]
+
+    driver.execute_script.side_effect = execute_script
+    return driver
+
+
 class TestReviewCommentCount:
     def test_none_and_empty(self):
         assert scraper.review_comment_count_from_text(None) is None
@@ -101,70 +151,87 @@ class TestParseE2eVideoReviewsHtml:
 
 class TestWaitAndHydrate:
     def test_wait_returns_empty_when_zero_comments(self):
-        root = MagicMock()
-        root.text = "総評価数 4 (0件のコメント)"
-
-        def find_elements(by, sel):
-            if sel == "review":
-                return [root]
-            return []
-
-        driver = MagicMock()
-        driver.find_elements.side_effect = find_elements
+        driver = _probe_driver({"root": True, "text": "総評価数 4 (0件のコメント)"})
         assert scraper._wait_video_review_ui(driver, timeout=0.4) == "empty"
 
     def test_wait_returns_legacy_when_items_present(self):
-        driver = MagicMock()
-
-        def find_elements(by, sel):
-            if sel == '[data-e2eid="review-item"]':
-                return [MagicMock()]
-            return []
-
-        driver.find_elements.side_effect = find_elements
+        driver = _probe_driver({"root": False, "e2e": 2})
         assert scraper._wait_video_review_ui(driver, timeout=0.4) == "legacy"
 
-    def test_wait_times_out_to_digital_if_only_shell(self):
-        root = MagicMock()
-        root.text = "ユーザーレビュー"
+    def test_wait_returns_comic_section(self):
+        driver = _probe_driver({"comic": True})
+        assert scraper._wait_video_review_ui(driver, timeout=0.4) == "comic"
 
-        def find_elements(by, sel):
-            if sel == "review":
-                return [root]
-            return []
+    def test_wait_returns_digital_as_soon_as_cards_render(self):
+        driver = _probe_driver(
+            {"root": True, "text": "ユーザーレビュー"},
+            {"root": True, "text": "ユーザーレビュー (3件のコメント)", "reviewers": 3},
+        )
+        assert scraper._wait_video_review_ui(driver, timeout=5) == "digital"
+        assert driver.execute_script.call_count == 2
 
-        driver = MagicMock()
-        driver.find_elements.side_effect = find_elements
+    def test_wait_times_out_to_digital_if_only_shell(self):
+        driver = _probe_driver({"root": True, "text": "ユーザーレビュー"})
         assert scraper._wait_video_review_ui(driver, timeout=0.3) == "digital"
 
     def test_wait_returns_none_without_review(self):
-        driver = MagicMock()
-        driver.find_elements.return_value = []
+        driver = _probe_driver({"root": False})
         assert scraper._wait_video_review_ui(driver, timeout=0.3) is None
 
-    def test_hydrate_returns_empty(self):
-        root = MagicMock()
-        root.text = "この作品に最初のレビューを書いてみませんか？"
-        root.find_elements.return_value = []
+    def test_wait_treats_script_error_as_missing(self):
         driver = MagicMock()
-        driver.find_element.return_value = root
-        driver.find_elements.return_value = []
+        driver.execute_script.side_effect = RuntimeError("js")
+        assert scraper._wait_video_review_ui(driver, timeout=0.2) is None
+
+    def test_hydrate_returns_empty(self):
+        driver = _probe_driver(
+            {"root": True, "text": "この作品に最初のレビューを書いてみませんか？"}
+        )
         assert scraper._hydrate_fanza_digital_review_list(driver, timeout=0.4) == "empty"
 
     def test_hydrate_returns_ready_on_e2e_item(self):
-        root = MagicMock()
-        root.text = "総評価数 1 (1件のコメント)"
-        root.find_elements.return_value = []
+        driver = _probe_driver({"root": True, "text": "総評価数 1 (1件のコメント)", "e2e": 1})
+        assert scraper._hydrate_fanza_digital_review_list(driver, timeout=0.4) == "ready"
+
+    def test_hydrate_scrolls_and_returns_ready_on_card_stars(self):
+        driver = _probe_driver(
+            {"root": True, "text": "(1件のコメント)"},
+            {"root": True, "text": "(1件のコメント)", "cardStars": 4},
+        )
+        assert scraper._hydrate_fanza_digital_review_list(driver, timeout=5) == "ready"
+        assert driver.execute_script.call_args.args[1] == 500
+
+    def test_hydrate_timeout(self):
+        driver = _probe_driver({"root": True, "text": "(1件のコメント)"})
+        assert scraper._hydrate_fanza_digital_review_list(driver, timeout=0.2) is None
+
+
+class TestWaitForDomQuiet:
+    def test_returns_when_quiet(self):
         driver = MagicMock()
-        driver.find_element.return_value = root
+        driver.execute_script.side_effect = [True, 50.0, 120.0, 400.0]
+        assert scraper.wait_for_dom_quiet(driver, quiet=0.2, timeout=5) is True
+        assert driver.execute_script.call_count == 4
 
-        def find_elements(by, sel):
-            if sel == '[data-e2eid="review-item"]':
-                return [MagicMock()]
-            return []
+    def test_observer_failure_does_not_wait(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = RuntimeError("js")
+        assert scraper.wait_for_dom_quiet(driver, timeout=5) is False
 
-        driver.find_elements.side_effect = find_elements
-        assert scraper._hydrate_fanza_digital_review_list(driver, timeout=0.4) == "ready"
+    def test_lost_observer_counts_as_settled(self):
+        driver = MagicMock()
+        driver.execute_script.side_effect = [True, None]
+        assert scraper.wait_for_dom_quiet(driver, timeout=5) is True
+
+    def test_expand_waits_for_dom_after_click(self):
+        button = MagicMock()
+        driver = MagicMock()
+        driver.find_elements.side_effect = lambda by, sel: (
+            [button] if "続きを読む" in sel and driver.find_elements.call_count <= 6 else []
+        )
+        with patch.object(scraper, "wait_for_dom_quiet") as quiet:
+            scraper.expand_hidden_reviews(driver)
+        quiet.assert_called_once_with(driver)
 
 
 class TestGetVideoReviews:
@@ -188,12 +255,10 @@ class TestGetVideoReviews:
         with (
             patch.object(scraper, "_wait_video_review_ui", return_value="legacy"),
             patch.object(scraper, "expand_hidden_reviews"),
-            patch.object(scraper, "time") as t,
             patch.object(
                 scraper, "_parse_legacy_e2e_video_reviews", return_value=expected
             ),
         ):
-            t.sleep.return_value = None
             assert scraper.get_video_reviews(driver, "https://example/x") == expected
 
     def test_digital_hydrate_empty_skips(self):
@@ -201,49 +266,52 @@ class TestGetVideoReviews:
         with (
             patch.object(scraper, "_wait_video_review_ui", return_value="digital"),
             patch.object(scraper, "expand_hidden_reviews"),
-            patch.object(scraper, "time") as t,
             patch.object(
                 scraper, "_hydrate_fanza_digital_review_list", return_value="empty"
             ),
             patch.object(scraper, "_parse_legacy_e2e_video_reviews") as parse,
         ):
-            t.sleep.return_value = None
             assert scraper.get_video_reviews(driver, "https://example/x") == []
             parse.assert_not_called()
 
     def test_digital_hydrate_then_legacy_html(self):
         driver = MagicMock()
+        driver.page_source = AMATEUR_REVIEW_HTML
         expected = [{"rating": 4.0, "text": "body", "title": "t"}]
-
-        def find_elements(by, sel):
-            if sel == '[data-e2eid="review-item"]':
-                return [MagicMock()]
-            return []
-
-        driver.find_elements.side_effect = find_elements
         with (
             patch.object(scraper, "_wait_video_review_ui", return_value="digital"),
             patch.object(scraper, "expand_hidden_reviews"),
-            patch.object(scraper, "time") as t,
             patch.object(
                 scraper, "_hydrate_fanza_digital_review_list", return_value="ready"
             ),
             patch.object(
                 scraper, "_parse_legacy_e2e_video_reviews", return_value=expected
-            ),
+            ) as parse,
         ):
-            t.sleep.return_value = None
             assert scraper.get_video_reviews(driver, "https://example/x") == expected
+            parse.assert_called_once_with(AMATEUR_REVIEW_HTML, 10)
+
+    def test_digital_parses_single_page_source(self):
+        driver = MagicMock()
+        driver.page_source = DIGITAL_REVIEW_HTML
+        with (
+            patch.object(scraper, "_wait_video_review_ui", return_value="digital"),
+            patch.object(scraper, "expand_hidden_reviews"),
+            patch.object(
+                scraper, "_hydrate_fanza_digital_review_list", return_value="ready"
+            ),
+        ):
+            reviews = scraper.get_video_reviews(driver, "https://example/x")
+        assert [r["reviewer"] for r in reviews] == ["花子", "次郎"]
+        driver.find_element.assert_not_called()
 
     def test_comic_path(self):
         driver = MagicMock()
         with (
             patch.object(scraper, "_wait_video_review_ui", return_value="comic"),
             patch.object(scraper, "expand_hidden_reviews"),
-            patch.object(scraper, "time") as t,
             patch.object(scraper, "_parse_comic_reviews", return_value=[]),
         ):
-            t.sleep.return_value = None
             assert scraper.get_video_reviews(driver, "https://example/x") == []
 
     def test_parse_error_returns_empty(self):
@@ -254,17 +322,72 @@ class TestGetVideoReviews:
             assert scraper.get_video_reviews(driver, "https://example/x") == []
 
 
-class TestLegacyHtmlFallback:
-    def test_uses_html_parser_from_review_root(self):
-        root = MagicMock()
-        root.get_attribute.return_value = AMATEUR_REVIEW_HTML
-        driver = MagicMock()
-        driver.find_element.return_value = root
-        reviews = scraper._parse_legacy_e2e_video_reviews(driver, max_reviews=10)
+class TestLegacyHtml:
+    def test_parses_page_source(self):
+        reviews = scraper._parse_legacy_e2e_video_reviews(AMATEUR_REVIEW_HTML, max_reviews=10)
         assert len(reviews) == 1
         assert "面白かったです。" in reviews[0]["text"]
 
 
+class TestParseFanzaDigitalHtml:
+    def test_reviewer_link_cards(self):
+        reviews = scraper.parse_fanza_digital_video_reviews_html(DIGITAL_REVIEW_HTML)
+        assert len(reviews) == 2
+        first, second = reviews
+        assert first["reviewer"] == "花子"
+        assert first["rating"] == 4.0
+        assert first["title"] == "最高の一本"
+        assert first["text"].startswith("最高の一本\n")
+        assert "参考になりましたか" not in first["text"]
+        assert first["date"] == "2026-08-10"
+        assert second["rating"] == 2.0
+        assert second["date"] == "2026-07-01"
+
+    def test_summary_stars_are_not_cards(self):
+        reviews = scraper.parse_fanza_digital_video_reviews_html(DIGITAL_REVIEW_HTML)
+        assert all("総評価" not in r["text"] for r in reviews)
+
+    def test_star_fallback_without_reviewer_links(self):
+        html = DIGITAL_REVIEW_HTML.replace("/review-front/reviewer/", "/profile/")
+        reviews = scraper.parse_fanza_digital_video_reviews_html(html)
+        assert len(reviews) == 2
+        assert reviews[0]["rating"] == 4.0
+        assert reviews[0]["title"] == ""
+
+    def test_hidden_spoiler_text_is_ignored(self):
+        spoiler = (
+            '<p style="display: none">隠れたネタバレ本文</p>'
+            '<div hidden>折りたたみ</div>'
+            '<span class="hidden">非表示クラス</span>'
+            '<script>var x = 1;</script>'
+        )
+        html = DIGITAL_REVIEW_HTML.replace(
+            "<p>演技も構成も", spoiler + "<p>演技も構成も"
+        ).replace(
+            "<p>前半は良かったが", '<span class="hidden md:inline">広い画面だけ</span><p>前半は良かったが'
+        )
+        plain = scraper.parse_fanza_digital_video_reviews_html(DIGITAL_REVIEW_HTML)
+        reviews = scraper.parse_fanza_digital_video_reviews_html(html)
+
+        assert reviews[0] == plain[0]
+        assert "広い画面だけ" in reviews[1]["text"]
+
+    def test_text_nodes_are_separated_by_newlines(self):
+        html = DIGITAL_REVIEW_HTML.replace(
+            "<p>演技も構成も素晴らしく、何度も見返しています。</p>",
+            "<p>演技も構成も素晴らしく、</p><p>何度も見返しています。</p>",
+        )
+        text = scraper.parse_fanza_digital_video_reviews_html(html)[0]["text"]
+        assert "素晴らしく、\n何度も" in text
+
+    def test_empty_list_and_missing_root(self):
+        assert scraper.parse_fanza_digital_video_reviews_html(EMPTY_REVIEW_HTML) == []
+        assert scraper.parse_fanza_digital_video_reviews_html("<div></div>") == []
+        assert scraper.parse_fanza_digital_video_reviews_html(DIGITAL_REVIEW_HTML, 1)[0][
+            "reviewer"
+        ] == "花子"
+
+
 NESTED_COMIC_HTML = """
 <section data-section-name="review">
   <div class="outer">
@@ -309,16 +432,61 @@ class TestParseComicReviewsHtml:
         assert len(reviews) == 1
         assert reviews[0]["reviewer"] == "ｎｏｎｏｎｏ"
 
-    def test_driver_uses_html_parser(self):
-        root = MagicMock()
-        root.get_attribute.return_value = NESTED_COMIC_HTML
-        driver = MagicMock()
-        driver.find_elements.return_value = [root]
-        reviews = scraper._parse_comic_reviews(driver, max_reviews=10)
+    def test_page_source_uses_html_parser(self):
+        html = f"<html><body><nav>menu</nav>{NESTED_COMIC_HTML}</body></html>"
+        reviews = scraper._parse_comic_reviews(html, max_reviews=10)
         assert len(reviews) == 2
 
-    def test_driver_no_section(self):
+    def test_page_source_without_section(self):
+        assert scraper._parse_comic_reviews("<html><body></body></html>", max_reviews=10) == []
+
+
+DOUJIN_REVIEW_HTML = """
+<html><body>
+<div id="review_anchor">
+  <ul>
+    <li class="dcd-review__unit">
+      <span class="dcd-review-rating-40"></span>
+      <span class="dcd-review__unit__title">期待以上</span>
+      <span class="dcd-review__unit__postdate">- 2026/08/02</span>
+      <span class="dcd-review__unit__reviewer"><a href="/u/1">同人好き</a></span>
+      <div class="dcd-review__unit__comment">絵柄がとても好みでした。</div>
+      <div class="dcd-review__unit__comment">続編希望。</div>
+    </li>
+    <li class="dcd-review__unit">
+      <span class="dcd-review__unit__title"></span>
+    </li>
+  </ul>
+</div>
+</body></html>
+"""
+
+
+class TestParseDoujinReviewsHtml:
+    def test_units(self):
+        reviews = scraper.parse_doujin_reviews_html(DOUJIN_REVIEW_HTML)
+        assert reviews == [
+            {
+                "rating": 4.0,
+                "text": "期待以上\n絵柄がとても好みでした。\n続編希望。",
+                "date": "2026/08/02",
+                "reviewer": "同人好き",
+            }
+        ]
+
+    def test_empty(self):
+        assert scraper.parse_doujin_reviews_html("") == []
+        assert scraper.parse_doujin_reviews_html("<div id='review_anchor'></div>") == []
+
+    def test_get_doujin_reviews_reads_page_source_once(self):
         driver = MagicMock()
-        driver.find_elements.return_value = []
-        assert scraper._parse_comic_reviews(driver, max_reviews=10) == []
+        driver.page_source = DOUJIN_REVIEW_HTML
+        driver.find_elements.return_value = [MagicMock()]
+        with (
+            patch.object(scraper, "WebDriverWait"),
+            patch.object(scraper, "expand_hidden_reviews"),
+        ):
+            reviews = scraper.get_doujin_reviews(driver, "https://example/d")
+        assert [r["reviewer"] for r in reviews] == ["同人好き"]
+        driver.find_element.assert_not_called()
 
@@ -0,0 +1,151 @@
+"""AI 生成文の後段生成（pending → done）のテスト。"""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+from db.registered_content_ids import RegisteredContentIdIndex
+from db.trn_dmm_items_repository import _insert_dmm_item, has_ai_content
+from scripts.process import generate_item_content as gen
+
+AI_OK = {"auto_comment": "一言", "auto_summary": "概要", "auto_point": "ポイント"}
+AI_EMPTY = {"auto_comment": "", "auto_summary": "", "auto_point": ""}
+
+
+def _item(content_id="cid1"):
+    return {
+        "content_id": content_id,
+        "title": "t",
+        "URL": "https://example.com/i",
+        "iteminfo": {},
+        "prices": {},
+        "imageURL": {},
+        "sampleImageURL": {},
+    }
+
+
+def _insert(client, **kwargs):
+    with patch(
+        "db.trn_dmm_items_repository.execute_with_retry",
+        side_effect=lambda builder: builder().execute(),
+    ):
+        _insert_dmm_item(
+            _item(),
+            [],
+            None,
+            "FANZA",
+            "digital",
+            "videoa",
+            supabase_client=client,
+            upload_local_image_to_s3_fn=MagicMock(),
+            coerce_empty_image_urls=True,
+            registered_index=RegisteredContentIdIndex(),
+            **kwargs,
+        )
+    return client.table.return_value.insert.call_args[0][0]
+
+
+class TestInsertDefersAiContent:
+    def test_default_inserts_pending_without_generating(self):
+        with patch("db.trn_dmm_items_repository.generate_content") as generate:
+            payload = _insert(MagicMock())
+        generate.assert_not_called()
+        assert payload["ai_content_status"] == "pending"
+        assert payload["auto_summary"] == ""
+
+    def test_inline_generation_marks_done(self):
+        with patch("db.trn_dmm_items_repository.generate_content", return_value=AI_OK):
+            payload = _insert(MagicMock(), generate_ai=True)
+        assert payload["ai_content_status"] == "done"
+        assert payload["auto_summary"] == "概要"
+
+    def test_inline_failure_stays_pending(self):
+        with patch("db.trn_dmm_items_repository.generate_content", return_value=AI_EMPTY):
+            payload = _insert(MagicMock(), generate_ai=True)
+        assert payload["ai_content_status"] == "pending"
+
+    def test_has_ai_content(self):
+        assert has_ai_content(AI_OK)
+        assert not has_ai_content(AI_EMPTY)
+        assert not has_ai_content({})
+
+
+class TestProcessOneRow:
+    def test_done_updates_fields(self):
+        client = MagicMock()
+        row = {"content_id": "c1", "raw_json": {"title": "x"}}
+        with patch.object(gen, "generate_content", return_value=AI_OK):
+            with patch.object(gen, "update_pending_row", return_value=True) as upd:
+                assert gen.process_one_row(row, client=client, dry_run=False) == "done"
+        upd.assert_called_once_with(client, "c1", {**AI_OK, "ai_content_status": "done"})
+
+    def test_empty_result_counts_failure(self):
+        client = MagicMock()
+        row = {"content_id": "c1", "raw_json": {}, "ai_content_attempts": 1}
+        with patch.object(gen, "generate_content", return_value=AI_EMPTY):
+            with patch.object(gen, "update_pending_row", return_value=True) as upd:
+                assert gen.process_one_row(row, client=client, dry_run=False) == "failed"
+        upd.assert_called_once_with(client, "c1", {"ai_content_attempts": 2})
+
+    def test_failure_threshold_marks_failed(self):
+        client = MagicMock()
+        with patch.object(gen, "update_pending_row", return_value=True) as upd:
+            assert gen.record_generation_failure(client, "c1", gen.MAX_ATTEMPTS - 1) == 3
+        upd.assert_called_once_with(
+            client, "c1", {"ai_content_attempts": 3, "ai_content_status": "failed"}
+        )
+
+    def test_skips_invalid_raw_json(self):
+        with patch.object(gen, "generate_content") as generate:
+            row = {"content_id": "c1", "raw_json": None}
+            assert gen.process_one_row(row, client=MagicMock(), dry_run=False) == "skipped"
+        generate.assert_not_called()
+
+    def test_dry_run_does_not_generate(self):
+        with patch.object(gen, "generate_content") as generate:
+            row = {"content_id": "c1", "raw_json": {}}
+            assert gen.process_one_row(row, client=MagicMock(), dry_run=True) == "done"
+        generate.assert_not_called()
+
+
+class TestRunGeneration:
+    def test_drains_pages_with_keyset_and_limit(self):
+        pages = [
+            [{"content_id": "a", "raw_json": {}}, {"content_id": "b", "raw_json": {}}],
+            [{"content_id": "c", "raw_json": {}}],
+        ]
+        fetch = MagicMock(side_effect=pages)
+        with patch.object(gen, "resolve_db_client", return_value=MagicMock()):
+            with patch.object(gen, "fetch_pending_rows", fetch):
+                with patch.object(gen, "process_one_row", return_value="done") as proc:
+                    code = gen.run_generation(
+                        db_name="default", workers=2, limit=None, dry_run=False, page_size=2
+                    )
+        assert code == 0
+        assert proc.call_count == 3
+        assert [c.kwargs["after"] for c in fetch.call_args_list] == [None, "b"]
+
+    def test_limit_caps_fetch_size(self):
+        fetch = MagicMock(return_value=[{"content_id": "a", "raw_json": {}}])
+        with patch.object(gen, "resolve_db_client", return_value=MagicMock()):
+            with patch.object(gen, "fetch_pending_rows", fetch):
+                with patch.object(gen, "process_one_row", return_value="failed"):
+                    code = gen.run_generation(
+                        db_name="default", workers=1, limit=1, dry_run=False, page_size=50
+                    )
+        assert code == 1
+        assert fetch.call_count == 1
+        assert fetch.call_args.kwargs["limit"] == 1
+
+    def test_exception_records_failure(self):
+        client = MagicMock()
+        fetch = MagicMock(side_effect=[[{"content_id": "a", "raw_json": {}}], []])
+        with patch.object(gen, "resolve_db_client", return_value=client):
+            with patch.object(gen, "fetch_pending_rows", fetch):
+                with patch.object(gen, "process_one_row", side_effect=RuntimeError("boom")):
+                    with patch.object(gen, "record_generation_failure") as rec:
+                        code = gen.run_generation(
+                            db_name="default", workers=1, limit=None, dry_run=False, page_size=1
+                        )
+        assert code == 1
+        rec.assert_called_once_with(client, "a", None)
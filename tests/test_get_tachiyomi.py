@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 import utils.get_tachiyomi as tachiyomi
 
 
@@ -145,3 +147,313 @@ def test_is_end_of_book_legacy():
     driver.find_elements.return_value = [el]
     with patch.object(tachiyomi, "detect_viewer_kind", return_value="legacy"):
         assert tachiyomi.is_end_of_book(driver) is True
+
+
+def _data_url(fmt):
+    import base64
+    import io
+
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (4, 6), "red").save(buf, fmt)
+    mime = "image/webp" if fmt == "webp" else "image/png"
+    return f"data:{mime};base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def test_save_data_url_writes_webp_bytes_directly(tmp_path):
+    path = tmp_path / "page_001.webp"
+    with patch.object(tachiyomi, "Image") as image_mock:
+        tachiyomi.save_data_url_as_webp(_data_url("webp"), str(path))
+    image_mock.open.assert_not_called()
+    assert path.read_bytes()[8:12] == b"WEBP"
+
+
+def test_save_data_url_converts_png_to_webp(tmp_path):
+    path = tmp_path / "page_001.webp"
+    tachiyomi.save_data_url_as_webp(_data_url("png"), str(path))
+    assert path.read_bytes()[8:12] == b"WEBP"
+
+
+def test_wait_for_rendered_canvas_polls_until_changed():
+    driver = MagicMock()
+    driver.execute_script.side_effect = [
+        {"blank": True, "sig": "0"},
+        {"same": True, "sig": "prev"},
+        {"sig": "next", "data": "data:image/webp;base64,"},
+    ]
+    with patch.object(tachiyomi, "get_visible_canvas", return_value=MagicMock()):
+        with patch.object(tachiyomi, "TACHIYOMI_RENDER_POLL", 0.001):
+            snapshot = tachiyomi.wait_for_rendered_canvas(driver, "prev", timeout=2)
+    assert snapshot["sig"] == "next"
+    assert driver.execute_script.call_count == 3
+    assert driver.execute_script.call_args.args[2] == "prev"
+
+
+def test_wait_for_rendered_canvas_forces_read_on_timeout():
+    driver = MagicMock()
+    driver.execute_script.return_value = {"same": True, "sig": "prev"}
+    with patch.object(tachiyomi, "get_visible_canvas", return_value=MagicMock()):
+        with patch.object(tachiyomi, "TACHIYOMI_RENDER_POLL", 0.001):
+            tachiyomi.wait_for_rendered_canvas(driver, "prev", timeout=0.01)
+    # 最後の呼び出しは force=True
+    assert driver.execute_script.call_args.args[3] is True
+
+
+def test_wait_for_rendered_canvas_settles_quickly_on_unchanged_page():
+    import time as _time
+
+    driver = MagicMock()
+    driver.execute_script.side_effect = lambda js, canvas, sig, force, *a: (
+        {"sig": "prev", "data": "data:image/webp;base64,"} if force else {"same": True, "sig": "prev"}
+    )
+    started = _time.monotonic()
+    with patch.object(tachiyomi, "get_visible_canvas", return_value=MagicMock()):
+        with patch.object(tachiyomi, "TACHIYOMI_RENDER_POLL", 0.001):
+            snapshot = tachiyomi.wait_for_rendered_canvas(driver, "prev", timeout=5, settle=0.02)
+    assert snapshot["data"]
+    assert _time.monotonic() - started < 1
+
+
+def test_capture_data_url_mode_reads_canvas_without_screenshots(tmp_path):
+    driver = MagicMock()
+    canvas = MagicMock()
+    snapshots = [
+        {"sig": "1", "data": _data_url("webp")},
+        {"sig": "2", "data": _data_url("webp")},
+    ]
+
+    class FakeWait:
+        def __init__(self, drv, timeout, **kwargs):
+            self.timeout = timeout
+
+        def until(self, method):
+            if self.timeout == 20:
+                return "publus"
+            return method(driver)
+
+    with patch.object(tachiyomi, "create_chrome_driver", return_value=driver), patch.object(
+        tachiyomi, "quit_chrome_driver"
+    ), patch.object(tachiyomi, "WebDriverWait", FakeWait), patch.object(
+        tachiyomi, "ActionChains"
+    ), patch.object(tachiyomi.os.path, "dirname", return_value=str(tmp_path)), patch.object(
+        tachiyomi, "is_end_of_book", return_value=False
+    ), patch.object(tachiyomi, "get_page_counter", return_value=(1, 2)), patch.object(
+        tachiyomi, "read_canvas_snapshot", side_effect=snapshots
+    ) as read_mock, patch.object(tachiyomi, "TACHIYOMI_CAPTURE_MODE", "dataurl"), patch.object(
+        tachiyomi.time, "sleep"
+    ) as sleep_mock:
+        result = tachiyomi.capture_all_tachiyomi_pages("https://example.com/t")
+
+    assert [p.rsplit("/", 1)[-1] for p in result] == ["page_001.webp", "page_002.webp"]
+    assert read_mock.call_args.kwargs["previous_sig"] == "1"
+    canvas.screenshot.assert_not_called()
+    # 年齢認証クリック後の 1 秒以外は固定 sleep しない
+    assert sleep_mock.call_count <= 1
+
+
+def test_capture_falls_back_to_screenshot_when_canvas_is_tainted(tmp_path):
+    driver = MagicMock()
+
+    class FakeWait:
+        def __init__(self, drv, timeout, **kwargs):
+            self.timeout = timeout
+
+        def until(self, method):
+            if self.timeout == 20:
+                return "publus"
+            return method(driver)
+
+    with patch.object(tachiyomi, "create_chrome_driver", return_value=driver), patch.object(
+        tachiyomi, "quit_chrome_driver"
+    ), patch.object(tachiyomi, "WebDriverWait", FakeWait), patch.object(
+        tachiyomi, "ActionChains"
+    ), patch.object(tachiyomi.os.path, "dirname", return_value=str(tmp_path)), patch.object(
+        tachiyomi, "is_end_of_book", return_value=False
+    ), patch.object(tachiyomi, "get_page_counter", return_value=(1, 1)), patch.object(
+        tachiyomi, "read_canvas_snapshot", return_value={"error": "SecurityError"}
+    ), patch.object(
+        tachiyomi, "_capture_by_screenshot", return_value="page_001.webp"
+    ) as screenshot_mock, patch.object(tachiyomi, "TACHIYOMI_CAPTURE_MODE", "dataurl"), patch.object(
+        tachiyomi.time, "sleep"
+    ):
+        result = tachiyomi.capture_all_tachiyomi_pages("https://example.com/t")
+
+    assert result == ["page_001.webp"]
+    screenshot_mock.assert_called_once()
+
+
+def test_capture_unreadable_page_uses_screenshot_only_for_that_page(tmp_path):
+    driver = MagicMock()
+
+    class FakeWait:
+        def __init__(self, drv, timeout, **kwargs):
+            self.timeout = timeout
+
+        def until(self, method):
+            if self.timeout == 20:
+                return "publus"
+            return method(driver)
+
+    with patch.object(tachiyomi, "create_chrome_driver", return_value=driver), patch.object(
+        tachiyomi, "quit_chrome_driver"
+    ), patch.object(tachiyomi, "WebDriverWait", FakeWait), patch.object(
+        tachiyomi, "ActionChains"
+    ), patch.object(tachiyomi.os.path, "dirname", return_value=str(tmp_path)), patch.object(
+        tachiyomi, "is_end_of_book", return_value=False
+    ), patch.object(tachiyomi, "get_page_counter", return_value=(1, 2)), patch.object(
+        tachiyomi, "read_canvas_snapshot", side_effect=[None, {"sig": "2", "data": _data_url("webp")}]
+    ), patch.object(
+        tachiyomi, "_capture_by_screenshot", return_value="page_001.webp"
+    ) as screenshot_mock, patch.object(tachiyomi, "TACHIYOMI_CAPTURE_MODE", "dataurl"), patch.object(
+        tachiyomi.time, "sleep"
+    ):
+        result = tachiyomi.capture_all_tachiyomi_pages("https://example.com/t")
+
+    assert result[0] == "page_001.webp"
+    assert result[1].endswith("page_002.webp")
+    screenshot_mock.assert_called_once()
+
+
+def _service(workers=2):
+    pool = tachiyomi.DriverPool(MagicMock, size=workers, quit_driver=MagicMock())
+    return tachiyomi.TachiyomiCaptureService(workers, pool=pool)
+
+
+def test_capture_service_keeps_order_and_reuses_pooled_drivers():
+    import threading
+    import time as _time
+
+    drivers = set()
+    lock = threading.Lock()
+
+    def fake_capture(url, *, driver, file_prefix):
+        with lock:
+            drivers.add(id(driver))
+        _time.sleep(0.02 if url.endswith("1") else 0)
+        return [f"{file_prefix}_{url}_{i}.webp" for i in range(2)]
+
+    with patch.object(tachiyomi, "capture_all_tachiyomi_pages", side_effect=fake_capture), patch(
+        "utils.chromedriver.is_driver_alive", return_value=True
+    ), patch(
+        "utils.chromedriver.driver_heap_mb", return_value=None
+    ):
+        with _service(2) as service:
+            results = service.capture_many(["u1", None, "u2", "u3", "u4"])
+
+    assert [len(r) for r in results] == [2, 0, 2, 2, 2]
+    assert [r[0].split("_")[-2] for r in results if r] == ["u1", "u2", "u3", "u4"]
+    # 本ごとにファイル名の接頭辞が違う
+    assert len({r[0].split("_")[0] for r in results if r}) == 4
+    assert len(drivers) <= 2
+
+
+def test_prefetch_gives_duplicate_urls_their_own_files_and_bounds_read_ahead():
+    import threading
+
+    started = []
+    lock = threading.Lock()
+
+    def fake_capture(url, *, driver, file_prefix):
+        with lock:
+            started.append(url)
+        return [f"{file_prefix}_{url}.webp"]
+
+    with patch.object(tachiyomi, "capture_all_tachiyomi_pages", side_effect=fake_capture), patch(
+        "utils.chromedriver.is_driver_alive", return_value=True
+    ), patch("utils.chromedriver.driver_heap_mb", return_value=None):
+        with _service(1) as service:
+            jobs = service.prefetch(["u1", "u1", "u2", "u3", "u4"], read_ahead=2)
+            # 投入されるのは先読み上限の 2 冊まで
+            assert len(jobs._jobs) == 2
+            first = jobs.take("u1")
+            second = jobs.take("u1")
+            assert len(jobs._jobs) == 2
+            jobs.close()
+
+    assert first != second
+    assert first[0].endswith("_u1.webp") and second[0].endswith("_u1.webp")
+    assert "u4" not in started
+
+
+def test_prefetch_take_discards_skipped_books(tmp_path):
+    page = tmp_path / "skipped.webp"
+    page.write_bytes(b"x")
+    service = MagicMock()
+    service.submit.side_effect = lambda url: MagicMock(
+        cancel=MagicMock(return_value=False),
+        result=MagicMock(return_value=[str(page)] if url == "u1" else [f"{url}.webp"]),
+    )
+    jobs = tachiyomi.TachiyomiPrefetch(service, ["u1", None, "u2"], limit=2)
+
+    assert jobs.take("u2") == ["u2.webp"]
+    assert not page.exists()
+    service.capture.assert_not_called()
+    jobs.take("u9")
+    service.capture.assert_called_once_with("u9")
+
+
+def test_capture_service_launch_failure_returns_empty():
+    pool = MagicMock()
+    pool.driver.side_effect = RuntimeError("session not created")
+    with tachiyomi.TachiyomiCaptureService(1, pool=pool) as service:
+        assert service.capture_many(["u1"]) == [[]]
+    pool.close.assert_called_once()
+
+
+def test_create_tachiyomi_driver_verifies_age_once_and_quits_on_failure():
+    driver = MagicMock()
+    with patch.object(tachiyomi, "_launch_mobile_driver", return_value=driver), patch.object(
+        tachiyomi, "verify_age"
+    ) as verify:
+        assert tachiyomi.create_tachiyomi_driver() is driver
+    verify.assert_called_once_with(driver)
+
+    with patch.object(tachiyomi, "_launch_mobile_driver", return_value=driver), patch.object(
+        tachiyomi, "verify_age", side_effect=RuntimeError("top")
+    ), patch.object(tachiyomi, "quit_chrome_driver") as quit_mock:
+        with pytest.raises(RuntimeError):
+            tachiyomi.create_tachiyomi_driver()
+    quit_mock.assert_called_once_with(driver)
+
+
+def test_capture_with_pooled_driver_skips_age_check_and_quit():
+    driver = MagicMock()
+    driver.get.side_effect = RuntimeError("boom")
+    with patch.object(tachiyomi, "verify_age") as verify, patch.object(
+        tachiyomi, "quit_chrome_driver"
+    ) as quit_mock, patch.object(tachiyomi.os, "makedirs"):
+        assert tachiyomi.capture_all_tachiyomi_pages("https://example.com/t", driver=driver) == []
+    verify.assert_not_called()
+    quit_mock.assert_not_called()
+
+
+def test_capture_calls_on_page_after_each_saved_page(tmp_path):
+    driver = MagicMock()
+    snapshots = [{"sig": "1", "data": _data_url("webp")}, {"sig": "2", "data": _data_url("webp")}]
+    seen = []
+
+    class FakeWait:
+        def __init__(self, drv, timeout, **kwargs):
+            self.timeout = timeout
+
+        def until(self, method):
+            return "publus" if self.timeout == 20 else method(driver)
+
+    def on_page(index, path):
+        # コールバック時点でファイルは書き終わっている
+        seen.append((index, tachiyomi.os.path.getsize(path) > 0))
+
+    with patch.object(tachiyomi, "WebDriverWait", FakeWait), patch.object(
+        tachiyomi, "ActionChains"
+    ), patch.object(tachiyomi.os.path, "dirname", return_value=str(tmp_path)), patch.object(
+        tachiyomi, "is_end_of_book", return_value=False
+    ), patch.object(tachiyomi, "get_page_counter", return_value=(1, 2)), patch.object(
+        tachiyomi, "read_canvas_snapshot", side_effect=snapshots
+    ), patch.object(tachiyomi, "TACHIYOMI_CAPTURE_MODE", "dataurl"):
+        result = tachiyomi.capture_all_tachiyomi_pages(
+            "https://example.com/t", driver=driver, on_page=on_page
+        )
+
+    assert len(result) == 2
+    assert seen == [(1, True), (2, True)]
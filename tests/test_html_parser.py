@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+if "openai" not in sys.modules:
+    openai_mock = MagicMock()
+    openai_mock.OpenAI = MagicMock()
+    sys.modules["openai"] = openai_mock
+
+from openai_api.content_generator import parse_synopsis_html
+from utils import html_parser
+from utils.dmm_review_scraper import parse_comic_reviews_html, parse_e2e_video_reviews_html
+from utils.html_parser import (
+    E2E_REVIEW_STRAINER,
+    SYNOPSIS_STRAINER,
+    make_soup,
+    resolve_parser,
+    strip_hidden_nodes,
+)
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "html"
+PARSERS = ["html.parser"] + (["lxml"] if html_parser.lxml_available() else [])
+VIDEO_URL = "https://video.dmm.co.jp/av/content/?id=sample001"
+
+
+def _fixture(name):
+    return (FIXTURE_DIR / name).read_text(encoding="utf-8")
+
+
+@pytest.fixture(params=PARSERS)
+def parser(request, monkeypatch):
+    monkeypatch.setattr(html_parser, "HTML_PARSER", request.param)
+    return request.param
+
+
+def _both_modes(monkeypatch, func):
+    monkeypatch.setattr(html_parser, "HTML_TARGETED_PARSE", False)
+    full = func()
+    monkeypatch.setattr(html_parser, "HTML_TARGETED_PARSE", True)
+    return full, func()
+
+
+def test_resolve_parser_prefers_explicit_then_env(monkeypatch):
+    monkeypatch.setattr(html_parser, "HTML_PARSER", "html5lib")
+    assert resolve_parser("html.parser") == "html.parser"
+    assert resolve_parser() == "html5lib"
+
+
+def test_resolve_parser_falls_back_without_lxml(monkeypatch):
+    monkeypatch.setattr(html_parser, "HTML_PARSER", "")
+    monkeypatch.setattr(html_parser, "lxml_available", lambda: False)
+    assert resolve_parser() == "html.parser"
+    monkeypatch.setattr(html_parser, "lxml_available", lambda: True)
+    assert resolve_parser() == "lxml"
+
+
+def test_synopsis_strainer_keeps_only_target_subtrees(parser):
+    html = (
+        "<html><head><script>var x = 1;</script>"
+        '<script type="application/ld+json">{"description": "d"}</script></head>'
+        '<body>noise<div class="wrap"><div class="mg-b20 lh4">本文<p>続き</p></div></div>'
+        '<p class="mg-b20">対象外</p></body></html>'
+    )
+    soup = make_soup(html, parse_only=SYNOPSIS_STRAINER)
+    assert [tag.name for tag in soup.find_all(recursive=False)] == ["script", "div"]
+    assert soup.select_one("div.mg-b20.lh4").get_text() == "本文続き"
+    assert "noise" not in soup.get_text()
+
+
+def test_targeted_parse_can_be_disabled(monkeypatch, parser):
+    monkeypatch.setattr(html_parser, "HTML_TARGETED_PARSE", False)
+    soup = make_soup('<p>x</p><div data-e2eid="review-item">r</div>', parse_only=E2E_REVIEW_STRAINER)
+    assert soup.find("p") is not None
+
+
+def test_synopsis_fixture_same_result_full_and_targeted(monkeypatch, parser):
+    html = _fixture("video_product.html")
+    full, targeted = _both_modes(monkeypatch, lambda: parse_synopsis_html(html, VIDEO_URL))
+    assert targeted == full
+    assert targeted.startswith("普段は真面目な新人社員が")
+
+
+def test_e2e_review_fixture_same_result_full_and_targeted(monkeypatch, parser):
+    html = _fixture("video_product.html")
+    full, targeted = _both_modes(monkeypatch, lambda: parse_e2e_video_reviews_html(html))
+    assert targeted == full
+    assert len(targeted) == 10
+    assert targeted[0]["reviewer"] == "レビュアー0"
+
+
+def test_comic_review_fixture_same_result_full_and_targeted(monkeypatch, parser):
+    html = _fixture("comic_product.html")
+    full, targeted = _both_modes(monkeypatch, lambda: parse_comic_reviews_html(html))
+    assert targeted == full
+    assert len(targeted) == 10
+    assert targeted[1]["rating"] == 2.0
+
+
+def test_comic_reviews_without_section_fall_back_to_whole_page(parser):
+    html = (
+        '<div><div class="card"><a data-testid="nickname">読者</a>'
+        "<p>面白かったので続きも読みたいです。</p></div></div>"
+    )
+    reviews = parse_comic_reviews_html(html)
+    assert [r["reviewer"] for r in reviews] == ["読者"]
+
+
+def test_strip_hidden_nodes_keeps_only_visible_text(parser):
+    soup = make_soup(
+        '<div id="r"><p>見える</p><p style="visibility:hidden">隠れ</p>'
+        '<div hidden><p>入れ子</p></div><template>雛形</template>'
+        '<span class="hidden sm:block">広い画面</span></div>'
+    )
+    root = strip_hidden_nodes(soup.find(id="r"))
+    assert root.get_text("\n", strip=True) == "見える\n広い画面"
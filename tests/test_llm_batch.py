@@ -0,0 +1,194 @@
+"""openai_api.llm_batch の JSONL 入出力・ポーリング・キャッシュ（LocalBatchClient 使用）。"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from openai_api import llm_batch, llm_gateway
+
+MESSAGES = [{"role": "user", "content": "こんにちは"}]
+
+
+@pytest.fixture(autouse=True)
+def _no_cache(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", "")
+
+
+def _echo(body):
+    return "re:" + body["messages"][-1]["content"]
+
+
+def _run(requests, client, tmp_path, **kwargs):
+    sleeps = []
+    results = llm_batch.run_batch(
+        requests, client=client, workdir=tmp_path, sleep=sleeps.append, **kwargs
+    )
+    return results, sleeps
+
+
+def test_batch_request_line():
+    line = llm_batch.batch_request(10, MESSAGES, model="m", max_completion_tokens=5)
+    assert line == {
+        "custom_id": "10",
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {"model": "m", "messages": MESSAGES, "max_completion_tokens": 5},
+    }
+
+
+def test_round_trip_through_local_client(tmp_path):
+    client = llm_batch.LocalBatchClient(_echo)
+    requests = [
+        llm_batch.batch_request(f"id{i}", [{"role": "user", "content": f"p{i}"}], model="m")
+        for i in range(3)
+    ]
+
+    results, sleeps = _run(requests, client, tmp_path, poll_seconds=7)
+
+    assert results == {"id0": "re:p0", "id1": "re:p1", "id2": "re:p2"}
+    # retrieve 1 回目は in_progress なので 1 回待ってから完了を読む
+    assert sleeps == [7]
+    written = list(tmp_path.glob("batch_*.jsonl"))
+    assert len(written) == 1
+    lines = [json.loads(l) for l in written[0].read_text(encoding="utf-8").splitlines()]
+    assert [l["custom_id"] for l in lines] == ["id0", "id1", "id2"]
+
+
+def test_failed_requests_are_none(tmp_path):
+    def handler(body):
+        if body["messages"][0]["content"] == "bad":
+            raise ValueError("boom")
+        return "ok"
+
+    client = llm_batch.LocalBatchClient(handler)
+    requests = [
+        llm_batch.batch_request("good", [{"role": "user", "content": "good"}], model="m"),
+        llm_batch.batch_request("bad", [{"role": "user", "content": "bad"}], model="m"),
+    ]
+    results, _ = _run(requests, client, tmp_path)
+    assert results == {"good": "ok", "bad": None}
+
+
+def test_splits_into_multiple_batches(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_batch, "LLM_BATCH_MAX_REQUESTS", 2)
+    client = llm_batch.LocalBatchClient(_echo)
+    requests = [
+        llm_batch.batch_request(i, [{"role": "user", "content": str(i)}], model="m")
+        for i in range(5)
+    ]
+    results, _ = _run(requests, client, tmp_path)
+    assert results == {str(i): f"re:{i}" for i in range(5)}
+    assert len(client._batches) == 3
+
+
+def test_cached_requests_are_not_submitted(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path / "llm"))
+    calls = []
+
+    def handler(body):
+        calls.append(body)
+        return "generated"
+
+    client = llm_batch.LocalBatchClient(handler)
+    request = llm_batch.batch_request("a", MESSAGES, model="m", temperature=0.7)
+    _run([request], client, tmp_path)
+    results, _ = _run([request], client, tmp_path)
+
+    assert results == {"a": "generated"}
+    assert len(calls) == 1
+    # 同期呼び出し（llm_gateway.complete）とキャッシュを共有する
+    assert llm_gateway.complete(MESSAGES, model="m", client=object(), temperature=0.7) == "generated"
+
+
+def test_only_complete_and_valid_results_are_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path / "llm"))
+    client = llm_batch.LocalBatchClient(lambda body: body["messages"][0]["content"])
+    requests = [
+        llm_batch.batch_request(name, [{"role": "user", "content": text}], model="m")
+        for name, text in (("ok", '{"a": 1}'), ("bad", "not json"))
+    ]
+    _run(requests, client, tmp_path, validate=json.loads)
+
+    def cached(request):
+        body = dict(request["body"])
+        return llm_gateway.read_cache(
+            llm_gateway.cache_key(body.pop("model"), body.pop("messages"), body)
+        )
+
+    assert cached(requests[0]) == '{"a": 1}'
+    assert cached(requests[1]) is None
+
+
+def test_truncated_batch_result_is_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path / "llm"))
+    line = json.dumps(
+        {
+            "custom_id": "a",
+            "response": {
+                "status_code": 200,
+                "body": {"choices": [{"message": {"content": "途中"}, "finish_reason": "length"}]},
+            },
+            "error": None,
+        }
+    )
+    client = llm_batch.LocalBatchClient(_echo)
+    request = llm_batch.batch_request("a", MESSAGES, model="m")
+    batch = SimpleNamespace(status="completed", output_file_id=client._store(line), error_file_id=None)
+    monkeypatch.setattr(llm_batch, "submit_batch", lambda *a, **k: "batch-x")
+    monkeypatch.setattr(llm_batch, "wait_for_batch", lambda *a, **k: batch)
+
+    results, _ = _run([request], client, tmp_path)
+
+    assert results == {"a": "途中"}
+    assert llm_gateway.read_cache(llm_gateway.cache_key("m", MESSAGES, {})) is None
+
+
+def test_duplicate_custom_id_rejected(tmp_path):
+    client = llm_batch.LocalBatchClient(_echo)
+    request = llm_batch.batch_request("a", MESSAGES, model="m")
+    with pytest.raises(ValueError):
+        _run([request, request], client, tmp_path)
+
+
+def test_parse_batch_output_handles_http_errors():
+    text = "\n".join(
+        [
+            json.dumps(
+                {
+                    "custom_id": "x",
+                    "response": {"status_code": 400, "body": {"error": {"message": "bad"}}},
+                    "error": None,
+                }
+            ),
+            json.dumps(
+                {
+                    "custom_id": "y",
+                    "response": {
+                        "status_code": 200,
+                        "body": {"choices": [{"message": {"content": "ok"}}]},
+                    },
+                    "error": None,
+                }
+            ),
+        ]
+    )
+    assert llm_batch.parse_batch_output(text) == {"x": None, "y": "ok"}
+
+
+def test_wait_for_batch_times_out():
+    class Stuck:
+        class batches:
+            @staticmethod
+            def retrieve(batch_id):
+                return type("B", (), {"status": "in_progress"})()
+
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    with pytest.raises(TimeoutError):
+        llm_batch.wait_for_batch(
+            Stuck, "b1", poll_seconds=10, timeout_seconds=30, sleep=sleep, clock=lambda: now[0]
+        )
@@ -0,0 +1,149 @@
+"""openai_api.llm_gateway のキャッシュ・リトライ・流量制御。"""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from openai_api import llm_gateway
+from utils.rate_limit import TokenBucketRateLimiter
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = MagicMock(headers=headers or {})
+
+
+def _client(*contents_or_errors, finish_reason="stop"):
+    client = MagicMock()
+    side_effect = []
+    for item in contents_or_errors:
+        if isinstance(item, Exception):
+            side_effect.append(item)
+        else:
+            response = MagicMock()
+            response.choices[0].message.content = item
+            response.choices[0].finish_reason = finish_reason
+            side_effect.append(response)
+    client.chat.completions.create.side_effect = side_effect
+    return client
+
+
+@pytest.fixture(autouse=True)
+def _no_wait(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(llm_gateway, "token_limiter", None)
+    monkeypatch.setattr(llm_gateway.time, "sleep", sleeps.append)
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", "")
+    return sleeps
+
+
+MESSAGES = [{"role": "user", "content": "こんにちは"}]
+
+
+def test_returns_content_and_passes_params():
+    client = _client("応答")
+    assert llm_gateway.complete(MESSAGES, model="m", client=client, temperature=0.7) == "応答"
+    kwargs = client.chat.completions.create.call_args.kwargs
+    assert kwargs["model"] == "m"
+    assert kwargs["messages"] == MESSAGES
+    assert kwargs["temperature"] == 0.7
+    assert kwargs["timeout"] == llm_gateway.LLM_TIMEOUT
+
+
+def test_disk_cache_skips_second_call(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path))
+    client = _client("一回目", "二回目")
+
+    assert llm_gateway.complete(MESSAGES, model="m", client=client) == "一回目"
+    assert llm_gateway.complete(MESSAGES, model="m", client=client) == "一回目"
+    assert client.chat.completions.create.call_count == 1
+
+    # モデル・パラメータが違えば別キー
+    assert llm_gateway.complete(MESSAGES, model="m2", client=client) == "二回目"
+
+
+def test_cache_can_be_bypassed(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path))
+    client = _client("a", "b")
+    llm_gateway.complete(MESSAGES, model="m", client=client)
+    assert llm_gateway.complete(MESSAGES, model="m", client=client, use_cache=False) == "b"
+
+
+def test_truncated_response_is_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path))
+    client = _client('{"a": 1', '{"a": 1}', finish_reason="length")
+    assert llm_gateway.complete(MESSAGES, model="m", client=client) == '{"a": 1'
+    assert llm_gateway.complete(MESSAGES, model="m", client=client) == '{"a": 1}'
+    assert client.chat.completions.create.call_count == 2
+    assert not list(tmp_path.rglob("*.json"))
+
+
+def test_invalid_response_is_returned_but_not_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path))
+    client = _client("not json", '{"a": 1}', "unused")
+    assert llm_gateway.complete(MESSAGES, model="m", client=client, validate=json.loads) == "not json"
+    assert llm_gateway.complete(MESSAGES, model="m", client=client, validate=json.loads) == '{"a": 1}'
+    assert llm_gateway.complete(MESSAGES, model="m", client=client, validate=json.loads) == '{"a": 1}'
+    assert client.chat.completions.create.call_count == 2
+
+
+def test_invalid_cached_response_is_evicted(monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_gateway, "LLM_CACHE_DIR", str(tmp_path))
+    key = llm_gateway.cache_key("m", MESSAGES, {})
+    llm_gateway.write_cache(key, "m", "broken")
+    client = _client('{"a": 1}')
+    assert llm_gateway.complete(MESSAGES, model="m", client=client, validate=json.loads) == '{"a": 1}'
+    assert llm_gateway.read_cache(key) == '{"a": 1}'
+
+
+def test_retries_429_and_5xx(_no_wait):
+    client = _client(StatusError(429), StatusError(503), "ok")
+    assert llm_gateway.complete(MESSAGES, model="m", client=client) == "ok"
+    assert client.chat.completions.create.call_count == 3
+    assert len(_no_wait) == 2
+
+
+def test_honours_retry_after(_no_wait):
+    client = _client(StatusError(429, {"retry-after": "7"}), "ok")
+    llm_gateway.complete(MESSAGES, model="m", client=client)
+    assert _no_wait == [7.0]
+
+
+def test_non_retryable_error_raises_immediately():
+    client = _client(StatusError(400), "unused")
+    with pytest.raises(StatusError):
+        llm_gateway.complete(MESSAGES, model="m", client=client)
+    assert client.chat.completions.create.call_count == 1
+
+
+def test_gives_up_after_retries():
+    client = _client(StatusError(500), StatusError(500))
+    with pytest.raises(StatusError):
+        llm_gateway.complete(MESSAGES, model="m", client=client, retries=2)
+
+
+def test_token_limiter_charges_estimate(monkeypatch):
+    limiter = MagicMock()
+    monkeypatch.setattr(llm_gateway, "token_limiter", limiter)
+    client = _client("ok")
+    llm_gateway.complete(MESSAGES, model="m", client=client, max_completion_tokens=100)
+    limiter.acquire.assert_called_once_with(len("こんにちは") + 100)
+
+
+def test_submit_returns_future():
+    client = _client("非同期")
+    future = llm_gateway.submit(MESSAGES, model="m", client=client)
+    assert future.result(timeout=5) == "非同期"
+
+
+def test_rate_limiter_acquire_multiple_tokens():
+    now = [0.0]
+    waits = []
+    limiter = TokenBucketRateLimiter(
+        10, 100, clock=lambda: now[0], sleep=waits.append
+    )
+    assert limiter.acquire(100) == 0
+    assert limiter.acquire(50) == pytest.approx(5.0)
@@ -0,0 +1,124 @@
+"""db.registered_content_ids の一括照会を検証する。"""
+
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from db.registered_content_ids import (
+    RegisteredContentIdIndex,
+    fetch_registered_content_ids,
+)
+
+
+def test_fetch_registered_content_ids_chunks_and_dedupes():
+    table = MagicMock()
+    table.select.return_value.in_.return_value.execute.side_effect = [
+        MagicMock(data=[{"content_id": "a"}, {"content_id": "b"}]),
+        MagicMock(data=[{"content_id": "c"}]),
+    ]
+
+    registered = fetch_registered_content_ids(
+        table, ["a", "b", "a", None, "", "c"], chunk_size=2
+    )
+
+    assert registered == {"a", "b", "c"}
+    table.select.assert_called_with("content_id")
+    chunks = [c.args for c in table.select.return_value.in_.call_args_list]
+    assert chunks == [("content_id", ["a", "b"]), ("content_id", ["c"])]
+
+
+def test_fetch_registered_content_ids_empty_input_skips_query():
+    table = MagicMock()
+    assert fetch_registered_content_ids(table, []) == set()
+    table.select.assert_not_called()
+
+
+def test_fetch_registered_content_ids_none_data():
+    table = MagicMock()
+    table.select.return_value.in_.return_value.execute.return_value = MagicMock(data=None)
+    assert fetch_registered_content_ids(table, ["x"]) == set()
+
+
+def test_fetch_registered_content_ids_retries_remote_protocol_error():
+    table = MagicMock()
+    table.select.return_value.in_.return_value.execute.side_effect = [
+        httpx.RemoteProtocolError("disconnect"),
+        MagicMock(data=[{"content_id": "x"}]),
+    ]
+    with patch("utils.supabase_retry.time.sleep"):
+        assert fetch_registered_content_ids(table, ["x"]) == {"x"}
+
+
+class TestRegisteredContentIdIndex:
+    def test_load_paginates_until_short_page(self):
+        table = MagicMock()
+        ranged = table.select.return_value.order.return_value.range
+        ranged.return_value.execute.side_effect = [
+            MagicMock(data=[{"content_id": "a"}, {"content_id": "b"}]),
+            MagicMock(data=[{"content_id": "c"}]),
+        ]
+
+        index = RegisteredContentIdIndex.load(table, page_size=2)
+
+        assert len(index) == 3
+        assert "a" in index and "c" in index
+        table.select.assert_called_with("content_id")
+        assert [c.args for c in ranged.call_args_list] == [(0, 1), (2, 3)]
+
+    def test_load_empty_table(self):
+        table = MagicMock()
+        table.select.return_value.order.return_value.range.return_value.execute.return_value = (
+            MagicMock(data=None)
+        )
+        assert len(RegisteredContentIdIndex.load(table)) == 0
+
+    def test_add_and_registered_among(self):
+        index = RegisteredContentIdIndex(["a", None, ""])
+        index.add("b")
+        index.add(None)
+
+        assert len(index) == 2
+        assert None not in index
+        assert index.registered_among(["a", "b", "c", None]) == {"a", "b"}
+
+
+class TestInsertWithIndex:
+    def _insert(self, client, index, content_id):
+        from db.trn_dmm_items_repository import _insert_dmm_item
+
+        item = {
+            "content_id": content_id,
+            "title": "t",
+            "URL": "https://example.com/i",
+            "iteminfo": {},
+            "prices": {},
+            "imageURL": {},
+            "sampleImageURL": {},
+        }
+        with patch("db.trn_dmm_items_repository.generate_content", return_value={}):
+            _insert_dmm_item(
+                item,
+                [],
+                None,
+                "FANZA",
+                "digital",
+                "videoa",
+                supabase_client=client,
+                upload_local_image_to_s3_fn=MagicMock(),
+                coerce_empty_image_urls=True,
+                registered_index=index,
+            )
+
+    def test_skips_registered_without_query(self):
+        client = MagicMock()
+        self._insert(client, RegisteredContentIdIndex(["dup"]), "dup")
+        client.table.return_value.select.assert_not_called()
+        client.table.return_value.insert.assert_not_called()
+
+    def test_adds_to_index_after_insert(self):
+        client = MagicMock()
+        index = RegisteredContentIdIndex()
+        self._insert(client, index, "new1")
+        client.table.return_value.select.assert_not_called()
+        client.table.return_value.insert.assert_called_once()
+        assert "new1" in index
@@ -117,6 +117,7 @@ def test_resolve_lock_paths_process_acquires_all_pipelines():
     names = {p.name for p in paths}
     assert names == {
         "run_process_main.lock",
+        "run_process_bltl.lock",
         "run_process_actress.lock",
         "run_process_mesugaki.lock",
     }
@@ -127,7 +128,7 @@ def test_resolve_lock_paths_all_includes_run_and_pipelines():
     names = {p.name for p in paths}
     assert "run.lock" in names
     assert "run_process_main.lock" in names
-    assert len(paths) == 4
+    assert len(paths) == 5
 
 
 def test_resolve_lock_paths_script_maps_to_pipeline():
@@ -138,6 +139,20 @@ def test_resolve_lock_paths_script_maps_to_pipeline():
     assert paths[0].name == "run.lock"
 
 
+def test_resolve_lock_paths_generate_item_content_follows_db():
+    def names(phase):
+        tasks = run_mod.load_tasks()
+        entries = run_mod.resolve_scripts(tasks, phase, None)
+        return [p.name for p in run_mod.resolve_lock_paths(phase, None, entries)]
+
+    assert names("process_main") == ["run_process_main.lock", "run_process_bltl.lock"]
+    assert names("process_mesugaki") == ["run_process_mesugaki.lock"]
+    assert run_mod.entry_pipeline(
+        "scripts/process/generate_item_content.py", ["--db", "supabase3"]
+    ) == "process_mesugaki"
+    assert run_mod.entry_pipeline("scripts/process/generate_item_content.py") == "process_main"
+
+
 def test_script_cli_args():
     assert run_mod.script_cli_args({}) == []
     assert run_mod.script_cli_args({"args": None}) == []
@@ -193,21 +208,45 @@ def test_resolve_lock_paths_weekly_shares_daily_lock():
     assert paths[0].name == "run_process_mesugaki.lock"
     tasks = run_mod.load_tasks()
     entries = run_mod.resolve_scripts(tasks, "process_main", None)
-    assert len(entries) == 3
+    assert len(entries) == 5
     assert all(e["phase"] == "process_main" for e in entries)
-    assert entries[0]["path"].endswith("update_items.py")
+    assert entries[0]["path"].endswith("generate_item_content.py")
+    assert not entries[0].get("args")
+    assert entries[1]["path"].endswith("generate_item_content.py")
+    assert run_mod.script_cli_args(entries[1]) == ["--db", "supabase2"]
+    assert entries[2]["path"].endswith("update_items.py")
     assert entries[-1]["path"].endswith("create_weekly_rankings.py")
 
 
 def test_resolve_scripts_pipeline_phase():
     tasks = run_mod.load_tasks()
     entries = run_mod.resolve_scripts(tasks, "process_main", None)
-    assert len(entries) == 3
+    assert len(entries) == 5
     assert all(e["phase"] == "process_main" for e in entries)
-    assert entries[0]["path"].endswith("update_items.py")
+    assert entries[0]["path"].endswith("generate_item_content.py")
+    assert not entries[0].get("args")
+    assert entries[1]["path"].endswith("generate_item_content.py")
+    assert run_mod.script_cli_args(entries[1]) == ["--db", "supabase2"]
+    assert entries[2]["path"].endswith("update_items.py")
     assert entries[-1]["path"].endswith("create_weekly_rankings.py")
 
 
+def test_resolve_scripts_mesugaki_generates_pending_supabase3_first():
+    tasks = run_mod.load_tasks()
+    entries = run_mod.resolve_scripts(tasks, "process_mesugaki", None)
+    assert entries[0]["path"].endswith("generate_item_content.py")
+    assert run_mod.script_cli_args(entries[0]) == ["--db", "supabase3"]
+
+
+def test_resolve_scripts_generate_item_content_defaults_to_main_db():
+    tasks = run_mod.load_tasks()
+    entries = run_mod.resolve_scripts(
+        tasks, None, "scripts/process/generate_item_content.py"
+    )
+    assert entries[0]["phase"] == "process_main"
+    assert not entries[0].get("args")
+
+
 def test_resolve_scripts_prefers_pipeline_over_process():
     tasks = run_mod.load_tasks()
     entries = run_mod.resolve_scripts(
@@ -0,0 +1,92 @@
+"""db.storageS3 の署名付き URL キャッシュのテスト。"""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from db import storageS3
+from db.storageS3 import PresignedUrlCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def _clear_presign_cache():
+    storageS3.presigned_url_cache.clear()
+    yield
+    storageS3.presigned_url_cache.clear()
+
+
+class TestPresignedUrlCache:
+    def test_returns_cached_until_refresh_margin(self):
+        clock = FakeClock()
+        cache = PresignedUrlCache(refresh_margin=300, clock=clock)
+        cache.put("b", "k", "url1", 3600)
+        clock.now += 3600 - 301
+        assert cache.get("b", "k") == "url1"
+        clock.now += 1
+        assert cache.get("b", "k") is None
+
+    def test_keyed_by_bucket_and_key(self):
+        cache = PresignedUrlCache(clock=FakeClock())
+        cache.put("b1", "k", "url1", 3600)
+        assert cache.get("b2", "k") is None
+        assert cache.get("b1", "other") is None
+
+    def test_disk_round_trip_drops_expired(self, tmp_path):
+        path = tmp_path / "presign" / "cache.json"
+        clock = FakeClock()
+        cache = PresignedUrlCache(str(path), clock=clock)
+        cache.put("b", "fresh", "u1", 3600)
+        cache.put("b", "stale", "u2", 10)
+        clock.now += 20
+        cache.save()
+
+        reloaded = PresignedUrlCache(str(path), clock=clock)
+        assert reloaded.get("b", "fresh") == "u1"
+        assert reloaded.get("b", "stale") is None
+
+    def test_corrupt_disk_cache_is_ignored(self, tmp_path):
+        path = tmp_path / "cache.json"
+        path.write_text("{broken", encoding="utf-8")
+        cache = PresignedUrlCache(str(path), clock=FakeClock())
+        assert cache.get("b", "k") is None
+
+
+class TestPresignedGetUrl:
+    def test_signs_each_key_once(self):
+        with patch("db.storageS3.s3_client") as client:
+            client.generate_presigned_url.side_effect = ["signed1", "signed2"]
+            assert storageS3._presigned_get_url("k1", "b") == "signed1"
+            assert storageS3._presigned_get_url("k1", "b") == "signed1"
+            assert storageS3._presigned_get_url("k2", "b") == "signed2"
+        assert client.generate_presigned_url.call_count == 2
+
+    def test_skipped_existing_object_reuses_cached_url(self, tmp_path):
+        path = tmp_path / "page_001.webp"
+        path.write_bytes(b"x")
+        with patch("db.storageS3.s3_client") as client:
+            client.generate_presigned_url.return_value = "signed"
+            for _ in range(3):
+                url = storageS3._upload_local_image_to_s3(str(path), "abc", 1, "comic", "b")
+                assert url == "signed"
+        client.generate_presigned_url.assert_called_once()
+
+    def test_failure_is_not_cached(self):
+        from botocore.exceptions import ClientError
+
+        with patch("db.storageS3.s3_client") as client:
+            client.generate_presigned_url.side_effect = [
+                ClientError({"Error": {"Code": "500", "Message": "x"}}, "GetObject"),
+                "signed",
+            ]
+            assert storageS3._presigned_get_url("k", "b") == ""
+            assert storageS3._presigned_get_url("k", "b") == "signed"
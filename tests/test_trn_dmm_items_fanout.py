@@ -0,0 +1,109 @@
+"""insert_dmm_item_fanout（複数 DB への同時登録）のテスト。"""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from db import trn_dmm_items_repository as repo
+from db.registered_content_ids import RegisteredContentIdIndex
+
+AI_OK = {"auto_comment": "一言", "auto_summary": "概要", "auto_point": "ポイント"}
+
+
+def _item(content_id="cid1"):
+    return {
+        "content_id": content_id,
+        "title": "t",
+        "URL": "https://example.com/i",
+        "tachiyomi": {"URL": "https://example.com/t"},
+        "iteminfo": {},
+        "prices": {},
+        "imageURL": {"large": ""},
+        "sampleImageURL": {},
+    }
+
+
+def _target(name, bulk, *, registered=(), coerce=False):
+    return repo.DmmItemTarget(
+        name,
+        MagicMock(name=f"client_{name}"),
+        upload_local_image_to_s3_fn=MagicMock(),
+        upload_local_images_to_s3_fn=bulk,
+        coerce_empty_image_urls=coerce,
+        registered_index=RegisteredContentIdIndex(set(registered)),
+    )
+
+
+def _fanout(targets, **kwargs):
+    with patch(
+        "db.trn_dmm_items_repository.execute_with_retry",
+        side_effect=lambda builder: builder().execute(),
+    ), patch("db.trn_dmm_items_repository.generate_content", return_value=AI_OK) as gen:
+        result = repo.insert_dmm_item_fanout(
+            _item(),
+            ["p1.webp", "p2.webp"],
+            None,
+            "FANZA",
+            "ebook",
+            "comic",
+            targets=targets,
+            **kwargs,
+        )
+    return result, gen
+
+
+def _payload(target):
+    return target.client.table.return_value.insert.call_args[0][0]
+
+
+def test_generates_once_and_uploads_once_per_bucket():
+    bucket1 = MagicMock(return_value=["u1", "u2"])
+    bucket3 = MagicMock(return_value=["u1", ""])
+    default = _target("default", bucket1, coerce=True)
+    second = _target("supabase2", bucket1)
+    third = _target("supabase3", bucket3)
+
+    result, gen = _fanout([default, second, third], generate_ai=True)
+
+    assert result == {"default": "inserted", "supabase2": "inserted", "supabase3": "inserted"}
+    gen.assert_called_once()
+    bucket1.assert_called_once_with(["p1.webp", "p2.webp"], "cid1", "comic")
+    bucket3.assert_called_once()
+    assert _payload(default)["tachiyomi_page_count"] == 2
+    assert _payload(third)["tachiyomi_page_count"] == 1
+    assert _payload(default)["image_large_url"] is None
+    assert _payload(second)["image_large_url"] == ""
+    assert _payload(second)["ai_content_status"] == repo.AI_CONTENT_DONE
+    assert "cid1" in default.registered_index
+
+
+def test_skips_registered_targets_and_reports_failures_per_target():
+    bucket1 = MagicMock(return_value=["u1", "u2"])
+    registered = _target("default", bucket1, registered={"cid1"})
+    broken = _target("supabase2", bucket1)
+    broken.client.table.return_value.insert.return_value.execute.side_effect = RuntimeError("503")
+    ok = _target("supabase3", MagicMock(return_value=["u1", "u2"]))
+
+    result, _ = _fanout([registered, broken, ok], generate_ai=False)
+
+    assert result == {"default": "skipped", "supabase2": "failed", "supabase3": "inserted"}
+    registered.client.table.return_value.insert.assert_not_called()
+    assert "cid1" not in broken.registered_index
+
+
+def test_nothing_uploaded_when_all_targets_registered():
+    bulk = MagicMock()
+    result, gen = _fanout([_target("default", bulk, registered={"cid1"})], generate_ai=True)
+    assert result == {"default": "skipped"}
+    bulk.assert_not_called()
+    gen.assert_not_called()
+
+
+def test_dmm_item_target_settings():
+    target = repo.dmm_item_target("default")
+    assert target.coerce_empty_image_urls is True
+    assert target.upload_key is repo.upload_local_images_to_s3_default
+    with pytest.raises(ValueError):
+        repo.dmm_item_target("nope")
@@ -22,8 +22,14 @@ def load_update_items_module():
 
 
 @pytest.fixture
-def update_items():
-    return load_update_items_module()
+def update_items(monkeypatch):
+    monkeypatch.setattr("db.actress_cache.ACTRESS_CACHE_PATH", ":memory:")
+    module = load_update_items_module()
+    # main() の prewarm などで実際の Supabase に接続しない（接続失敗はリトライで数十秒待つ）
+    module.supabase = MagicMock()
+    select = module.supabase.table.return_value.select.return_value
+    select.order.return_value.range.return_value.execute.return_value = MagicMock(data=[])
+    return module
 
 
 class TestGenerateSafeSummaryPoint:
@@ -62,6 +68,67 @@ class TestGenerateSafeSummaryPoint:
         )
 
 
+class TestRunSafeRewriteBatch:
+    def test_generates_in_one_batch_and_queues_writes(self, update_items, monkeypatch, tmp_path):
+        from functools import partial
+
+        from openai_api import llm_batch
+
+        monkeypatch.setattr("openai_api.llm_gateway.LLM_CACHE_DIR", "")
+        monkeypatch.setattr(
+            llm_batch,
+            "run_batch",
+            partial(llm_batch.run_batch, workdir=tmp_path, sleep=lambda s: None),
+        )
+        prompts = []
+
+        def handler(body):
+            prompts.append(body["messages"][0]["content"])
+            return "【あらすじ・概要】\nソフト文\n【おすすめポイント】\n・見どころ"
+
+        update_items.client = llm_batch.LocalBatchClient(handler)
+        writes = MagicMock()
+        rows = [
+            {"content_id": "a", "title": "作品A", "auto_summary": "セックス", "auto_point": ""},
+            {"content_id": "b", "auto_summary": "", "auto_point": ""},
+            {"content_id": "c", "auto_summary": "x", "safe_generated_at": "2026-08-01"},
+        ]
+
+        assert update_items.run_safe_rewrite_batch(rows, writes=writes) == 1
+
+        assert len(prompts) == 1
+        assert "作品タイトル: 作品A" in prompts[0]
+        row = writes.add.call_args.args[0]
+        assert row["content_id"] == "a"
+        assert row["auto_summary"] == "ソフト文"
+        assert row["auto_point"] == "・見どころ"
+        assert row["safe_generated_at"]
+
+    def test_failed_results_are_left_unchanged(self, update_items, monkeypatch):
+        monkeypatch.setattr(
+            update_items.llm_batch, "run_batch", MagicMock(return_value={"a": None})
+        )
+        writes = MagicMock()
+        rows = [{"content_id": "a", "auto_summary": "本文", "auto_point": ""}]
+        assert update_items.run_safe_rewrite_batch(rows, writes=writes) == 0
+        writes.add.assert_not_called()
+
+    def test_update_dmm_item_defers_ai(self, update_items):
+        client = MagicMock()
+        update_items.client = client
+        update_items.safe_ai_batch = True
+        update_items.upsert_actresses = MagicMock()
+        buffer = MagicMock()
+        item = {"title": "t", "review": {}, "prices": {}, "iteminfo": {}}
+
+        update_items.update_dmm_item("x", item, "あらすじ", "ポイント", buffer=buffer)
+
+        client.chat.completions.create.assert_not_called()
+        row = buffer.add.call_args.args[0]
+        assert "safe_generated_at" not in row
+        assert "auto_summary" not in row
+
+
 class TestUpdateDmmItemSafeFlag:
     def _base_item(self):
         return {
@@ -151,12 +218,84 @@ class TestUpdateDmmItemSafeFlag:
         assert "safe_generated_at" not in payload
 
 
+    def test_buffers_update_payload(self, update_items):
+        update_items.upsert_actresses = MagicMock()
+        update_items.supabase = MagicMock()
+        buffer = MagicMock()
+
+        update_items.update_dmm_item(
+            "b1",
+            self._base_item(),
+            "",
+            "",
+            safe_generated_at="2026-08-01T00:00:00+00:00",
+            buffer=buffer,
+        )
+
+        update_items.supabase.table.assert_not_called()
+        row = buffer.add.call_args[0][0]
+        assert row["content_id"] == "b1"
+        assert row["price"] == 1000
+
+
+class TestUpsertActresses:
+    def _setup(self, update_items):
+        update_items.supabase = MagicMock()
+        update_items.fetch_actress_detail = MagicMock(
+            side_effect=lambda aid: {"id": aid, "name": f"name{aid}", "ruby": "あい"}
+        )
+
+    def test_skips_fresh_and_bulk_upserts_stale(self, update_items):
+        from db.actress_cache import ActressCache
+
+        self._setup(update_items)
+        cache = ActressCache(":memory:", ttl_seconds=3600, clock=lambda: 1000.0)
+        cache.mark_refreshed(["1"], at=900.0)
+
+        update_items.upsert_actresses(
+            [{"id": "1"}, {"id": "2"}, {"id": "3"}, {"id": "2"}], cache=cache
+        )
+
+        assert [c.args[0] for c in update_items.fetch_actress_detail.call_args_list] == ["2", "3"]
+        upsert = update_items.supabase.table.return_value.upsert
+        upsert.assert_called_once()
+        assert [r["actress_id"] for r in upsert.call_args.args[0]] == ["2", "3"]
+        assert cache.is_fresh("2") and cache.is_fresh("3")
+
+    def test_all_fresh_skips_api_and_upsert(self, update_items):
+        from db.actress_cache import ActressCache
+
+        self._setup(update_items)
+        cache = ActressCache(":memory:", clock=lambda: 1000.0)
+        cache.mark_refreshed(["1"])
+
+        update_items.upsert_actresses([{"id": "1"}], cache=cache)
+
+        update_items.fetch_actress_detail.assert_not_called()
+        update_items.supabase.table.assert_not_called()
+
+    def test_failed_upsert_keeps_cache_stale(self, update_items, caplog):
+        from db.actress_cache import ActressCache
+
+        self._setup(update_items)
+        update_items.supabase.table.return_value.upsert.return_value.execute.side_effect = (
+            RuntimeError("db")
+        )
+        cache = ActressCache(":memory:")
+
+        with caplog.at_level("ERROR"):
+            update_items.upsert_actresses([{"id": "5"}], cache=cache)
+
+        assert not cache.is_fresh("5")
+        assert any("女優UPSERT失敗" in r.message for r in caplog.records)
+
+
 class TestProcessBatchProgress:
     def test_logs_global_index_across_batches(self, update_items, caplog):
         update_items.fetch_item_by_content_id = MagicMock(return_value=None)
         update_items.record_api_result = MagicMock()
         batch_items = [{"content_id": "a"}, {"content_id": "b"}]
-        with patch.object(update_items.time, "sleep"), caplog.at_level("INFO"):
+        with caplog.at_level("INFO"):
             update_items.process_batch(batch_items, batch_index=2, total=3466, range_start=100)
 
         messages = [r.message for r in caplog.records]
@@ -173,8 +312,7 @@ class TestProcessBatchProgress:
         batch_items = [
             {"content_id": "13dsvr01798", "service": "digital", "floor": "videoa"}
         ]
-        with patch.object(update_items.time, "sleep"):
-            update_items.process_batch(batch_items, batch_index=1, total=1, range_start=0)
+        update_items.process_batch(batch_items, batch_index=1, total=1, range_start=0)
 
         update_items.fetch_item_by_content_id.assert_called_once_with(
             "13dsvr01798", service="digital", floor="videoa"
@@ -185,10 +323,57 @@ class TestProcessBatchProgress:
         update_items.update_dmm_item = MagicMock()
         update_items.record_api_result = MagicMock()
         row = {"content_id": "ok1", "auto_summary": "s", "auto_point": "p", "safe_generated_at": None}
-        with patch.object(update_items.time, "sleep"):
-            update_items.process_batch([row], batch_index=1, total=1, range_start=0)
+        update_items.process_batch([row], batch_index=1, total=1, range_start=0)
         update_items.record_api_result.assert_called_once_with(
-            "ok1", ok=True, current_state=row
+            "ok1", ok=True, current_state=row, buffer=None
+        )
+
+
+    def test_prefetch_keeps_order_and_records_same_state(self, update_items):
+        fetched = {"a": {"title": "A"}, "b": None, "c": {"title": "C"}}
+        update_items.fetch_item_by_content_id = MagicMock(
+            side_effect=lambda cid, **_kw: fetched[cid]
+        )
+        update_items.update_dmm_item = MagicMock()
+        update_items.record_api_result = MagicMock()
+        rows = [{"content_id": cid} for cid in ("a", "b", "c")]
+
+        update_items.process_batch(rows, 1, 3, range_start=0, fetch_workers=3)
+
+        assert update_items.fetch_item_by_content_id.call_count == 3
+        assert [c.args[0] for c in update_items.update_dmm_item.call_args_list] == ["a", "c"]
+        assert [
+            (c.args[0], c.kwargs["ok"]) for c in update_items.record_api_result.call_args_list
+        ] == [("a", True), ("b", False), ("c", True)]
+
+    def test_main_passes_fetch_workers(self, update_items):
+        update_items.fetch_paginated_rows = MagicMock(
+            side_effect=[
+                [{"content_id": "a", "release_date": "2026-08-01", "campaign": None}],
+                [],
+            ]
+        )
+        update_items.process_batch = MagicMock()
+        today = __import__("datetime").date(2026, 8, 19)
+        update_items.main(["--fetch-workers", "8"], today=today)
+        assert update_items.process_batch.call_args.kwargs["fetch_workers"] == 8
+
+
+    def test_passes_write_buffers(self, update_items):
+        update_items.fetch_item_by_content_id = MagicMock(side_effect=[{"title": "x"}, None])
+        update_items.update_dmm_item = MagicMock()
+        update_items.record_api_result = MagicMock()
+        item_writes, state_writes = MagicMock(), MagicMock()
+        rows = [{"content_id": "ok"}, {"content_id": "miss"}]
+
+        update_items.process_batch(
+            rows, 1, 2, item_writes=item_writes, state_writes=state_writes
+        )
+
+        assert update_items.update_dmm_item.call_args.kwargs["buffer"] is item_writes
+        assert all(
+            c.kwargs["buffer"] is state_writes
+            for c in update_items.record_api_result.call_args_list
         )
 
 
@@ -198,15 +383,15 @@ class TestFetchItemByContentId:
         found.raise_for_status = MagicMock()
         found.json.return_value = {"result": {"items": [{"content_id": "13dsvr01798"}]}}
 
-        with patch.object(update_items.requests, "get", return_value=found) as get_mock:
+        with patch.object(update_items, "dmm_api_get", return_value=found) as get_mock:
             item = update_items.fetch_item_by_content_id(
                 "13dsvr01798", service="digital", floor="videoa"
             )
 
         assert item == {"content_id": "13dsvr01798"}
         assert get_mock.call_count == 1
-        assert get_mock.call_args.kwargs["params"]["service"] == "digital"
-        assert get_mock.call_args.kwargs["params"]["floor"] == "videoa"
+        assert get_mock.call_args.args[1]["service"] == "digital"
+        assert get_mock.call_args.args[1]["floor"] == "videoa"
 
     def test_falls_back_to_cid_only_when_service_floor_empty(self, update_items):
         empty = MagicMock()
@@ -217,7 +402,7 @@ class TestFetchItemByContentId:
         found.json.return_value = {"result": {"items": [{"content_id": "x"}]}}
 
         with patch.object(
-            update_items.requests, "get", side_effect=[empty, found]
+            update_items, "dmm_api_get", side_effect=[empty, found]
         ) as get_mock:
             item = update_items.fetch_item_by_content_id(
                 "x", service="digital", floor="videoa"
@@ -225,12 +410,12 @@ class TestFetchItemByContentId:
 
         assert item == {"content_id": "x"}
         assert get_mock.call_count == 2
-        assert "service" not in get_mock.call_args_list[1].kwargs["params"]
+        assert "service" not in get_mock.call_args_list[1].args[1]
 
     def test_returns_none_and_logs_on_http_error(self, update_items, caplog):
         with patch.object(
-            update_items.requests,
-            "get",
+            update_items,
+            "dmm_api_get",
             side_effect=RuntimeError("timeout"),
         ), caplog.at_level("ERROR"):
             assert update_items.fetch_item_by_content_id("bad") is None
@@ -293,6 +478,19 @@ class TestRecordApiResult:
         assert payload["miss_count"] == 3
         assert payload["skip_until"]
 
+    def test_buffers_instead_of_upsert(self, update_items):
+        update_items.supabase = MagicMock()
+        buffer = MagicMock()
+        now = __import__("datetime").datetime(2026, 8, 19, 8, 0, tzinfo=__import__("datetime").timezone.utc)
+
+        update_items.record_api_result("cid4", ok=True, now=now, buffer=buffer)
+
+        update_items.supabase.table.assert_not_called()
+        row = buffer.add.call_args[0][0]
+        assert row["content_id"] == "cid4"
+        assert row["miss_count"] == 0
+        assert row["updated_at"] == now.isoformat()
+
     def test_logs_on_upsert_error(self, update_items, caplog):
         table = MagicMock()
         update_items.supabase = MagicMock()
@@ -332,13 +530,40 @@ class TestParseArgsAndMain:
         now = __import__("datetime").datetime(
             2026, 8, 19, 8, 0, tzinfo=__import__("datetime").timezone.utc
         )
-        with patch.object(update_items.time, "sleep"), caplog.at_level("INFO"):
+        with caplog.at_level("INFO"):
             update_items.main([], today=today, now=now)
 
         processed = update_items.process_batch.call_args[0][0]
         assert [r["content_id"] for r in processed] == ["new"]
         assert any("更新対象は 1 件" in r.message for r in caplog.records)
 
+    def test_main_exits_nonzero_when_writes_fail(self, update_items, caplog):
+        update_items.fetch_paginated_rows = MagicMock(
+            side_effect=[
+                [{"content_id": "new", "release_date": "2026-08-01", "campaign": None}],
+                [],
+            ]
+        )
+
+        def process_batch(batch_items, *args, item_writes, **kwargs):
+            item_writes.add({"content_id": "new", "title": "t"})
+
+        update_items.process_batch = process_batch
+        update_items.supabase.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(
+            data=[{"content_id": "new"}]
+        )
+        update_items.supabase.table.return_value.upsert.return_value.execute.side_effect = (
+            RuntimeError("db")
+        )
+        today = __import__("datetime").date(2026, 8, 19)
+        now = __import__("datetime").datetime(
+            2026, 8, 19, 8, 0, tzinfo=__import__("datetime").timezone.utc
+        )
+        with caplog.at_level("ERROR"), pytest.raises(SystemExit) as exc:
+            update_items.main([], today=today, now=now)
+        assert exc.value.code == 1
+        assert any("書き込みに失敗した行があります" in r.message for r in caplog.records)
+
     def test_main_continues_if_api_state_missing(self, update_items, caplog):
         def fetch(table, columns):
             if table == update_items.API_STATE_TABLE:
@@ -357,7 +582,7 @@ class TestParseArgsAndMain:
         now = __import__("datetime").datetime(
             2026, 8, 19, 8, 0, tzinfo=__import__("datetime").timezone.utc
         )
-        with patch.object(update_items.time, "sleep"), caplog.at_level("WARNING"):
+        with caplog.at_level("WARNING"):
             update_items.main([], today=today, now=now)
         update_items.process_batch.assert_called_once()
         assert any("API状態を取得できませんでした" in r.message for r in caplog.records)
@@ -399,13 +624,13 @@ class TestParseArgsAndMain:
         now = __import__("datetime").datetime(
             2026, 8, 19, 8, 0, tzinfo=__import__("datetime").timezone.utc
         )
-        with patch.object(update_items.time, "sleep"), caplog.at_level("INFO"):
+        with caplog.at_level("INFO"):
             update_items.main(["--content-id", "old"], today=today, now=now)
         processed = update_items.process_batch.call_args[0][0]
         assert processed[0]["content_id"] == "old"
         assert any("content_id 指定" in r.message for r in caplog.records)
 
-    def test_main_sleeps_between_batches(self, update_items):
+    def test_main_splits_batches(self, update_items):
         update_items.BATCH_SIZE = 1
         update_items.fetch_paginated_rows = MagicMock(
             side_effect=[
@@ -421,7 +646,5 @@ class TestParseArgsAndMain:
         now = __import__("datetime").datetime(
             2026, 8, 19, 8, 0, tzinfo=__import__("datetime").timezone.utc
         )
-        with patch.object(update_items.time, "sleep") as sleep_mock:
-            update_items.main(["--mode", "all"], today=today, now=now)
+        update_items.main(["--mode", "all"], today=today, now=now)
         assert update_items.process_batch.call_count == 2
-        sleep_mock.assert_called()
@@ -7,6 +7,7 @@ from datetime import date, datetime, timezone
 import pytest
 
 from utils.update_items_selection import (
+    DEFAULT_FETCH_WORKERS,
     DEFAULT_RECENT_DAYS,
     filter_items_for_update,
     has_active_campaign,
@@ -291,6 +292,7 @@ class TestParseUpdateModeArgs:
         assert args.recent_days == DEFAULT_RECENT_DAYS
         assert args.content_ids is None
         assert args.retry_skipped is False
+        assert args.fetch_workers == DEFAULT_FETCH_WORKERS
 
     def test_weekly_days_content_id_and_retry(self):
         args = parse_update_mode_args(
@@ -304,12 +306,15 @@ class TestParseUpdateModeArgs:
                 "--content-id",
                 "bbb",
                 "--retry-skipped",
+                "--fetch-workers",
+                "1",
             ]
         )
         assert args.mode == "weekly"
         assert args.recent_days == 31
         assert args.content_ids == ["aaa", "bbb"]
         assert args.retry_skipped is True
+        assert args.fetch_workers == 1
 
     def test_invalid_mode(self):
         with pytest.raises(SystemExit):
@@ -30,7 +30,8 @@ def load_update_mesugaki_module():
 
 
 @pytest.fixture
-def update_mesugaki():
+def update_mesugaki(monkeypatch):
+    monkeypatch.setattr("db.actress_cache.ACTRESS_CACHE_PATH", ":memory:")
     return load_update_mesugaki_module()
 
 
@@ -94,6 +95,58 @@ class TestProcessBatch:
         assert update_mesugaki.record_api_result.call_args_list[1].kwargs["ok"] is False
 
 
+    def test_prefetch_skips_missing_content_id(self, update_mesugaki):
+        update_mesugaki.fetch_item_by_content_id = MagicMock(
+            side_effect=lambda cid: {"title": cid} if cid == "ok" else None
+        )
+        update_mesugaki.update_dmm_item = MagicMock()
+        update_mesugaki.record_api_result = MagicMock()
+        rows = [{"content_id": "ok"}, {}, {"content_id": "miss"}]
+        update_mesugaki.process_batch(
+            rows, batch_index=1, total_batches=1, range_start=0, total=3, fetch_workers=2
+        )
+        assert update_mesugaki.fetch_item_by_content_id.call_count == 2
+        assert [
+            (c.args[0], c.kwargs["ok"]) for c in update_mesugaki.record_api_result.call_args_list
+        ] == [("ok", True), ("miss", False)]
+
+
+class TestUpsertActresses:
+    def test_uses_cache(self, update_mesugaki):
+        from db.actress_cache import ActressCache
+
+        update_mesugaki.supabase = MagicMock()
+        update_mesugaki.fetch_actress_detail = MagicMock(return_value={"id": "2", "name": "B"})
+        cache = ActressCache(":memory:", namespace="mesugaki")
+        cache.mark_refreshed(["1"])
+
+        update_mesugaki.upsert_actresses([{"id": "1"}, {"id": "2"}], cache=cache)
+
+        update_mesugaki.fetch_actress_detail.assert_called_once_with("2")
+        rows = update_mesugaki.supabase.table.return_value.upsert.call_args.args[0]
+        assert [r["actress_id"] for r in rows] == ["2"]
+        assert cache.is_fresh("2")
+
+    def test_main_prewarms_cache(self, update_mesugaki):
+        update_mesugaki.fetch_paginated_rows = MagicMock(
+            side_effect=[[{"content_id": "a", "release_date": "2026-08-01"}], []]
+        )
+        update_mesugaki.process_batch = MagicMock()
+        table = MagicMock()
+        table.select.return_value.order.return_value.range.return_value.execute.return_value = (
+            MagicMock(data=[{"actress_id": 7, "updated_at": "2026-08-19T07:00:00+00:00"}])
+        )
+        update_mesugaki.supabase = MagicMock()
+        update_mesugaki.supabase.table.return_value = table
+
+        update_mesugaki.main(
+            [], today=date(2026, 8, 19), now=datetime(2026, 8, 19, 8, 0, tzinfo=timezone.utc)
+        )
+
+        assert update_mesugaki.actress_cache.namespace == "mesugaki"
+        assert "7" in update_mesugaki.actress_cache._refreshed_at
+
+
 class TestMain:
     def test_exits_when_env_missing(self, update_mesugaki):
         update_mesugaki.DMM_API_ID = None
@@ -146,7 +199,7 @@ class TestMain:
         assert exc.value.code == 0
         update_mesugaki.process_batch.assert_not_called()
 
-    def test_content_id_and_batch_sleep(self, update_mesugaki, caplog):
+    def test_content_id_and_batches_without_sleep(self, update_mesugaki, caplog):
         update_mesugaki.BATCH_SIZE = 1
         update_mesugaki.fetch_paginated_rows = MagicMock(
             side_effect=[
@@ -167,5 +220,6 @@ class TestMain:
                 now=now,
             )
         assert update_mesugaki.process_batch.call_count == 2
-        sleep_mock.assert_called()
+        # 固定スリープは廃止（流量は dmm.dmm_http のレート制限で調整）
+        sleep_mock.assert_not_called()
         assert any("content_id 指定" in r.message for r in caplog.records)
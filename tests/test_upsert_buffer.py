@@ -0,0 +1,125 @@
+"""db.upsert_buffer の write-behind 一括 UPSERT を検証する。"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from db.upsert_buffer import UpsertBuffer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _upsert_calls(client):
+    return client.table.return_value.upsert.call_args_list
+
+
+def test_flushes_when_max_rows_reached():
+    client = MagicMock()
+    buffer = UpsertBuffer(client, "t", on_conflict="content_id", max_rows=2)
+
+    buffer.add({"content_id": "a", "v": 1})
+    assert _upsert_calls(client) == []
+    buffer.add({"content_id": "b", "v": 2})
+
+    calls = _upsert_calls(client)
+    assert len(calls) == 1
+    assert calls[0].args[0] == [{"content_id": "a", "v": 1}, {"content_id": "b", "v": 2}]
+    assert calls[0].kwargs == {"on_conflict": "content_id"}
+    assert len(buffer) == 0
+    assert buffer.flushed_count == 2
+
+
+def test_flushes_when_interval_elapsed():
+    client = MagicMock()
+    clock = FakeClock()
+    buffer = UpsertBuffer(client, "t", on_conflict="content_id", max_seconds=5, clock=clock)
+
+    buffer.add({"content_id": "a"})
+    assert _upsert_calls(client) == []
+    clock.now = 5.0
+    buffer.add({"content_id": "b"})
+    assert len(_upsert_calls(client)) == 1
+
+
+def test_merges_same_key_and_groups_by_columns():
+    client = MagicMock()
+    buffer = UpsertBuffer(client, "t", on_conflict="content_id")
+
+    buffer.add({"content_id": "a", "price": 1})
+    buffer.add({"content_id": "a", "price": 2, "auto_summary": "s"})
+    buffer.add({"content_id": "b", "price": 3})
+    assert buffer.flush() == 2
+
+    payloads = [c.args[0] for c in _upsert_calls(client)]
+    assert {"content_id": "a", "price": 2, "auto_summary": "s"} in payloads[0] + payloads[1]
+    assert all(len({tuple(sorted(r)) for r in p}) == 1 for p in payloads)
+
+
+def test_flush_empty_is_noop():
+    client = MagicMock()
+    assert UpsertBuffer(client, "t", on_conflict="content_id").flush() == 0
+    client.table.assert_not_called()
+
+
+def test_failed_group_is_logged_and_dropped(caplog):
+    client = MagicMock()
+    client.table.return_value.upsert.return_value.execute.side_effect = RuntimeError("db")
+    buffer = UpsertBuffer(client, "t", on_conflict="content_id")
+    buffer.add({"content_id": "a"})
+
+    with caplog.at_level("ERROR"):
+        assert buffer.flush() == 0
+    assert buffer.failed_count == 1
+    assert len(buffer) == 0
+    assert any("一括UPSERT失敗" in r.message for r in caplog.records)
+
+
+def test_context_manager_flushes_on_error():
+    client = MagicMock()
+    with pytest.raises(RuntimeError):
+        with UpsertBuffer(client, "t", on_conflict="content_id") as buffer:
+            buffer.add({"content_id": "a"})
+            raise RuntimeError("boom")
+    assert _upsert_calls(client)[0].args[0] == [{"content_id": "a"}]
+
+
+def test_update_only_drops_rows_missing_from_table(caplog):
+    client = MagicMock()
+    client.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(
+        data=[{"content_id": "a"}]
+    )
+    buffer = UpsertBuffer(client, "t", on_conflict="content_id", update_only=True)
+    buffer.add({"content_id": "a", "price": 1})
+    buffer.add({"content_id": "gone", "price": 2})
+
+    with caplog.at_level("WARNING"):
+        assert buffer.flush() == 1
+    assert _upsert_calls(client)[0].args[0] == [{"content_id": "a", "price": 1}]
+    client.table.return_value.select.return_value.in_.assert_called_once_with(
+        "content_id", ["a", "gone"]
+    )
+    assert buffer.skipped_count == 1
+    assert not buffer.has_failures
+
+
+def test_update_only_existence_check_failure_counts_as_failed():
+    client = MagicMock()
+    client.table.return_value.select.return_value.in_.return_value.execute.side_effect = (
+        RuntimeError("db")
+    )
+    with UpsertBuffer(client, "t", on_conflict="content_id", update_only=True) as buffer:
+        buffer.add({"content_id": "a"})
+    assert buffer.failed_count == 1
+    assert buffer.has_failures
+    client.table.return_value.upsert.assert_not_called()
+
+
+def test_update_only_requires_single_key():
+    with pytest.raises(ValueError):
+        UpsertBuffer(MagicMock(), "t", on_conflict="a,b", update_only=True)
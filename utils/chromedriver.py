@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import logging
+import os
 import shutil
 import tempfile
+import threading
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
@@ -18,6 +23,59 @@ _CACHED: str | None = None
 DEFAULT_LAUNCH_RETRIES = 3
 DEFAULT_RETRY_DELAY = 2.0
 DEFAULT_PAGE_LOAD_TIMEOUT = 60
+# プールの driver はこの件数を処理したら作り直す（長時間起動によるメモリ増加・不安定化対策）
+DEFAULT_DRIVER_MAX_PAGES = 50
+# JS ヒープ使用量（MB）がこれを超えた driver は返却時に作り直す（0 で無効）
+DEFAULT_DRIVER_MAX_HEAP_MB = 512
+
+# スクレイピング用 Chrome で画像・フォント・動画・計測タグを読まない（0 で無効）
+SCRAPER_BLOCK_RESOURCES = os.getenv("SCRAPER_BLOCK_RESOURCES", "1") != "0"
+# 追加でブロックする URL パターン（カンマ区切り。Network.setBlockedURLs の * ワイルドカード）
+SCRAPER_BLOCK_EXTRA_URLS = tuple(
+    p.strip() for p in os.getenv("SCRAPER_BLOCK_EXTRA_URLS", "").split(",") if p.strip()
+)
+
+
+def _extension_patterns(*extensions: str) -> tuple[str, ...]:
+    return tuple(f"*.{ext}{suffix}" for ext in extensions for suffix in ("", "?*"))
+
+
+# ブロック対象の分類 → URL パターン
+BLOCKED_RESOURCE_PATTERNS: dict[str, tuple[str, ...]] = {
+    "image": _extension_patterns("jpg", "jpeg", "png", "gif", "webp", "avif", "bmp", "ico"),
+    "svg": _extension_patterns("svg"),
+    "font": _extension_patterns("woff", "woff2", "ttf", "otf", "eot"),
+    "media": _extension_patterns("mp4", "webm", "m3u8", "mp3", "m4a"),
+    "tracker": (
+        "*googletagmanager.com/*",
+        "*google-analytics.com/*",
+        "*doubleclick.net/*",
+        "*googlesyndication.com/*",
+        "*connect.facebook.net/*",
+        "*static.ads-twitter.com/*",
+        "*clarity.ms/*",
+    ),
+}
+# ページ種別ごとに読み込みを許す分類（それ以外はブロック）
+# - review: 星は <img src=".../star/yellow.svg"> の属性で数えるが、描画判定に備えて svg は許可
+# - tachiyomi: canvas に描かれるページ画像が必要なのでブロックしない
+RESOURCE_ALLOWLISTS: dict[str, frozenset[str]] = {
+    "synopsis": frozenset(),
+    "review": frozenset({"svg"}),
+    "campaign": frozenset(),
+    "tachiyomi": frozenset(BLOCKED_RESOURCE_PATTERNS),
+}
+_PAGE_LOAD_METRICS_JS = """
+const nav = performance.getEntriesByType('navigation')[0];
+const resources = performance.getEntriesByType('resource');
+let bytes = nav ? (nav.transferSize || 0) : 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+return {
+  load_ms: nav ? (nav.loadEventEnd || nav.domContentLoadedEventEnd) - nav.startTime : null,
+  transfer_bytes: bytes,
+  resources: resources.length
+};
+"""
 
 
 def chromedriver_path() -> str:
@@ -99,6 +157,62 @@ def build_chrome_options(
     return options
 
 
+def blocked_url_patterns(page_type: str) -> list[str]:
+    """page_type（RESOURCE_ALLOWLISTS のキー）で読み込まない URL パターン。"""
+    if not SCRAPER_BLOCK_RESOURCES:
+        return []
+    if page_type not in RESOURCE_ALLOWLISTS:
+        raise ValueError(f"unknown page type: {page_type}")
+    allowed = RESOURCE_ALLOWLISTS[page_type]
+    if allowed >= set(BLOCKED_RESOURCE_PATTERNS):
+        return []
+    patterns = [
+        pattern
+        for category, category_patterns in BLOCKED_RESOURCE_PATTERNS.items()
+        if category not in allowed
+        for pattern in category_patterns
+    ]
+    return patterns + list(SCRAPER_BLOCK_EXTRA_URLS)
+
+
+def apply_resource_blocking(driver, page_type: str) -> bool:
+    """DevTools の Network.setBlockedURLs で page_type 用のブロックを設定する（前の設定は置き換わる）。
+
+    次の driver.get から効く。CDP が使えない driver では何もしない（False）。
+    """
+    patterns = blocked_url_patterns(page_type)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as exc:
+        logging.debug("リソースブロック設定をスキップ (%s): %s", page_type, exc)
+        return False
+    return True
+
+
+def page_load_metrics(driver) -> dict | None:
+    """直前に開いたページの読み込み時間（ms）・転送量（bytes）・サブリソース数。取れなければ None。"""
+    try:
+        metrics = driver.execute_script(_PAGE_LOAD_METRICS_JS)
+    except Exception:
+        return None
+    return metrics if isinstance(metrics, dict) else None
+
+
+def log_page_load_metrics(driver, label: str) -> None:
+    metrics = page_load_metrics(driver)
+    if not metrics:
+        return
+    load_ms = metrics.get("load_ms")
+    logging.info(
+        "ページ読込 %s: %s 転送 %.0fKB リソース %s 件",
+        label,
+        f"{load_ms:.0f}ms" if isinstance(load_ms, (int, float)) else "-",
+        (metrics.get("transfer_bytes") or 0) / 1024,
+        metrics.get("resources"),
+    )
+
+
 def create_chrome_driver(
     *,
     headless: bool = True,
@@ -108,8 +222,12 @@ def create_chrome_driver(
     extra_args: list[str] | None = None,
     max_retries: int = DEFAULT_LAUNCH_RETRIES,
     retry_delay: float = DEFAULT_RETRY_DELAY,
+    block_resources: str | None = None,
 ) -> webdriver.Chrome:
-    """安定化オプション付きで Chrome を起動する（失敗時は短い間隔でリトライ）。"""
+    """安定化オプション付きで Chrome を起動する（失敗時は短い間隔でリトライ）。
+
+    block_resources にページ種別（"synopsis" など）を渡すと apply_resource_blocking を適用する。
+    """
     last_exc: BaseException | None = None
     attempts = max(1, max_retries)
 
@@ -129,6 +247,8 @@ def create_chrome_driver(
             )
             driver.set_page_load_timeout(page_load_timeout)
             setattr(driver, "_chrome_user_data_dir", user_data_dir)
+            if block_resources:
+                apply_resource_blocking(driver, block_resources)
             return driver
         except Exception as exc:
             last_exc = exc
@@ -159,3 +279,153 @@ def quit_chrome_driver(driver: webdriver.Chrome | None) -> None:
         pass
     if user_data_dir:
         shutil.rmtree(user_data_dir, ignore_errors=True)
+
+
+def is_driver_alive(driver) -> bool:
+    try:
+        _ = driver.current_url
+        return True
+    except (InvalidSessionIdException, WebDriverException):
+        return False
+
+
+def driver_heap_mb(driver) -> float | None:
+    """ページの JS ヒープ使用量（MB）。取れなければ None。"""
+    try:
+        used = driver.execute_script(
+            "return window.performance && performance.memory"
+            " ? performance.memory.usedJSHeapSize : null;"
+        )
+    except (InvalidSessionIdException, WebDriverException):
+        return None
+    if not isinstance(used, (int, float)):
+        return None
+    return used / (1024 * 1024)
+
+
+class DriverPool:
+    """長寿命の Chrome を最大 size 台まで貸し出すプール。
+
+    - lease() / release()（または with pool.driver() as driver:）で借りて返す
+    - driver は必要になった時点で factory() により作る（起動時に全台は立ち上げない）
+    - 貸し出し前に is_driver_alive で生存確認し、死んでいれば作り直す
+    - max_pages 件処理した driver、JS ヒープが max_heap_mb を超えた driver は返却時に破棄する
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], webdriver.Chrome],
+        *,
+        size: int = 1,
+        max_pages: int = DEFAULT_DRIVER_MAX_PAGES,
+        max_heap_mb: float = DEFAULT_DRIVER_MAX_HEAP_MB,
+        quit_driver: Callable[[webdriver.Chrome], None] = quit_chrome_driver,
+    ):
+        self.factory = factory
+        self.size = max(int(size), 1)
+        self.max_pages = max_pages
+        self.max_heap_mb = max_heap_mb
+        self._quit_driver = quit_driver
+        self._idle: list = []
+        self._uses: dict[int, int] = {}
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __enter__(self) -> "DriverPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def lease(self, timeout: float | None = None) -> webdriver.Chrome:
+        """空いている driver を返す。全台貸出中なら返却を待つ（timeout 秒で TimeoutError）。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    driver = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    driver = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("DriverPool: driver の返却待ちがタイムアウトしました")
+                self._cond.wait(remaining)
+
+        if driver is not None and not is_driver_alive(driver):
+            logging.warning("Chrome セッション切れ → プールの driver を作り直します")
+            self._discard(driver, release_slot=False)
+            driver = None
+        if driver is None:
+            try:
+                driver = self.factory()
+            except BaseException:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._uses[id(driver)] = 0
+        return driver
+
+    def release(self, driver: webdriver.Chrome, *, broken: bool = False) -> None:
+        """driver を返す。壊れている・使用上限・メモリ超過なら破棄して枠を空ける。"""
+        with self._cond:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            closed = self._closed
+        reason = None
+        if broken:
+            reason = "異常終了"
+        elif closed:
+            reason = "プール終了"
+        elif self.max_pages and uses >= self.max_pages:
+            reason = f"{uses} 件処理"
+        elif self.max_heap_mb:
+            heap = driver_heap_mb(driver)
+            if heap is not None and heap > self.max_heap_mb:
+                reason = f"JS ヒープ {heap:.0f}MB"
+        if not reason:
+            with self._cond:
+                if not self._closed:
+                    self._idle.append(driver)
+                    self._cond.notify()
+                    return
+            reason = "プール終了"
+        logging.info("♻ Chrome を作り直します（%s）", reason)
+        self._discard(driver)
+
+    @contextmanager
+    def driver(self, timeout: float | None = None) -> Iterator[webdriver.Chrome]:
+        driver = self.lease(timeout)
+        broken = False
+        try:
+            yield driver
+        except BaseException:
+            broken = not is_driver_alive(driver)
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self) -> None:
+        """待機中の driver をすべて終了する。貸出中のものは返却時に終了する。"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def _discard(self, driver: webdriver.Chrome, *, release_slot: bool = True) -> None:
+        with self._cond:
+            self._uses.pop(id(driver), None)
+        self._quit_driver(driver)
+        if release_slot:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
@@ -15,7 +15,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from openai import OpenAI
 
 from openai_api.config import OPENAI_MODEL
-from utils.chromedriver import chromedriver_path
+from utils.chromedriver import apply_resource_blocking, chromedriver_path
 from utils.screenshot import save_debug_files
 
 client = OpenAI()
@@ -31,12 +31,12 @@ def create_driver() -> webdriver.Chrome:
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-extensions")
-    options.add_argument("--disable-images")
     options.page_load_strategy = "eager"
 
     service = Service(chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     driver.set_page_load_timeout(20)
+    apply_resource_blocking(driver, "review")
 
     return driver
 
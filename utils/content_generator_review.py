@@ -1,5 +1,6 @@
 # utils/content_generator.py
 
+import json
 import os
 import random
 import re
@@ -16,17 +17,26 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
 from openai import OpenAI
 
-from bs4 import BeautifulSoup
-
+from openai_api import llm_gateway
 from openai_api.config import OPENAI_MODEL
-from openai_api.content_generator import extract_synopsis_from_soup
-from utils.chromedriver import chromedriver_path
+from openai_api.content_generator import extract_synopsis_from_soup, parse_synopsis_html
+from utils.chromedriver import (
+    DriverPool,
+    apply_resource_blocking,
+    chromedriver_path,
+    is_driver_alive,
+    log_page_load_metrics,
+)
 from utils.dmm_review_scraper import get_doujin_reviews, get_video_reviews
+from utils.html_parser import make_soup
 from utils.screenshot import save_debug_files
 
 client = OpenAI()
 
 SUMMARY_MAX_CHARS_FOR_AI = 4000
+REVIEW_INSIGHTS_MAX_TOKENS = 1200
+# 同時に起動しておく Chrome の台数
+REVIEW_DRIVER_POOL_SIZE = int(os.getenv("REVIEW_DRIVER_POOL_SIZE", "1"))
 AGE_GATE_SYNOPSIS_MARKERS = (
     "アダルトサイトとなります",
     "18歳未満の方のアクセスは固くお断り",
@@ -43,22 +53,19 @@ def create_driver() -> webdriver.Chrome:
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--disable-gpu")
     options.add_argument("--disable-extensions")
-    options.add_argument("--disable-images")
     options.page_load_strategy = "eager"
 
     service = Service(chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     driver.set_page_load_timeout(20)
+    apply_resource_blocking(driver, "review")
 
     return driver
 
 
-def is_driver_alive(driver) -> bool:
-    try:
-        _ = driver.current_url
-        return True
-    except (InvalidSessionIdException, WebDriverException):
-        return False
+def create_driver_pool(size: int = REVIEW_DRIVER_POOL_SIZE) -> DriverPool:
+    """create_driver() の driver を使い回すプール（AI レビュー系・収集系で共用）。"""
+    return DriverPool(create_driver, size=size, quit_driver=quit_driver_safe)
 
 
 def quit_driver_safe(driver) -> None:
@@ -242,8 +249,11 @@ def scrape_review_comments(product_url: str, driver, service: str, floor: str, m
     logging.info(f"🔍 レビューURL: {review_url}")
 
     try:
+        # プールの driver はあらすじ用の設定のことがあるので、開く前に切り替える
+        apply_resource_blocking(driver, "review")
         if service == "doujin" and floor == "digital_doujin":
             driver.get(review_url)
+            log_page_load_metrics(driver, "review")
             handle_safe_mode(driver)
             try:
                 WebDriverWait(driver, 8).until(
@@ -261,6 +271,7 @@ def scrape_review_comments(product_url: str, driver, service: str, floor: str, m
         apply_age_check_cookie(driver)
 
         driver.get(review_url)
+        log_page_load_metrics(driver, "review")
         handle_safe_mode(driver)
 
         try:
@@ -295,7 +306,9 @@ def scrape_doujin_synopsis(driver, product_url: str) -> str:
     base_url = product_url.split("#")[0]
     current = (driver.current_url or "").split("#")[0]
     if base_url and base_url not in current:
+        apply_resource_blocking(driver, "synopsis")
         driver.get(base_url)
+        log_page_load_metrics(driver, "synopsis")
         handle_safe_mode(driver)
         try:
             WebDriverWait(driver, 12).until(
@@ -310,7 +323,7 @@ def scrape_doujin_synopsis(driver, product_url: str) -> str:
         )
         return ""
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = make_soup(driver.page_source)
     synopsis = extract_synopsis_from_soup(soup, base_url or driver.current_url)
     if synopsis and not is_age_gate_synopsis(synopsis):
         return synopsis
@@ -388,8 +401,7 @@ def _try_comic_synopsis_block(driver) -> str:
     except Exception:
         pass
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    synopsis = extract_synopsis_from_soup(soup, current_url)
+    synopsis = parse_synopsis_html(driver.page_source, current_url)
     if synopsis and not is_age_gate_synopsis(synopsis):
         return synopsis
 
@@ -398,7 +410,9 @@ def _try_comic_synopsis_block(driver) -> str:
 
 def scrape_product_summary(product_url: str, driver) -> str:
     try:
+        apply_resource_blocking(driver, "synopsis")
         driver.get(product_url)
+        log_page_load_metrics(driver, "synopsis")
         handle_safe_mode(driver)
         wait = WebDriverWait(driver, 15)
 
@@ -636,13 +650,13 @@ warning_points: 購入前に知っておくべき注意点を1〜3件、具体
 """
 
 
-def generate_review_insights(
+def build_review_insights_messages(
     reviews: List[Dict],
     html_summary: str,
     review_avg: float,
     review_count: int,
     genre_type: str
-) -> Dict:
+) -> List[Dict]:
 
     config = getGenreConfig(genre_type)
 
@@ -696,62 +710,91 @@ def generate_review_insights(
   "warning_points": ["..."]
 }}
 """
-    try:
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": REVIEW_INSIGHTS_SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_completion_tokens=1200,
+    return [
+        {"role": "system", "content": REVIEW_INSIGHTS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def parse_review_insights(
+    content: str,
+    review_avg: float,
+    review_count: int,
+    genre_type: str
+) -> Dict:
+    """AI 出力（JSON）にレビュー補正・総合スコア・レーダーチャートを付ける。"""
+
+    config = getGenreConfig(genre_type)
+    axis1 = config["axes"][0]["label"]
+    axis2 = config["axes"][1]["label"]
+
+    result = json.loads(content)
+
+    # =========================
+    # 🔥 レビュー補正適用
+    # =========================
+    for key in [
+        "content_score",
+        "emotion_score",
+        "attraction_score",
+        "genre_axis1_score",
+        "genre_axis2_score"
+    ]:
+        result[key] = adjust_score(
+            result.get(key, 70),
+            review_avg,
+            review_count
         )
 
-        import json
-        result = json.loads(response.choices[0].message.content)
+    # =========================
+    # 📊 総合スコア算出
+    # =========================
+    result["total_score"] = calculate_total_score(result)
+
+    # =========================
+    # 📈 レーダーチャート用データ
+    # =========================
+    result["radar_chart"] = {
+        "labels": [
+            "内容力",
+            "感情インパクト",
+            "魅力",
+            axis1,
+            axis2
+        ],
+        "values": [
+            result["content_score"],
+            result["emotion_score"],
+            result["attraction_score"],
+            result["genre_axis1_score"],
+            result["genre_axis2_score"]
+        ]
+    }
 
-        # =========================
-        # 🔥 レビュー補正適用
-        # =========================
-        for key in [
-            "content_score",
-            "emotion_score",
-            "attraction_score",
-            "genre_axis1_score",
-            "genre_axis2_score"
-        ]:
-            result[key] = adjust_score(
-                result.get(key, 70),
-                review_avg,
-                review_count
-            )
+    return result
 
-        # =========================
-        # 📊 総合スコア算出
-        # =========================
-        result["total_score"] = calculate_total_score(result)
 
-        # =========================
-        # 📈 レーダーチャート用データ
-        # =========================
-        result["radar_chart"] = {
-            "labels": [
-                "内容力",
-                "感情インパクト",
-                "魅力",
-                axis1,
-                axis2
-            ],
-            "values": [
-                result["content_score"],
-                result["emotion_score"],
-                result["attraction_score"],
-                result["genre_axis1_score"],
-                result["genre_axis2_score"]
-            ]
-        }
-
-        return result
+def generate_review_insights(
+    reviews: List[Dict],
+    html_summary: str,
+    review_avg: float,
+    review_count: int,
+    genre_type: str
+) -> Dict:
+
+    messages = build_review_insights_messages(
+        reviews, html_summary, review_avg, review_count, genre_type
+    )
+    try:
+        content = llm_gateway.complete(
+            messages,
+            model=OPENAI_MODEL,
+            client=client,
+            response_format={"type": "json_object"},
+            max_completion_tokens=REVIEW_INSIGHTS_MAX_TOKENS,
+            validate=json.loads,
+        )
+        return parse_review_insights(content, review_avg, review_count, genre_type)
 
     except Exception as e:
         logging.warning(f"[AI Error] {e}")
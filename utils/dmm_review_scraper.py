@@ -1,18 +1,137 @@
 import logging
 import re
 import time
-from typing import Optional
+from typing import Any, Callable, Optional
 
-from bs4 import BeautifulSoup
+from bs4 import Tag
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from utils.html_parser import (
+    COMIC_REVIEW_STRAINER,
+    DOUJIN_REVIEW_STRAINER,
+    E2E_REVIEW_STRAINER,
+    VIDEO_REVIEW_STRAINER,
+    make_soup,
+    strip_hidden_nodes,
+)
+
 # カードの星は 24px、古い UI は 16px。サマリーの 50px 星は除外する。
 _CARD_STAR_SIZES = {"16", "24"}
 _FULL_STAR_SRC = "/star/yellow.svg"
 _COMMENT_COUNT_RE = re.compile(r"\((\d+)件のコメント\)")
 _REVIEW_DATE_RE = re.compile(r"(20\d{2})[./年](\d{1,2})[./月](\d{1,2})")
+_ANY_DATE_RE = re.compile(r"(\d{4})[./年](\d{1,2})[./月](\d{1,2})")
+_DOUJIN_RATING_RE = re.compile(r"dcd-review-rating-(\d+)")
+_E2E_REVIEW_MARKER = 'data-e2eid="review-item"'
+_REVIEWER_LINK = 'a[href*="/review-front/reviewer/"]'
+_STAR_IMG = 'img[src*="/star/yellow.svg"]'
+
+# 条件待ちのポーリング間隔（固定 sleep の代わりに条件成立で即座に抜ける）
+REVIEW_POLL_SECONDS = 0.1
+# 展開クリック後、この秒数だけ DOM 変化が止まれば描画完了とみなす
+REVIEW_DOM_QUIET_SECONDS = 0.2
+REVIEW_DOM_QUIET_TIMEOUT = 3.0
+
+# document.body の変化時刻を記録する MutationObserver（ページ遷移で消えるので毎回入れ直す）
+_OBSERVE_MUTATIONS_JS = """
+const state = window.__xdmmMutations || (window.__xdmmMutations = {});
+if (state.observer) { state.observer.disconnect(); }
+state.last = performance.now();
+state.observer = new MutationObserver(() => { state.last = performance.now(); });
+state.observer.observe(document.body || document.documentElement, {
+  childList: true, subtree: true, characterData: true, attributes: true
+});
+return true;
+"""
+_MS_SINCE_MUTATION_JS = """
+const state = window.__xdmmMutations;
+return state ? performance.now() - state.last : null;
+"""
+# レビュー欄の状態を 1 回の RPC でまとめて読む（#review は表示位置へスクロールして遅延描画を促す）
+_REVIEW_PROBE_JS = """
+const scrollBy = arguments[0] || 0;
+const root = document.getElementById('review');
+const probe = {
+  comic: !!document.querySelector('[data-section-name="review"]'),
+  e2e: document.querySelectorAll('[data-e2eid="review-item"]').length,
+  root: !!root, text: '', reviewers: 0, cardStars: 0
+};
+if (!root) { return probe; }
+root.scrollIntoView({block: 'center', behavior: 'instant'});
+if (scrollBy) { window.scrollBy(0, scrollBy); }
+probe.text = root.innerText || '';
+probe.reviewers = root.querySelectorAll('a[href*="/review-front/reviewer/"]').length;
+probe.cardStars = Array.from(root.querySelectorAll('img[src*="/star/yellow.svg"]')).filter(
+  (im) => ['16', '24'].includes(im.getAttribute('width') || '') ||
+          ['16', '24'].includes(im.getAttribute('height') || '')
+).length;
+return probe;
+"""
+
+
+class _PhaseTimer:
+    """処理段階ごとの経過秒を測り、まとめて 1 行でログに出す。"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.phases: list[tuple[str, float]] = []
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def log(self) -> None:
+        detail = " ".join(f"{phase}={sec:.2f}s" for phase, sec in self.phases)
+        logging.info(
+            "%s 計測: %s 合計=%.2fs", self.label, detail, time.perf_counter() - self._start
+        )
+
+
+def _wait_until(driver, timeout: float, predicate: Callable[[Any], Any]) -> Any:
+    """predicate が真の値を返すまで待つ（タイムアウト時は None）。"""
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=REVIEW_POLL_SECONDS).until(
+            predicate
+        )
+    except TimeoutException:
+        return None
+
+
+def wait_for_dom_quiet(
+    driver,
+    *,
+    quiet: float = REVIEW_DOM_QUIET_SECONDS,
+    timeout: float = REVIEW_DOM_QUIET_TIMEOUT,
+) -> bool:
+    """DOM の変化が quiet 秒止まるまで待つ。測れない（JS 失敗・ページ遷移）場合は待たずに返す。"""
+    try:
+        driver.execute_script(_OBSERVE_MUTATIONS_JS)
+    except Exception:
+        return False
+
+    def settled(d) -> bool:
+        elapsed = d.execute_script(_MS_SINCE_MUTATION_JS)
+        if not isinstance(elapsed, (int, float)):
+            return True
+        return elapsed >= quiet * 1000
+
+    try:
+        return _wait_until(driver, timeout, settled) is not None
+    except Exception:
+        return False
+
+
+def _probe_reviews(driver, *, scroll_by: int = 0) -> dict:
+    try:
+        probe = driver.execute_script(_REVIEW_PROBE_JS, scroll_by)
+    except Exception:
+        return {}
+    return probe if isinstance(probe, dict) else {}
 
 
 def expand_hidden_reviews(driver):
@@ -45,53 +164,33 @@ def expand_hidden_reviews(driver):
                         continue
             if not clicked:
                 break
-            time.sleep(0.45)
+            # 展開で差し込まれる本文の描画が落ち着くまで待つ
+            wait_for_dom_quiet(driver)
     except Exception as e:
         logging.warning(f"ネタバレ展開失敗: {e}")
 
 
-def _node_text_content(driver, node) -> str:
-    if node is None:
-        return ""
+def _page_html(driver) -> str:
+    """展開後のページ全体を 1 回だけ取得する（以降の抽出は WebDriver を呼ばない）。"""
     try:
-        raw = driver.execute_script("return (arguments[0].textContent || '').trim();", node)
-        return (raw or "").strip()
-    except Exception:
+        return driver.page_source or ""
+    except Exception as e:
+        logging.warning(f"page_source 取得失敗: {e}")
         return ""
 
 
-def _legacy_e2e_review_body_text(driver, block) -> str:
-    """overflow-hidden 内は Selenium .text が空になりやすいので textContent を使う。"""
-    try:
-        body_el = block.find_element(
-            By.CSS_SELECTOR,
-            "div.text-xs.overflow-hidden.break-all",
-        )
-        t = _node_text_content(driver, body_el)
-        if t:
-            return t
-    except Exception:
-        pass
-    parts = []
-    for p in block.find_elements(By.CSS_SELECTOR, "p"):
-        try:
-            p.find_element(
-                By.XPATH,
-                "./ancestor::div[contains(@class,'border-t')][contains(@class,'border-gray-300')]",
-            )
-            continue
-        except Exception:
-            pass
-        tc = _node_text_content(driver, p)
-        if tc:
-            parts.append(tc)
-    return " ".join(parts)
+def _element_text(el) -> str:
+    """Selenium の .text 相当（要素ごとに改行）。"""
+    return el.get_text("\n", strip=True)
+
+
+def _format_date(m) -> str:
+    return f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"
 
 
-def _parse_doujin_rating_from_unit(unit) -> float:
-    for span in unit.find_elements(By.CSS_SELECTOR, "span[class*='dcd-review-rating-']"):
-        cls = span.get_attribute("class") or ""
-        m = re.search(r"dcd-review-rating-(\d+)", cls)
+def _parse_doujin_rating_from_unit(unit: Tag) -> float:
+    for span in unit.select("span[class*='dcd-review-rating-']"):
+        m = _DOUJIN_RATING_RE.search(" ".join(span.get("class") or []))
         if m:
             return int(m.group(1)) / 10.0
     return 0.0
@@ -102,14 +201,27 @@ def _is_full_star_src(src: str) -> bool:
     return bool(src) and _FULL_STAR_SRC in src
 
 
+def _img_attr(img, name: str) -> str:
+    """bs4 の Tag と Selenium の WebElement のどちらからも属性を読む。"""
+    if isinstance(img, Tag):
+        value = img.get(name)
+    elif hasattr(img, "get_attribute"):
+        value = img.get_attribute(name)
+    else:
+        value = ""
+    return (value or "").strip()
+
+
 def _is_small_star_img(img) -> bool:
     """レビューカードの星（16px / 24px）。サマリーの 50px は対象外。"""
-    src = (img.get_attribute("src") or "") if hasattr(img, "get_attribute") else ""
+    src = _img_attr(img, "src")
     if src and not _is_full_star_src(src):
         return False
-    w = (img.get_attribute("width") or "").strip()
-    h = (img.get_attribute("height") or "").strip()
-    return w in _CARD_STAR_SIZES or h in _CARD_STAR_SIZES
+    return _img_attr(img, "width") in _CARD_STAR_SIZES or _img_attr(img, "height") in _CARD_STAR_SIZES
+
+
+def _count_small_stars(el: Tag) -> int:
+    return sum(1 for im in el.select(_STAR_IMG) if _is_small_star_img(im))
 
 
 def review_comment_count_from_text(text: str) -> Optional[int]:
@@ -134,7 +246,7 @@ def parse_e2e_video_reviews_html(html: str, max_reviews: int = 10) -> list:
     """[data-e2eid=review-item] を HTML から抽出（Selenium 非依存）。"""
     if not html:
         return []
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, parse_only=E2E_REVIEW_STRAINER)
     blocks = soup.select('[data-e2eid="review-item"]')
     reviews = []
     for block in blocks[:max_reviews]:
@@ -189,15 +301,11 @@ def parse_e2e_video_reviews_html(html: str, max_reviews: int = 10) -> list:
     return reviews
 
 
-def _element_inside(driver, container, node) -> bool:
-    try:
-        return bool(
-            driver.execute_script(
-                "return arguments[0].contains(arguments[1]);", container, node
-            )
-        )
-    except Exception:
+def _is_inside(node: Tag, container: Optional[Tag]) -> bool:
+    """node が container 自身かその子孫か（DOM の contains 相当）。"""
+    if container is None:
         return False
+    return node is container or any(parent is container for parent in node.parents)
 
 
 def _strip_digital_review_noise(text: str) -> str:
@@ -215,140 +323,88 @@ def _strip_digital_review_noise(text: str) -> str:
     return re.sub(r"\n{3,}", "\n\n", text).strip()
 
 
-def _parse_legacy_e2e_video_reviews(driver, max_reviews: int) -> list:
-    try:
-        root = driver.find_element(By.ID, "review")
-        html = root.get_attribute("innerHTML") or ""
-    except Exception:
-        html = driver.page_source or ""
-    html_reviews = parse_e2e_video_reviews_html(html, max_reviews)
-    if html_reviews:
-        logging.info(
-            "動画レビュー取得(legacy/html): 本文抽出できたレビュー %s 件",
-            len(html_reviews),
-        )
-        return html_reviews
-
-    review_blocks = driver.find_elements(
-        By.CSS_SELECTOR,
-        '[data-e2eid="review-item"]',
-    )
-    n_blocks = len(review_blocks)
-    logging.info(
-        "動画レビュー取得(legacy): [data-e2eid=review-item] を %s 件検出", n_blocks
-    )
-    reviews = []
-    for idx, block in enumerate(review_blocks[:max_reviews], start=1):
-        stars = block.find_elements(
-            By.CSS_SELECTOR,
-            'img[src*="/star/yellow.svg"]',
-        )
-        rating = len(stars)
-        title = ""
-        try:
-            title_el = block.find_element(
-                By.CSS_SELECTOR,
-                "header span.font-bold",
-            )
-            title = _node_text_content(driver, title_el)
-        except Exception:
-            pass
-        text = _legacy_e2e_review_body_text(driver, block)
-        if text:
-            reviews.append({"rating": rating, "title": title, "text": text})
-        else:
-            logging.debug(
-                "動画レビュー取得(legacy): [%s] 本文なし（段落テキスト空）preview=%r",
-                idx,
-                (block.text or "").replace("\n", " ")[:100],
-            )
-        logging.debug(
-            "動画レビュー取得(legacy): [%s/%s] rating=%s title=%r text_len=%s",
-            idx,
-            min(n_blocks, max_reviews),
-            rating,
-            title[:80] if title else "",
-            len(text),
-        )
-    logging.info(
-        "動画レビュー取得(legacy): 本文抽出できたレビュー %s / %s 件",
-        len(reviews),
-        min(n_blocks, max_reviews),
-    )
+def _parse_legacy_e2e_video_reviews(html: str, max_reviews: int) -> list:
+    reviews = parse_e2e_video_reviews_html(html, max_reviews)
+    logging.info("動画レビュー取得(legacy/html): 本文抽出できたレビュー %s 件", len(reviews))
     return reviews
 
 
-def _parse_fanza_digital_video_reviews(driver, root, summary_el, max_reviews: int) -> list:
-    """video.dmm.co.jp 新UI（#review 内。参考: review_simw005_*.html）"""
+def _digital_review_unit(node: Tag, summary_el: Optional[Tag], *, levels: int, min_text: int):
+    """node から親をたどり、カード星 1〜5 個と min_text 文字超の本文を持つ最も外側の要素を返す。"""
+    unit = None
+    el = node
+    for _ in range(levels):
+        el = el.parent
+        if el is None or el.name == "[document]":
+            break
+        if _is_inside(el, summary_el):
+            continue
+        if 1 <= _count_small_stars(el) <= 5 and len(_element_text(el)) > min_text:
+            unit = el
+    return unit
+
+
+def _digital_review_title(unit: Tag) -> str:
+    for sel in ("span.font-bold", "h4", "[class*='font-semibold']"):
+        el = unit.select_one(sel)
+        if el is None:
+            continue
+        t = _element_text(el)
+        if t and len(t) < 200:
+            return t
+    return ""
+
+
+def _digital_review_date(unit: Tag) -> Optional[str]:
+    t_el = unit.find("time")
+    if t_el is not None:
+        return (t_el.get("datetime") or _element_text(t_el) or "").strip() or None
+    m = _ANY_DATE_RE.search(_element_text(unit))
+    return _format_date(m) if m else None
+
+
+def parse_fanza_digital_video_reviews_html(html: str, max_reviews: int = 10) -> list:
+    """video.dmm.co.jp 新UI（#review 内。参考: review_simw005_*.html）を HTML から抽出する。
+
+    レビュアーリンクごとに「カード星 1〜5 個を含む最も外側の祖先」をカードとみなす。
+    リンクが無いページはカード星（16/24px）から同様にカードを推定する。
+    """
+    if not html or max_reviews <= 0:
+        return []
+    soup = make_soup(html, parse_only=VIDEO_REVIEW_STRAINER)
+    root = soup.find(id="review")
+    if root is None:
+        return []
+    # ネタバレ折りたたみなど非表示の文字は Selenium の .text に含まれなかったので落とす
+    strip_hidden_nodes(root)
+    if is_empty_video_review_list(root.get_text("\n")):
+        return []
+    summary_el = root.select_one("div.border.rounded-lg.border-gray-300")
+
     reviews = []
     seen_prefix = set()
-
-    links = root.find_elements(
-        By.CSS_SELECTOR,
-        'a[href*="/review-front/reviewer/"]',
-    )
-    for link in links:
+    for link in root.select(_REVIEWER_LINK):
         if len(reviews) >= max_reviews:
             break
-        unit = None
-        el = link
-        for _ in range(16):
-            try:
-                el = el.find_element(By.XPATH, "..")
-            except Exception:
-                break
-            if summary_el and _element_inside(driver, summary_el, el):
-                continue
-            imgs = el.find_elements(By.CSS_SELECTOR, 'img[src*="/star/yellow.svg"]')
-            n_small = sum(1 for im in imgs if _is_small_star_img(im))
-            if 1 <= n_small <= 5 and len(el.text.strip()) > 20:
-                unit = el
+        unit = _digital_review_unit(link, summary_el, levels=16, min_text=20)
         if unit is None:
             continue
-        sig = unit.text.strip()[:160]
+        unit_text = _element_text(unit)
+        sig = unit_text[:160]
         if sig in seen_prefix:
             continue
         seen_prefix.add(sig)
 
-        rating = sum(
-            1
-            for im in unit.find_elements(By.CSS_SELECTOR, 'img[src*="/star/yellow.svg"]')
-            if _is_small_star_img(im)
-        )
-        rating = min(rating, 5) if rating else 0
-
-        title = ""
-        for sel in ("span.font-bold", "h4", "[class*='font-semibold']"):
-            try:
-                t = unit.find_element(By.CSS_SELECTOR, sel).text.strip()
-                if t and len(t) < 200:
-                    title = t
-                    break
-            except Exception:
-                pass
-
-        body = _strip_digital_review_noise(unit.text.strip())
+        rating = min(_count_small_stars(unit), 5)
+        title = _digital_review_title(unit)
+        body = _strip_digital_review_noise(unit_text)
         if title and body.startswith(title):
             text = body
         elif title:
             text = f"{title}\n{body}"
         else:
             text = body
-
-        reviewer = None
-        try:
-            reviewer = link.text.replace("\n", "").strip() or None
-        except Exception:
-            pass
-
-        date_str = None
-        try:
-            t_el = unit.find_element(By.TAG_NAME, "time")
-            date_str = (t_el.get_attribute("datetime") or t_el.text or "").strip() or None
-        except Exception:
-            m = re.search(r"(\d{4})[./年](\d{1,2})[./月](\d{1,2})", unit.text)
-            if m:
-                date_str = f"{m.group(1)}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"
+        reviewer = link.get_text("", strip=True).replace("\n", "") or None
 
         if text:
             reviews.append(
@@ -356,7 +412,7 @@ def _parse_fanza_digital_video_reviews(driver, root, summary_el, max_reviews: in
                     "rating": float(rating),
                     "title": title,
                     "text": text,
-                    "date": date_str,
+                    "date": _digital_review_date(unit),
                     "reviewer": reviewer,
                 }
             )
@@ -365,87 +421,56 @@ def _parse_fanza_digital_video_reviews(driver, root, summary_el, max_reviews: in
         return reviews
 
     # レビュアリンクが無い場合（稀）: カード星（16/24px）でブロックを推定
-    for img in root.find_elements(By.CSS_SELECTOR, 'img[src*="/star/yellow.svg"]'):
+    for img in root.select(_STAR_IMG):
         if len(reviews) >= max_reviews:
             break
-        if not _is_small_star_img(img):
-            continue
-        if summary_el and _element_inside(driver, summary_el, img):
+        if not _is_small_star_img(img) or _is_inside(img, summary_el):
             continue
-        el = img
-        unit = None
-        for _ in range(14):
-            try:
-                el = el.find_element(By.XPATH, "..")
-            except Exception:
-                break
-            if summary_el and _element_inside(driver, summary_el, el):
-                continue
-            txt = el.text.strip()
-            n_small = sum(
-                1
-                for im in el.find_elements(By.CSS_SELECTOR, 'img[src*="/star/yellow.svg"]')
-                if _is_small_star_img(im)
-            )
-            if 1 <= n_small <= 5 and len(txt) > 50:
-                unit = el
+        unit = _digital_review_unit(img, summary_el, levels=14, min_text=50)
         if unit is None:
             continue
-        sig = unit.text.strip()[:160]
+        unit_text = _element_text(unit)
+        sig = unit_text[:160]
         if sig in seen_prefix:
             continue
         seen_prefix.add(sig)
-        rating = min(
-            sum(
-                1
-                for im in unit.find_elements(
-                    By.CSS_SELECTOR, 'img[src*="/star/yellow.svg"]'
-                )
-                if _is_small_star_img(im)
-            ),
-            5,
-        )
-        text = _strip_digital_review_noise(unit.text.strip())
+        text = _strip_digital_review_noise(unit_text)
         if text:
-            reviews.append({"rating": float(rating), "title": "", "text": text})
+            reviews.append(
+                {"rating": float(min(_count_small_stars(unit), 5)), "title": "", "text": text}
+            )
 
     return reviews
 
 
 def _wait_video_review_ui(driver, timeout: float = 20) -> Optional[str]:
-    deadline = time.time() + timeout
+    """レビュー欄の種類を判定する: comic / legacy / empty / digital / None（レビュー欄なし）"""
     saw_review = False
-    while time.time() < deadline:
+
+    def detect(d):
+        nonlocal saw_review
+        probe = _probe_reviews(d)
         # book.dmm (comic) React UI
-        if driver.find_elements(By.CSS_SELECTOR, '[data-section-name="review"]'):
+        if probe.get("comic"):
             return "comic"
-        if driver.find_elements(By.CSS_SELECTOR, '[data-e2eid="review-item"]'):
+        if probe.get("e2e"):
             return "legacy"
-        roots = driver.find_elements(By.ID, "review")
-        if roots:
-            saw_review = True
-            try:
-                driver.execute_script(
-                    "arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});",
-                    roots[0],
-                )
-            except Exception:
-                pass
-            try:
-                text = roots[0].text or ""
-            except Exception:
-                text = ""
-            # #review 枠だけの SSR では digital と即断しない（一覧は遅延描画）
-            if is_empty_video_review_list(text):
-                return "empty"
-        time.sleep(0.25)
+        if not probe.get("root"):
+            return False
+        saw_review = True
+        if is_empty_video_review_list(probe.get("text") or ""):
+            return "empty"
+        # #review 枠だけの SSR では digital と即断しない（一覧は遅延描画）。カードが出たら digital
+        if probe.get("reviewers") or probe.get("cardStars"):
+            return "digital"
+        return False
+
+    mode = _wait_until(driver, timeout, detect)
+    if mode:
+        return mode
     if saw_review:
-        try:
-            roots = driver.find_elements(By.ID, "review")
-            if roots and is_empty_video_review_list(roots[0].text or ""):
-                return "empty"
-        except Exception:
-            pass
+        if is_empty_video_review_list(_probe_reviews(driver).get("text") or ""):
+            return "empty"
         return "digital"
     return None
 
@@ -455,51 +480,24 @@ def _hydrate_fanza_digital_review_list(driver, timeout: float = 25) -> Optional[
     video.dmm の #review は枠だけ先に SSR され、レビューカードが後から描画される。
     empty: コメント0件 / ready: 一覧あり / None: タイムアウト
     """
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        try:
-            root = driver.find_element(By.ID, "review")
-        except Exception:
-            time.sleep(0.3)
-            continue
-        try:
-            driver.execute_script(
-                "arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});",
-                root,
-            )
-        except Exception:
-            pass
-        try:
-            text = root.text or ""
-            if is_empty_video_review_list(text):
-                return "empty"
-            if driver.find_elements(By.CSS_SELECTOR, '[data-e2eid="review-item"]'):
-                return "ready"
-            if root.find_elements(
-                By.CSS_SELECTOR, 'a[href*="/review-front/reviewer/"]'
-            ):
-                return "ready"
-            card_stars = [
-                im
-                for im in root.find_elements(
-                    By.CSS_SELECTOR, 'img[src*="/star/yellow.svg"]'
-                )
-                if _is_small_star_img(im)
-            ]
-            if len(card_stars) >= 1:
-                return "ready"
-        except Exception:
-            pass
-        try:
-            driver.execute_script("window.scrollBy(0, 500);")
-        except Exception:
-            pass
-        time.sleep(0.35)
-    logging.warning(
-        "動画レビュー: #review 内の一覧が %.0f 秒以内に現れませんでした",
-        timeout,
-    )
-    return None
+
+    def hydrated(d):
+        probe = _probe_reviews(d, scroll_by=500)
+        if not probe.get("root"):
+            return False
+        if is_empty_video_review_list(probe.get("text") or ""):
+            return "empty"
+        if probe.get("e2e") or probe.get("reviewers") or probe.get("cardStars"):
+            return "ready"
+        return False
+
+    state = _wait_until(driver, timeout, hydrated)
+    if state is None:
+        logging.warning(
+            "動画レビュー: #review 内の一覧が %.0f 秒以内に現れませんでした",
+            timeout,
+        )
+    return state
 
 
 # =========================
@@ -507,9 +505,11 @@ def _hydrate_fanza_digital_review_list(driver, timeout: float = 25) -> Optional[
 # =========================
 def get_video_reviews(driver, product_url, max_reviews=10):
     logging.info(f"🔍 動画レビュー取得: {product_url}")
+    timer = _PhaseTimer("動画レビュー")
 
     try:
         mode = _wait_video_review_ui(driver, timeout=20)
+        timer.lap("detect")
         if not mode:
             logging.warning(
                 f"[Video Review] レビュー領域が見つかりません: {product_url}"
@@ -521,59 +521,49 @@ def get_video_reviews(driver, product_url, max_reviews=10):
             return []
 
         expand_hidden_reviews(driver)
-        time.sleep(0.8)
+        timer.lap("expand")
 
         if mode == "legacy":
             logging.info("🔍 動画レビュー取得: legacy")
-            expand_hidden_reviews(driver)
-            time.sleep(0.5)
-            return _parse_legacy_e2e_video_reviews(driver, max_reviews)
+            html = _page_html(driver)
+            timer.lap("page_source")
+            reviews = _parse_legacy_e2e_video_reviews(html, max_reviews)
+            timer.lap("parse")
+            return reviews
 
         if mode == "comic":
             logging.info("🔍 動画レビュー取得: comic")
-            expand_hidden_reviews(driver)
-            time.sleep(0.5)
-            return _parse_comic_reviews(driver, max_reviews)
+            html = _page_html(driver)
+            timer.lap("page_source")
+            reviews = _parse_comic_reviews(html, max_reviews)
+            timer.lap("parse")
+            return reviews
 
         logging.info("🔍 動画レビュー取得: digital")
         hydrated = _hydrate_fanza_digital_review_list(driver, timeout=25)
-        expand_hidden_reviews(driver)
-        time.sleep(0.6)
-
+        timer.lap("hydrate")
         if hydrated == "empty":
             logging.info("動画レビュー: コメント0件のためスキップ")
             return []
 
-        if driver.find_elements(By.CSS_SELECTOR, '[data-e2eid="review-item"]'):
+        expand_hidden_reviews(driver)
+        timer.lap("expand2")
+        html = _page_html(driver)
+        timer.lap("page_source")
+        if _E2E_REVIEW_MARKER in html:
             logging.info("🔍 動画レビュー取得: legacy (hydrate後)")
-            return _parse_legacy_e2e_video_reviews(driver, max_reviews)
-
-        root = driver.find_element(By.ID, "review")
-        try:
-            text = root.text or ""
-        except Exception:
-            text = ""
-        if is_empty_video_review_list(text):
-            logging.info("動画レビュー: コメント0件のためスキップ")
-            return []
-
-        summaries = root.find_elements(
-            By.CSS_SELECTOR,
-            "div.border.rounded-lg.border-gray-300",
-        )
-        summary_el = summaries[0] if summaries else None
-        reviews = _parse_fanza_digital_video_reviews(
-            driver, root, summary_el, max_reviews
-        )
-        if not reviews:
-            html = root.get_attribute("innerHTML") or ""
-            reviews = parse_e2e_video_reviews_html(html, max_reviews)
-        logging.info(f"動画(デジタル)レビュー取得: {len(reviews)} 件")
+            reviews = _parse_legacy_e2e_video_reviews(html, max_reviews)
+        else:
+            reviews = parse_fanza_digital_video_reviews_html(html, max_reviews)
+            logging.info(f"動画(デジタル)レビュー取得: {len(reviews)} 件")
+        timer.lap("parse")
         return reviews
 
     except Exception as e:
         logging.warning(f"[Video Review Parse Error] {product_url} → {repr(e)}")
         return []
+    finally:
+        timer.log()
 
 
 def parse_comic_reviews_html(html: str, max_reviews: int = 10) -> list:
@@ -584,8 +574,11 @@ def parse_comic_reviews_html(html: str, max_reviews: int = 10) -> list:
     """
     if not html:
         return []
-    soup = BeautifulSoup(html, "html.parser")
-    root = soup.select_one('[data-section-name="review"]') or soup
+    soup = make_soup(html, parse_only=COMIC_REVIEW_STRAINER)
+    root = soup.select_one('[data-section-name="review"]')
+    if root is None:
+        # レビュー欄の外側にカードがある HTML（section 属性なし）は全体から探す
+        root = make_soup(html)
     reviews = []
     seen = set()
     for link in root.select('a[data-testid="nickname"]'):
@@ -640,107 +633,85 @@ def parse_comic_reviews_html(html: str, max_reviews: int = 10) -> list:
     return reviews
 
 
-def _parse_comic_reviews(driver, max_reviews: int) -> list:
+def _parse_comic_reviews(html: str, max_reviews: int) -> list:
     """floor=comic / photo (book.dmm) のレビュー抽出。"""
-    roots = driver.find_elements(By.CSS_SELECTOR, '[data-section-name="review"]')
-    if not roots:
+    if 'data-section-name="review"' not in html:
         logging.info("comicレビュー: 0件（review section なし）")
         return []
-
-    html = roots[0].get_attribute("outerHTML") or ""
     reviews = parse_comic_reviews_html(html, max_reviews)
     logging.info("comicレビュー取得: %s 件", len(reviews))
     return reviews
 
 
+def parse_doujin_reviews_html(html: str, max_reviews: int = 10) -> list:
+    """FANZA同人の #review_anchor li.dcd-review__unit からレビューを抽出する。"""
+    if not html:
+        return []
+    soup = make_soup(html, parse_only=DOUJIN_REVIEW_STRAINER)
+    reviews = []
+    for unit in soup.select("#review_anchor li.dcd-review__unit")[:max_reviews]:
+        title_el = unit.select_one("span.dcd-review__unit__title")
+        title = _element_text(title_el) if title_el else ""
+
+        comment_parts = []
+        for div in unit.select("div.dcd-review__unit__comment"):
+            t = _element_text(div)
+            if t:
+                comment_parts.append(t)
+        body = "\n".join(comment_parts)
+
+        reviewer_el = unit.select_one("span.dcd-review__unit__reviewer a")
+        reviewer = reviewer_el.get_text("", strip=True) if reviewer_el else None
+
+        date_el = unit.select_one("span.dcd-review__unit__postdate")
+        date_str = (_element_text(date_el).lstrip("-").strip() or None) if date_el else None
+
+        rating_val = _parse_doujin_rating_from_unit(unit)
+        text = "\n".join(s for s in (title, body) if s)
+        if text:
+            reviews.append(
+                {
+                    "rating": rating_val if rating_val else 0,
+                    "text": text,
+                    "date": date_str,
+                    "reviewer": reviewer,
+                }
+            )
+    return reviews
 
 
 # =========================
 # 📝 同人誌レビュー取得（FANZA同人: #review_anchor / .dcd-review__unit）
 # =========================
 def get_doujin_reviews(driver, product_url, max_reviews=10):
+    timer = _PhaseTimer("同人レビュー")
 
     try:
         # scrape_review_comments 側でも待機済みのため短めにする
         try:
-            WebDriverWait(driver, 5).until(
+            WebDriverWait(driver, 5, poll_frequency=REVIEW_POLL_SECONDS).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "#review_anchor"))
             )
         except Exception:
             logging.info("同人レビュー: #review_anchor 未検出")
             return []
 
-        units = driver.find_elements(By.CSS_SELECTOR, "#review_anchor li.dcd-review__unit")
-        if not units:
-            try:
-                WebDriverWait(driver, 3).until(
-                    lambda d: d.find_elements(
-                        By.CSS_SELECTOR, "#review_anchor li.dcd-review__unit"
-                    )
-                )
-            except Exception:
-                pass
-            units = driver.find_elements(
-                By.CSS_SELECTOR, "#review_anchor li.dcd-review__unit"
-            )
-
+        units = _wait_until(
+            driver,
+            3,
+            lambda d: d.find_elements(By.CSS_SELECTOR, "#review_anchor li.dcd-review__unit"),
+        )
+        timer.lap("detect")
         if not units:
             logging.info("同人レビュー: 0件（セクション内に .dcd-review__unit なし）")
             return []
 
         expand_hidden_reviews(driver)
-        time.sleep(0.25)
-
-        units = driver.find_elements(By.CSS_SELECTOR, "#review_anchor li.dcd-review__unit")
-
-        reviews = []
-
-        for unit in units[:max_reviews]:
-            title = ""
-            try:
-                title = unit.find_element(
-                    By.CSS_SELECTOR, "span.dcd-review__unit__title"
-                ).text.strip()
-            except Exception:
-                pass
-
-            comment_parts = []
-            for div in unit.find_elements(By.CSS_SELECTOR, "div.dcd-review__unit__comment"):
-                t = div.text.strip()
-                if t:
-                    comment_parts.append(t)
-            body = "\n".join(comment_parts)
-
-            reviewer = None
-            try:
-                reviewer = unit.find_element(
-                    By.CSS_SELECTOR, "span.dcd-review__unit__reviewer a"
-                ).text.replace("\n", "").strip()
-            except Exception:
-                pass
-
-            date_str = None
-            try:
-                raw = unit.find_element(
-                    By.CSS_SELECTOR, "span.dcd-review__unit__postdate"
-                ).text.strip()
-                date_str = raw.lstrip("-").strip() or None
-            except Exception:
-                pass
-
-            rating_val = _parse_doujin_rating_from_unit(unit)
-
-            lines = [s for s in (title, body) if s]
-            text = "\n".join(lines)
-
-            if text:
-                reviews.append({
-                    "rating": rating_val if rating_val else 0,
-                    "text": text,
-                    "date": date_str,
-                    "reviewer": reviewer,
-                })
-
+        timer.lap("expand")
+        html = _page_html(driver)
+        timer.lap("page_source")
+        reviews = parse_doujin_reviews_html(html, max_reviews)
+        timer.lap("parse")
         logging.info(f"取得レビュー件数: {len(reviews)}")
 
         return reviews
@@ -748,3 +719,5 @@ def get_doujin_reviews(driver, product_url, max_reviews=10):
     except Exception as e:
         logging.warning(f"[Doujin Review Parse Error] {product_url} → {repr(e)}")
         return []
+    finally:
+        timer.log()
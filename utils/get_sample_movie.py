@@ -65,8 +65,8 @@ def resolve_mp4_url(page_url: str) -> str | None:
     headers = {"User-Agent": "Mozilla/5.0"}
     res = requests.get(page_url, headers=headers)
     res.raise_for_status()
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(res.text, "html.parser")
+    from utils.html_parser import make_soup
+    soup = make_soup(res.text)
     source = soup.find("source")
     return source["src"] if source and source.get("src") else None
 
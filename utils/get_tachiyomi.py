@@ -1,6 +1,12 @@
+import base64
+import io
 import os
 import time
+import uuid
 import logging
+from collections import deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -9,7 +15,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from PIL import Image
 
-from utils.chromedriver import create_chrome_driver, quit_chrome_driver
+from utils.chromedriver import DriverPool, create_chrome_driver, quit_chrome_driver
 from utils.logger import setup_logger
 
 # ---------------------
@@ -17,6 +23,19 @@ from utils.logger import setup_logger
 # ---------------------
 setup_logger("get_tachiyomi.log")
 
+# dataurl: canvas の画素を toDataURL で直接読む / screenshot: 旧方式（canvas のスクリーンショット → PNG → WebP）
+TACHIYOMI_CAPTURE_MODE = os.getenv("TACHIYOMI_CAPTURE_MODE", "dataurl")
+# ページ送り後、canvas の描画が変わるまで待つ上限秒（超えたら表示中の canvas をそのまま読む）
+TACHIYOMI_RENDER_TIMEOUT = float(os.getenv("TACHIYOMI_RENDER_TIMEOUT", "8"))
+TACHIYOMI_RENDER_POLL = 0.1
+# 白紙・前ページと同じ絵のまま変わらない canvas は、この秒数続いたらそのまま読む（白紙ページで上限まで待たない）
+TACHIYOMI_RENDER_SETTLE = float(os.getenv("TACHIYOMI_RENDER_SETTLE", "1.5"))
+TACHIYOMI_WEBP_QUALITY = 0.9
+# TachiyomiCaptureService で同時に取り込む本の数（= 起動しておく Chrome の台数）
+TACHIYOMI_CAPTURE_WORKERS = int(os.getenv("TACHIYOMI_CAPTURE_WORKERS", "3"))
+# prefetch で先読みする本の数（worker あたり）。取り込み済みで未使用の WebP が utils/temp に溜まりすぎないようにする
+TACHIYOMI_READ_AHEAD_PER_WORKER = int(os.getenv("TACHIYOMI_READ_AHEAD_PER_WORKER", "2"))
+
 # DMM book は 2026-06 頃から Publus（Web Components + Shadow DOM）へ移行。
 # 旧 #viewer / #pageSliderCounter / #endOfBook は残っていない。
 _VIEWER_KIND_JS = """
@@ -70,6 +89,39 @@ return st.visibility !== 'hidden' && st.display !== 'none' && Number(st.opacity
 """
 
 
+# 16x16 に縮小した画素から署名を作り、未描画（単色）・前ページと同じなら画像は返さない。
+# force=true なら判定せずに返す。cross-origin で読めない canvas は {error}。
+_CANVAS_SNAPSHOT_JS = """
+const canvas = arguments[0];
+const previous = arguments[1];
+const force = arguments[2];
+if (!canvas || !canvas.width || !canvas.height) return null;
+const probe = document.createElement('canvas');
+probe.width = 16;
+probe.height = 16;
+const ctx = probe.getContext('2d');
+let pixels;
+try {
+  ctx.drawImage(canvas, 0, 0, 16, 16);
+  pixels = ctx.getImageData(0, 0, 16, 16).data;
+} catch (e) {
+  return {error: String(e)};
+}
+let sig = 0, min = 255, max = 0;
+for (let i = 0; i < pixels.length; i += 4) {
+  const v = ((pixels[i] + pixels[i + 1] + pixels[i + 2]) / 3) | 0;
+  sig = (sig * 31 + v) >>> 0;
+  if (v < min) min = v;
+  if (v > max) max = v;
+}
+sig = String(sig);
+if (!force && max - min < 4) return {blank: true, sig: sig};
+if (!force && previous !== null && sig === previous) return {same: true, sig: sig};
+return {sig: sig, data: canvas.toDataURL(arguments[3], arguments[4]),
+        width: canvas.width, height: canvas.height};
+"""
+
+
 def save_page_source(driver, idx, log_dir="logs"):
     # ログディレクトリがなければ作成
     os.makedirs(log_dir, exist_ok=True)
@@ -128,6 +180,84 @@ def get_visible_canvas(driver):
     raise Exception("表示中のcanvasが見つかりません")
 
 
+# ---------------------
+# canvas 画素の直接読み出し
+# ---------------------
+def read_canvas_snapshot(driver, *, previous_sig=None, force=False):
+    """表示中 canvas を _CANVAS_SNAPSHOT_JS で読む。canvas が無ければ None。"""
+    try:
+        canvas = get_visible_canvas(driver)
+    except Exception:
+        return None
+    result = driver.execute_script(
+        _CANVAS_SNAPSHOT_JS, canvas, previous_sig, force, "image/webp", TACHIYOMI_WEBP_QUALITY
+    )
+    return result if isinstance(result, dict) else None
+
+
+def wait_for_rendered_canvas(driver, previous_sig=None, timeout=None, settle=None):
+    """canvas が描画済みで前ページ（previous_sig）と違う内容になるまで待ち、その画像を返す。
+
+    白紙・前ページと同じ状態が settle 秒続いたら（白紙ページ・同じ絵の見開き等）表示中の canvas をそのまま読む。
+    canvas 自体が見つからないまま timeout を過ぎた場合も同様。
+    """
+    timeout = TACHIYOMI_RENDER_TIMEOUT if timeout is None else timeout
+    settle = TACHIYOMI_RENDER_SETTLE if settle is None else settle
+    unchanged_since = None
+
+    def _rendered(d):
+        nonlocal unchanged_since
+        snapshot = read_canvas_snapshot(d, previous_sig=previous_sig)
+        if snapshot and ("data" in snapshot or "error" in snapshot):
+            return snapshot
+        if not snapshot:
+            unchanged_since = None
+            return False
+        now = time.monotonic()
+        if unchanged_since is None:
+            unchanged_since = now
+        elif now - unchanged_since >= settle:
+            logging.info("canvas が %.1f 秒変化しない → 表示中の canvas を読む", settle)
+            return read_canvas_snapshot(d, force=True) or False
+        return False
+
+    try:
+        return WebDriverWait(
+            driver,
+            timeout,
+            poll_frequency=TACHIYOMI_RENDER_POLL,
+            ignored_exceptions=(StaleElementReferenceException,),
+        ).until(_rendered)
+    except TimeoutException:
+        logging.info("canvas の描画変化を確認できず → 表示中の canvas を読む")
+        return read_canvas_snapshot(driver, force=True)
+
+
+def save_data_url_as_webp(data_url: str, path: str) -> str:
+    """toDataURL の結果を WebP で保存する（WebP 以外で返ってきた場合だけ PIL で変換）。"""
+    header, _, encoded = data_url.partition(",")
+    raw = base64.b64decode(encoded)
+    if header.startswith("data:image/webp"):
+        with open(path, "wb") as f:
+            f.write(raw)
+    else:
+        with Image.open(io.BytesIO(raw)) as im:
+            im.save(path, "webp", quality=int(TACHIYOMI_WEBP_QUALITY * 100))
+    return path
+
+
+def _capture_by_screenshot(driver, screenshot_path: str) -> str:
+    canvas = WebDriverWait(driver, 5).until(lambda d: get_visible_canvas(d))
+    canvas.screenshot(screenshot_path)
+
+    # PNG → WebP に変換して削除
+    webp_path = screenshot_path.replace(".png", ".webp")
+    with Image.open(screenshot_path) as im:
+        im.save(webp_path, "webp", quality=90)
+    os.remove(screenshot_path)
+    return webp_path
+
+
 # ---------------------
 # ページカウンタ取得関数
 # ---------------------
@@ -167,41 +297,76 @@ _MOBILE_USER_AGENT = (
 )
 
 
-def capture_all_tachiyomi_pages(tachiyomi_url: str):
+def _launch_mobile_driver():
+    return create_chrome_driver(
+        page_load_timeout=60,
+        window_size="440,932",
+        user_agent=_MOBILE_USER_AGENT,
+    )
+
+
+def verify_age(driver) -> None:
+    """DMM トップを開いて年齢認証「はい」を押す（認証済みなら何もしない）。"""
+    logging.info("DMMトップページを開く")
+    driver.get("https://www.dmm.co.jp/top/")
+
+    try:
+        button = WebDriverWait(driver, 5).until(
+            EC.presence_of_element_located((
+                By.XPATH,
+                "//a[text()='はい'] | //a[text()='I Agree']"
+            ))
+        )
+        driver.execute_script("arguments[0].click();", button)
+        logging.info("年齢認証成功")
+        time.sleep(1)
+    except (TimeoutException, StaleElementReferenceException):
+        logging.info("年齢認証不要 or 既認証済み")
+
+
+def create_tachiyomi_driver():
+    """年齢認証まで済ませたモバイル表示の Chrome（TachiyomiCaptureService のプール用）。"""
+    driver = _launch_mobile_driver()
+    try:
+        verify_age(driver)
+    except BaseException:
+        quit_chrome_driver(driver)
+        raise
+    return driver
+
+
+def capture_all_tachiyomi_pages(
+    tachiyomi_url: str,
+    *,
+    driver=None,
+    file_prefix: str = "page",
+    on_page: Callable[[int, str], None] | None = None,
+):
+    """立ち読みの全ページを WebP で保存し、ページ順のパス一覧を返す（失敗時は取れた分まで）。
+
+    driver を渡すと年齢認証済みとみなしてそのまま使い、終了もしない（TachiyomiCaptureService 用）。
+    並列に取り込むときは file_prefix を本ごとに変えてファイル名の衝突を避ける。
+    on_page(ページ番号, パス) は 1 ページ保存するたびに呼ぶ（TachiyomiUploadStream.put を渡すと
+    次のページを撮っている間にアップロードが進む）。
+    """
     logging.info(f"立ち読み対象URL: {tachiyomi_url}")
 
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     TEMP_DIR = os.path.join(BASE_DIR, "temp")
     os.makedirs(TEMP_DIR, exist_ok=True)
 
-    try:
-        driver = create_chrome_driver(
-            page_load_timeout=60,
-            window_size="440,932",
-            user_agent=_MOBILE_USER_AGENT,
-        )
-    except Exception as e:
-        logging.warning("Chrome 起動失敗（立ち読みをスキップ）: %s", e)
-        return []
+    own_driver = driver is None
+    if own_driver:
+        try:
+            driver = _launch_mobile_driver()
+        except Exception as e:
+            logging.warning("Chrome 起動失敗（立ち読みをスキップ）: %s", e)
+            return []
 
     images: list[str] = []
     try:
-        logging.info("DMMトップページを開く")
-        driver.get("https://www.dmm.co.jp/top/")
-
-        # 年齢認証
-        try:
-            button = WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((
-                    By.XPATH,
-                    "//a[text()='はい'] | //a[text()='I Agree']"
-                ))
-            )
-            driver.execute_script("arguments[0].click();", button)
-            logging.info("年齢認証成功")
-            time.sleep(1)
-        except (TimeoutException, StaleElementReferenceException):
-            logging.info("年齢認証不要 or 既認証済み")
+        if own_driver:
+            verify_age(driver)
 
         try:
             driver.get(tachiyomi_url)
@@ -210,10 +375,13 @@ def capture_all_tachiyomi_pages(tachiyomi_url: str):
             logging.error(f"driver.get 失敗（立ち読みをスキップ）: {e!r}")
             return []
 
-        time.sleep(2)
+        use_data_url = TACHIYOMI_CAPTURE_MODE == "dataurl"
+        if not use_data_url:
+            time.sleep(2)
 
         page_idx = 1
         current_page = 0
+        previous_sig = None
 
         # ビューア表示待ちのタイムアウトは致命的にせず、空リストを返して呼び出し元の処理を継続させる。
         try:
@@ -232,7 +400,8 @@ def capture_all_tachiyomi_pages(tachiyomi_url: str):
         logging.info(f"総ページ数: {total_page}")
 
         actions = ActionChains(driver)
-        time.sleep(2)  # ページ描画待ち
+        if not use_data_url:
+            time.sleep(2)  # ページ描画待ち（dataurl は canvas の描画を待って読む）
 
         while True:
             try:
@@ -242,18 +411,33 @@ def capture_all_tachiyomi_pages(tachiyomi_url: str):
                     logging.info("最終ページを検出 → スクリーンショット終了")
                     break
 
-                canvas = WebDriverWait(driver, 5).until(lambda d: get_visible_canvas(d))
-                screenshot_path = os.path.join(TEMP_DIR, f"page_{page_idx:03}.png")
-                canvas.screenshot(screenshot_path)
-
-                # PNG → WebP に変換して削除
-                webp_path = screenshot_path.replace(".png", ".webp")
-                with Image.open(screenshot_path) as im:
-                    im.save(webp_path, "webp", quality=90)
-                os.remove(screenshot_path)
+                webp_path = None
+                if use_data_url:
+                    snapshot = wait_for_rendered_canvas(driver, previous_sig)
+                    if snapshot and snapshot.get("data"):
+                        previous_sig = snapshot.get("sig")
+                        webp_path = save_data_url_as_webp(
+                            snapshot["data"],
+                            os.path.join(TEMP_DIR, f"{file_prefix}_{page_idx:03}.webp"),
+                        )
+                    elif snapshot and snapshot.get("error"):
+                        # toDataURL が例外（汚染 canvas 等）→ 以降のページもスクリーンショットで取る
+                        logging.warning(
+                            "canvas を直接読めないためスクリーンショットに切り替え: %s",
+                            snapshot["error"],
+                        )
+                        use_data_url = False
+                    else:
+                        logging.info("canvas を読めなかったため、このページだけスクリーンショットで取る")
+                if webp_path is None:
+                    webp_path = _capture_by_screenshot(
+                        driver, os.path.join(TEMP_DIR, f"{file_prefix}_{page_idx:03}.png")
+                    )
 
                 images.append(webp_path)
                 logging.info(f"保存成功 (WebP): {webp_path}")
+                if on_page is not None:
+                    on_page(page_idx, webp_path)
 
                 if current_page == 0:
                     current_page, _ = get_page_counter(driver, timeout=5)
@@ -266,7 +450,8 @@ def capture_all_tachiyomi_pages(tachiyomi_url: str):
                 actions.send_keys(Keys.ARROW_LEFT).perform()
                 page_idx += 1
                 current_page += 1
-                time.sleep(1)
+                if not use_data_url:
+                    time.sleep(1)
 
             except (TimeoutException, NoSuchElementException) as e:
                 logging.error(f"canvas取得失敗 idx={page_idx}: {e}")
@@ -281,11 +466,132 @@ def capture_all_tachiyomi_pages(tachiyomi_url: str):
         logging.warning("立ち読み処理失敗（空リストで続行）: %s", e)
         return []
     finally:
-        quit_chrome_driver(driver)
+        if own_driver:
+            quit_chrome_driver(driver)
 
     return images
 
 
+# ---------------------
+# 複数の本を並列に取り込むサービス
+# ---------------------
+def _discard_pages(paths: list[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class TachiyomiPrefetch:
+    """TachiyomiCaptureService.prefetch の戻り値。URL の並び順に本を先読みする。
+
+    - 同じ URL が複数回出てきても 1 件ごとに別の取り込みにする（各呼び出し側が自分のファイルを消せる）
+    - 投入済みで take() されていない本は limit 冊まで。take() するたびに次の本を投入する
+    """
+
+    def __init__(self, service: "TachiyomiCaptureService", tachiyomi_urls: Iterable[str | None], limit: int):
+        self._service = service
+        self._urls = iter([url for url in tachiyomi_urls if url])
+        self._limit = max(int(limit), 1)
+        self._jobs: deque[tuple[str, Future]] = deque()
+        self._fill()
+
+    def _fill(self) -> None:
+        while len(self._jobs) < self._limit:
+            url = next(self._urls, None)
+            if url is None:
+                return
+            self._jobs.append((url, self._service.submit(url)))
+
+    def take(self, tachiyomi_url: str) -> list[str]:
+        """次の本の取り込み結果（ページ順の WebP パス一覧）を待って返す。
+
+        入力順に呼ぶ前提。飛ばされた本は取り消し、取り込み済みならファイルを消す。
+        先読みに無い URL はこのスレッドで取り込む。
+        """
+        while self._jobs:
+            url, future = self._jobs.popleft()
+            if url == tachiyomi_url:
+                self._fill()
+                return future.result()
+            logging.warning("立ち読みの先読みを破棄（順序外）: %s", url)
+            if not future.cancel():
+                _discard_pages(future.result())
+        self._fill()
+        return self._service.capture(tachiyomi_url)
+
+    def close(self) -> None:
+        """未使用の先読みを取り消し、取り込み済みのファイルを消す。"""
+        self._urls = iter(())
+        while self._jobs:
+            _, future = self._jobs.popleft()
+            if not future.cancel():
+                _discard_pages(future.result())
+
+    def __enter__(self) -> "TachiyomiPrefetch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class TachiyomiCaptureService:
+    """年齢認証済みのモバイル Chrome をプールし、複数の本の立ち読みを並列に取り込む。
+
+    - prefetch(urls) で先読みし、本ごとの結果（ページ順の WebP パス一覧）を take(url) で受け取る
+    - driver は必要になった時点で作り、本をまたいで使い回す（年齢認証は driver ごとに 1 回）
+    - 1 冊の失敗は空リストになるだけで、他の本は止めない
+    """
+
+    def __init__(self, workers: int = TACHIYOMI_CAPTURE_WORKERS, *, pool: DriverPool | None = None):
+        self.workers = max(int(workers), 1)
+        self.pool = pool or DriverPool(create_tachiyomi_driver, size=self.workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tachiyomi")
+
+    def __enter__(self) -> "TachiyomiCaptureService":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def capture(self, tachiyomi_url: str) -> list[str]:
+        """プールの driver で 1 冊取り込む（呼び出したスレッドで実行）。"""
+        file_prefix = f"{uuid.uuid4().hex[:8]}_page"
+        try:
+            with self.pool.driver() as driver:
+                return capture_all_tachiyomi_pages(
+                    tachiyomi_url, driver=driver, file_prefix=file_prefix
+                )
+        except Exception as e:
+            logging.warning("立ち読み処理失敗（空リストで続行）: %s", e)
+            return []
+
+    def submit(self, tachiyomi_url: str) -> Future:
+        return self._executor.submit(self.capture, tachiyomi_url)
+
+    def prefetch(
+        self, tachiyomi_urls: Iterable[str | None], *, read_ahead: int | None = None
+    ) -> TachiyomiPrefetch:
+        """URL の並び順に取り込みを先読みする（空は除く）。結果は戻り値の take(url) で受け取る。
+
+        read_ahead は投入しておく本の上限（省略時は workers × TACHIYOMI_READ_AHEAD_PER_WORKER）。
+        """
+        if read_ahead is None:
+            read_ahead = self.workers * TACHIYOMI_READ_AHEAD_PER_WORKER
+        return TachiyomiPrefetch(self, tachiyomi_urls, read_ahead)
+
+    def capture_many(self, tachiyomi_urls: list[str | None]) -> list[list[str]]:
+        """入力順に、本ごとのページパス一覧を返す（URL が空の本は []）。"""
+        with self.prefetch(tachiyomi_urls) as jobs:
+            return [jobs.take(url) if url else [] for url in tachiyomi_urls]
+
+    def close(self) -> None:
+        """未着手の取り込みを取り消し、実行中の分を待ってから Chrome を終了する。"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.pool.close()
+
+
 if __name__ == "__main__":
     test_url = "https://book.dmm.co.jp/tachiyomi/?cid=FRNfXRNVFW1RAQxaBwFUVgMLU1gAClAPVU5EDl0VClQMBllNB1o*UFcKWhRHVwVfCBxZW1kEVQ__&lin=1&sd=0"
     capture_all_tachiyomi_pages(test_url)
@@ -0,0 +1,133 @@
+"""BeautifulSoup の生成を一か所にまとめる（パーサの選択と部分パース）。
+
+- パーサは HTML_PARSER（lxml / html.parser / html5lib）。未指定なら lxml が入っていれば lxml、無ければ html.parser
+- parse_only に渡すストレーナで、レビュー・あらすじ・meta など必要な部分木だけを木にする
+  （開始タグの名前と属性だけで判定し、一致したタグの子孫はすべて残る）
+- HTML_TARGETED_PARSE=0 で部分パースを止め、常に全体を木にする（切り分け用）
+- strip_hidden_nodes で非表示要素を取り除き、Selenium の .text と同じく見えている文字だけにする
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import re
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4.filter import ElementFilter
+
+HTML_PARSER = os.getenv("HTML_PARSER", "")
+HTML_TARGETED_PARSE = os.getenv("HTML_TARGETED_PARSE", "1") != "0"
+
+
+def lxml_available() -> bool:
+    return importlib.util.find_spec("lxml") is not None
+
+
+def resolve_parser(name: str | None = None) -> str:
+    """BeautifulSoup に渡すパーサ名（name > HTML_PARSER > lxml があれば lxml > html.parser）。"""
+    name = name or HTML_PARSER
+    if name:
+        return name
+    return "lxml" if lxml_available() else "html.parser"
+
+
+def make_soup(
+    markup: str | bytes,
+    *,
+    parse_only: ElementFilter | None = None,
+    parser: str | None = None,
+) -> BeautifulSoup:
+    """BeautifulSoup(markup, <既定パーサ>)。parse_only は HTML_TARGETED_PARSE=0 なら無視する。"""
+    if not HTML_TARGETED_PARSE:
+        parse_only = None
+    return BeautifulSoup(markup or "", resolve_parser(parser), parse_only=parse_only)
+
+
+def _class_names(attrs: dict[str, Any]) -> set[str]:
+    value = attrs.get("class") or ""
+    if isinstance(value, str):
+        return set(value.split())
+    return set(value)
+
+
+_NON_RENDERED_TAGS = frozenset({"script", "style", "template", "noscript"})
+_HIDDEN_STYLE_RE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+
+
+def is_hidden_tag(tag: Tag) -> bool:
+    """hidden 属性・display:none / visibility:hidden・Tailwind の hidden クラスの要素か。
+
+    md:block のようなブレークポイント付きの表示クラスが併記されていれば表示扱いにする。
+    """
+    if tag.name in _NON_RENDERED_TAGS:
+        return True
+    attrs = tag.attrs or {}
+    if "hidden" in attrs:
+        return True
+    if _HIDDEN_STYLE_RE.search(str(attrs.get("style") or "")):
+        return True
+    classes = _class_names(attrs)
+    return "hidden" in classes and not any(":" in c for c in classes)
+
+
+def strip_hidden_nodes(root: Tag) -> Tag:
+    """root 配下の非表示要素を木から取り除く（root 自身は残す）。"""
+    for tag in root.find_all(is_hidden_tag):
+        if not tag.decomposed:
+            tag.decompose()
+    return root
+
+
+class TagStrainer(ElementFilter):
+    """predicate(タグ名, 属性) が真の開始タグの部分木だけを残すストレーナ。
+
+    一致しなかったタグの外側の文字列は捨てる。属性は分割前の生の値（class も空白区切りの文字列）。
+    """
+
+    def __init__(self, predicate: Callable[[str, dict[str, Any]], bool]):
+        super().__init__()
+        self.predicate = predicate
+
+    def allow_tag_creation(self, nsprefix: str | None, name: str, attrs: Any) -> bool:
+        return self.predicate(name, dict(attrs or {}))
+
+    def allow_string_creation(self, string: str) -> bool:
+        return False
+
+
+def tags_with_attr(attr: str, value: str) -> TagStrainer:
+    """attr=value を持つタグ（例: data-e2eid="review-item"）の部分木だけを残す。"""
+    return TagStrainer(lambda name, attrs: attrs.get(attr) == value)
+
+
+def tags_named(names: Iterable[str]) -> SoupStrainer:
+    return SoupStrainer(list(names))
+
+
+_SYNOPSIS_CLASSES = ({"summary__txt"}, {"trailer__txt"}, {"mg-b20", "lh4"})
+
+
+def _is_synopsis_tag(name: str, attrs: dict[str, Any]) -> bool:
+    if name == "script":
+        return attrs.get("type") == "application/ld+json"
+    classes = _class_names(attrs)
+    return any(required <= classes for required in _SYNOPSIS_CLASSES)
+
+
+# extract_synopsis_from_soup が見る要素（.summary__txt / div.mg-b20.lh4 / .trailer__txt / JSON-LD）
+SYNOPSIS_STRAINER = TagStrainer(_is_synopsis_tag)
+# parse_e2e_video_reviews_html のレビューカード
+E2E_REVIEW_STRAINER = tags_with_attr("data-e2eid", "review-item")
+# parse_fanza_digital_video_reviews_html の video.dmm レビュー欄
+VIDEO_REVIEW_STRAINER = tags_with_attr("id", "review")
+# parse_doujin_reviews_html の FANZA同人レビュー欄
+DOUJIN_REVIEW_STRAINER = tags_with_attr("id", "review_anchor")
+# parse_comic_reviews_html の book.dmm レビュー欄
+COMIC_REVIEW_STRAINER = tags_with_attr("data-section-name", "review")
+# リンク一覧だけ見るページ（キャンペーンバナー・検索結果）
+ANCHOR_STRAINER = tags_named(["a"])
+# <title> と <meta>（特集ページのタイトル・OGP）
+HEAD_META_STRAINER = tags_named(["title", "meta"])
@@ -0,0 +1,73 @@
+"""API 呼び出しの流量制御（トークンバケット・Retry-After 解釈）。"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucketRateLimiter:
+    """スレッド間で共有するトークンバケット。
+
+    acquire() はトークンを予約し、足りなければ補充されるまで待つ。
+    429 などで API から待機を求められたら pause() で全スレッドをまとめて止める。
+    """
+
+    def __init__(
+        self,
+        rate_per_sec: float,
+        burst: int = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        self.rate_per_sec = float(rate_per_sec)
+        self.capacity = float(max(int(burst), 1))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """トークンを tokens 個（既定 1）消費する。戻り値は待った秒数。"""
+        with self._lock:
+            now = self._clock()
+            elapsed = max(now - self._updated_at, 0.0)
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_sec)
+            self._updated_at = now
+            self._tokens -= tokens
+            wait = max(-self._tokens / self.rate_per_sec, self._paused_until - now, 0.0)
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """以降の acquire() を now + seconds まで待たせる（延長のみ、短縮はしない）。"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + max(seconds, 0.0))
+
+
+def parse_retry_after(value: str | None, *, now: datetime | None = None) -> float | None:
+    """Retry-After ヘッダ（秒数 or HTTP-date）を待機秒数にする。不正値は None。"""
+    if not value:
+        return None
+    text = value.strip()
+    try:
+        return max(float(text), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    clock = now or datetime.now(timezone.utc)
+    return max((retry_at - clock).total_seconds(), 0.0)
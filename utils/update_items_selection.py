@@ -10,6 +10,7 @@ UPDATE_MODES = ("daily", "weekly", "all")
 DEFAULT_RECENT_DAYS = 60
 DEFAULT_MISS_LIMIT = 3
 DEFAULT_SKIP_DAYS = 30
+DEFAULT_FETCH_WORKERS = 4
 
 
 def parse_release_date(value: Any) -> date | None:
@@ -251,6 +252,12 @@ def build_update_mode_parser(description: str) -> argparse.ArgumentParser:
         action="store_true",
         help="api_skip 中の作品も対象に含める",
     )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=DEFAULT_FETCH_WORKERS,
+        help="DMM API 取得の並列数（1 で 1 件ずつ逐次取得、デフォルト 4）",
+    )
     return parser
 
 